@@ -0,0 +1,537 @@
+"""
+VMSI-SDM Dashboard - Signal Analyst Rule Tables
+SignalAnalyst 임계값 규칙 표 + DataFrame 전체 일괄 평가 (NumPy 마스크)
+
+각 규칙은 위에서부터 처음 조건을 만족하는 구간(Tier)을 고릅니다 (np.select).
+같은 표로 단일 신호 리포트 문구(SignalAnalyst)와 전체 신호의 점수 / 리스크 / SL·TP 컬럼(score_signals)을 만듭니다.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# (컬럼, 비교 함수, 임계값) — 한 구간의 조건들은 모두 참이어야 함 (OR는 같은 결과의 구간을 나눠 적음)
+Clause = Tuple[str, Callable[..., np.ndarray], float]
+
+
+class Tier(NamedTuple):
+    """규칙 구간 (when이 비어 있으면 나머지 전체)"""
+    when: Tuple[Clause, ...]
+    score: float = 0.0
+    label: str = ""
+    threshold: Optional[float] = None
+    text: Optional[Dict[str, str]] = None
+
+
+class Rule(NamedTuple):
+    """
+    임계값 규칙
+
+    value: 평가 / 표시 값 컬럼, signals: 적용 신호 타입 (None이면 전체),
+    applies: 추가 적용 조건, text: 모든 구간 공통 문구
+    """
+    name: str
+    value: str
+    tiers: Tuple[Tier, ...]
+    signals: Optional[Tuple[str, ...]] = None
+    applies: Tuple[Clause, ...] = ()
+    text: Optional[Dict[str, str]] = None
+
+
+# ─────────────── Inputs ───────────────
+
+# 컬럼 → (features_json 키 (앞쪽 우선), 기본값) — SignalAnalyst의 features.get() 체인과 동일
+ANALYST_FEATURES: Dict[str, Tuple[Tuple[str, ...], float]] = {
+    'trend_score': (('trend_score', 'trendScore'), 60),
+    'rsi': (('rsi',), 50),
+    'vol_mult': (('vol_mult',), 1.0),
+    'ema1': (('ema1',), 0),
+    'ema2': (('ema2',), 0),
+    'prob': (('prob',), 0.5),
+    'vcp_ratio': (('vcp_ratio', 'vcp'), 0.5),
+    'dist_ath': (('dist_ath',), 0.0),
+    'price': (('price', 'ema1'), 100),
+}
+
+
+def analyst_frame(signals: Iterable[Mapping[str, Any]]) -> pd.DataFrame:
+    """
+    신호 dict 목록 → 규칙 평가용 DataFrame
+
+    Args:
+        signals: 'signal'과 'features_json'을 가진 dict (SignalAnalyst 입력과 같은 형식)
+
+    Returns:
+        signal + ANALYST_FEATURES 컬럼 DataFrame (prepare_frame 적용)
+    """
+    rows = []
+    for signal in signals:
+        features = signal.get('features_json') or {}
+        row = {'signal': signal.get('signal', 'BUY')}
+        for column, (keys, _) in ANALYST_FEATURES.items():
+            row[column] = next((features[key] for key in keys if features.get(key) is not None), None)
+        rows.append(row)
+    return prepare_frame(pd.DataFrame(rows, columns=['signal', *ANALYST_FEATURES]))
+
+
+def prepare_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    결측 피처를 기본값으로 채우고 파생 컬럼 추가
+
+    Args:
+        df: signal + ANALYST_FEATURES 컬럼 (없는 컬럼 / NaN은 기본값)
+
+    Returns:
+        float 피처 + ema_up / ema_spread 컬럼이 추가된 복사본
+    """
+    df = df.copy()
+    for column, (_, default) in ANALYST_FEATURES.items():
+        values = pd.to_numeric(df[column], errors='coerce') if column in df else np.nan
+        df[column] = pd.Series(values, index=df.index, dtype='float64').fillna(default)
+
+    # EMA 정배열 여부와 괴리율 (정배열: 장기 대비 %, 역배열: -(단기 대비 %))
+    ema1, ema2 = df['ema1'].to_numpy(), df['ema2'].to_numpy()
+    with np.errstate(divide='ignore', invalid='ignore'):
+        spread = np.where(ema1 > ema2, ((ema1 - ema2) / ema2) * 100, -(((ema2 - ema1) / ema1) * 100))
+    df['ema_up'] = (ema1 > ema2).astype(np.float64)
+    df['ema_spread'] = spread
+    return df
+
+
+# ─────────────── Indicator Rules (analyze_all_indicators) ───────────────
+
+WEAK = 'weak'
+
+INDICATOR_RULES: Tuple[Rule, ...] = (
+    Rule('Trend Score', 'trend_score', signals=('BUY',), text={
+        'meaning': '트렌드 스코어는 가격의 상승 추세 강도를 0~100으로 나타냅니다.',
+    }, tiers=(
+        Tier((('trend_score', np.greater_equal, 70),), 10, 'excellent', 70, {
+            'detail': '현재 {value:.1f}점으로 매우 강한 상승 추세에 있습니다. 70점 이상은 강세장을 의미하며, 지속적인 상승 가능성이 높습니다.',
+            'recent_trend': '최근 10~20 바 동안 지속적으로 상승하며 강한 모멘텀을 보이고 있습니다.',
+        }),
+        Tier((('trend_score', np.greater_equal, 60),), 8, 'good', 60, {
+            'detail': '현재 {value:.1f}점으로 상승 추세에 있습니다. 60~70점 구간은 안정적인 상승 국면을 의미합니다.',
+            'recent_trend': '최근 가격이 꾸준히 상승하고 있으며, 추세가 유지되고 있습니다.',
+        }),
+        Tier((('trend_score', np.greater_equal, 55),), 5, 'moderate', 55, {
+            'detail': '현재 {value:.1f}점으로 약한 상승 추세에 있습니다. 55~60점 구간은 추세 전환 가능성도 있는 구간입니다.',
+            'recent_trend': '최근 가격 변동이 있었으나 전반적으로 상승 방향을 유지하고 있습니다.',
+        }),
+        Tier((), 2, WEAK, 55, {
+            'detail': '현재 {value:.1f}점으로 상승 추세가 약합니다. 55점 미만은 추세가 불분명하거나 하락 가능성이 있는 구간입니다.',
+            'reason': '매수 신호에 필요한 최소 55점에 미달하여 약 {gap:.1f}점이 부족합니다. 추세 전환 주의가 필요합니다.',
+            'recent_trend': '최근 가격 변동성이 크거나 하락 압력이 있었습니다.',
+        }),
+    )),
+    Rule('RSI(14)', 'rsi', signals=('BUY',), text={
+        'meaning': 'RSI는 과매수/과매도 상태를 나타내는 지표로, 0~100 범위를 가집니다.',
+    }, tiers=(
+        Tier((('rsi', np.greater, 60),), 9, 'excellent', 60, {
+            'detail': '현재 RSI는 {value:.1f}로 강세권(60 이상)에 있습니다. 매수 세력이 강하며 상승 모멘텀이 있습니다.',
+            'recent_trend': '최근 RSI가 상승하며 매수 압력이 증가하고 있습니다. 다만 70 이상이면 단기 과열 주의가 필요합니다.',
+        }),
+        Tier((('rsi', np.greater, 50),), 7, 'good', 50, {
+            'detail': '현재 RSI는 {value:.1f}로 중립 상단(50~60)에 있습니다. 매수 세력이 우세하지만 과열은 아닙니다.',
+            'recent_trend': '최근 RSI가 중립권에서 상승하며 매수 신호가 나타나고 있습니다.',
+        }),
+        Tier((('rsi', np.greater, 45),), 5, 'moderate', 45, {
+            'detail': '현재 RSI는 {value:.1f}로 중립권(45~50)에 있습니다. 매수/매도 세력이 균형을 이루고 있습니다.',
+            'recent_trend': 'RSI가 중립권에서 횡보하고 있어 방향성 확인이 필요합니다.',
+        }),
+        Tier((), 2, WEAK, 45, {
+            'detail': '현재 RSI는 {value:.1f}로 약세권(45 미만)에 있습니다. 매도 압력이 강한 상태입니다.',
+            'reason': '매수 신호에 적합한 최소 45 이상에 미달하여 약 {gap:.1f}포인트 부족합니다. BUY 신호에 불리한 조건입니다.',
+            'recent_trend': '최근 RSI가 하락하며 매도 압력이 증가하고 있습니다.',
+        }),
+    )),
+    Rule('Volume Multiplier', 'vol_mult', signals=('BUY',), text={
+        'meaning': '거래량 배율은 현재 거래량이 평균 거래량의 몇 배인지를 나타냅니다.',
+    }, tiers=(
+        Tier((('vol_mult', np.greater, 2.0),), 10, 'excellent', 2.0, {
+            'detail': '현재 거래량은 평균의 {value:.2f}배로 폭증하였습니다. 2배 이상은 강한 관심과 변동성을 의미합니다.',
+            'recent_trend': '최근 거래량이 급증하며 시장 참여자들의 관심이 집중되고 있습니다. 돌파 시 큰 움직임이 예상됩니다.',
+        }),
+        Tier((('vol_mult', np.greater, 1.5),), 8, 'good', 1.5, {
+            'detail': '현재 거래량은 평균의 {value:.2f}배로 증가하였습니다. 1.5~2배는 관심이 증가하고 있음을 의미합니다.',
+            'recent_trend': '최근 거래량이 증가 추세로, 매수/매도 활동이 활발해지고 있습니다.',
+        }),
+        Tier((('vol_mult', np.greater, 1.2),), 6, 'good', 1.2, {
+            'detail': '현재 거래량은 평균의 {value:.2f}배로 정상적인 수준입니다. 1.2배 이상은 안정적인 거래 활동을 나타냅니다.',
+            'recent_trend': '거래량이 평균 수준을 유지하며 안정적으로 거래되고 있습니다.',
+        }),
+        Tier((), 3, WEAK, 1.2, {
+            'detail': '현재 거래량은 평균의 {value:.2f}배로 부족한 상태입니다. 1.2배 미만은 거래 활동이 저조함을 의미합니다.',
+            'reason': '안정적인 신호에 필요한 최소 1.2배에 미달합니다. 거래량 부족은 신호의 신뢰성을 낮춥니다.',
+            'recent_trend': '최근 거래량이 저조하며 시장 참여자들의 관심이 낮습니다. 돌파 시 추세 지속력이 약할 수 있습니다.',
+        }),
+    )),
+    Rule('EMA Alignment', 'ema_spread', signals=('BUY',),
+         applies=(('ema1', np.greater, 0), ('ema2', np.greater, 0)), text={
+        'meaning': 'EMA(지수이동평균) 정배열은 단기 EMA가 장기 EMA 위에 있을 때를 말하며, 상승 추세를 나타냅니다.',
+    }, tiers=(
+        Tier((('ema_up', np.greater, 0), ('ema_spread', np.greater, 2)), 9, 'excellent', 2.0, {
+            'detail': '단기 EMA가 장기 EMA보다 {magnitude:.2f}% 높게 형성되어 강한 정배열 상태입니다. 2% 이상 차이는 강한 상승 추세를 의미합니다.',
+            'recent_trend': '최근 EMA 간격이 벌어지며 상승 추세가 강화되고 있습니다.',
+        }),
+        Tier((('ema_up', np.greater, 0),), 7, 'good', 0, {
+            'detail': '단기 EMA가 장기 EMA보다 {magnitude:.2f}% 높게 형성되어 정배열 상태입니다. 상승 추세가 유지되고 있습니다.',
+            'recent_trend': 'EMA 정배열이 유지되며 상승 추세가 지속되고 있습니다.',
+        }),
+        Tier((), 0, WEAK, 0, {
+            'detail': '단기 EMA가 장기 EMA보다 {magnitude:.2f}% 낮게 형성되어 역배열 상태입니다. 하락 추세 또는 횡보 국면입니다.',
+            'reason': 'BUY 신호에는 정배열이 필요하지만 현재 역배열로 상승 추세가 아닙니다. EMA 크로스 발생 시 추세 전환 가능성이 있습니다.',
+            'recent_trend': 'EMA가 역배열로 하락 압력이 있거나 횡보 중입니다.',
+        }),
+    )),
+    Rule('ML Probability', 'prob', signals=('BUY',), text={
+        'meaning': 'ML 확률은 머신러닝 모델이 예측한 상승 확률로, 과거 데이터를 기반으로 학습되었습니다.',
+    }, tiers=(
+        Tier((('prob', np.greater_equal, 0.70),), 10, 'excellent', 0.70, {
+            'detail': '모델이 예측한 상승 확률은 {value:.1%}로 매우 높습니다. 70% 이상은 고확률 신호로 분류됩니다.',
+            'recent_trend': '최근 학습 데이터에서 유사한 패턴이 높은 성공률을 보였습니다.',
+        }),
+        Tier((('prob', np.greater_equal, 0.60),), 7, 'good', 0.60, {
+            'detail': '모델이 예측한 상승 확률은 {value:.1%}로 신뢰할 수 있는 수준입니다. 60~70%는 안정적인 신호를 의미합니다.',
+            'recent_trend': '최근 학습 데이터에서 유사한 패턴이 준수한 성공률을 보였습니다.',
+        }),
+        Tier((('prob', np.greater_equal, 0.55),), 5, 'moderate', 0.55, {
+            'detail': '모델이 예측한 상승 확률은 {value:.1%}로 보통 수준입니다. 55~60%는 중립적인 신호를 의미합니다.',
+            'recent_trend': '최근 학습 데이터에서 유사한 패턴의 성공률이 보통 수준입니다.',
+        }),
+        Tier((), 2, WEAK, 0.55, {
+            'detail': '모델이 예측한 상승 확률은 {value:.1%}로 낮은 수준입니다. 55% 미만은 신뢰도가 낮은 신호입니다.',
+            'reason': '신뢰할 수 있는 최소 55% 확률에 미달합니다. 약 {gap_pct:.1f}%p 부족하며 신호의 신뢰성이 낮습니다.',
+            'recent_trend': '최근 학습 데이터에서 유사한 패턴의 성공률이 낮았습니다.',
+        }),
+    )),
+)
+
+# 종합 점수 → 신호 강도
+STRENGTH_RULE = Rule('strength', 'overall_score', tiers=(
+    Tier((('overall_score', np.greater_equal, 8),), label='매우 강함 (Strong)', text={'color': '#2ea043'}),
+    Tier((('overall_score', np.greater_equal, 6),), label='보통 (Moderate)', text={'color': '#fb8500'}),
+    Tier((), label='약함 (Weak)', text={'color': '#f85149'}),
+))
+
+
+# ─────────────── SL/TP Rules (calculate_dynamic_sltp) ───────────────
+
+# 손절 비율 (변동성 기반, score = 비율)
+STOP_LOSS_RULE = Rule('sl_pct', 'vcp_ratio', tiers=(
+    Tier((('vcp_ratio', np.greater, 0.7),), 0.08, text={
+        'reasoning': '가격 변동성(VCP)이 크므로 손절 폭을 8%로 확대하여 단기 변동에 흔들리지 않도록 설정했습니다.',
+    }),
+    Tier((('vcp_ratio', np.greater, 0.5),), 0.06, text={
+        'reasoning': '가격 변동성(VCP)이 중간 수준이므로 손절 폭을 6%로 설정했습니다.',
+    }),
+    Tier((), 0.04, text={
+        'reasoning': '가격 변동성(VCP)이 낮아 안정적이므로 손절 폭을 4%로 타이트하게 설정했습니다.',
+    }),
+))
+
+# 익절 비율 (확률 & 추세 기반)
+_TP_WEAK = {'reasoning': 'ML 확률 또는 트렌드가 약하므로 익절 목표를 8%로 낮춰 빠르게 수익을 실현합니다.'}
+TAKE_PROFIT_RULE = Rule('tp_pct', 'prob', tiers=(
+    Tier((('prob', np.greater_equal, 0.70), ('trend_score', np.greater_equal, 70)), 0.15, text={
+        'reasoning': 'ML 확률이 70% 이상이고 트렌드가 강하므로 익절 목표를 15%로 상향하여 더 큰 수익을 노립니다.',
+    }),
+    Tier((('prob', np.greater_equal, 0.60), ('trend_score', np.greater_equal, 60)), 0.12, text={
+        'reasoning': 'ML 확률과 트렌드가 양호하므로 익절 목표를 12%로 설정했습니다.',
+    }),
+    Tier((('prob', np.less, 0.55),), 0.08, text=_TP_WEAK),
+    Tier((('trend_score', np.less, 55),), 0.08, text=_TP_WEAK),
+    Tier((), 0.10, text={
+        'reasoning': 'ML 확률과 트렌드가 보통 수준이므로 익절 목표를 10%로 설정했습니다.',
+    }),
+))
+
+# 비율 조정 (조건 충족 시 score 배수 적용, 나머지 구간 없음)
+STOP_LOSS_ADJUSTMENTS: Tuple[Rule, ...] = (
+    Rule('volume_spike', 'vol_mult', tiers=(
+        Tier((('vol_mult', np.greater, 2.5),), 1.2, text={
+            'reasoning': ' 거래량이 평균의 {vol_mult:.1f}배로 폭증하여 단기 변동성이 클 것으로 예상되므로 손절 폭에 20% 여유를 추가했습니다.',
+        }),
+    )),
+)
+TAKE_PROFIT_ADJUSTMENTS: Tuple[Rule, ...] = (
+    Rule('rsi_overbought', 'rsi', signals=('BUY',), tiers=(
+        Tier((('rsi', np.greater, 75),), 0.9, text={
+            'reasoning': ' RSI가 {rsi:.1f}로 과매수권에 진입하여 단기 조정 가능성이 있으므로 익절 목표를 10% 낮췄습니다.',
+        }),
+    )),
+)
+
+# 손익비 평가
+RISK_REWARD_RULE = Rule('rr_ratio', 'rr_ratio', tiers=(
+    Tier((('rr_ratio', np.greater_equal, 2.5),), text={
+        'reasoning': '손익비(R:R Ratio)는 1:{rr_ratio:.2f}입니다. 매우 우수한 손익비로 리스크 대비 보상이 큽니다.',
+    }),
+    Tier((('rr_ratio', np.greater_equal, 2.0),), text={
+        'reasoning': '손익비(R:R Ratio)는 1:{rr_ratio:.2f}입니다. 양호한 손익비로 리스크 대비 보상이 적절합니다.',
+    }),
+    Tier((('rr_ratio', np.greater_equal, 1.5),), text={
+        'reasoning': '손익비(R:R Ratio)는 1:{rr_ratio:.2f}입니다. 적정한 손익비이나 보수적인 편입니다.',
+    }),
+    Tier((), text={
+        'reasoning': '손익비(R:R Ratio)는 1:{rr_ratio:.2f}입니다. 손익비가 다소 낮습니다. 신중한 접근이 필요합니다.',
+    }),
+))
+
+
+# ─────────────── Risk Rules (assess_detailed_risk) ───────────────
+
+RISK_RULES: Tuple[Rule, ...] = (
+    Rule('volume', 'vol_mult', tiers=(
+        Tier((('vol_mult', np.greater, 3.0),), 8, 'high', text={
+            'category': '거래량 변동성',
+            'detail': '거래량이 평균의 {vol_mult:.2f}배로 급증했습니다. 이는 시장 참여자들의 관심이 집중되었음을 의미하지만, 동시에 단기 과열 가능성도 있습니다.',
+            'impact': '갑작스런 거래량 증가는 양방향 변동성을 높일 수 있으며, 급등 후 급락의 위험이 있습니다.',
+            'mitigation': '거래량 폭증 시에는 포지션 크기를 평소의 50%로 줄이고, 익절/손절을 평소보다 빠르게 집행하는 것이 안전합니다.',
+        }),
+        Tier((('vol_mult', np.greater, 2.0),), 5, 'moderate', text={
+            'category': '거래량 변동성',
+            'detail': '거래량이 평균의 {vol_mult:.2f}배로 증가했습니다. 관심이 높아지고 있으나 과열까지는 아닙니다.',
+            'impact': '거래량 증가는 추세 강화 신호이지만, 단기 변동성도 함께 증가할 수 있습니다.',
+            'mitigation': '거래량 증가 구간에서는 분할 진입/청산 전략을 사용하여 리스크를 분산하세요.',
+        }),
+        Tier((), 2, 'low', text={
+            'category': '거래량 안정성',
+            'detail': '거래량이 평균의 {vol_mult:.2f}배로 안정적입니다. 급격한 변동 가능성은 낮습니다.',
+            'impact': '거래량이 안정적이어서 변동성 리스크는 낮지만, 추세 지속력도 약할 수 있습니다.',
+            'mitigation': '거래량이 적으면 추세 전환 시 느리게 반응할 수 있으므로, 추세 전환 신호에 민감하게 대응하세요.',
+        }),
+    )),
+    Rule('vcp', 'vcp_ratio', tiers=(
+        Tier((('vcp_ratio', np.greater, 0.7),), 8, 'high', text={
+            'category': '가격 변동 폭',
+            'detail': 'VCP(가격 변동성) 비율이 {vcp_ratio:.1%}로 높습니다. 최근 가격 변동 폭이 크며 불안정한 상태입니다.',
+            'impact': '높은 VCP는 손절가에 쉽게 도달할 수 있으며, 예상치 못한 손실 위험이 있습니다.',
+            'mitigation': 'VCP가 높을 때는 손절 폭을 넓게 설정하거나(8% 이상), 포지션 크기를 줄여 총 리스크를 제한하세요.',
+        }),
+        Tier((('vcp_ratio', np.greater, 0.5),), 5, 'moderate', text={
+            'category': '가격 변동 폭',
+            'detail': 'VCP(가격 변동성) 비율이 {vcp_ratio:.1%}로 보통 수준입니다. 적절한 변동성을 보이고 있습니다.',
+            'impact': '중간 수준의 변동성으로 손절가 터치 가능성이 있으나 관리 가능한 수준입니다.',
+            'mitigation': '표준 손절 폭(5~6%)으로 충분하며, 추세가 유지되는지 모니터링하세요.',
+        }),
+        Tier((), 2, 'low', text={
+            'category': '가격 안정성',
+            'detail': 'VCP(가격 변동성) 비율이 {vcp_ratio:.1%}로 낮습니다. 가격이 안정적이며 예측 가능성이 높습니다.',
+            'impact': '낮은 변동성으로 손절 위험은 낮지만, 단기 수익 기회도 제한적일 수 있습니다.',
+            'mitigation': '안정적인 구간이므로 손절 폭을 타이트하게(4%) 설정해도 안전합니다.',
+        }),
+    )),
+    Rule('ath', 'dist_ath', tiers=(
+        Tier((('dist_ath', np.greater, 0.20),), 6, 'moderate', text={
+            'category': '신고가 대비 위치',
+            'detail': '현재 가격이 52주 신고가 대비 {dist_ath:.1%} 하락한 위치입니다. 신고가에서 멀리 떨어져 있습니다.',
+            'impact': '신고가까지 여러 저항선이 있을 수 있으며, 반등 시 저항에 부딪힐 가능성이 있습니다.',
+            'mitigation': '신고가에서 멀 때는 단계적 저항선(전고점)을 확인하고, 저항선 부근에서 일부 익절을 고려하세요.',
+        }),
+        Tier((('dist_ath', np.greater, 0.05),), 3, 'low', text={
+            'category': '신고가 근처',
+            'detail': '현재 가격이 52주 신고가 대비 {dist_ath:.1%} 하락한 위치로 신고가에 근접해 있습니다.',
+            'impact': '신고가 근처에서는 강한 상승 추세가 지속될 가능성이 높으나, 신고가가 저항선이 될 수도 있습니다.',
+            'mitigation': '신고가 근처에서는 신고가 돌파 여부를 주시하고, 돌파 시 추가 상승 기대, 실패 시 일부 익절을 고려하세요.',
+        }),
+        Tier((), 1, 'low', text={
+            'category': '신고가 경신 중',
+            'detail': '현재 가격이 52주 신고가 수준으로 신고가를 경신하고 있습니다.',
+            'impact': '신고가 경신은 강한 추세를 의미하며, 추가 상승 여력이 큽니다. 단, 과열 주의는 필요합니다.',
+            'mitigation': '신고가 경신 시에는 추세 추종 전략이 유효하나, RSI 과열 여부를 체크하여 과매수 위험을 관리하세요.',
+        }),
+    )),
+    Rule('rsi', 'rsi', signals=('BUY',), tiers=(
+        Tier((('rsi', np.greater, 75),), 7, 'high', text={
+            'category': 'RSI 과매수',
+            'detail': 'RSI가 {rsi:.1f}로 과매수권(75 이상)에 진입했습니다. 단기 조정 가능성이 높습니다.',
+            'impact': 'RSI 과매수는 단기 급락 또는 조정의 신호가 될 수 있으며, 신규 매수 시 리스크가 큽니다.',
+            'mitigation': 'RSI 75 이상에서는 신규 진입을 자제하거나, 진입 시 즉시 익절 목표를 낮추고(5~8%) 빠르게 수익 실현하세요.',
+        }),
+        Tier((('rsi', np.greater, 65),), 5, 'moderate', text={
+            'category': 'RSI 과매수 임박',
+            'detail': 'RSI가 {rsi:.1f}로 과매수권에 근접하고 있습니다. 주의가 필요합니다.',
+            'impact': 'RSI가 높아지면서 단기 조정 가능성이 증가하고 있습니다.',
+            'mitigation': 'RSI 65 이상에서는 추가 상승 시 분할 익절을 고려하고, 손절가를 점진적으로 올려(트레일링 스탑) 수익을 보호하세요.',
+        }),
+        Tier((), 2, 'low', text={
+            'category': 'RSI 적정',
+            'detail': 'RSI가 {rsi:.1f}로 적정 수준에 있습니다. 과열 위험은 낮습니다.',
+            'impact': 'RSI가 적정 수준이므로 추가 상승 여력이 있으며, 단기 조정 리스크는 낮습니다.',
+            'mitigation': 'RSI가 적정 수준이므로 표준 손익 전략을 사용하면 됩니다.',
+        }),
+    )),
+    Rule('trend', 'trend_score', tiers=(
+        Tier((('trend_score', np.less, 55),), 7, 'high', text={
+            'category': '약한 추세',
+            'detail': '트렌드 스코어가 {trend_score:.1f}로 약합니다. 추세가 불분명하거나 전환 가능성이 있습니다.',
+            'impact': '약한 추세에서는 신호의 신뢰성이 낮고, 추세 반전 시 손실이 확대될 수 있습니다.',
+            'mitigation': '트렌드가 약할 때는 포지션 크기를 줄이고(3~5%), 손절을 엄격히 지켜 빠른 손절이 필요합니다.',
+        }),
+        Tier((('trend_score', np.less, 60),), 4, 'moderate', text={
+            'category': '보통 추세',
+            'detail': '트렌드 스코어가 {trend_score:.1f}로 보통 수준입니다. 추세가 유지되고 있으나 강하지는 않습니다.',
+            'impact': '보통 추세에서는 신호가 유효하나, 추세 약화 시 빠른 대응이 필요합니다.',
+            'mitigation': '트렌드가 보통 수준일 때는 추세 약화 신호(EMA 역배열 등)를 주시하고, 추세 전환 시 즉시 청산하세요.',
+        }),
+        Tier((), 1, 'low', text={
+            'category': '강한 추세',
+            'detail': '트렌드 스코어가 {trend_score:.1f}로 강합니다. 추세가 명확하고 지속 가능성이 높습니다.',
+            'impact': '강한 추세에서는 추세 추종 전략이 유효하며, 추세 반전 리스크는 낮습니다.',
+            'mitigation': '강한 추세가 유지되는 동안 트레일링 스탑을 활용하여 수익을 극대화하세요.',
+        }),
+    )),
+)
+
+# 평균 리스크 점수 → 리스크 수준 / 권장 포지션 크기
+RISK_LEVEL_RULE = Rule('risk_level', 'risk_score', tiers=(
+    Tier((('risk_score', np.greater_equal, 7),), label='높음 (High Risk)',
+         text={'color': '#f85149', 'position_size': '총 자산의 3~5%'}),
+    Tier((('risk_score', np.greater_equal, 5),), label='보통 (Moderate Risk)',
+         text={'color': '#fb8500', 'position_size': '총 자산의 5~10%'}),
+    Tier((), label='낮음 (Low Risk)',
+         text={'color': '#2ea043', 'position_size': '총 자산의 10~15%'}),
+))
+
+# 적용된 리스크 규칙이 없을 때 점수
+DEFAULT_RISK_SCORE = 5
+
+
+# ─────────────── Evaluation ───────────────
+
+def _mask(df: pd.DataFrame, clauses: Tuple[Clause, ...]) -> np.ndarray:
+    """조건 절 AND 마스크 (빈 조건은 전체 True)"""
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, threshold in clauses:
+        mask &= op(df[column].to_numpy(), threshold)
+    return mask
+
+
+def applies_mask(df: pd.DataFrame, rule: Rule) -> np.ndarray:
+    """규칙 적용 대상 행 (신호 타입 + 추가 조건)"""
+    mask = _mask(df, rule.applies)
+    if rule.signals is not None:
+        mask &= df['signal'].astype(object).isin(rule.signals).to_numpy()
+    return mask
+
+
+def select_tiers(df: pd.DataFrame, rule: Rule) -> np.ndarray:
+    """
+    행별 선택 구간 인덱스
+
+    Returns:
+        구간 인덱스 배열 (적용 대상이 아니거나 만족하는 구간이 없으면 -1)
+    """
+    index = np.select([_mask(df, tier.when) for tier in rule.tiers], np.arange(len(rule.tiers)), default=-1)
+    return np.where(applies_mask(df, rule), index, -1)
+
+
+def tier_values(rule: Rule, index: np.ndarray, field: str, default: Any = np.nan) -> np.ndarray:
+    """구간 인덱스 → 구간 속성 배열 (score / label / text 키, -1은 default)"""
+    values = [
+        getattr(tier, field) if field in Tier._fields else (tier.text or {}).get(field, default)
+        for tier in rule.tiers
+    ]
+    lookup = np.array([*values, default], dtype=object if isinstance(values[0], str) else np.float64)
+    return lookup[index]
+
+
+def _mean_score(df: pd.DataFrame, rules: Tuple[Rule, ...], empty: float) -> np.ndarray:
+    """적용된 규칙 점수 평균 (적용 규칙이 없으면 empty)"""
+    total = np.zeros(len(df))
+    count = np.zeros(len(df))
+    for rule in rules:
+        index = select_tiers(df, rule)
+        matched = index >= 0
+        total += np.where(matched, tier_values(rule, index, 'score', 0.0), 0.0)
+        count += matched
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(count > 0, total / count, empty)
+
+
+def _apply_factors(df: pd.DataFrame, base: np.ndarray, adjustments: Tuple[Rule, ...]) -> np.ndarray:
+    """조정 규칙 배수 적용"""
+    for rule in adjustments:
+        index = select_tiers(df, rule)
+        base = np.where(index >= 0, base * tier_values(rule, index, 'score', 1.0), base)
+    return base
+
+
+def score_signals(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    전체 신호 일괄 평가 (SignalAnalyst 단건 결과와 같은 값)
+
+    Args:
+        df: signal + ANALYST_FEATURES 컬럼 DataFrame (결측은 기본값)
+
+    Returns:
+        입력과 같은 인덱스의 overall_score / strength / risk_score / risk_level / position_size /
+        entry_price / sl_price / tp_price / sl_pct / tp_pct / rr_ratio DataFrame
+    """
+    frame = prepare_frame(df)
+    result = pd.DataFrame(index=df.index)
+
+    frame['overall_score'] = _mean_score(frame, INDICATOR_RULES, 0.0)
+    result['overall_score'] = frame['overall_score'].to_numpy()
+    result['strength'] = tier_values(STRENGTH_RULE, select_tiers(frame, STRENGTH_RULE), 'label')
+
+    frame['risk_score'] = _mean_score(frame, RISK_RULES, DEFAULT_RISK_SCORE)
+    risk_index = select_tiers(frame, RISK_LEVEL_RULE)
+    result['risk_score'] = frame['risk_score'].to_numpy()
+    result['risk_level'] = tier_values(RISK_LEVEL_RULE, risk_index, 'label')
+    result['position_size'] = tier_values(RISK_LEVEL_RULE, risk_index, 'position_size')
+
+    sl_pct = _apply_factors(frame, tier_values(STOP_LOSS_RULE, select_tiers(frame, STOP_LOSS_RULE), 'score'),
+                            STOP_LOSS_ADJUSTMENTS)
+    tp_pct = _apply_factors(frame, tier_values(TAKE_PROFIT_RULE, select_tiers(frame, TAKE_PROFIT_RULE), 'score'),
+                            TAKE_PROFIT_ADJUSTMENTS)
+
+    entry = frame['price'].to_numpy()
+    is_buy = (frame['signal'].astype(object) == 'BUY').to_numpy()
+    sl_price = np.where(is_buy, entry * (1 - sl_pct), entry * (1 + sl_pct))
+    tp_price = np.where(is_buy, entry * (1 + tp_pct), entry * (1 - tp_pct))
+    risk = np.abs(entry - sl_price)
+    reward = np.abs(tp_price - entry)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        rr_ratio = np.where(risk > 0, reward / risk, 0.0)
+
+    result['entry_price'] = entry
+    result['sl_price'] = sl_price
+    result['tp_price'] = tp_price
+    result['sl_pct'] = sl_pct
+    result['tp_pct'] = tp_pct
+    result['rr_ratio'] = rr_ratio
+    return result
+
+
+def matched_tiers(df: pd.DataFrame, rules: Tuple[Rule, ...], row: int = 0) -> List[Tuple[Rule, Tier, Dict[str, Any]]]:
+    """
+    한 행에 적용된 규칙 구간과 문구 포맷 값 (단건 리포트용)
+
+    Args:
+        df: prepare_frame 결과
+        rules: 규칙 목록
+        row: 행 위치
+
+    Returns:
+        [(규칙, 선택 구간, 포맷 값)] — 포맷 값은 행의 피처 + value / gap / gap_pct / magnitude
+    """
+    values = df.iloc[row].to_dict()
+    matched = []
+    for rule in rules:
+        index = int(select_tiers(df, rule)[row])
+        if index < 0:
+            continue
+        tier = rule.tiers[index]
+        value = values[rule.value]
+        gap = (tier.threshold - value) if tier.threshold is not None else 0.0
+        matched.append((rule, tier, {**values, 'value': value, 'gap': gap, 'gap_pct': gap * 100, 'magnitude': abs(value)}))
+    return matched
+
+
+def render(template: str, values: Mapping[str, Any]) -> str:
+    """규칙 문구 포맷"""
+    return template.format(**values)
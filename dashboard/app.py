@@ -11,7 +11,7 @@ from plotly.subplots import make_subplots
 import sys
 import os
 from pathlib import Path
-from datetime import datetime, timedelta, timezone
+from datetime import datetime
 
 # Streamlit Cloud Secrets를 환경변수로 설정 (로컬에서는 스킵)
 try:
@@ -25,6 +25,17 @@ except FileNotFoundError:
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from server.db import SessionLocal, Signal, Label, Experiment
+from dashboard.cache import ChangeTokenCache, cached_query, file_change_token
+from dashboard.analyst_rules import STRENGTH_RULE
+from dashboard.charts import (
+    HISTOGRAM_BINS, MAX_LINE_POINTS, TIME_BIN_LABELS,
+    bin_time_counts, box_stats, choose_time_bin, downsample_frame, histogram_counts
+)
+from dashboard.data import (
+    filter_signal_frame, load_analyst_frame, load_daily_rollup, load_labeled_returns, load_signal_frame,
+    load_signal_rows, load_signal_summary, merge_signal_rows
+)
+from dashboard.live import DEFAULT_STREAM_URL, SignalStreamClient
 from learner.preset import PresetManager
 from learner.metrics import PerformanceMetrics
 
@@ -353,7 +364,7 @@ st.markdown("---")
 
 st.sidebar.header("설정")
 
-days_back = st.sidebar.slider("조회 기간 (일)", 1, 90, 30)
+days_back = st.sidebar.slider("조회 기간 (일)", 1, 3650, 30)
 
 signal_filter = st.sidebar.multiselect(
     "신호 타입",
@@ -363,6 +374,11 @@ signal_filter = st.sidebar.multiselect(
 
 symbol_filter = st.sidebar.text_input("심볼 필터 (예: AAPL)", "")
 
+live_updates = st.sidebar.toggle(
+    "실시간 갱신", value=bool(DEFAULT_STREAM_URL), disabled=not DEFAULT_STREAM_URL,
+    help="서버 /signals/stream을 구독해 최근 신호 목록에 새 신호와 라벨 결과만 추가합니다"
+)
+
 if st.sidebar.button("새로고침"):
     st.rerun()
 
@@ -422,59 +438,79 @@ if uploaded_file is not None:
 # 데이터 로드
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 
-@st.cache_data(ttl=60)
-def load_signals(days_back: int, signal_types: list, symbol: str = ""):
-    """신호 데이터 로드"""
-    db = SessionLocal()
-    
-    cutoff_date = datetime.now(timezone.utc) - timedelta(days=days_back)
-    query = db.query(Signal).filter(Signal.created_at >= cutoff_date)
-    
-    if signal_types:
-        query = query.filter(Signal.signal.in_(signal_types))
-    
-    if symbol:
-        query = query.filter(Signal.symbol.contains(symbol.upper()))
-    
-    signals = query.order_by(Signal.created_at.desc()).all()
-    
-    data = []
-    for s in signals:
-        features = s.features_json
-        labels = {label.fwd_n: label for label in s.labels}
-        
-        data.append({
-            'id': s.id,
-            'created_at': s.created_at,
-            'symbol': s.symbol,
-            'tf': s.tf,
-            'signal': s.signal,
-            'trend_score': features.get('trendScore', 0),
-            'prob': features.get('prob', 0),
-            'rsi': features.get('rsi', 50),
-            'vol_mult': features.get('vol_mult', 1),
-            'fwd_ret_10': labels.get(10).fwd_ret if 10 in labels else None,
-            'broke_high': labels.get(10).broke_high if 10 in labels else None,
-            'broke_low': labels.get(10).broke_low if 10 in labels else None,
-        })
-    
-    db.close()
-    return pd.DataFrame(data)
+@st.cache_resource
+def shared_cache() -> ChangeTokenCache:
+    """세션 간 공유 캐시 (Streamlit 프로세스당 1개, DB 변경 토큰으로 무효화)"""
+    return ChangeTokenCache()
+
+
+def _window_key(name: str, days_back: int, signal_types: list, symbol: str, *extra) -> tuple:
+    """기간 조회 캐시 키 (조회 기간 경계는 시간 단위로 갱신)"""
+    hour = datetime.utcnow().strftime('%Y-%m-%d %H')
+    return (name, days_back, tuple(signal_types), symbol, *extra, hour)
+
+
+def load_signals(days_back: int, signal_types: list, symbol: str = "", limit: int = 50):
+    """최근 신호 목록 (필터 + 10봉 라벨 조인 단일 SQL)"""
+    return cached_query(
+        shared_cache(), _window_key('signals', days_back, signal_types, symbol, limit),
+        lambda db: load_signal_frame(db, days_back, signal_types, symbol, limit=limit)
+    )
+
+
+@st.cache_resource
+def stream_client() -> SignalStreamClient:
+    """실시간 스트림 구독 클라이언트 (Streamlit 프로세스당 1개)"""
+    client = SignalStreamClient()
+    client.start()
+    return client
+
+
+def load_summary(days_back: int, signal_types: list, symbol: str = ""):
+    """통계 카드 집계 (SQL COUNT / AVG)"""
+    return cached_query(
+        shared_cache(), _window_key('summary', days_back, signal_types, symbol),
+        lambda db: load_signal_summary(db, days_back, signal_types, symbol)
+    )
+
+
+def load_timeline(days_back: int, signal_types: list, symbol: str = "", time_bin: str = "day"):
+    """구간별 신호 개수 (stats_counters 일별 롤업 → 일/주/월 합산)"""
+    return cached_query(
+        shared_cache(), _window_key('timeline', days_back, signal_types, symbol, time_bin),
+        lambda db: bin_time_counts(load_daily_rollup(db, days_back, signal_types, symbol), time_bin)
+    )
+
+
+def load_labeled(days_back: int, signal_types: list, symbol: str = ""):
+    """10봉 라벨이 있는 신호의 성과 컬럼"""
+    return cached_query(
+        shared_cache(), _window_key('labeled', days_back, signal_types, symbol),
+        lambda db: load_labeled_returns(db, days_back, signal_types, symbol)
+    )
+
+
+def load_analyst_scores(days_back: int, signal_types: list, symbol: str = ""):
+    """기간 내 전체 신호의 애널리스트 점수 (규칙 표 일괄 평가)"""
+    return cached_query(
+        shared_cache(), _window_key('analyst', days_back, signal_types, symbol),
+        lambda db: load_analyst_frame(db, days_back, signal_types, symbol)
+    )
 
 
-@st.cache_data(ttl=300)
 def load_presets():
-    """프리셋 로드"""
+    """프리셋 로드 (프리셋 파일 mtime이 바뀌었을 때만 다시 읽음)"""
     manager = PresetManager()
-    current = manager.load_preset(manager.current_preset_path)
-    candidate = manager.load_preset(manager.candidate_preset_path)
-    return current, candidate
+    paths = [manager.current_preset_path, manager.candidate_preset_path]
+    
+    def read_presets():
+        return tuple(manager.load_preset(path) for path in paths)
+    
+    return shared_cache().get(('presets', *map(str, paths)), file_change_token(paths), read_presets)
 
 
-@st.cache_data(ttl=300)
-def load_experiments(limit: int = 10):
-    """실험 결과 로드"""
-    db = SessionLocal()
+def _read_experiments(db, limit: int) -> pd.DataFrame:
+    """최근 실험 결과 DataFrame"""
     experiments = db.query(Experiment).order_by(Experiment.created_at.desc()).limit(limit).all()
     
     data = []
@@ -489,10 +525,18 @@ def load_experiments(limit: int = 10):
             'psu_10': metrics.get('psu_10', 0)
         })
     
-    db.close()
     return pd.DataFrame(data)
 
 
+# 실험 성능 추이 차트에 사용할 최대 실험 수
+EXPERIMENT_HISTORY = int(os.getenv("DASHBOARD_EXPERIMENT_HISTORY", "5000"))
+
+
+def load_experiments(limit: int = 10):
+    """실험 결과 로드"""
+    return cached_query(shared_cache(), ('experiments', limit), lambda db: _read_experiments(db, limit))
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # Plotly 다크 테마 설정
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -510,6 +554,147 @@ PLOTLY_DARK_TEMPLATE = dict(
 )
 
 
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 사전 집계 차트 (행 수와 무관한 크기의 payload)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+SIGNAL_COLORS = {'BUY': '#2ea043', 'SELL': '#f85149', 'WATCH_UP': '#1f6feb', 'WATCH_DOWN': '#fb8500'}
+
+
+def return_distribution_figure(df_labeled: pd.DataFrame) -> go.Figure:
+    """
+    10-bar 수익률 분포 (신호별 히스토그램 + 박스플롯)
+    
+    원본 행 대신 NumPy로 집계한 구간 개수와 박스 요약 통계만 전달합니다.
+    """
+    hist = histogram_counts(df_labeled['fwd_ret_10'], df_labeled['signal'].astype(object), nbins=HISTOGRAM_BINS)
+    fig = make_subplots(rows=2, cols=1, shared_xaxes=True, row_heights=[0.2, 0.8], vertical_spacing=0.03)
+    
+    for signal, group in hist.groupby('group', sort=False):
+        color = SIGNAL_COLORS.get(signal, '#8b949e')
+        stats = box_stats(df_labeled.loc[df_labeled['signal'] == signal, 'fwd_ret_10'])
+        if stats:
+            fig.add_trace(go.Box(
+                y=[signal], orientation='h', name=signal, legendgroup=signal, showlegend=False,
+                marker_color=color, **{key: [value] for key, value in stats.items()}
+            ), row=1, col=1)
+        fig.add_trace(go.Bar(
+            x=group['bin_mid'], y=group['count'], width=group['bin_end'] - group['bin_start'],
+            name=signal, legendgroup=signal, marker_color=color
+        ), row=2, col=1)
+    
+    fig.update_layout(
+        height=400, title="10-bar Forward Return 분포", barmode='stack', bargap=0,
+        template=PLOTLY_DARK_TEMPLATE
+    )
+    fig.update_xaxes(title_text="수익률", row=2, col=1)
+    fig.update_yaxes(title_text="빈도", row=2, col=1)
+    fig.update_yaxes(showticklabels=False, row=1, col=1)
+    return fig
+
+
+def experiment_trend_figure(df_experiments: pd.DataFrame) -> go.Figure:
+    """실험 성능 추이 (지표별 시간순 선, trace당 MAX_LINE_POINTS점 이하 LTTB 다운샘플링)"""
+    fig = make_subplots(rows=2, cols=2, subplot_titles=("Profit Factor", "Max Drawdown", "Win Rate", "PSU 10-bar"))
+    
+    for (column, name, color), (row, col) in zip(
+        [('pf', 'PF', '#1f6feb'), ('mdd', 'MDD', '#f85149'), ('win_rate', 'WR', '#2ea043'), ('psu_10', 'PSU', '#fb8500')],
+        [(1, 1), (1, 2), (2, 1), (2, 2)]
+    ):
+        points = downsample_frame(df_experiments, 'created_at', column, MAX_LINE_POINTS)
+        fig.add_trace(go.Scatter(x=points['created_at'], y=points[column],
+                                 mode='lines+markers', name=name, line=dict(color=color, width=3)), row=row, col=col)
+    
+    fig.update_layout(height=600, showlegend=False, **PLOTLY_DARK_TEMPLATE['layout'])
+    return fig
+
+
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+# 최근 신호 테이블 (실시간 갱신)
+# ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
+
+LIVE_REFRESH_SEC = float(os.getenv("DASHBOARD_STREAM_REFRESH_SEC", "2"))
+
+
+def render_signal_table(df: pd.DataFrame):
+    """최근 신호 50건 테이블"""
+    display_df = df[[
+        'created_at', 'symbol', 'tf', 'signal',
+        'trend_score', 'prob', 'rsi', 'vol_mult', 'fwd_ret_10'
+    ]].head(50).copy()
+    
+    display_df['created_at'] = pd.to_datetime(display_df['created_at']).dt.strftime('%Y-%m-%d %H:%M')
+    display_df.columns = ['시각', '심볼', 'TF', '신호', 'TrendScore', 'Prob', 'RSI', 'VolMult', '10-bar 수익률']
+    
+    st.dataframe(display_df, use_container_width=True, height=400)
+
+
+# 애널리스트 랭킹 정렬 기준: 라벨 → (컬럼, 오름차순 여부)
+ANALYST_SORT_OPTIONS = {
+    "종합 점수 (높은 순)": ('overall_score', False),
+    "리스크 점수 (낮은 순)": ('risk_score', True),
+    "손익비 (높은 순)": ('rr_ratio', False),
+}
+ANALYST_STRENGTHS = [tier.label for tier in STRENGTH_RULE.tiers]
+ANALYST_TOP_N = 50
+
+
+def render_analyst_table(df: pd.DataFrame):
+    """애널리스트 점수 상위 신호 테이블"""
+    display_df = df[[
+        'created_at', 'symbol', 'tf', 'signal', 'overall_score', 'strength',
+        'risk_score', 'risk_level', 'entry_price', 'sl_price', 'tp_price', 'rr_ratio', 'fwd_ret_10'
+    ]].head(ANALYST_TOP_N).copy()
+    
+    display_df['created_at'] = pd.to_datetime(display_df['created_at']).dt.strftime('%Y-%m-%d %H:%M')
+    display_df.columns = [
+        '시각', '심볼', 'TF', '신호', '종합 점수', '신호 강도',
+        '리스크 점수', '리스크 수준', '진입가', '손절가', '익절가', '손익비', '10-bar 수익률'
+    ]
+    
+    st.dataframe(display_df, use_container_width=True, height=400)
+
+
+@st.fragment(run_every=LIVE_REFRESH_SEC)
+def live_signal_table(df_base: pd.DataFrame, cursor: int, days_back: int, signal_types: list, symbol: str):
+    """
+    스트림 이벤트로 최근 신호 목록 증분 갱신 (이 영역만 주기적으로 다시 그림)
+    
+    새 신호와 목록에 있는 신호의 라벨 완료 이벤트만 PK로 조회해 병합하므로
+    갱신 비용은 전체 조회가 아니라 새 행 수에 비례합니다.
+    """
+    client = stream_client()
+    key = (days_back, tuple(signal_types), symbol)
+    state = st.session_state.get('live_signals')
+    if state is None or state['key'] != key or state['base_cursor'] != cursor:
+        state = {'key': key, 'base_cursor': cursor, 'cursor': cursor, 'df': df_base.head(50)}
+        st.session_state['live_signals'] = state
+    
+    new_cursor, reset, new_ids, labeled = client.read(state['cursor'])
+    if reset:
+        # 놓친 이벤트가 있음 → 전체 재조회
+        st.session_state.pop('live_signals', None)
+        st.rerun(scope="app")
+    
+    ids = set(new_ids) | (labeled & set(state['df']['id'].tolist()))
+    if ids:
+        db = SessionLocal()
+        try:
+            updates = filter_signal_frame(load_signal_rows(db, ids), days_back, signal_types, symbol)
+        finally:
+            db.close()
+        state['df'] = merge_signal_rows(state['df'], updates, limit=50)
+    state['cursor'] = new_cursor
+    
+    stats = client.stats()
+    if stats['connected']:
+        st.caption(f"🟢 실시간 연결됨 · 마지막 이벤트 {stats['last_event_id'] or '-'}")
+    else:
+        st.caption(f"🔴 스트림 연결 끊김 (재접속 중) · {stats['last_error'] or DEFAULT_STREAM_URL}")
+    
+    render_signal_table(state['df'])
+
+
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
 # 메인 대시보드
 # ━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━━
@@ -524,36 +709,41 @@ tab1, tab2, tab3, tab4 = st.tabs(["신호 모니터링", "A/B 비교", "실험 
 with tab1:
     st.header("신호 모니터링")
     
-    df_signals = load_signals(days_back, signal_filter, symbol_filter)
+    summary = load_summary(days_back, signal_filter, symbol_filter)
     
-    if len(df_signals) == 0:
+    if summary['total'] == 0:
         st.warning("선택한 기간에 신호가 없습니다.")
     else:
+        # 목록 조회 전 스트림 커서 (조회와 겹치는 이벤트는 id 기준 병합으로 중복 제거)
+        stream_cursor = stream_client().cursor() if live_updates else None
+        df_signals = load_signals(days_back, signal_filter, symbol_filter)
+        
         # ─── 통계 카드 ───
         st.subheader("전체 통계")
         
         col1, col2, col3, col4, col5 = st.columns(5)
+        total_count = summary['total']
         
         with col1:
-            st.metric("총 신호", len(df_signals))
+            st.metric("총 신호", total_count)
         
         with col2:
-            buy_count = len(df_signals[df_signals['signal'] == 'BUY'])
+            buy_count = summary['buy']
             st.metric("BUY 신호", buy_count, 
-                     delta=f"{buy_count/len(df_signals)*100:.0f}%" if len(df_signals) > 0 else "0%")
+                     delta=f"{buy_count/total_count*100:.0f}%")
         
         with col3:
-            sell_count = len(df_signals[df_signals['signal'] == 'SELL'])
+            sell_count = summary['sell']
             st.metric("SELL 신호", sell_count,
-                     delta=f"{sell_count/len(df_signals)*100:.0f}%" if len(df_signals) > 0 else "0%")
+                     delta=f"{sell_count/total_count*100:.0f}%")
         
         with col4:
-            avg_prob = df_signals['prob'].mean()
+            avg_prob = summary['avg_prob']
             st.metric("평균 확률", f"{avg_prob:.2f}",
                      delta=f"{(avg_prob-0.5)*100:.0f}%" if avg_prob > 0 else "0%")
         
         with col5:
-            avg_ts = df_signals['trend_score'].mean()
+            avg_ts = summary['avg_trend_score']
             st.metric("평균 TrendScore", f"{avg_ts:.0f}",
                      delta=f"{(avg_ts-50):.0f}" if avg_ts > 0 else "0")
         
@@ -562,22 +752,21 @@ with tab1:
         # ─── 시계열 차트 ───
         st.subheader("신호 발생 추이")
         
-        df_timeline = df_signals.copy()
-        df_timeline['date'] = pd.to_datetime(df_timeline['created_at']).dt.date
-        timeline_counts = df_timeline.groupby(['date', 'signal']).size().reset_index(name='count')
+        # 구간 수가 MAX_TIME_BINS를 넘지 않도록 기간에 따라 일/주/월 선택
+        time_bin = choose_time_bin(days_back)
+        timeline_counts = load_timeline(days_back, signal_filter, symbol_filter, time_bin)
         
         fig_timeline = px.bar(
             timeline_counts, x='date', y='count', color='signal',
-            title="일별 신호 발생 빈도",
-            color_discrete_map={'BUY': '#2ea043', 'SELL': '#f85149', 
-                              'WATCH_UP': '#1f6feb', 'WATCH_DOWN': '#fb8500'},
+            title=f"{TIME_BIN_LABELS[time_bin]} 신호 발생 빈도",
+            color_discrete_map=SIGNAL_COLORS,
             barmode='group', template=PLOTLY_DARK_TEMPLATE
         )
         fig_timeline.update_layout(height=400, xaxis_title="날짜", yaxis_title="신호 개수")
         st.plotly_chart(fig_timeline, width="stretch")
         
         # ─── 성과 분석 ───
-        df_labeled = df_signals[df_signals['fwd_ret_10'].notna()]
+        df_labeled = load_labeled(days_back, signal_filter, symbol_filter)
         
         if len(df_labeled) > 0:
             st.markdown("---")
@@ -633,29 +822,41 @@ with tab1:
             st.markdown("---")
             st.subheader("수익률 분포")
             
-            fig_dist = px.histogram(
-                df_labeled, x='fwd_ret_10', color='signal', nbins=30,
-                title="10-bar Forward Return 분포",
-                color_discrete_map={'BUY': '#2ea043', 'SELL': '#f85149'},
-                marginal="box", template=PLOTLY_DARK_TEMPLATE
-            )
-            fig_dist.update_layout(height=400, xaxis_title="수익률", yaxis_title="빈도")
+            fig_dist = return_distribution_figure(df_labeled)
             st.plotly_chart(fig_dist, width="stretch")
         
+        # ─── 애널리스트 스코어 랭킹 ───
+        st.markdown("---")
+        st.subheader("애널리스트 스코어 랭킹")
+        st.caption("상세 리포트와 같은 규칙으로 기간 내 전체 신호를 일괄 평가합니다. (지표 점수는 BUY 신호 기준, 그 외 신호는 0점)")
+        
+        df_analyst = load_analyst_scores(days_back, signal_filter, symbol_filter)
+        
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            sort_label = st.selectbox("정렬 기준", list(ANALYST_SORT_OPTIONS))
+        with col2:
+            strength_filter = st.multiselect("신호 강도", ANALYST_STRENGTHS, default=ANALYST_STRENGTHS)
+        with col3:
+            min_score = st.slider("최소 종합 점수", 0.0, 10.0, 0.0, 0.5)
+        
+        sort_column, ascending = ANALYST_SORT_OPTIONS[sort_label]
+        df_ranked = df_analyst[
+            df_analyst['strength'].isin(strength_filter) & (df_analyst['overall_score'] >= min_score)
+        ].sort_values([sort_column, 'created_at'], ascending=[ascending, False], kind='stable')
+        
+        st.caption(f"조건 충족 {len(df_ranked):,}건 / 전체 {len(df_analyst):,}건 (상위 {ANALYST_TOP_N}건 표시)")
+        render_analyst_table(df_ranked)
+        
         # ─── 최근 신호 테이블 & 상세 분석 ───
         st.markdown("---")
         st.subheader("최근 신호 목록")
         
         # 전체 신호 테이블 (먼저 표시)
-        display_df = df_signals[[
-            'created_at', 'symbol', 'tf', 'signal',
-            'trend_score', 'prob', 'rsi', 'vol_mult', 'fwd_ret_10'
-        ]].head(50).copy()
-        
-        display_df['created_at'] = pd.to_datetime(display_df['created_at']).dt.strftime('%Y-%m-%d %H:%M')
-        display_df.columns = ['시각', '심볼', 'TF', '신호', 'TrendScore', 'Prob', 'RSI', 'VolMult', '10-bar 수익률']
-        
-        st.dataframe(display_df, use_container_width=True, height=400)
+        if live_updates:
+            live_signal_table(df_signals, stream_cursor, days_back, signal_filter, symbol_filter)
+        else:
+            render_signal_table(df_signals)
         
         # 상세 분석 섹션
         st.markdown("---")
@@ -820,7 +1021,9 @@ with tab2:
 with tab3:
     st.header("실험 히스토리")
     
-    df_experiments = load_experiments(20)
+    # 추이 차트는 긴 이력을 다운샘플링해 표시, 테이블은 최근 20건
+    df_history = load_experiments(EXPERIMENT_HISTORY)
+    df_experiments = df_history.head(20)
     
     if len(df_experiments) == 0:
         st.info("실험 기록이 없습니다. Learner를 실행하세요.")
@@ -836,18 +1039,7 @@ with tab3:
         st.markdown("---")
         st.subheader("실험 성능 추이")
         
-        fig_exp = make_subplots(rows=2, cols=2, subplot_titles=("Profit Factor", "Max Drawdown", "Win Rate", "PSU 10-bar"))
-        
-        fig_exp.add_trace(go.Scatter(x=df_experiments.index, y=df_experiments['pf'], 
-                                     mode='lines+markers', name='PF', line=dict(color='#1f6feb', width=3)), row=1, col=1)
-        fig_exp.add_trace(go.Scatter(x=df_experiments.index, y=df_experiments['mdd'],
-                                     mode='lines+markers', name='MDD', line=dict(color='#f85149', width=3)), row=1, col=2)
-        fig_exp.add_trace(go.Scatter(x=df_experiments.index, y=df_experiments['win_rate'],
-                                     mode='lines+markers', name='WR', line=dict(color='#2ea043', width=3)), row=2, col=1)
-        fig_exp.add_trace(go.Scatter(x=df_experiments.index, y=df_experiments['psu_10'],
-                                     mode='lines+markers', name='PSU', line=dict(color='#fb8500', width=3)), row=2, col=2)
-        
-        fig_exp.update_layout(height=600, showlegend=False, **PLOTLY_DARK_TEMPLATE['layout'])
+        fig_exp = experiment_trend_figure(df_history)
         st.plotly_chart(fig_exp, width="stretch")
 
 
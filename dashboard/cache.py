@@ -0,0 +1,229 @@
+"""
+VMSI-SDM Dashboard - Shared Query Cache
+DB 변경 토큰 기반 세션 공유 캐시 (인프로세스 LRU + 선택적 Arrow 디스크 스필)
+
+TTL 대신 저렴한 변경 토큰(최대 signal/label/experiment id, 프리셋 파일 mtime)을
+조회마다 확인해 바뀌었을 때만 다시 로드합니다. 같은 Streamlit 프로세스의 모든
+세션이 한 캐시를 공유하며, DASHBOARD_CACHE_DIR를 지정하면 DataFrame 결과를
+Feather(Arrow) 파일로 저장해 다른 워커 프로세스/재시작 후에도 재사용합니다.
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, Iterable, Optional, Tuple
+
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from server.db import Experiment, Label, SessionLocal, Signal
+
+
+# 메모리에 유지할 최대 항목 수
+DEFAULT_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_ENTRIES", "64"))
+
+# Arrow 스필 디렉터리 (미지정 시 메모리만 사용, pyarrow 필요)
+DEFAULT_SPILL_DIR = os.getenv("DASHBOARD_CACHE_DIR") or None
+
+
+def db_change_token(db: Session) -> Tuple[int, int, int]:
+    """
+    DB 변경 토큰 (PK 인덱스 MAX 3회, 단일 쿼리)
+
+    신규 INSERT만 감지하며 기존 행 수정/삭제는 감지하지 않습니다 (DatasetSnapshot과 같은 기준).
+
+    Returns:
+        (최대 signal id, 최대 label id, 최대 experiment id)
+    """
+    row = db.execute(select(
+        select(func.max(Signal.id)).scalar_subquery(),
+        select(func.max(Label.id)).scalar_subquery(),
+        select(func.max(Experiment.id)).scalar_subquery(),
+    )).one()
+    return tuple(int(value or 0) for value in row)
+
+
+def file_change_token(paths: Iterable[os.PathLike]) -> Tuple[Optional[Tuple[int, int]], ...]:
+    """파일 변경 토큰 (경로별 (mtime_ns, size), 없는 파일은 None)"""
+    token = []
+    for path in paths:
+        try:
+            stat = os.stat(path)
+            token.append((stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            token.append(None)
+    return tuple(token)
+
+
+class ChangeTokenCache:
+    """
+    변경 토큰 기반 LRU 캐시 (스레드 안전, Streamlit 세션 간 공유)
+
+    키별 로드는 한 번에 하나만 실행되며, 같은 키를 기다리던 세션은
+    먼저 끝난 로드 결과를 그대로 사용합니다.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_ENTRIES, spill_dir: Optional[str] = DEFAULT_SPILL_DIR):
+        """
+        Args:
+            max_entries: 메모리 최대 항목 수 (초과 시 가장 오래 안 쓴 항목 제거)
+            spill_dir: DataFrame 결과를 Feather로 저장할 디렉터리 (None이면 사용 안 함)
+        """
+        self.max_entries = max_entries
+        self.spill_dir = Path(spill_dir) if spill_dir else None
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self.hits = 0
+        self.misses = 0
+        self.spill_hits = 0
+
+        if self.spill_dir is not None:
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+
+    def get(self, key: Hashable, token: Hashable, loader: Callable[[], Any]) -> Any:
+        """
+        토큰이 같으면 캐시 값, 다르면 loader() 결과 (반환 값은 세션 간 공유되므로 수정 금지)
+
+        Args:
+            key: 조회 키 (쿼리 이름 + 인자)
+            token: 현재 변경 토큰
+            loader: 캐시 미스 시 호출할 함수
+
+        Returns:
+            캐시 값
+        """
+        value = self._lookup(key, token)
+        if value is not None:
+            return value[0]
+
+        with self._key_lock(key):
+            # 기다리는 동안 다른 세션이 로드했으면 재사용
+            value = self._lookup(key, token)
+            if value is not None:
+                return value[0]
+
+            value = self._read_spill(key, token)
+            if value is not None:
+                self.spill_hits += 1
+            else:
+                self.misses += 1
+                value = loader()
+                self._write_spill(key, token, value)
+            self._store(key, token, value)
+            return value
+
+    def clear(self):
+        """메모리 항목 전체 삭제 (스필 파일은 유지)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """캐시 상태"""
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "spill_hits": self.spill_hits,
+            "spill_dir": str(self.spill_dir) if self.spill_dir else None,
+        }
+
+    # ─────────────── Internal ───────────────
+
+    def _lookup(self, key: Hashable, token: Hashable) -> Optional[Tuple[Any]]:
+        """토큰이 같은 메모리 항목 ((value,) 또는 None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != token:
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return (entry[1],)
+
+    def _store(self, key: Hashable, token: Hashable, value: Any):
+        """항목 저장 후 LRU 초과분 제거"""
+        with self._lock:
+            self._entries[key] = (token, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._key_locks.pop(evicted, None)
+
+    def _key_lock(self, key: Hashable) -> threading.Lock:
+        """키별 로드 락"""
+        with self._lock:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    @staticmethod
+    def _digest(value: Hashable) -> str:
+        """키/토큰 → 파일 이름용 해시"""
+        return hashlib.sha1(repr(value).encode()).hexdigest()[:16]
+
+    def _spill_path(self, key: Hashable, token: Hashable) -> Path:
+        """스필 파일 경로 ({키 해시}-{토큰 해시}.feather)"""
+        return self.spill_dir / f"{self._digest(key)}-{self._digest(token)}.feather"
+
+    def _read_spill(self, key: Hashable, token: Hashable) -> Optional[pd.DataFrame]:
+        """같은 토큰의 스필 파일 로드 (없거나 읽기 실패 시 None)"""
+        if self.spill_dir is None:
+            return None
+        path = self._spill_path(key, token)
+        if not path.exists():
+            return None
+        try:
+            return pd.read_feather(path)
+        except Exception as e:
+            print(f"⚠️  Cache spill read failed ({path.name}): {e}")
+            return None
+
+    def _write_spill(self, key: Hashable, token: Hashable, value: Any):
+        """DataFrame 결과를 Feather로 저장하고 같은 키의 이전 토큰 파일 삭제"""
+        if self.spill_dir is None or not isinstance(value, pd.DataFrame):
+            return
+        path = self._spill_path(key, token)
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        try:
+            value.to_feather(tmp_path)
+            os.replace(tmp_path, path)
+        except ImportError as e:
+            # pyarrow 미설치 → 이후 스필 없이 메모리만 사용
+            print(f"⚠️  Cache spill disabled: {e}")
+            self.spill_dir = None
+            return
+        except Exception as e:
+            print(f"⚠️  Cache spill write failed ({path.name}): {e}")
+            tmp_path.unlink(missing_ok=True)
+            return
+
+        for stale in self.spill_dir.glob(f"{self._digest(key)}-*.feather"):
+            if stale != path:
+                stale.unlink(missing_ok=True)
+
+
+def cached_query(
+    cache: ChangeTokenCache,
+    key: Hashable,
+    loader: Callable[[Session], Any],
+    session_factory: Callable[[], Session] = SessionLocal
+) -> Any:
+    """
+    DB 변경 토큰으로 검증한 캐시 조회 (토큰 조회와 로드는 같은 세션 사용)
+
+    Args:
+        cache: 공유 캐시
+        key: 조회 키 (쿼리 이름 + 인자)
+        loader: db → 결과 함수
+        session_factory: 세션 생성 함수
+
+    Returns:
+        캐시 값
+    """
+    db = session_factory()
+    try:
+        return cache.get(key, db_change_token(db), lambda: loader(db))
+    finally:
+        db.close()
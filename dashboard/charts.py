@@ -0,0 +1,195 @@
+"""
+VMSI-SDM Dashboard - Chart Payload Helpers
+조회 범위와 무관하게 브라우저로 보내는 차트 점 수를 제한 (시간 구간 자동 선택, LTTB 다운샘플링, 히스토그램 사전 집계)
+"""
+
+import os
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+# 타임라인 최대 구간 수 (초과하지 않는 가장 작은 구간 선택)
+MAX_TIME_BINS = int(os.getenv("DASHBOARD_MAX_BINS", "120"))
+
+# 선/산점도 trace당 최대 점 수
+MAX_LINE_POINTS = int(os.getenv("DASHBOARD_MAX_POINTS", "500"))
+
+# 수익률 분포 구간 수
+HISTOGRAM_BINS = 30
+
+# 시간 구간: (이름, 대략적인 일 수, pandas period)
+TIME_BINS = [("day", 1, "D"), ("week", 7, "W-SUN"), ("month", 31, "M")]
+TIME_BIN_LABELS = {"day": "일별", "week": "주별", "month": "월별"}
+
+
+# ─────────────── Time Bins ───────────────
+
+def choose_time_bin(days_back: int, max_bins: int = MAX_TIME_BINS) -> str:
+    """
+    조회 기간에 맞는 시간 구간 선택
+
+    Args:
+        days_back: 조회 기간 (일)
+        max_bins: 최대 구간 수
+
+    Returns:
+        day / week / month
+    """
+    for name, days, _ in TIME_BINS:
+        if days_back / days <= max_bins:
+            return name
+    return TIME_BINS[-1][0]
+
+
+def bin_time_counts(daily: pd.DataFrame, time_bin: str) -> pd.DataFrame:
+    """
+    일별 개수 → 주별 / 월별 합계 (구간 시작일 기준)
+
+    Args:
+        daily: date / signal / count DataFrame (load_daily_rollup 결과)
+        time_bin: day / week / month
+
+    Returns:
+        같은 컬럼의 구간별 DataFrame (주는 월요일, 월은 1일)
+    """
+    if time_bin == "day" or daily.empty:
+        return daily
+    period = dict((name, freq) for name, _, freq in TIME_BINS)[time_bin]
+    binned = daily.assign(date=daily['date'].dt.to_period(period).dt.start_time)
+    return binned.groupby(['date', 'signal'], as_index=False, sort=True)['count'].sum()
+
+
+# ─────────────── Downsampling ───────────────
+
+def _numeric(values: Any) -> np.ndarray:
+    """x 값 (숫자 / datetime) → float 배열"""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.astype('int64').to_numpy(dtype=np.float64)
+    return values.to_numpy(dtype=np.float64)
+
+
+def lttb_indices(x: Any, y: Any, threshold: int = MAX_LINE_POINTS) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets 다운샘플링 인덱스
+
+    첫/마지막 점은 유지하고, 나머지를 threshold - 2개 구간으로 나눠 구간마다
+    이전 선택 점 · 다음 구간 평균점과 만드는 삼각형 면적이 가장 큰 점 1개를 고릅니다.
+    (x 오름차순, 결측 없는 입력 가정)
+
+    Args:
+        x: x 값 (숫자 또는 datetime)
+        y: y 값
+        threshold: 남길 점 수
+
+    Returns:
+        선택된 점의 위치 인덱스 (오름차순)
+    """
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    xs, ys = _numeric(x), np.asarray(y, dtype=np.float64)
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+
+    a = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else n
+        avg_x = xs[end:next_end].mean()
+        avg_y = ys[end:next_end].mean()
+        area = np.abs(
+            (xs[a] - avg_x) * (ys[start:end] - ys[a]) - (xs[a] - xs[start:end]) * (avg_y - ys[a])
+        )
+        a = start + int(np.argmax(area))
+        selected[i + 1] = a
+    return selected
+
+
+def downsample_frame(df: pd.DataFrame, x: str, y: str, threshold: int = MAX_LINE_POINTS) -> pd.DataFrame:
+    """
+    선 / 산점도 trace용 DataFrame 다운샘플링 (x 정렬, y 결측 제외 후 LTTB)
+
+    Args:
+        df: 원본 DataFrame
+        x: x 컬럼
+        y: y 컬럼
+        threshold: 남길 점 수
+
+    Returns:
+        최대 threshold행 DataFrame
+    """
+    points = df[[x, y]].dropna().sort_values(x, kind='stable')
+    return points.iloc[lttb_indices(points[x], points[y], threshold)]
+
+
+# ─────────────── Distributions ───────────────
+
+def histogram_counts(
+    values: Any,
+    groups: Optional[Any] = None,
+    nbins: int = HISTOGRAM_BINS,
+    value_range: Optional[Tuple[float, float]] = None
+) -> pd.DataFrame:
+    """
+    히스토그램 사전 집계 (모든 그룹이 같은 구간 경계 사용)
+
+    Args:
+        values: 값 배열
+        groups: 그룹 라벨 배열 (None이면 단일 그룹 "")
+        nbins: 구간 수
+        value_range: (최소, 최대) (None이면 값 범위)
+
+    Returns:
+        group / bin_start / bin_end / bin_mid / count DataFrame (그룹당 nbins행)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    groups = np.asarray(groups, dtype=object) if groups is not None else np.full(len(values), "", dtype=object)
+    finite = np.isfinite(values)
+    values, groups = values[finite], groups[finite]
+
+    edges = np.histogram_bin_edges(values, bins=nbins, range=value_range) if len(values) else np.linspace(0, 1, nbins + 1)
+    frames = []
+    for group in pd.unique(groups):
+        counts, _ = np.histogram(values[groups == group], bins=edges)
+        frames.append(pd.DataFrame({
+            'group': group,
+            'bin_start': edges[:-1],
+            'bin_end': edges[1:],
+            'bin_mid': (edges[:-1] + edges[1:]) / 2,
+            'count': counts,
+        }))
+    if not frames:
+        return pd.DataFrame(columns=['group', 'bin_start', 'bin_end', 'bin_mid', 'count'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def box_stats(values: Sequence[float]) -> Dict[str, float]:
+    """
+    박스플롯 요약 통계 (Plotly 사전 계산 box 입력, 수염 = 1.5 IQR 안쪽 최소/최대)
+
+    Args:
+        values: 값 배열
+
+    Returns:
+        {'q1', 'median', 'q3', 'lowerfence', 'upperfence', 'mean'} (값이 없으면 빈 dict)
+    """
+    values = np.asarray(values, dtype=np.float64)
+    values = values[np.isfinite(values)]
+    if len(values) == 0:
+        return {}
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - 1.5 * iqr) & (values <= q3 + 1.5 * iqr)]
+    return {
+        'q1': float(q1),
+        'median': float(median),
+        'q3': float(q3),
+        'lowerfence': float(inside.min()),
+        'upperfence': float(inside.max()),
+        'mean': float(values.mean()),
+    }
@@ -0,0 +1,399 @@
+"""
+VMSI-SDM Dashboard - Data Access Module
+대시보드 조회 쿼리 (필터/라벨 조인/일별 집계를 SQL에서 처리하고 컬럼 배열로 로드)
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import Select, and_, case, func, select
+from sqlalchemy.orm import Session
+
+from dashboard.analyst_rules import ANALYST_FEATURES, score_signals
+from server.db import Label, Signal, StatsCounter
+
+
+# 신호 모니터링 탭 성과 지표 기준 forward window
+DASHBOARD_FWD_N = 10
+
+# 컬럼별 dtype (나머지는 object)
+FLOAT_COLUMNS = ['trend_score', 'prob', 'rsi', 'vol_mult', 'fwd_ret_10', *ANALYST_FEATURES]
+NULLABLE_BOOL_COLUMNS = ['broke_high', 'broke_low']
+CATEGORY_COLUMNS = ['symbol', 'tf', 'signal']
+
+SIGNAL_FRAME_COLUMNS = [
+    'id', 'created_at', 'symbol', 'tf', 'signal',
+    'trend_score', 'prob', 'rsi', 'vol_mult',
+    'fwd_ret_10', 'broke_high', 'broke_low'
+]
+LABELED_RETURN_COLUMNS = ['signal', 'fwd_ret_10', 'broke_high', 'broke_low']
+ANALYST_FRAME_COLUMNS = ['id', 'created_at', 'symbol', 'tf', 'signal', *ANALYST_FEATURES, 'fwd_ret_10']
+
+
+def _cutoff(days_back: int) -> datetime:
+    """조회 시작 시각 (created_at과 같은 naive UTC)"""
+    return datetime.utcnow() - timedelta(days=days_back)
+
+
+def _apply_filters(query: Select, days_back: int, signal_types: Optional[Sequence[str]], symbol: str) -> Select:
+    """
+    기간 / 신호 타입 / 심볼(부분 일치) 필터
+
+    신호 타입은 값이 4개뿐이라 ix_signals_signal로 찾으면 기간 내 대부분의 행을
+    다시 정렬하게 되므로, 표현식(signal || '')으로 비교해 (created_at, id) 인덱스 범위 스캔을 유지합니다.
+    """
+    query = query.where(Signal.created_at >= _cutoff(days_back))
+    if signal_types:
+        query = query.where((Signal.signal + '').in_(list(signal_types)))
+    if symbol:
+        query = query.where(Signal.symbol.contains(symbol.upper()))
+    return query
+
+
+def _label_join(labeled_only: bool = False):
+    """신호당 10봉 라벨 1행 조인 조건 (signals → labels)"""
+    on = and_(Label.signal_id == Signal.id, Label.fwd_n == DASHBOARD_FWD_N)
+    return (Signal.__table__.join if labeled_only else Signal.__table__.outerjoin)(Label.__table__, on)
+
+
+def _signal_frame_select() -> Select:
+    """SIGNAL_FRAME_COLUMNS SELECT (10봉 라벨 LEFT JOIN, 필터/정렬 없음)"""
+    features = Signal.features_json
+    return (
+        select(
+            Signal.id.label('id'),
+            Signal.created_at.label('created_at'),
+            Signal.symbol.label('symbol'),
+            Signal.tf.label('tf'),
+            Signal.signal.label('signal'),
+            func.coalesce(Signal.trend_score, features['trendScore'].as_float(), 0).label('trend_score'),
+            func.coalesce(features['prob'].as_float(), 0).label('prob'),
+            func.coalesce(Signal.rsi, 50).label('rsi'),
+            func.coalesce(Signal.vol_mult, 1).label('vol_mult'),
+            Label.fwd_ret.label('fwd_ret_10'),
+            Label.broke_high.label('broke_high'),
+            Label.broke_low.label('broke_low'),
+        )
+        .select_from(_label_join())
+    )
+
+
+def signal_frame_query(
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = "",
+    limit: Optional[int] = None
+) -> Select:
+    """
+    신호 목록 + 10봉 라벨 단일 쿼리 (최신순)
+
+    라벨은 (signal_id, fwd_n=10) 조건 LEFT JOIN으로 신호당 1행만 붙이며,
+    피처는 승격 컬럼(없으면 features_json)에서 읽습니다.
+
+    Args:
+        days_back: 최근 N일 (created_at 기준)
+        signal_types: 신호 타입 목록 (비어 있으면 전체)
+        symbol: 심볼 부분 일치 필터
+        limit: 최대 행 수 (None이면 전체)
+
+    Returns:
+        SELECT 문 (컬럼 순서 = SIGNAL_FRAME_COLUMNS)
+    """
+    query = _signal_frame_select().order_by(Signal.created_at.desc(), Signal.id.desc())
+    query = _apply_filters(query, days_back, signal_types, symbol)
+    return query.limit(limit) if limit is not None else query
+
+
+def _to_array(name: str, values: Sequence[Any]) -> Any:
+    """쿼리 결과 컬럼 → typed 배열"""
+    if name == 'id':
+        return np.array(values, dtype=np.int64)
+    if name == 'created_at':
+        return pd.to_datetime(pd.Series(values, dtype=object)).to_numpy()
+    if name in FLOAT_COLUMNS:
+        return np.array(values, dtype=np.float64)  # None → NaN
+    if name in NULLABLE_BOOL_COLUMNS:
+        return pd.array(values, dtype='boolean')
+    return np.array(values, dtype=object)
+
+
+def _frame(rows: Sequence[Sequence[Any]], names: Sequence[str]) -> pd.DataFrame:
+    """쿼리 결과 행 → typed 컬럼 DataFrame"""
+    columns = list(zip(*rows)) if rows else [()] * len(names)
+    df = pd.DataFrame({name: _to_array(name, values) for name, values in zip(names, columns)}, columns=list(names))
+    for name in CATEGORY_COLUMNS:
+        if name in df:
+            df[name] = df[name].astype('category')
+    return df
+
+
+def load_signal_frame(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = "",
+    limit: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    신호 목록 DataFrame (단일 SQL → 컬럼 배열)
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        SIGNAL_FRAME_COLUMNS DataFrame (라벨 없는 신호의 fwd_ret_10 / broke_* 는 NaN / NA)
+    """
+    rows = db.execute(signal_frame_query(days_back, signal_types, symbol, limit)).all()
+    df = _frame(rows, SIGNAL_FRAME_COLUMNS)
+    # 같은 신호에 10봉 라벨이 중복 저장된 경우 1행만 유지
+    if df['id'].duplicated().any():
+        df = df.drop_duplicates('id', keep='last').reset_index(drop=True)
+    return df
+
+
+def load_signal_rows(db: Session, signal_ids: Sequence[int]) -> pd.DataFrame:
+    """
+    지정한 신호만 로드 (실시간 스트림의 신규 / 라벨 완료 신호 갱신용, PK 조회)
+
+    Args:
+        db: DB 세션
+        signal_ids: signal id 목록
+
+    Returns:
+        SIGNAL_FRAME_COLUMNS DataFrame (최신순)
+    """
+    ids = list(dict.fromkeys(int(signal_id) for signal_id in signal_ids))
+    rows = []
+    # SQLite 바인드 변수 제한 내로 분할
+    for offset in range(0, len(ids), 500):
+        rows.extend(db.execute(_signal_frame_select().where(Signal.id.in_(ids[offset:offset + 500]))).all())
+    df = _frame(rows, SIGNAL_FRAME_COLUMNS).drop_duplicates('id', keep='last')
+    return df.sort_values(['created_at', 'id'], ascending=False, ignore_index=True)
+
+
+def load_signal_summary(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> Dict[str, float]:
+    """
+    통계 카드 집계 (SQL COUNT / AVG 1회)
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        {'total', 'buy', 'sell', 'avg_prob', 'avg_trend_score'}
+    """
+    features = Signal.features_json
+    query = _apply_filters(
+        select(
+            func.count(),
+            func.sum(case((Signal.signal == 'BUY', 1), else_=0)),
+            func.sum(case((Signal.signal == 'SELL', 1), else_=0)),
+            func.avg(func.coalesce(features['prob'].as_float(), 0)),
+            func.avg(func.coalesce(Signal.trend_score, features['trendScore'].as_float(), 0)),
+        ),
+        days_back, signal_types, symbol
+    )
+    total, buy, sell, avg_prob, avg_trend_score = db.execute(query).one()
+    return {
+        'total': int(total or 0),
+        'buy': int(buy or 0),
+        'sell': int(sell or 0),
+        'avg_prob': float(avg_prob or 0),
+        'avg_trend_score': float(avg_trend_score or 0),
+    }
+
+
+def load_labeled_returns(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> pd.DataFrame:
+    """
+    10봉 라벨이 있는 신호의 성과 컬럼만 로드 (성과 지표 / 수익률 분포용)
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        signal / fwd_ret_10 / broke_high / broke_low DataFrame
+    """
+    query = _apply_filters(
+        select(
+            Signal.signal.label('signal'),
+            Label.fwd_ret.label('fwd_ret_10'),
+            Label.broke_high.label('broke_high'),
+            Label.broke_low.label('broke_low'),
+        ).select_from(_label_join(labeled_only=True)),
+        days_back, signal_types, symbol
+    )
+    return _frame(db.execute(query).all(), LABELED_RETURN_COLUMNS)
+
+
+def load_daily_counts(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> pd.DataFrame:
+    """
+    일별 · 신호 타입별 신호 개수 (SQL GROUP BY, 타임라인 차트용)
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        date(datetime64) / signal / count DataFrame (날짜 오름차순)
+    """
+    day = func.date(Signal.created_at)
+    query = _apply_filters(
+        select(day.label('date'), Signal.signal.label('signal'), func.count().label('count')),
+        days_back, signal_types, symbol
+    ).group_by(day, Signal.signal).order_by(day)
+
+    rows = db.execute(query).all()
+    return pd.DataFrame({
+        'date': pd.to_datetime(pd.Series([row[0] for row in rows], dtype=object)),
+        'signal': pd.Series([row[1] for row in rows], dtype=object),
+        'count': np.array([row[2] for row in rows], dtype=np.int64),
+    })
+
+
+def load_daily_rollup(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> pd.DataFrame:
+    """
+    일별 · 신호 타입별 신호 개수 (stats_counters 일별 롤업 행 합산, signals 원본 스캔 없음)
+
+    롤업은 일 단위이므로 기간 시작일은 하루 전체가 포함됩니다.
+    카운터가 비어 있으면(서버 시작 전 / 외부 적재 후 미재계산) load_daily_counts로 대체합니다.
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        date(datetime64) / signal / count DataFrame (날짜 오름차순)
+    """
+    if db.execute(select(StatsCounter.id).limit(1)).first() is None:
+        return load_daily_counts(db, days_back, signal_types, symbol)
+
+    query = (
+        select(StatsCounter.day, StatsCounter.signal, func.sum(StatsCounter.count))
+        .where(
+            StatsCounter.metric == "signals",
+            StatsCounter.day >= _cutoff(days_back).strftime('%Y-%m-%d')
+        )
+        .group_by(StatsCounter.day, StatsCounter.signal)
+        .order_by(StatsCounter.day)
+    )
+    if signal_types:
+        query = query.where(StatsCounter.signal.in_(list(signal_types)))
+    if symbol:
+        query = query.where(StatsCounter.symbol.contains(symbol.upper()))
+
+    rows = db.execute(query).all()
+    return pd.DataFrame({
+        'date': pd.to_datetime(pd.Series([row[0] for row in rows], dtype=object)),
+        'signal': pd.Series([row[1] for row in rows], dtype=object),
+        'count': np.array([row[2] for row in rows], dtype=np.int64),
+    })
+
+
+def load_analyst_frame(
+    db: Session,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> pd.DataFrame:
+    """
+    기간 내 전체 신호의 애널리스트 점수 (SignalAnalyst 규칙 표를 DataFrame 전체에 일괄 적용)
+
+    피처는 승격 컬럼 대신 features_json 원본 키를 읽어 단건 리포트와 같은 값을 냅니다.
+
+    Args:
+        db: DB 세션
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        ANALYST_FRAME_COLUMNS + score_signals() 컬럼 DataFrame (최신순)
+    """
+    features = Signal.features_json
+    feature_columns = [
+        func.coalesce(*(features[key].as_float() for key in keys), None).label(column)
+        for column, (keys, _) in ANALYST_FEATURES.items()
+    ]
+    query = _apply_filters(
+        select(
+            Signal.id.label('id'),
+            Signal.created_at.label('created_at'),
+            Signal.symbol.label('symbol'),
+            Signal.tf.label('tf'),
+            Signal.signal.label('signal'),
+            *feature_columns,
+            Label.fwd_ret.label('fwd_ret_10'),
+        ).select_from(_label_join()),
+        days_back, signal_types, symbol
+    ).order_by(Signal.created_at.desc(), Signal.id.desc())
+
+    df = _frame(db.execute(query).all(), ANALYST_FRAME_COLUMNS)
+    if df['id'].duplicated().any():
+        df = df.drop_duplicates('id', keep='last').reset_index(drop=True)
+    return pd.concat([df, score_signals(df)], axis=1)
+
+
+def filter_signal_frame(
+    df: pd.DataFrame,
+    days_back: int,
+    signal_types: Optional[Sequence[str]] = None,
+    symbol: str = ""
+) -> pd.DataFrame:
+    """
+    _apply_filters와 같은 조건을 이미 로드한 행에 적용 (실시간 스트림 신규 행용)
+
+    Args:
+        df: SIGNAL_FRAME_COLUMNS DataFrame
+        (나머지는 signal_frame_query 참고)
+
+    Returns:
+        조건을 만족하는 행
+    """
+    mask = df['created_at'] >= _cutoff(days_back)
+    if signal_types:
+        mask &= df['signal'].astype(object).isin(list(signal_types))
+    if symbol:
+        mask &= df['symbol'].astype(str).str.contains(symbol.upper(), regex=False)
+    return df[mask]
+
+
+def merge_signal_rows(base: pd.DataFrame, updates: pd.DataFrame, limit: int) -> pd.DataFrame:
+    """
+    최신 신호 목록에 신규 / 갱신 행 병합 (같은 id는 updates 우선, 최신순 limit행)
+
+    Args:
+        base: 현재 목록
+        updates: load_signal_rows() 결과
+        limit: 최대 행 수
+
+    Returns:
+        병합된 목록
+    """
+    if updates.empty:
+        return base
+    merged = pd.concat([updates, base[~base['id'].isin(updates['id'])]], ignore_index=True)
+    for name in CATEGORY_COLUMNS:
+        merged[name] = merged[name].astype('category')
+    return merged.sort_values(['created_at', 'id'], ascending=False, ignore_index=True).head(limit)
@@ -0,0 +1,182 @@
+"""
+VMSI-SDM Dashboard - Live Signal Stream
+서버 /signals/stream(SSE)을 백그라운드 스레드로 구독해 이벤트를 누적하는 클라이언트
+
+Streamlit 프로세스당 1개(st.cache_resource)를 두고, 각 세션은 자신이 마지막으로 읽은
+커서 이후의 이벤트만 가져가 새 신호 / 라벨 완료 행만 조회합니다.
+연결이 끊기면 Last-Event-ID로 재접속해 놓친 이벤트를 이어 받습니다.
+"""
+
+import json
+import os
+import threading
+from collections import deque
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import requests
+
+
+# 스트림 URL (빈 값이면 실시간 갱신 비활성)
+DEFAULT_STREAM_URL = os.getenv("DASHBOARD_STREAM_URL", "http://localhost:8000/signals/stream")
+
+# 클라이언트가 보관할 최근 이벤트 수 (초과 시 오래된 세션 커서는 reset 처리)
+DEFAULT_BUFFER = int(os.getenv("DASHBOARD_STREAM_BUFFER", "5000"))
+
+
+def parse_sse(lines: Iterator[str]) -> Iterator[Tuple[Optional[str], str, str, Optional[int]]]:
+    """
+    SSE 라인 → (id, event, data, retry_ms) 메시지
+
+    Args:
+        lines: 디코딩된 응답 라인 (개행 제거)
+
+    Yields:
+        빈 줄로 구분된 메시지 단위 튜플 (주석 / 빈 메시지는 건너뜀)
+    """
+    event_id, event, data, retry = None, "message", [], None
+    for line in lines:
+        if line == "":
+            if data or retry is not None:
+                yield event_id, event, "\n".join(data), retry
+            event_id, event, data, retry = None, "message", [], None
+            continue
+        if line.startswith(":"):
+            continue
+        name, _, value = line.partition(":")
+        value = value[1:] if value.startswith(" ") else value
+        if name == "id":
+            event_id = value
+        elif name == "event":
+            event = value
+        elif name == "data":
+            data.append(value)
+        elif name == "retry" and value.isdigit():
+            retry = int(value)
+
+
+class SignalStreamClient:
+    """
+    /signals/stream 구독 클라이언트 (스레드 안전, 세션 간 공유)
+
+    수신 이벤트에 클라이언트 로컬 순번(seq)을 붙여 링 버퍼에 보관합니다.
+    서버가 reset을 보내거나 세션 커서가 버퍼 밖이면 read()가 reset=True를 반환하며,
+    호출자는 전체 재조회 후 이어서 읽습니다.
+    """
+
+    def __init__(self, url: str = DEFAULT_STREAM_URL, buffer: int = DEFAULT_BUFFER, timeout: float = 60.0):
+        """
+        Args:
+            url: 스트림 URL
+            buffer: 보관할 최근 이벤트 수
+            timeout: 읽기 타임아웃 (초, 서버 keep-alive 간격보다 길게)
+        """
+        self.url = url
+        self.timeout = timeout
+        self._events: "deque[Tuple[int, str, Dict[str, Any]]]" = deque(maxlen=buffer)
+        self._lock = threading.Lock()
+        self._seq = 0
+        self._reset_seq = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.last_event_id: Optional[str] = None
+        self.connected = False
+        self.last_error: Optional[str] = None
+        self.reconnects = 0
+
+    # ─────────────── Lifecycle ───────────────
+
+    def start(self):
+        """구독 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="signal-stream", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """구독 중지 (현재 읽기는 타임아웃 후 종료)"""
+        self._stop.set()
+
+    # ─────────────── Read ───────────────
+
+    def cursor(self) -> int:
+        """현재 마지막 이벤트 순번 (세션 초기 커서)"""
+        with self._lock:
+            return self._seq
+
+    def read(self, cursor: int) -> Tuple[int, bool, List[int], Set[int]]:
+        """
+        커서 이후 이벤트 요약
+
+        Args:
+            cursor: 세션이 마지막으로 읽은 순번
+
+        Returns:
+            (새 커서, reset 여부, 새 signal id 목록(수신 순), 라벨 완료 signal id 집합)
+        """
+        with self._lock:
+            oldest = self._events[0][0] if self._events else self._seq + 1
+            if cursor < self._reset_seq or cursor < oldest - 1:
+                return self._seq, True, [], set()
+            new_ids: List[int] = []
+            labeled: Set[int] = set()
+            for seq, event, data in self._events:
+                if seq <= cursor:
+                    continue
+                if event == "signal":
+                    new_ids.append(int(data["id"]))
+                elif event == "label":
+                    labeled.update(int(signal_id) for signal_id in data.get("signal_ids", []))
+            return self._seq, False, new_ids, labeled
+
+    def stats(self) -> Dict[str, Any]:
+        """클라이언트 상태"""
+        return {
+            "url": self.url,
+            "connected": self.connected,
+            "last_event_id": self.last_event_id,
+            "buffered": len(self._events),
+            "reconnects": self.reconnects,
+            "last_error": self.last_error,
+        }
+
+    # ─────────────── Internal ───────────────
+
+    def _append(self, event: str, data: Dict[str, Any]):
+        """이벤트 보관 (reset은 순번만 기록)"""
+        with self._lock:
+            self._seq += 1
+            if event == "reset":
+                self._reset_seq = self._seq
+            else:
+                self._events.append((self._seq, event, data))
+
+    def _run(self):
+        """구독 루프 (끊기면 서버 retry 간격으로 재접속)"""
+        retry = 2.0
+        while not self._stop.is_set():
+            headers = {"Accept": "text/event-stream"}
+            if self.last_event_id is not None:
+                headers["Last-Event-ID"] = self.last_event_id
+            try:
+                with requests.get(self.url, headers=headers, stream=True, timeout=(5, self.timeout)) as response:
+                    response.raise_for_status()
+                    self.connected = True
+                    self.last_error = None
+                    for event_id, event, data, retry_ms in parse_sse(response.iter_lines(decode_unicode=True)):
+                        if retry_ms is not None:
+                            retry = retry_ms / 1000.0
+                        if event_id is not None:
+                            self.last_event_id = event_id
+                        if data:
+                            self._append(event, json.loads(data))
+                        if self._stop.is_set():
+                            return
+            except Exception as e:
+                self.last_error = str(e)
+            finally:
+                self.connected = False
+
+            self.reconnects += 1
+            self._stop.wait(retry)
@@ -5,7 +5,7 @@ VMSI-SDM Learner - Ablation Study
 
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Tuple
+from typing import Any, Dict, List, Tuple
 from sqlalchemy.orm import Session
 
 from learner.data import DataLoader
@@ -21,7 +21,7 @@ class AblationAnalyzer:
             db: DB 세션
         """
         self.db = db
-        loader = DataLoader(db)
+        loader = DataLoader(db, use_snapshot=True)
         self.df = loader.load_signals_with_labels()
         
         if len(self.df) == 0:
@@ -50,19 +50,20 @@ class AblationAnalyzer:
         df_buy = self.df[self.df['signal'] == 'BUY'].copy()
         df_buy['quantile'] = pd.qcut(df_buy[feature_name], q=quantiles, labels=False, duplicates='drop')
         
+        # 분위수별 마스크를 한 번에 평가
+        quantile_ids = df_buy['quantile'].to_numpy()
+        candidates = [q for q in range(quantiles) if (quantile_ids == q).sum() >= 5]
+        masks = np.stack([quantile_ids == q for q in candidates]) if candidates else np.zeros((0, len(df_buy)), dtype=bool)
+        batch = PerformanceMetrics.batch_metrics(PerformanceMetrics.returns_matrix(df_buy), masks, 'BUY')
+        values = df_buy[feature_name].to_numpy()
+        
         results = []
-        for q in range(quantiles):
-            subset = df_buy[df_buy['quantile'] == q]
-            
-            if len(subset) < 5:
-                continue
-            
-            metrics = PerformanceMetrics.calculate_all_metrics(subset, 'BUY')
-            
+        for i, (q, metrics) in enumerate(zip(candidates, PerformanceMetrics.batch_to_dicts(batch))):
+            subset_values = values[masks[i]]
             results.append({
                 'quantile': q,
-                'range': f"{subset[feature_name].min():.2f} - {subset[feature_name].max():.2f}",
-                'count': len(subset),
+                'range': f"{subset_values.min():.2f} - {subset_values.max():.2f}",
+                'count': int(masks[i].sum()),
                 'pf': metrics['pf'],
                 'mdd': metrics['mdd'],
                 'win_rate': metrics['win_rate'],
@@ -90,26 +91,35 @@ class AblationAnalyzer:
         # 베이스라인
         baseline_score = self._calculate_composite_score(self.baseline_metrics)
         
+        is_buy = (self.df['signal'] == 'BUY').to_numpy()
+        returns = PerformanceMetrics.returns_matrix(self.df)
+        
+        # 피처를 제거/중립화한 데이터셋 시뮬레이션
+        # (실제로는 피처 없이 재학습해야 하지만, 여기서는 근사)
+        # 해당 피처가 중립값인 신호만 필터링 → 피처별 마스크를 한 번에 평가
+        evaluated = []
+        masks = []
         for feature in features:
             if feature not in self.df.columns:
                 continue
             
-            # 피처를 제거/중립화한 데이터셋 시뮬레이션
-            # (실제로는 피처 없이 재학습해야 하지만, 여기서는 근사)
-            # 해당 피처가 중립값인 신호만 필터링
-            neutral_value = self.df[feature].median()
-            tolerance = self.df[feature].std() * 0.2
-            
-            filtered_df = self.df[
-                (self.df['signal'] == 'BUY') &
-                (abs(self.df[feature] - neutral_value) < tolerance)
-            ]
+            values = self.df[feature]
+            neutral_value = values.median()
+            tolerance = values.std() * 0.2
+            mask = is_buy & (abs(values - neutral_value) < tolerance).to_numpy()
             
-            if len(filtered_df) < 10:
+            if mask.sum() < 10:
                 # 데이터가 부족하면 전체 데이터 사용
-                filtered_df = self.df[self.df['signal'] == 'BUY']
+                mask = is_buy
             
-            ablated_metrics = PerformanceMetrics.calculate_all_metrics(filtered_df, 'BUY')
+            evaluated.append(feature)
+            masks.append(mask)
+        
+        batch = PerformanceMetrics.batch_metrics(
+            returns, np.stack(masks) if masks else np.zeros((0, len(self.df)), dtype=bool), 'BUY'
+        )
+        
+        for feature, ablated_metrics in zip(evaluated, PerformanceMetrics.batch_to_dicts(batch)):
             ablated_score = self._calculate_composite_score(ablated_metrics)
             
             # 성능 차이 = 베이스라인 - Ablated
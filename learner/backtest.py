@@ -0,0 +1,548 @@
+"""
+VMSI-SDM Learner - Bar Backtest Module
+OHLC 바 캐시 기반 이벤트 백테스트 (SL/TP/타임스탑, 포지션 사이징, 동시 보유 제한)
+"""
+
+import heapq
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from server.db import Signal
+from learner.metrics import PerformanceMetrics
+
+
+SIZING_MODES = ('fixed', 'atr_risk', 'kelly')
+
+# 바 로더: (symbol, tf, start, end) → OHLC DataFrame (UTC DatetimeIndex, Open/High/Low/Close)
+BarLoader = Callable[[str, str, datetime, datetime], pd.DataFrame]
+
+
+def default_bar_loader() -> BarLoader:
+    """라벨러와 같은 바 캐시/제공자를 사용하는 로더"""
+    from server.labeler import MarketDataLabeler
+
+    labeler = MarketDataLabeler()
+
+    def load(symbol: str, tf: str, start: datetime, end: datetime) -> pd.DataFrame:
+        return labeler.fetch_ohlc(symbol, start, end, labeler._convert_tf_to_yf_interval(tf))
+
+    return load
+
+
+class BacktestConfig:
+    """백테스트 설정"""
+
+    def __init__(
+        self,
+        initial_capital: float = 100000,
+        max_hold_bars: int = 20,
+        sizing: str = 'fixed',
+        fixed_fraction: float = 0.1,
+        risk_per_trade: float = 0.01,
+        kelly_fraction: float = 0.5,
+        kelly_warmup: int = 20,
+        max_position_fraction: float = 0.25,
+        max_concurrent: int = 10,
+        fee_bps: float = 5.0,
+        slippage_bps: float = 5.0,
+        sl_atr_mult: float = 1.5,
+        tp_atr_mult: float = 3.0,
+        sl_pct: float = 0.03,
+        tp_pct: float = 0.06
+    ):
+        """
+        Args:
+            initial_capital: 초기 자본
+            max_hold_bars: 타임스탑 (진입 후 최대 보유 봉 수)
+            sizing: fixed (자본 대비 고정 비율) / atr_risk (손절폭 기준 위험 금액) / kelly (누적 성과 기반 켈리 비율)
+            fixed_fraction: fixed 모드 포지션 비율 (kelly 워밍업에도 사용)
+            risk_per_trade: atr_risk 모드 거래당 위험 비율
+            kelly_fraction: 켈리 비율 축소 계수 (0.5 = half Kelly)
+            kelly_warmup: 켈리 계산 전 필요한 청산 거래 수
+            max_position_fraction: 포지션당 최대 자본 비율
+            max_concurrent: 최대 동시 보유 포지션 수
+            fee_bps: 편도 수수료 (bp)
+            slippage_bps: 편도 슬리피지 (bp, 불리한 방향)
+            sl_atr_mult: sl_price가 없을 때 ATR 배수 손절폭
+            tp_atr_mult: tp_price가 없을 때 ATR 배수 익절폭
+            sl_pct: sl_price/ATR 모두 없을 때 손절 비율
+            tp_pct: tp_price/ATR 모두 없을 때 익절 비율
+        """
+        if sizing not in SIZING_MODES:
+            raise ValueError(f"Unknown sizing mode: {sizing} (expected one of {SIZING_MODES})")
+
+        self.initial_capital = initial_capital
+        self.max_hold_bars = max_hold_bars
+        self.sizing = sizing
+        self.fixed_fraction = fixed_fraction
+        self.risk_per_trade = risk_per_trade
+        self.kelly_fraction = kelly_fraction
+        self.kelly_warmup = kelly_warmup
+        self.max_position_fraction = max_position_fraction
+        self.max_concurrent = max_concurrent
+        self.fee_bps = fee_bps
+        self.slippage_bps = slippage_bps
+        self.sl_atr_mult = sl_atr_mult
+        self.tp_atr_mult = tp_atr_mult
+        self.sl_pct = sl_pct
+        self.tp_pct = tp_pct
+
+
+def resolve_stops(
+    side: np.ndarray,
+    entry: np.ndarray,
+    sl_price: np.ndarray,
+    tp_price: np.ndarray,
+    atr: np.ndarray,
+    config: BacktestConfig
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    신호별 손절/익절가 결정 (알럿 값 → ATR 배수 → 고정 비율 순)
+
+    Args:
+        side: +1 (BUY) / -1 (SELL)
+        entry: 진입가
+        sl_price, tp_price, atr: 알럿 값 (없으면 NaN)
+        config: 백테스트 설정
+
+    Returns:
+        (손절가, 익절가)
+    """
+    has_atr = np.isfinite(atr) & (atr > 0)
+    sl_dist = np.where(has_atr, atr * config.sl_atr_mult, entry * config.sl_pct)
+    tp_dist = np.where(has_atr, atr * config.tp_atr_mult, entry * config.tp_pct)
+
+    # 알럿 손절/익절가는 진입가 기준 올바른 방향일 때만 사용
+    sl_ok = np.isfinite(sl_price) & (side * (entry - sl_price) > 0)
+    tp_ok = np.isfinite(tp_price) & (side * (tp_price - entry) > 0)
+
+    sl = np.where(sl_ok, sl_price, entry - side * sl_dist)
+    tp = np.where(tp_ok, tp_price, entry + side * tp_dist)
+    return sl, tp
+
+
+def simulate_exits(
+    side: np.ndarray,
+    entry_idx: np.ndarray,
+    sl: np.ndarray,
+    tp: np.ndarray,
+    ohlc: np.ndarray,
+    max_hold: int
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    신호 배열의 청산 봉/가격/사유를 한 번에 계산 (한 심볼의 바 시계열 기준)
+
+    진입 다음 봉부터 max_hold 봉까지의 고가/저가를 [S, max_hold] 행렬로 모아
+    손절/익절 최초 도달 봉을 argmax로 찾습니다. 같은 봉에서 둘 다 닿으면
+    보수적으로 손절로 처리하고, 시가가 가격을 건너뛰면 시가에 체결합니다.
+
+    Args:
+        side: +1 (BUY) / -1 (SELL) [S]
+        entry_idx: 진입 봉 인덱스 [S]
+        sl, tp: 손절가/익절가 [S]
+        ohlc: Open/High/Low/Close [B, 4]
+        max_hold: 최대 보유 봉 수
+
+    Returns:
+        (청산 봉 인덱스, 청산가, 사유 코드) - 사유: 0=sl, 1=tp, 2=time, 3=end(데이터 끝)
+    """
+    last = len(ohlc) - 1
+    offsets = np.arange(1, max_hold + 1)
+    idx = entry_idx[:, None] + offsets
+    valid = idx <= last
+    idx = np.minimum(idx, last)
+
+    opens, highs, lows, closes = (ohlc[idx, j] for j in range(4))
+    is_long = (side > 0)[:, None]
+
+    sl_hit = valid & np.where(is_long, lows <= sl[:, None], highs >= sl[:, None])
+    tp_hit = valid & np.where(is_long, highs >= tp[:, None], lows <= tp[:, None])
+
+    never = max_hold
+    first_sl = np.where(sl_hit.any(axis=1), sl_hit.argmax(axis=1), never)
+    first_tp = np.where(tp_hit.any(axis=1), tp_hit.argmax(axis=1), never)
+    available = valid.sum(axis=1)
+
+    by_sl = (first_sl < never) & (first_sl <= first_tp)
+    by_tp = ~by_sl & (first_tp < never)
+
+    offset = np.where(by_sl, first_sl, np.where(by_tp, first_tp, np.maximum(available - 1, 0)))
+    rows = np.arange(len(side))
+    bar_open = opens[rows, offset]
+
+    # 갭으로 손절/익절가를 건너뛴 경우 시가 체결
+    sl_fill = np.where(side > 0, np.minimum(bar_open, sl), np.maximum(bar_open, sl))
+    tp_fill = np.where(side > 0, np.maximum(bar_open, tp), np.minimum(bar_open, tp))
+    exit_price = np.where(by_sl, sl_fill, np.where(by_tp, tp_fill, closes[rows, offset]))
+
+    reason = np.where(by_sl, 0, np.where(by_tp, 1, np.where(available >= max_hold, 2, 3)))
+    return idx[rows, offset], exit_price, reason
+
+
+EXIT_REASONS = np.array(['sl', 'tp', 'time', 'end'])
+
+
+class BarBacktester:
+    """
+    바 캐시 기반 백테스터
+
+    1) 심볼/타임프레임별로 바를 한 번 로드해 모든 신호의 청산을 벡터 연산으로 계산하고
+    2) 진입 시각 순으로 포트폴리오(동시 보유 제한, 사이징, 수수료/슬리피지)를 적용합니다.
+    """
+
+    def __init__(self, config: Optional[BacktestConfig] = None, bar_loader: Optional[BarLoader] = None):
+        """
+        Args:
+            config: 백테스트 설정
+            bar_loader: (symbol, tf, start, end) → OHLC DataFrame (기본: MarketDataLabeler.fetch_ohlc, 바 캐시 경유)
+        """
+        self.config = config or BacktestConfig()
+        self.bar_loader = bar_loader or default_bar_loader()
+
+    # ─────────────── Data ───────────────
+
+    @staticmethod
+    def load_signals(
+        db: Session,
+        signal_type: Optional[str] = None,
+        symbols: Optional[List[str]] = None,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None
+    ) -> pd.DataFrame:
+        """
+        백테스트용 신호 로드 (승격 피처 컬럼 사용)
+
+        Args:
+            db: DB 세션
+            signal_type: BUY / SELL (None이면 둘 다)
+            symbols: 심볼 목록
+            start_ts, end_ts: 신호 시각 범위 (unix 초)
+
+        Returns:
+            signal_id, symbol, tf, signal, ts, price, atr, sl_price, tp_price DataFrame
+        """
+        query = select(
+            Signal.id.label('signal_id'), Signal.symbol, Signal.tf, Signal.signal, Signal.ts_sec.label('ts'),
+            Signal.price, Signal.atr, Signal.sl_price, Signal.tp_price
+        ).where(
+            Signal.signal.in_([signal_type] if signal_type else ['BUY', 'SELL']),
+            Signal.ts_sec.isnot(None)
+        )
+
+        if symbols:
+            query = query.where(Signal.symbol.in_(symbols))
+        if start_ts is not None:
+            query = query.where(Signal.ts_sec >= start_ts)
+        if end_ts is not None:
+            query = query.where(Signal.ts_sec <= end_ts)
+
+        rows = db.execute(query.order_by(Signal.id)).all()
+        df = pd.DataFrame(rows, columns=['signal_id', 'symbol', 'tf', 'signal', 'ts', 'price', 'atr', 'sl_price', 'tp_price'])
+        for col in ['price', 'atr', 'sl_price', 'tp_price']:
+            df[col] = df[col].astype(np.float64)
+        return df
+
+    # ─────────────── Simulation ───────────────
+
+    def simulate_trades(self, signals: pd.DataFrame, chunk_size: int = 200_000) -> pd.DataFrame:
+        """
+        신호별 진입/청산 계산 (사이징 전, 심볼/타임프레임 단위 벡터 연산)
+
+        Args:
+            signals: load_signals() 형식 DataFrame
+            chunk_size: 한 번에 계산할 신호 수
+
+        Returns:
+            신호별 trade DataFrame (바 데이터가 없는 신호는 제외)
+        """
+        config = self.config
+        frames = []
+
+        for (symbol, tf), group in signals.groupby(['symbol', 'tf'], sort=False, observed=True):
+            group = group.sort_values('ts')
+            ts = group['ts'].to_numpy(dtype=np.int64)
+            start = datetime.fromtimestamp(int(ts[0]), tz=timezone.utc)
+            # 타임스탑 구간만큼 여유 (주봉/월봉 포함 넉넉히)
+            end = datetime.fromtimestamp(int(ts[-1]), tz=timezone.utc) + pd.Timedelta(days=config.max_hold_bars * 31)
+
+            bars = self.bar_loader(symbol, tf, start, end)
+            if bars is None or bars.empty:
+                print(f"⚠️  No bars for {symbol} {tf} ({len(group)} signals)")
+                continue
+
+            bar_ts = bars.index.as_unit('s').asi8
+            ohlc = bars[['Open', 'High', 'Low', 'Close']].to_numpy(dtype=np.float64)
+
+            entry_idx_all = np.searchsorted(bar_ts, ts, side='left')
+            has_bar = entry_idx_all < len(bar_ts) - 1  # 진입 후 최소 1봉 필요
+
+            for offset in range(0, len(group), chunk_size):
+                part = slice(offset, offset + chunk_size)
+                keep = has_bar[part]
+                chunk = group.iloc[part][keep]
+                if chunk.empty:
+                    continue
+
+                entry_idx = entry_idx_all[part][keep]
+                side = np.where(chunk['signal'].to_numpy() == 'SELL', -1, 1)
+                entry = ohlc[entry_idx, 3]
+                sl, tp = resolve_stops(
+                    side, entry,
+                    chunk['sl_price'].to_numpy(dtype=np.float64),
+                    chunk['tp_price'].to_numpy(dtype=np.float64),
+                    chunk['atr'].to_numpy(dtype=np.float64),
+                    config
+                )
+                exit_idx, exit_price, reason = simulate_exits(side, entry_idx, sl, tp, ohlc, config.max_hold_bars)
+
+                frames.append(pd.DataFrame({
+                    'signal_id': chunk['signal_id'].to_numpy(),
+                    'symbol': symbol,
+                    'tf': tf,
+                    'side': side,
+                    'entry_ts': bar_ts[entry_idx],
+                    'exit_ts': bar_ts[exit_idx],
+                    'entry_price': entry,
+                    'exit_price': exit_price,
+                    'sl': sl,
+                    'tp': tp,
+                    'exit_reason': EXIT_REASONS[reason],
+                    'bars_held': exit_idx - entry_idx,
+                    'gross_ret': side * (exit_price - entry) / entry,
+                }))
+
+        if not frames:
+            return pd.DataFrame(columns=[
+                'signal_id', 'symbol', 'tf', 'side', 'entry_ts', 'exit_ts', 'entry_price', 'exit_price',
+                'sl', 'tp', 'exit_reason', 'bars_held', 'gross_ret'
+            ])
+
+        trades = pd.concat(frames, ignore_index=True)
+        return trades.sort_values(['entry_ts', 'signal_id'], kind='stable').reset_index(drop=True)
+
+    def run_portfolio(self, trades: pd.DataFrame) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        진입 시각 순 포트폴리오 적용 (동시 보유 제한, 사이징, 수수료/슬리피지)
+
+        사이징은 실현 자본 기준이며 청산 시점에 손익이 반영됩니다.
+
+        Args:
+            trades: simulate_trades() 결과 (entry_ts 순)
+
+        Returns:
+            (taken/qty/notional/fees/pnl/net_ret 컬럼이 추가된 trades, 청산 시점 equity 곡선)
+        """
+        config = self.config
+        n = len(trades)
+        slip = config.slippage_bps / 10000
+        fee = config.fee_bps / 10000
+
+        side = trades['side'].to_numpy(dtype=np.float64)
+        entry_fill = trades['entry_price'].to_numpy(dtype=np.float64) * (1 + side * slip)
+        exit_fill = trades['exit_price'].to_numpy(dtype=np.float64) * (1 - side * slip)
+        stop_dist = np.abs(entry_fill - trades['sl'].to_numpy(dtype=np.float64))
+        entry_ts = trades['entry_ts'].to_numpy(dtype=np.int64)
+        exit_ts = trades['exit_ts'].to_numpy(dtype=np.int64)
+
+        # 단위 수량당 순손익 (수수료 포함) → 포지션 손익 = qty * unit_pnl
+        unit_pnl = side * (exit_fill - entry_fill) - fee * (entry_fill + exit_fill)
+
+        qty = np.zeros(n)
+        taken = np.zeros(n, dtype=bool)
+
+        equity = config.initial_capital
+        committed = 0.0  # 보유 포지션 명목 금액
+        open_heap: List[Tuple[int, int]] = []  # (exit_ts, trade index)
+        curve_ts = [int(entry_ts[0]) if n else 0]
+        curve_equity = [equity]
+
+        # 켈리 추정용 청산 거래 통계
+        closed = 0
+        wins = 0
+        win_sum = 0.0
+        loss_sum = 0.0
+
+        def release_until(ts: int):
+            nonlocal equity, committed, closed, wins, win_sum, loss_sum
+            while open_heap and open_heap[0][0] <= ts:
+                close_ts, i = heapq.heappop(open_heap)
+                pnl = qty[i] * unit_pnl[i]
+                equity += pnl
+                committed -= qty[i] * entry_fill[i]
+                curve_ts.append(close_ts)
+                curve_equity.append(equity)
+
+                ret = unit_pnl[i] / entry_fill[i]
+                closed += 1
+                if ret > 0:
+                    wins += 1
+                    win_sum += ret
+                else:
+                    loss_sum -= ret
+
+        for i in range(n):
+            release_until(entry_ts[i])
+
+            if len(open_heap) >= config.max_concurrent or equity <= 0:
+                continue
+
+            if config.sizing == 'fixed':
+                notional = equity * config.fixed_fraction
+            elif config.sizing == 'atr_risk':
+                notional = (equity * config.risk_per_trade / stop_dist[i]) * entry_fill[i] if stop_dist[i] > 0 else 0.0
+            else:
+                if closed < config.kelly_warmup or wins == 0 or wins == closed:
+                    fraction = config.fixed_fraction
+                else:
+                    win_rate = wins / closed
+                    payoff = (win_sum / wins) / (loss_sum / (closed - wins)) if loss_sum > 0 else np.inf
+                    fraction = config.kelly_fraction * (win_rate - (1 - win_rate) / payoff)
+                notional = equity * fraction
+
+            notional = min(notional, equity * config.max_position_fraction, equity - committed)
+            if notional <= 0:
+                continue
+
+            qty[i] = notional / entry_fill[i]
+            taken[i] = True
+            committed += notional
+            heapq.heappush(open_heap, (int(exit_ts[i]), i))
+
+        release_until(np.iinfo(np.int64).max)
+
+        notional = qty * entry_fill
+        result = trades.copy()
+        result['taken'] = taken
+        result['qty'] = qty
+        result['notional'] = notional
+        result['fees'] = qty * fee * (entry_fill + exit_fill)
+        result['pnl'] = qty * unit_pnl
+        result['net_ret'] = np.where(taken, unit_pnl / entry_fill, 0.0)
+
+        curve = pd.DataFrame({'ts': curve_ts, 'equity': curve_equity})
+        return result, curve
+
+    def run(self, signals: pd.DataFrame) -> Dict[str, Any]:
+        """
+        백테스트 실행
+
+        Args:
+            signals: load_signals() 형식 DataFrame
+
+        Returns:
+            {'summary': 지표 딕셔너리, 'trades': trade DataFrame, 'equity': equity 곡선}
+        """
+        trades = self.simulate_trades(signals)
+        if trades.empty:
+            return {
+                'summary': {'final_capital': self.config.initial_capital, 'total_return': 0, 'num_trades': 0},
+                'trades': trades,
+                'equity': pd.DataFrame({'ts': [], 'equity': []})
+            }
+
+        trades, curve = self.run_portfolio(trades)
+        return {
+            'summary': self.summarize(trades, curve),
+            'trades': trades,
+            'equity': curve
+        }
+
+    def summarize(self, trades: pd.DataFrame, curve: pd.DataFrame) -> Dict[str, Any]:
+        """
+        백테스트 요약 지표
+
+        Args:
+            trades: run_portfolio() 결과
+            curve: equity 곡선
+
+        Returns:
+            지표 딕셔너리
+        """
+        taken = trades[trades['taken']]
+        pnl = taken['pnl'].to_numpy()
+        equity = curve['equity'].to_numpy()
+        running_max = np.maximum.accumulate(equity)
+
+        gains = pnl[pnl > 0].sum()
+        losses = -pnl[pnl < 0].sum()
+        final_capital = float(equity[-1])
+        returns = taken['net_ret']
+
+        return {
+            'final_capital': final_capital,
+            'total_return': (final_capital - self.config.initial_capital) / self.config.initial_capital,
+            'num_trades': int(len(taken)),
+            'skipped': int(len(trades) - len(taken)),
+            'pf': float(gains / losses) if losses > 0 else (float('inf') if gains > 0 else 0.0),
+            'mdd': float(np.abs(((equity - running_max) / running_max).min())),
+            'win_rate': float((pnl > 0).mean()) if len(pnl) else 0.0,
+            'sharpe': float(PerformanceMetrics.sharpe_ratio(returns)) if len(returns) > 1 else 0.0,
+            'avg_ret': float(returns.mean()) if len(returns) else 0.0,
+            'total_fees': float(taken['fees'].sum()),
+            'avg_bars_held': float(taken['bars_held'].mean()) if len(taken) else 0.0,
+            'exit_reasons': {reason: int(count) for reason, count in taken['exit_reason'].value_counts().items()},
+        }
+
+
+def run_backtest(
+    db: Session,
+    signal_type: Optional[str] = None,
+    config: Optional[BacktestConfig] = None,
+    symbols: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    DB 신호로 백테스트 실행 (편의 함수)
+
+    Args:
+        db: DB 세션
+        signal_type: BUY / SELL (None이면 둘 다)
+        config: 백테스트 설정
+        symbols: 심볼 목록
+
+    Returns:
+        BarBacktester.run() 결과
+    """
+    backtester = BarBacktester(config)
+    signals = backtester.load_signals(db, signal_type=signal_type, symbols=symbols)
+    return backtester.run(signals)
+
+
+if __name__ == "__main__":
+    import argparse
+    from server.db import SessionLocal, init_db
+
+    parser = argparse.ArgumentParser(description='VMSI-SDM Bar Backtest')
+    parser.add_argument('--signal-type', type=str, default=None, choices=['BUY', 'SELL'])
+    parser.add_argument('--symbols', nargs='*', default=None)
+    parser.add_argument('--sizing', type=str, default='fixed', choices=list(SIZING_MODES))
+    parser.add_argument('--max-hold', type=int, default=20, help='Time stop in bars (default: 20)')
+    parser.add_argument('--max-concurrent', type=int, default=10)
+    parser.add_argument('--fee-bps', type=float, default=5.0)
+    parser.add_argument('--slippage-bps', type=float, default=5.0)
+    args = parser.parse_args()
+
+    init_db()
+    db = SessionLocal()
+    try:
+        result = run_backtest(
+            db,
+            signal_type=args.signal_type,
+            symbols=args.symbols,
+            config=BacktestConfig(
+                sizing=args.sizing,
+                max_hold_bars=args.max_hold,
+                max_concurrent=args.max_concurrent,
+                fee_bps=args.fee_bps,
+                slippage_bps=args.slippage_bps
+            )
+        )
+        print("\n📊 Backtest Summary:")
+        for key, value in result['summary'].items():
+            print(f"  - {key}: {value}")
+    finally:
+        db.close()
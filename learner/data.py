@@ -3,81 +3,258 @@ VMSI-SDM Learner - Data Module
 학습용 데이터 로드 및 전처리
 """
 
+import hashlib
+import json
+import os
+import shutil
 import pandas as pd
 import numpy as np
-from typing import Tuple, List, Dict, Any
+from typing import Tuple, List, Dict, Any, Optional, Sequence, Union
+from sqlalchemy import Integer, Select, case, cast, func, select
 from sqlalchemy.orm import Session
 from server.db import Signal, Label
 
 
+# 라벨 forward window (labeler.forward_windows와 동일)
+FORWARD_WINDOWS = [3, 5, 10, 20]
+
+# 카테고리 dtype 컬럼
+CATEGORY_COLUMNS = ['symbol', 'tf', 'signal', 'dxy_trend', 'us10y_trend', 'hyg_ief']
+
+# 스냅샷 스키마 버전 (build_dataset_query 컬럼/의미가 바뀌면 증가 → 전체 재생성)
+SNAPSHOT_SCHEMA_VERSION = 1
+
+# 스냅샷 저장 위치
+SNAPSHOT_DIR = os.getenv("LEARNER_SNAPSHOT_DIR", "./data/snapshots")
+
+# 정수/불리언 컬럼 (나머지 수치 컬럼은 float32)
+INT64_COLUMNS = ['signal_id', 'ts', 'n_labels']
+BOOL_COLUMNS = ['ema20_above_50', 'broke_high_10', 'broke_low_10']
+
+
+def _to_array(name: str, values: Sequence[Any]) -> np.ndarray:
+    """쿼리 결과 컬럼 → compact dtype 배열"""
+    if name in INT64_COLUMNS:
+        return np.array(values, dtype=np.int64)
+    if name in BOOL_COLUMNS:
+        return np.array(values, dtype=bool)
+    if name in CATEGORY_COLUMNS:
+        return np.array(values, dtype=object)
+    return np.array(values, dtype=np.float32)
+
+
+def _json_float(column, key, default: float):
+    """JSON 필드 (키 또는 경로 튜플) → float (없으면 default)"""
+    return func.coalesce(column[key].as_float(), default)
+
+
+def _json_string(column, key, default: str):
+    """JSON 필드 (키 또는 경로 튜플) → 문자열 (없으면 default)"""
+    return func.coalesce(column[key].as_string(), default)
+
+
+def filter_dataset(
+    df: pd.DataFrame,
+    symbol: Optional[Union[str, List[str]]] = None,
+    tf: Optional[Union[str, List[str]]] = None,
+    start_ts: Optional[int] = None,
+    end_ts: Optional[int] = None,
+    min_labels: int = 4,
+    min_signal_id: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    로드된 데이터셋에 build_dataset_query()와 같은 필터 적용 (스냅샷용)
+    
+    Args:
+        df: load_columnar(min_labels=0) 결과
+        (나머지는 build_dataset_query 참고)
+    
+    Returns:
+        필터링된 DataFrame (인덱스 0부터 재설정)
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if symbol is not None:
+        mask &= df['symbol'].isin([symbol] if isinstance(symbol, str) else list(symbol)).to_numpy()
+    if tf is not None:
+        mask &= df['tf'].isin([tf] if isinstance(tf, str) else list(tf)).to_numpy()
+    if start_ts is not None:
+        mask &= df['ts'].to_numpy() >= start_ts
+    if end_ts is not None:
+        mask &= df['ts'].to_numpy() <= end_ts
+    if min_signal_id is not None:
+        mask &= df['signal_id'].to_numpy() > min_signal_id
+    if min_labels > 0:
+        mask &= df['n_labels'].to_numpy() >= min_labels
+    
+    if mask.all():
+        return df
+    return df[mask].reset_index(drop=True)
+
+
 class DataLoader:
     """학습 데이터 로더"""
     
-    def __init__(self, db: Session):
+    def __init__(self, db: Session, use_snapshot: bool = False, snapshot_dir: Optional[str] = None):
+        """
+        Args:
+            db: DB 세션
+            use_snapshot: True면 DatasetSnapshot 경유로 로드 (반복 실행 시 DB 재조회 생략)
+            snapshot_dir: 스냅샷 저장 위치 (기본: LEARNER_SNAPSHOT_DIR)
+        """
         self.db = db
+        self.use_snapshot = use_snapshot
+        self.snapshot_dir = snapshot_dir
     
-    def load_signals_with_labels(self, min_labels: int = 4) -> pd.DataFrame:
+    def build_dataset_query(
+        self,
+        symbol: Optional[Union[str, List[str]]] = None,
+        tf: Optional[Union[str, List[str]]] = None,
+        start_ts: Optional[int] = None,
+        end_ts: Optional[int] = None,
+        min_labels: int = 4,
+        min_signal_id: Optional[int] = None
+    ) -> Select:
+        """
+        signals × labels 피벗 쿼리 (신호당 1행, fwd_n별 라벨을 컬럼으로)
+        
+        Args:
+            symbol: 심볼 (또는 목록)
+            tf: 타임프레임 (또는 목록)
+            start_ts: 시작 시각 (unix 초, 포함)
+            end_ts: 종료 시각 (unix 초, 포함)
+            min_labels: 최소 라벨 개수 (0이면 라벨 없는 신호 포함)
+            min_signal_id: 이 ID보다 큰 신호만 (증분 로드용)
+        
+        Returns:
+            SELECT 문
+        """
+        s = Signal.__table__.c
+        lbl = Label.__table__.c
+        features = s.features_json
+        params = s.params_json
+        
+        # 라벨 피벗 (labels만 집계 후 signals와 PK 조인 → 신호별 랜덤 조회 없음)
+        def label_col(field, n):
+            return func.max(case((lbl.fwd_n == n, field)))
+        
+        n_labels = func.count(func.distinct(lbl.fwd_n))
+        pivot = (
+            select(
+                lbl.signal_id.label('signal_id'),
+                *[label_col(lbl.fwd_ret, n).label(f'fwd_ret_{n}') for n in FORWARD_WINDOWS],
+                label_col(cast(lbl.broke_high, Integer), 10).label('broke_high_10'),
+                label_col(cast(lbl.broke_low, Integer), 10).label('broke_low_10'),
+                n_labels.label('n_labels'),
+            )
+            .group_by(lbl.signal_id)
+        )
+        if min_signal_id is not None:
+            pivot = pivot.where(lbl.signal_id > min_signal_id)
+        if min_labels > 0:
+            pivot = pivot.having(n_labels >= min_labels)
+        pivot = pivot.subquery('label_pivot')
+        p = pivot.c
+        
+        columns = [
+            s.id.label('signal_id'),
+            s.symbol.label('symbol'),
+            s.tf.label('tf'),
+            s.signal.label('signal'),
+            s.ts_sec.label('ts'),
+            # 피처 (승격 컬럼 우선)
+            func.coalesce(s.trend_score, 0).label('trend_score'),
+            _json_float(features, 'prob', 0).label('prob'),
+            func.coalesce(features['ema20_above_50'].as_boolean(), False).label('ema20_above_50'),
+            func.coalesce(s.rsi, 50).label('rsi'),
+            func.coalesce(s.vol_mult, 1).label('vol_mult'),
+            func.coalesce(s.vcp_ratio, 0).label('vcp_ratio'),
+            _json_float(features, 'dist_ath', 0).label('dist_ath'),
+            # 매크로
+            _json_float(features, ('macro', 'vix'), 18).label('vix'),
+            _json_string(features, ('macro', 'dxy_trend'), 'flat').label('dxy_trend'),
+            _json_string(features, ('macro', 'us10y_trend'), 'flat').label('us10y_trend'),
+            _json_string(features, ('macro', 'hyg_ief'), 'bull').label('hyg_ief'),
+            # 파라미터
+            _json_float(params, 'alpha', 0.8).label('alpha'),
+            _json_float(params, 'beta', 0.35).label('beta'),
+            _json_float(params, 'gamma', 0.7).label('gamma'),
+            _json_float(params, 'delta', 0.6).label('delta'),
+            _json_float(params, 'epsilon', 0.8).label('epsilon'),
+        ]
+        # 라벨 (없는 window는 0 / False)
+        columns += [func.coalesce(p[f'fwd_ret_{n}'], 0).label(f'fwd_ret_{n}') for n in FORWARD_WINDOWS]
+        columns += [
+            func.coalesce(p.broke_high_10, 0).label('broke_high_10'),
+            func.coalesce(p.broke_low_10, 0).label('broke_low_10'),
+            func.coalesce(p.n_labels, 0).label('n_labels'),
+        ]
+        
+        join_on = p.signal_id == s.id
+        query = (
+            select(*columns)
+            .select_from(Signal.__table__.outerjoin(pivot, join_on) if min_labels <= 0
+                         else pivot.join(Signal.__table__, join_on))
+            .where(s.ts_sec.isnot(None))  # 숫자가 아닌 레거시 ts 제외
+            .order_by(s.id)
+        )
+        
+        if symbol is not None:
+            query = query.where(s.symbol.in_([symbol] if isinstance(symbol, str) else list(symbol)))
+        if tf is not None:
+            query = query.where(s.tf.in_([tf] if isinstance(tf, str) else list(tf)))
+        if start_ts is not None:
+            query = query.where(s.ts_sec >= start_ts)
+        if end_ts is not None:
+            query = query.where(s.ts_sec <= end_ts)
+        if min_signal_id is not None:
+            query = query.where(s.id > min_signal_id)
+        
+        return query
+    
+    def load_columnar(self, chunk_size: int = 200_000, **filters) -> pd.DataFrame:
+        """
+        단일 SQL 피벗 쿼리 결과를 컬럼 배열로 바로 로드
+        
+        Args:
+            chunk_size: 한 번에 가져올 행 수
+            **filters: build_dataset_query() 인자 (symbol, tf, start_ts, end_ts, min_labels, min_signal_id)
+        
+        Returns:
+            compact dtype DataFrame (float32 / category / int64 / bool)
+        """
+        query = self.build_dataset_query(**filters)
+        names = [column.name for column in query.selected_columns]
+        
+        result = self.db.execute(query.execution_options(stream_results=True))
+        chunks: Dict[str, List[np.ndarray]] = {name: [] for name in names}
+        for rows in result.partitions(chunk_size):
+            for name, values in zip(names, zip(*rows)):
+                chunks[name].append(_to_array(name, values))
+        
+        data = {
+            name: np.concatenate(parts) if parts else _to_array(name, ())
+            for name, parts in chunks.items()
+        }
+        df = pd.DataFrame(data, columns=names)
+        for name in CATEGORY_COLUMNS:
+            df[name] = df[name].astype('category')
+        return df
+    
+    def load_signals_with_labels(self, min_labels: int = 4, **filters) -> pd.DataFrame:
         """
         라벨이 있는 신호들을 DataFrame으로 로드
         
         Args:
             min_labels: 최소 라벨 개수 (기본 4: 3, 5, 10, 20봉)
+            **filters: symbol, tf, start_ts, end_ts (load_columnar 참고)
         
         Returns:
             신호 + 라벨이 결합된 DataFrame
         """
-        # 라벨이 충분한 신호들만 조회
-        signals = self.db.query(Signal).all()
-        
-        data = []
-        for signal in signals:
-            labels = {label.fwd_n: label for label in signal.labels}
-            
-            # 라벨이 충분하지 않으면 스킵
-            if len(labels) < min_labels:
-                continue
-            
-            # 피처 추출
-            features = signal.features_json
-            params = signal.params_json
-            
-            row = {
-                'signal_id': signal.id,
-                'symbol': signal.symbol,
-                'tf': signal.tf,
-                'signal': signal.signal,
-                'ts': signal.ts,
-                # 피처
-                'trend_score': features.get('trendScore', 0),
-                'prob': features.get('prob', 0),
-                'ema20_above_50': features.get('ema20_above_50', False),
-                'rsi': features.get('rsi', 50),
-                'vol_mult': features.get('vol_mult', 1),
-                'vcp_ratio': features.get('vcp_ratio', 0),
-                'dist_ath': features.get('dist_ath', 0),
-                # 매크로
-                'vix': features.get('macro', {}).get('vix', 18),
-                'dxy_trend': features.get('macro', {}).get('dxy_trend', 'flat'),
-                'us10y_trend': features.get('macro', {}).get('us10y_trend', 'flat'),
-                'hyg_ief': features.get('macro', {}).get('hyg_ief', 'bull'),
-                # 파라미터
-                'alpha': params.get('alpha', 0.8),
-                'beta': params.get('beta', 0.35),
-                'gamma': params.get('gamma', 0.7),
-                'delta': params.get('delta', 0.6),
-                'epsilon': params.get('epsilon', 0.8),
-                # 라벨
-                'fwd_ret_3': labels.get(3).fwd_ret if 3 in labels else 0,
-                'fwd_ret_5': labels.get(5).fwd_ret if 5 in labels else 0,
-                'fwd_ret_10': labels.get(10).fwd_ret if 10 in labels else 0,
-                'fwd_ret_20': labels.get(20).fwd_ret if 20 in labels else 0,
-                'broke_high_10': labels.get(10).broke_high if 10 in labels else False,
-                'broke_low_10': labels.get(10).broke_low if 10 in labels else False,
-            }
-            data.append(row)
-        
-        df = pd.DataFrame(data)
-        return df
+        if self.use_snapshot:
+            df = DatasetSnapshot(self.db, self.snapshot_dir).load()
+            return filter_dataset(df, min_labels=min_labels, **filters)
+        return self.load_columnar(min_labels=min_labels, **filters)
     
     def split_walk_forward(self, df: pd.DataFrame, train_ratio: float = 0.7) -> Tuple[pd.DataFrame, pd.DataFrame]:
         """
@@ -135,6 +312,173 @@ class DataLoader:
         return df[df['signal'] == signal_type].copy()
 
 
+# ─────────────── Dataset Snapshot ───────────────
+
+class DatasetSnapshot:
+    """
+    signals × labels 데이터셋의 컬럼 스냅샷 (컬럼별 .npy + meta.json)
+    
+    스냅샷 디렉터리 이름은 fingerprint(최대 signal id, 최대 label id, 스키마 버전)로
+    정해지며, DB가 바뀌지 않았으면 memory-mapped로 바로 로드합니다.
+    새 신호/라벨이 생기면 영향받은 가장 오래된 신호부터 끝까지만 다시 조회해
+    기존 스냅샷 앞부분에 이어 붙입니다.
+    
+    삭제나 기존 행 수정(라벨 재계산 등)은 감지하지 않으므로 그런 경우
+    rebuild()를 호출하세요.
+    """
+    
+    def __init__(self, db: Session, root: Optional[str] = None):
+        """
+        Args:
+            db: DB 세션
+            root: 스냅샷 저장 위치 (기본: LEARNER_SNAPSHOT_DIR)
+        """
+        self.db = db
+        url = db.get_bind().url.render_as_string(hide_password=True)
+        db_key = hashlib.sha1(url.encode()).hexdigest()[:12]
+        self.root = os.path.join(root or SNAPSHOT_DIR, db_key)
+    
+    # ─────────────── Public ───────────────
+    
+    def fingerprint(self) -> Dict[str, int]:
+        """현재 DB 상태 fingerprint"""
+        return {
+            'max_signal_id': self.db.scalar(select(func.max(Signal.id))) or 0,
+            'max_label_id': self.db.scalar(select(func.max(Label.id))) or 0,
+            'schema_version': SNAPSHOT_SCHEMA_VERSION,
+        }
+    
+    def load(self) -> pd.DataFrame:
+        """
+        최신 데이터셋 로드 (min_labels=0 전체, 필요 시 스냅샷 갱신)
+        
+        Returns:
+            signal_id 순 DataFrame (filter_dataset()으로 필터링)
+        """
+        fingerprint = self.fingerprint()
+        meta = self._read_meta()
+        
+        if meta is not None and meta['fingerprint'] == fingerprint:
+            return self._read(meta)
+        
+        if meta is not None and self._can_append(meta['fingerprint'], fingerprint):
+            df = self._append(meta, fingerprint)
+            print(f"✓ Snapshot updated: {meta['rows']} → {len(df)} rows")
+        else:
+            df = DataLoader(self.db).load_columnar(min_labels=0)
+            print(f"✓ Snapshot built: {len(df)} rows")
+        
+        self._write(df, fingerprint)
+        return df
+    
+    def rebuild(self) -> pd.DataFrame:
+        """스냅샷을 무시하고 전체 재생성"""
+        fingerprint = self.fingerprint()
+        df = DataLoader(self.db).load_columnar(min_labels=0)
+        self._write(df, fingerprint)
+        return df
+    
+    # ─────────────── Internal ───────────────
+    
+    @staticmethod
+    def _key(fingerprint: Dict[str, int]) -> str:
+        """fingerprint → 스냅샷 디렉터리 이름"""
+        return f"v{fingerprint['schema_version']}_s{fingerprint['max_signal_id']}_l{fingerprint['max_label_id']}"
+    
+    @staticmethod
+    def _can_append(old: Dict[str, int], new: Dict[str, int]) -> bool:
+        """이전 스냅샷 위에 증분 갱신 가능한지 (ID가 줄었으면 DB 재생성으로 판단)"""
+        return (
+            old['schema_version'] == new['schema_version']
+            and new['max_signal_id'] >= old['max_signal_id']
+            and new['max_label_id'] >= old['max_label_id']
+        )
+    
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        """CURRENT가 가리키는 스냅샷 메타데이터"""
+        try:
+            with open(os.path.join(self.root, 'CURRENT')) as f:
+                key = f.read().strip()
+            with open(os.path.join(self.root, key, 'meta.json')) as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return None
+        meta['path'] = os.path.join(self.root, key)
+        return meta
+    
+    def _read(self, meta: Dict[str, Any]) -> pd.DataFrame:
+        """스냅샷 컬럼을 memory-mapped로 로드"""
+        data = {}
+        for name in meta['columns']:
+            values = np.load(os.path.join(meta['path'], f'{name}.npy'), mmap_mode='r')
+            if name in meta['categories']:
+                values = pd.Categorical.from_codes(values, categories=meta['categories'][name])
+            data[name] = values
+        return pd.DataFrame(data, columns=meta['columns'], copy=False)
+    
+    def _append(self, meta: Dict[str, Any], fingerprint: Dict[str, int]) -> pd.DataFrame:
+        """스냅샷 이후 변경분만 조회해 결합"""
+        old_fp = meta['fingerprint']
+        
+        # 새 라벨이 붙은 기존 신호 중 가장 오래된 것부터 다시 조회
+        first_changed = old_fp['max_signal_id'] + 1
+        if fingerprint['max_label_id'] > old_fp['max_label_id']:
+            first_labeled = self.db.scalar(
+                select(func.min(Label.signal_id)).where(Label.id > old_fp['max_label_id'])
+            )
+            if first_labeled is not None:
+                first_changed = min(first_changed, first_labeled)
+        
+        old = self._read(meta)
+        keep = old[old['signal_id'].to_numpy() < first_changed]
+        tail = DataLoader(self.db).load_columnar(min_labels=0, min_signal_id=first_changed - 1)
+        
+        if len(tail) == 0:
+            return keep.reset_index(drop=True)
+        
+        for name in CATEGORY_COLUMNS:
+            categories = keep[name].cat.categories.union(tail[name].cat.categories)
+            keep = keep.assign(**{name: keep[name].cat.set_categories(categories)})
+            tail[name] = tail[name].cat.set_categories(categories)
+        return pd.concat([keep, tail], ignore_index=True)
+    
+    def _write(self, df: pd.DataFrame, fingerprint: Dict[str, int]):
+        """새 스냅샷 디렉터리에 저장 후 CURRENT 교체, 이전 스냅샷 정리"""
+        key = self._key(fingerprint)
+        path = os.path.join(self.root, key)
+        tmp_path = f"{path}.tmp"
+        shutil.rmtree(tmp_path, ignore_errors=True)
+        os.makedirs(tmp_path)
+        
+        categories = {}
+        for name in df.columns:
+            if name in CATEGORY_COLUMNS:
+                categories[name] = df[name].cat.categories.tolist()
+                values = df[name].cat.codes.to_numpy()
+            else:
+                values = df[name].to_numpy()
+            np.save(os.path.join(tmp_path, f'{name}.npy'), values)
+        
+        with open(os.path.join(tmp_path, 'meta.json'), 'w') as f:
+            json.dump({
+                'fingerprint': fingerprint,
+                'rows': len(df),
+                'columns': list(df.columns),
+                'categories': categories,
+            }, f)
+        
+        shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+        with open(os.path.join(self.root, 'CURRENT.tmp'), 'w') as f:
+            f.write(key)
+        os.replace(os.path.join(self.root, 'CURRENT.tmp'), os.path.join(self.root, 'CURRENT'))
+        
+        # 이전 스냅샷 삭제 (다른 프로세스가 mmap 중이면 실패할 수 있으므로 무시)
+        for name in os.listdir(self.root):
+            if name not in (key, 'CURRENT') and not name.endswith('.tmp'):
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+
+
 def prepare_training_data(db: Session) -> Tuple[pd.DataFrame, pd.DataFrame]:
     """
     학습용 데이터 준비 (편의 함수)
@@ -3,9 +3,15 @@ VMSI-SDM Learner - Metrics Module
 성능 평가 지표 계산
 """
 
+import os
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
+
+
+# 라벨 forward window (returns 행렬 열 순서)
+FORWARD_WINDOWS = [3, 5, 10, 20]
 
 
 class PerformanceMetrics:
@@ -137,23 +143,171 @@ class PerformanceMetrics:
                 'avg_ret': 0, 'total_trades': 0
             }
         
-        # 10봉 후 수익률 기준
-        returns = signal_df['fwd_ret_10']
+        return PerformanceMetrics.metrics_from_returns(
+            PerformanceMetrics.returns_matrix(signal_df), signal_type
+        )
+    
+    @staticmethod
+    def returns_matrix(df: pd.DataFrame) -> np.ndarray:
+        """
+        DataFrame → (신호 수, 4) float64 수익률 행렬 (fwd_ret_3/5/10/20, 없는 열은 NaN)
+        
+        Args:
+            df: 신호 + 라벨 DataFrame
+        
+        Returns:
+            수익률 행렬
+        """
+        matrix = np.full((len(df), len(FORWARD_WINDOWS)), np.nan)
+        for j, n in enumerate(FORWARD_WINDOWS):
+            col = f'fwd_ret_{n}'
+            if col in df.columns:
+                matrix[:, j] = df[col].to_numpy(dtype=np.float64)
+        return matrix
+    
+    @staticmethod
+    def batch_metrics(
+        returns: np.ndarray,
+        masks: np.ndarray,
+        signal_type: str = 'BUY',
+        threshold: float = 0.02,
+        chunk_elements: int = 2_000_000,
+        n_threads: Optional[int] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        K개 후보 신호 집합의 성능 지표를 한 번에 계산
+        
+        후보마다 DataFrame을 만들지 않고 마스크 행렬 곱으로 합계/개수를 구하며,
+        MDD는 제외된 행의 수익률을 1로 둔 마스크 누적곱으로 계산합니다
+        (calculate_all_metrics와 같은 순서의 곱셈이므로 결과가 일치).
         
-        metrics = {
-            'pf': PerformanceMetrics.profit_factor(returns),
-            'mdd': PerformanceMetrics.max_drawdown(returns),
-            'win_rate': PerformanceMetrics.win_rate(returns),
-            'sharpe': PerformanceMetrics.sharpe_ratio(returns),
-            'avg_ret': returns.mean(),
-            'total_trades': len(signal_df)
+        Args:
+            returns: (신호 수, 4) 수익률 행렬, 열 순서 fwd_ret_3/5/10/20 (행 순서 = 시간 순서)
+            masks: (K, 신호 수) bool 마스크, 후보별 포함 여부 (1차원이면 K=1)
+            signal_type: BUY 또는 SELL (PSU 방향)
+            threshold: PSU 성공 기준 수익률
+            chunk_elements: 한 번에 만드는 (후보 × 신호 수) 행렬 최대 원소 수
+            n_threads: 청크 병렬 스레드 수 (기본: CPU 코어 수)
+        
+        Returns:
+            {'pf', 'mdd', 'win_rate', 'sharpe', 'avg_ret', 'total_trades', 'psu_3', ..., 'psu_20'}
+            각 값은 길이 K 배열
+        """
+        returns = np.asarray(returns, dtype=np.float64)
+        masks = np.atleast_2d(np.asarray(masks, dtype=bool))
+        k, n = masks.shape
+        
+        # 10봉 후 수익률 기준 (라벨 없는 NaN 행은 합계에서 제외, 평균/표준편차 분모는 유효 행 수)
+        valid = ~np.isnan(returns[:, 2])
+        ret = np.where(valid, returns[:, 2], 0.0)
+        
+        # 행렬 곱 한 번으로 후보별 합계 계산: [양수 합, 음수 합, 승 수, 합, 제곱합, 유효 수, PSU 성공 수 x4]
+        success = returns > threshold if signal_type == 'BUY' else returns < -threshold
+        columns = np.column_stack([
+            np.where(ret > 0, ret, 0.0),
+            np.where(ret < 0, ret, 0.0),
+            (ret > 0).astype(np.float64),
+            ret,
+            ret * ret,
+            valid.astype(np.float64),
+            success.astype(np.float64),
+        ])
+        sums = np.empty((k, columns.shape[1]))
+        mdd = np.zeros(k)
+        
+        def evaluate(start: int, stop: int):
+            weights = masks[start:stop].astype(np.float64)
+            sums[start:stop] = weights @ columns
+            
+            # MDD: 제외 행은 성장률 1 (누적곱 유지), 고점은 포함 행에서만 갱신
+            # weights * ret + 1 은 포함 행에서 1 + ret과 비트 단위로 같음
+            cumulative = weights * ret
+            cumulative += 1.0
+            np.cumprod(cumulative, axis=1, out=cumulative)
+            running_max = np.multiply(cumulative, weights, out=weights)  # 제외 행 0 → 고점 계산에서 무시
+            np.maximum.accumulate(running_max, axis=1, out=running_max)
+            with np.errstate(divide='ignore', invalid='ignore'):
+                # 첫 포함 행 이전은 (1 - 0) / 0 = inf → 최솟값에 영향 없음
+                np.subtract(cumulative, running_max, out=cumulative)
+                np.divide(cumulative, running_max, out=cumulative)
+            mdd[start:stop] = np.abs(np.minimum(cumulative.min(axis=1), 0.0))
+        
+        # 청크 단위 계산 (NumPy 연산은 GIL을 해제하므로 스레드로 코어 활용)
+        rows_per_chunk = max(1, chunk_elements // max(n, 1))
+        bounds = [(start, min(start + rows_per_chunk, k)) for start in range(0, k, rows_per_chunk)]
+        workers = min(len(bounds), n_threads or os.cpu_count() or 1)
+        if workers <= 1:
+            for start, stop in bounds:
+                evaluate(start, stop)
+        else:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                list(executor.map(lambda bound: evaluate(*bound), bounds))
+        
+        positive, negative, wins, total, total_sq, labeled = (sums[:, i] for i in range(6))
+        negative = np.abs(negative)
+        psu = sums[:, 6:]
+        
+        # 승률/PSU/거래 수는 calculate_all_metrics와 같이 전체 행 수 기준
+        count = masks.sum(axis=1)
+        safe_count = np.maximum(count, 1)
+        labeled = np.rint(labeled)
+        
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pf = np.where(negative > 0, positive / negative, np.where(positive > 0, np.inf, 0.0))
+            
+            avg_ret = total / np.maximum(labeled, 1)
+            variance = np.maximum(total_sq - total * avg_ret, 0.0) / np.maximum(labeled - 1, 1)
+            std = np.sqrt(variance)
+            sharpe = np.where(
+                (labeled > 1) & (std > 0),
+                np.sqrt(252) * (avg_ret - 0.02 / 252) / std,
+                0.0
+            )
+        
+        psu = psu / safe_count[:, None]
+        
+        empty = count == 0
+        result = {
+            'pf': pf,
+            'mdd': mdd,
+            'win_rate': wins / safe_count,
+            'sharpe': sharpe,
+            'avg_ret': avg_ret,
+            'total_trades': count,
+            'psu_3': psu[:, 0],
+            'psu_5': psu[:, 1],
+            'psu_10': psu[:, 2],
+            'psu_20': psu[:, 3],
         }
+        for key in result:
+            result[key] = np.where(empty, 0, result[key])
+        return result
+    
+    @staticmethod
+    def batch_to_dicts(batch: Dict[str, np.ndarray]) -> List[Dict[str, float]]:
+        """batch_metrics() 결과 → 후보별 지표 딕셔너리 목록 (JSON 저장 가능한 Python 값)"""
+        k = len(batch['pf'])
+        return [
+            {key: int(values[i]) if key == 'total_trades' else float(values[i]) for key, values in batch.items()}
+            for i in range(k)
+        ]
+    
+    @staticmethod
+    def metrics_from_returns(returns: np.ndarray, signal_type: str = 'BUY', threshold: float = 0.02) -> Dict[str, float]:
+        """
+        이미 필터링된 신호 집합 1개의 지표 (batch_metrics K=1)
         
-        # 신호 정확도 추가
-        accuracy = PerformanceMetrics.signal_accuracy(df, signal_type)
-        metrics.update(accuracy)
+        Args:
+            returns: (신호 수, 4) 수익률 행렬
+            signal_type: BUY 또는 SELL
+            threshold: PSU 성공 기준 수익률
         
-        return metrics
+        Returns:
+            calculate_all_metrics()와 같은 키의 지표 딕셔너리
+        """
+        mask = np.ones((1, len(returns)), dtype=bool)
+        batch = PerformanceMetrics.batch_metrics(np.reshape(returns, (-1, 4)), mask, signal_type, threshold)
+        return PerformanceMetrics.batch_to_dicts(batch)[0]
     
     @staticmethod
     def stability_score(df: pd.DataFrame, param_name: str, variation: float = 0.2) -> float:
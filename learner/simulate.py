@@ -0,0 +1,265 @@
+"""
+VMSI-SDM Learner - Signal Simulation Module
+캐시된 바에서 파라미터별 v5 신호를 재생성해 튜너가 실제 파라미터 효과를 평가하도록 지원
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from server.db import Signal
+from server.bar_store import INTERVAL_SECONDS, TF_INTERVALS
+from server.indicators import (
+    INDICATOR_LENGTH_KEYS, PARAM_ALIASES, apply_cooldown, compute_indicators, grid_signal_masks,
+    params_matrix, resolve_params, signal_conditions, trend_score
+)
+from learner.backtest import BarLoader, default_bar_loader
+from learner.metrics import FORWARD_WINDOWS, PerformanceMetrics
+
+
+# 인디케이터 워밍업용 추가 로드 봉 수
+WARMUP_BARS = 250
+
+
+def forward_returns(close: np.ndarray, forward_windows: List[int] = FORWARD_WINDOWS) -> np.ndarray:
+    """
+    봉별 forward 수익률 (라벨러 정의: 진입 봉 종가 대비 n-1봉 뒤 종가, 봉 부족 시 0)
+
+    Args:
+        close: 종가 [n]
+        forward_windows: 윈도우 목록
+
+    Returns:
+        [n, len(forward_windows)] float64
+    """
+    n = len(close)
+    out = np.zeros((n, len(forward_windows)))
+    for j, window in enumerate(forward_windows):
+        shift = window - 1
+        if shift < n:
+            out[:n - shift, j] = (close[shift:] - close[:n - shift]) / close[:n - shift]
+    return out
+
+
+class SignalSimulator:
+    """
+    심볼/타임프레임별 바에서 파라미터 조합마다 BUY/SELL 신호를 재생성
+
+    기간 파라미터(EMA/RSI/VCP 길이)별 인디케이터와 봉별 forward 수익률은 한 번만 계산하고,
+    trial마다 trend score/조건/히스테리시스/쿨다운만 다시 계산합니다.
+    전체 봉을 시간 순으로 이어 붙인 배열에서 신호 발생 봉을 마스크로 표시합니다.
+    """
+
+    def __init__(
+        self,
+        bars_by_key: Mapping[Tuple[str, str], pd.DataFrame],
+        signal_type: str = 'BUY',
+        eval_start: Optional[Mapping[Tuple[str, str], int]] = None
+    ):
+        """
+        Args:
+            bars_by_key: {(symbol, tf): OHLCV 바} (시간 오름차순)
+            signal_type: BUY 또는 SELL
+            eval_start: 키별 평가 시작 시각 (unix 초, 이전 봉은 워밍업으로만 사용)
+        """
+        self.signal_type = signal_type
+        self.keys: List[Tuple[str, str]] = []
+        self.bars: List[pd.DataFrame] = []
+        self._indicator_cache: Dict[tuple, List[Dict[str, np.ndarray]]] = {}
+
+        defaults = resolve_params()
+        indicators, times, returns, evaluated = [], [], [], []
+        for key, bars in bars_by_key.items():
+            if bars is None or len(bars) == 0:
+                continue
+            arrays = compute_indicators(bars, defaults)
+            self.keys.append(key)
+            self.bars.append(bars)
+            indicators.append(arrays)
+            times.append(arrays['time'])
+            returns.append(forward_returns(arrays['close']))
+            start = (eval_start or {}).get(key)
+            evaluated.append(arrays['time'] >= start if start is not None else np.ones(len(bars), dtype=bool))
+
+        self._indicator_cache[tuple(int(defaults[key]) for key in INDICATOR_LENGTH_KEYS)] = indicators
+        self.offsets = np.cumsum([0] + [len(t) for t in times])
+        all_times = np.concatenate(times) if times else np.zeros(0, dtype=np.int64)
+        evaluated = np.concatenate(evaluated) if evaluated else np.zeros(0, dtype=bool)
+
+        # 평가 대상 봉만 시간 순 (동시각은 키 순서 유지)
+        rows = np.flatnonzero(evaluated)
+        self.rows = rows[np.argsort(all_times[rows], kind='stable')]
+        self.times = all_times[self.rows]
+        self.returns = (np.concatenate(returns) if returns else np.zeros((0, len(FORWARD_WINDOWS))))[self.rows]
+
+    @classmethod
+    def from_db(
+        cls,
+        db: Session,
+        signal_type: str = 'BUY',
+        bar_loader: Optional[BarLoader] = None,
+        symbols: Optional[List[str]] = None
+    ) -> 'SignalSimulator':
+        """
+        DB 신호가 있는 (symbol, tf)의 바를 신호 기간 + 워밍업만큼 로드
+
+        Args:
+            db: DB 세션
+            signal_type: BUY 또는 SELL
+            bar_loader: (symbol, tf, start, end) → OHLC DataFrame (기본: 라벨러 바 캐시)
+            symbols: 심볼 목록 (None이면 전체)
+
+        Returns:
+            SignalSimulator
+        """
+        query = (
+            select(Signal.symbol, Signal.tf, func.min(Signal.ts_sec), func.max(Signal.ts_sec))
+            .where(Signal.ts_sec.isnot(None))
+            .group_by(Signal.symbol, Signal.tf)
+        )
+        if symbols:
+            query = query.where(Signal.symbol.in_(symbols))
+
+        bar_loader = bar_loader or default_bar_loader()
+        bars_by_key, eval_start = {}, {}
+        for symbol, tf, start_ts, end_ts in db.execute(query).all():
+            interval_seconds = INTERVAL_SECONDS.get(TF_INTERVALS.get(tf, '1d'), 86400)
+            start = datetime.fromtimestamp(int(start_ts) - WARMUP_BARS * interval_seconds, tz=timezone.utc)
+            end = datetime.fromtimestamp(int(end_ts), tz=timezone.utc) + timedelta(seconds=max(FORWARD_WINDOWS) * interval_seconds)
+
+            bars = bar_loader(symbol, tf, start, end)
+            if bars is None or bars.empty:
+                print(f"⚠️  No bars for {symbol} {tf}, skipped in simulation")
+                continue
+            bars_by_key[(symbol, tf)] = bars
+            eval_start[(symbol, tf)] = int(start_ts)
+
+        simulator = cls(bars_by_key, signal_type, eval_start)
+        print(f"✓ Loaded bars for simulation: {len(simulator.keys)} series, {len(simulator.rows)} bars")
+        return simulator
+
+    def _indicators(self, params: Mapping[str, Any]) -> List[Dict[str, np.ndarray]]:
+        """기간 파라미터별 인디케이터 (캐시)"""
+        lengths = tuple(int(params[key]) for key in INDICATOR_LENGTH_KEYS)
+        if lengths not in self._indicator_cache:
+            self._indicator_cache[lengths] = [compute_indicators(bars, dict(params)) for bars in self.bars]
+        return self._indicator_cache[lengths]
+
+    def signal_mask(self, params: Mapping[str, Any]) -> np.ndarray:
+        """
+        파라미터 조합의 신호 발생 봉 마스크 (self.rows 기준, 시간 순)
+
+        Args:
+            params: 프리셋/튜너 파라미터 (resolve_params 참고)
+
+        Returns:
+            bool 배열
+        """
+        p = resolve_params(params)
+        flags = np.zeros(self.offsets[-1], dtype=bool)
+        for i, ind in enumerate(self._indicators(p)):
+            score = trend_score(ind, p['alpha'], p['beta'], p['gamma'], p['delta'])
+            buy, sell = apply_cooldown(*signal_conditions(ind, score, p), int(p['cooldown_bars']))
+            flags[self.offsets[i]:self.offsets[i + 1]] = buy if self.signal_type == 'BUY' else sell
+        return flags[self.rows]
+
+    def signal_masks(self, params_list: Union[pd.DataFrame, List[Mapping[str, Any]]]) -> np.ndarray:
+        """
+        파라미터 조합 P개의 신호 마스크를 그리드 엔진으로 한 번에 계산
+
+        기간 파라미터가 같은 조합끼리 묶어 인디케이터를 공유합니다.
+
+        Args:
+            params_list: P행 DataFrame 또는 파라미터 딕셔너리 목록
+
+        Returns:
+            [P, len(self.rows)] bool 배열 (시간 순)
+        """
+        frame = params_list if isinstance(params_list, pd.DataFrame) else pd.DataFrame(list(params_list))
+        frame = frame.rename(columns=PARAM_ALIASES).reset_index(drop=True)
+        lengths = pd.DataFrame({
+            key: frame[key].astype(int) if key in frame else resolve_params()[key]
+            for key in INDICATOR_LENGTH_KEYS
+        }, index=frame.index)
+
+        flags = np.zeros((len(frame), self.offsets[-1]), dtype=bool)
+        for group_lengths, group in lengths.groupby(list(INDICATOR_LENGTH_KEYS), sort=False):
+            rows = group.index.to_numpy()
+            grid = params_matrix(frame.iloc[rows])
+            indicators = self._indicators(dict(zip(INDICATOR_LENGTH_KEYS, group_lengths)))
+            for i, ind in enumerate(indicators):
+                buy, sell = grid_signal_masks(ind, grid)
+                flags[rows, self.offsets[i]:self.offsets[i + 1]] = buy if self.signal_type == 'BUY' else sell
+        return flags[:, self.rows]
+
+    def segment(self, start: int = 0, end: Optional[int] = None) -> 'SimulatedSignalIndex':
+        """self.rows[start:end] 구간 뷰 (ThresholdFilterIndex와 같은 인터페이스)"""
+        return SimulatedSignalIndex(self, slice(start, end))
+
+    def split_walk_forward(self, train_ratio: float = 0.7) -> Tuple['SimulatedSignalIndex', 'SimulatedSignalIndex']:
+        """
+        시간 기준 Train/Test 구간 분할
+
+        Args:
+            train_ratio: 학습 구간 비율 (봉 수 기준)
+
+        Returns:
+            (train, test)
+        """
+        split = int(len(self.rows) * train_ratio)
+        return self.segment(0, split), self.segment(split, None)
+
+
+class SimulatedSignalIndex:
+    """SignalSimulator 구간 뷰 (returns / mask / select)"""
+
+    def __init__(self, simulator: SignalSimulator, window: slice):
+        """
+        Args:
+            simulator: SignalSimulator
+            window: self.rows 기준 구간
+        """
+        self.simulator = simulator
+        self.window = window
+        self.returns = simulator.returns[window]
+
+    def mask(self, params: Mapping[str, Any]) -> np.ndarray:
+        """파라미터 조합으로 재생성한 신호 봉 마스크"""
+        return self.simulator.signal_mask(params)[self.window]
+
+    def masks(self, params_list: Union[pd.DataFrame, List[Mapping[str, Any]]]) -> np.ndarray:
+        """파라미터 조합 P개의 [P, 구간 봉 수] 마스크 (그리드 엔진)"""
+        return self.simulator.signal_masks(params_list)[:, self.window]
+
+    def select(self, params: Mapping[str, Any]) -> np.ndarray:
+        """신호 봉 위치 (self.returns 기준, 시간 순서 유지)"""
+        return np.flatnonzero(self.mask(params))
+
+
+def evaluate_grid(
+    bars: pd.DataFrame,
+    params: Union[pd.DataFrame, List[Mapping[str, Any]]],
+    signal_type: str = 'BUY',
+    lengths: Optional[Mapping[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    한 심볼의 바에서 파라미터 조합 P개를 한 번에 평가
+
+    Args:
+        bars: OHLCV 바 (시간 오름차순)
+        params: P행 DataFrame 또는 파라미터 딕셔너리 목록
+        signal_type: BUY 또는 SELL
+        lengths: 공통 기간 파라미터 (EMA/RSI/VCP 길이, 기본 v5)
+
+    Returns:
+        조합별 지표 DataFrame (pf, mdd, win_rate, ..., total_trades)
+    """
+    indicators = compute_indicators(bars, lengths)
+    buy, sell = grid_signal_masks(indicators, params)
+    masks = buy if signal_type == 'BUY' else sell
+    batch = PerformanceMetrics.batch_metrics(forward_returns(indicators['close']), masks, signal_type)
+    return pd.DataFrame(batch)
@@ -4,8 +4,9 @@ Optuna 기반 Bayesian Optimization
 """
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 import optuna
 from optuna.trial import Trial
 import pandas as pd
@@ -14,7 +15,167 @@ from sqlalchemy.orm import Session
 
 from learner.data import DataLoader
 from learner.metrics import PerformanceMetrics, BacktestEngine
+from learner.simulate import SignalSimulator
 from server.db import Experiment
+from server.stats import record_experiments
+
+
+# Optuna 스토리지 (미지정 시 인메모리, 다중 워커면 저널 파일)
+DEFAULT_STORAGE = os.getenv("OPTUNA_STORAGE") or None
+DEFAULT_JOURNAL_PATH = "./data/optuna_journal.log"
+
+
+def create_storage(url: str) -> optuna.storages.BaseStorage:
+    """
+    스토리지 URL → Optuna 스토리지
+    
+    Args:
+        url: "sqlite:///optuna.db" 등 RDB URL 또는 "journal:<파일 경로>"
+    
+    Returns:
+        Optuna 스토리지 (중단된 RUNNING trial은 heartbeat 만료 시 FAIL 처리 후 재시도)
+    """
+    if url.startswith("journal:"):
+        path = url[len("journal:"):]
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        journal = getattr(optuna.storages, "journal", None)
+        if journal is not None and hasattr(journal, "JournalFileBackend"):
+            backend = journal.JournalFileBackend(path)
+        else:
+            # optuna 3.x (JournalFileBackend는 4.0부터)
+            backend = optuna.storages.JournalFileStorage(path)
+        return optuna.storages.JournalStorage(backend)
+    
+    return optuna.storages.RDBStorage(
+        url,
+        heartbeat_interval=60,
+        grace_period=180,
+        failed_trial_callback=optuna.storages.RetryFailedTrialCallback(max_retry=1)
+    )
+
+
+def _optimize_worker(
+    storage_url: str,
+    study_name: str,
+    signal_type: str,
+    n_trials: int,
+    timeout: int,
+    seed: int,
+    resimulate: bool = False
+) -> int:
+    """
+    워커 프로세스 본문: 공유 스터디에 trial 추가
+    
+    Args:
+        storage_url: 스토리지 URL
+        study_name: 스터디 이름
+        signal_type: BUY/SELL
+        n_trials: 이 워커가 실행할 trial 수
+        timeout: 최대 실행 시간 (초)
+        seed: 샘플러 시드 (워커마다 다르게)
+        resimulate: 바에서 신호 재생성 모드
+    
+    Returns:
+        실행한 trial 수
+    """
+    from server.db import SessionLocal
+    
+    db = SessionLocal()
+    try:
+        tuner = ParameterTuner(db, n_trials=n_trials, timeout=timeout, signal_type=signal_type, resimulate=resimulate)
+        study = optuna.load_study(
+            study_name=study_name,
+            storage=create_storage(storage_url),
+            sampler=optuna.samplers.TPESampler(seed=seed)
+        )
+        completed = []
+        study.optimize(
+            tuner.objective, n_trials=n_trials, timeout=timeout,
+            callbacks=[lambda _study, trial: completed.append(trial.number)]
+        )
+        return len(completed)
+    finally:
+        db.close()
+
+
+# 신호 타입별 임계값 필터 (컬럼, 비교, 파라미터)
+FILTER_RULES = {
+    'BUY': [
+        ('rsi', '>', 'rsi_buy_th'),
+        ('vol_mult', '>', 'vol_mult_buy'),
+        ('vcp_ratio', '<', 'vcp_ratio_th'),
+        ('dist_ath', '<', 'dist_ath_max'),
+    ],
+    'SELL': [
+        ('rsi', '<', 'rsi_sell_th'),
+        ('vol_mult', '>', 'vol_mult_sell'),
+        ('vcp_ratio', '<', 'vcp_ratio_th'),
+        ('dist_ath', '<', 'dist_ath_max'),
+    ],
+}
+
+RETURN_COLUMNS = ['fwd_ret_3', 'fwd_ret_5', 'fwd_ret_10', 'fwd_ret_20']
+
+
+class ThresholdFilterIndex:
+    """
+    FILTER_RULES 임계값 필터용 사전 정렬 인덱스
+    
+    컬럼마다 정렬 순서와 각 행의 순위(rank)를 한 번만 계산해 두고,
+    trial마다 임계값을 searchsorted로 순위 cutoff로 바꾼 뒤
+    정수 비교 마스크를 AND 하여 통과 행을 구합니다 (DataFrame 생성 없음).
+    """
+    
+    def __init__(self, df: pd.DataFrame, signal_type: str):
+        """
+        Args:
+            df: 신호 + 라벨 DataFrame (행 순서 = 시간 순서)
+            signal_type: BUY 또는 SELL
+        """
+        self.rules = FILTER_RULES[signal_type]
+        self.rows = np.flatnonzero((df['signal'] == signal_type).to_numpy())
+        self.returns = df[RETURN_COLUMNS].to_numpy(dtype=np.float64)[self.rows]
+        
+        # NaN은 pandas 비교처럼 어떤 필터도 통과하지 못함
+        self.valid = np.ones(len(self.rows), dtype=bool)
+        self.sorted_values = {}
+        self.ranks = {}
+        for column, _, _ in self.rules:
+            values = df[column].to_numpy()[self.rows]
+            order = np.argsort(values, kind='stable')
+            rank = np.empty(len(values), dtype=np.int32 if len(values) < 2**31 else np.int64)
+            rank[order] = np.arange(len(values))
+            self.sorted_values[column] = values[order]
+            self.ranks[column] = rank
+            self.valid &= ~np.isnan(values)
+    
+    def mask(self, params: Dict[str, Any]) -> np.ndarray:
+        """
+        파라미터 조합을 통과하는 행 마스크 (self.rows 기준)
+        
+        Args:
+            params: 임계값 파라미터 (FILTER_RULES 참고)
+        
+        Returns:
+            bool 배열
+        """
+        mask = self.valid.copy()
+        for column, op, param in self.rules:
+            values = self.sorted_values[column]
+            threshold = np.asarray(params[param], dtype=values.dtype)  # 컬럼 dtype 기준 비교 (pandas와 동일)
+            if op == '>':
+                mask &= self.ranks[column] >= np.searchsorted(values, threshold, side='right')
+            else:
+                mask &= self.ranks[column] < np.searchsorted(values, threshold, side='left')
+        return mask
+    
+    def masks(self, params_list: List[Dict[str, Any]]) -> np.ndarray:
+        """파라미터 조합 K개의 [K, 행 수] 마스크"""
+        return np.stack([self.mask(params) for params in params_list])
+    
+    def select(self, params: Dict[str, Any]) -> np.ndarray:
+        """통과 행 위치 (self.rows / self.returns 기준, 시간 순서 유지)"""
+        return np.flatnonzero(self.mask(params))
 
 
 class ParameterTuner:
@@ -25,28 +186,53 @@ class ParameterTuner:
         db: Session,
         n_trials: int = 100,
         timeout: int = 3600,
-        signal_type: str = 'BUY'
+        signal_type: str = 'BUY',
+        storage: Optional[str] = DEFAULT_STORAGE,
+        study_name: Optional[str] = None,
+        n_jobs: int = 1,
+        resimulate: bool = False
     ):
         """
         Args:
             db: DB 세션
-            n_trials: 최적화 시도 횟수
+            n_trials: 최적화 시도 횟수 (이번 실행분, 저장된 스터디에 누적)
             timeout: 최대 실행 시간 (초)
             signal_type: 최적화할 신호 타입 (BUY/SELL)
+            storage: Optuna 스토리지 URL (sqlite:///..., journal:<경로>). None이면 인메모리
+            study_name: 스터디 이름 (기본: vmsi_sdm_<signal_type>). 같은 이름이면 이어서 실행
+            n_jobs: 워커 프로세스 수 (2 이상이면 스토리지 필요, 미지정 시 저널 파일 사용)
+            resimulate: True면 캐시된 바에서 trial 파라미터로 v5 신호를 재생성해 평가
+                        (False면 기존 신호를 임계값으로 필터링하는 근사)
         """
         self.db = db
         self.n_trials = n_trials
         self.timeout = timeout
         self.signal_type = signal_type
+        self.n_jobs = max(1, n_jobs)
+        self.storage = storage
+        if self.storage is None and self.n_jobs > 1:
+            self.storage = f"journal:{DEFAULT_JOURNAL_PATH}"
+        self.study_name = study_name or f"vmsi_sdm_{signal_type.lower()}"
+        self.resimulate = resimulate
+        
+        if resimulate:
+            # 바 로드 + 기본 인디케이터 1회 계산 → trial마다 신호만 재생성
+            simulator = SignalSimulator.from_db(db, signal_type)
+            if len(simulator.rows) == 0:
+                raise ValueError("No cached bars available for signal re-simulation.")
+            self.train_index, self.test_index = simulator.split_walk_forward(train_ratio=0.7)
+            print(f"✓ Simulation bars: Train={len(self.train_index.returns)}, Test={len(self.test_index.returns)}")
+            return
         
-        # 데이터 로드
-        loader = DataLoader(db)
+        # 데이터 로드 (스냅샷 경유: DB 변경분만 조회)
+        loader = DataLoader(db, use_snapshot=True)
         df = loader.load_signals_with_labels()
         
         if len(df) == 0:
             raise ValueError("No labeled signals available. Run labeler first.")
         
         self.train_df, self.test_df = loader.split_walk_forward(df, train_ratio=0.7)
+        self.train_index = ThresholdFilterIndex(self.train_df, signal_type)
         print(f"✓ Loaded data: Train={len(self.train_df)}, Test={len(self.test_df)}")
     
     def objective(self, trial: Trial) -> float:
@@ -81,34 +267,50 @@ class ParameterTuner:
             'hygief_w': trial.suggest_float('hygief_w', 0.0, 0.6),
         }
         
-        # 파라미터 적용한 시뮬레이션 (간단화)
-        # 실제로는 이 파라미터로 신호를 재생성해야 하지만,
-        # 여기서는 기존 신호 중 필터링으로 근사
-        filtered_df = self._apply_filters(self.train_df, params)
+        # 파라미터 적용한 시뮬레이션
+        # resimulate 모드: 바에서 이 파라미터로 신호를 재생성
+        # 기본 모드: 기존 신호 중 필터링으로 근사
+        selected = self.train_index.select(params)
         
-        if len(filtered_df) < 10:
+        if len(selected) < 10:
             # 신호가 너무 적으면 패널티
             return 0.0
         
-        # 성능 지표 계산
-        metrics = PerformanceMetrics.calculate_all_metrics(filtered_df, self.signal_type)
-        
-        # 목표: Profit Factor 최대화, MDD 최소화, PSU 정확도 최대화
-        pf = metrics['pf']
-        mdd = metrics['mdd']
-        psu_10 = metrics['psu_10']
-        win_rate = metrics['win_rate']
-        
-        # 복합 목표 함수
-        # PF > 1.5, MDD < 0.2, PSU > 0.6 목표
-        score = (
-            pf * 0.4 +
-            (1 - mdd) * 0.2 +
-            psu_10 * 0.3 +
-            win_rate * 0.1
+        # 성능 지표 계산 (통과 행만 모아 K=1로 계산)
+        metrics = PerformanceMetrics.metrics_from_returns(self.train_index.returns[selected], self.signal_type)
+        return float(self._composite_score(metrics))
+    
+    @staticmethod
+    def _composite_score(metrics: Dict[str, Any]):
+        """
+        복합 목표 함수 (스칼라 지표 또는 batch_metrics 배열 모두 지원)
+        
+        목표: Profit Factor 최대화, MDD 최소화, PSU 정확도 최대화
+        PF > 1.5, MDD < 0.2, PSU > 0.6 목표
+        """
+        return (
+            metrics['pf'] * 0.4 +
+            (1 - metrics['mdd']) * 0.2 +
+            metrics['psu_10'] * 0.3 +
+            metrics['win_rate'] * 0.1
         )
+    
+    def score_batch(self, params_list: List[Dict[str, Any]]) -> np.ndarray:
+        """
+        여러 파라미터 조합을 학습 세트에서 한 번에 평가
         
-        return score
+        Args:
+            params_list: 파라미터 딕셔너리 목록 (K개)
+        
+        Returns:
+            길이 K 복합 점수 배열 (통과 신호 10개 미만이면 0)
+        """
+        masks = self.train_index.masks(params_list)
+        metrics = PerformanceMetrics.batch_metrics(self.train_index.returns, masks, self.signal_type)
+        score = self._composite_score(metrics)
+        
+        # 신호가 너무 적으면 패널티
+        return np.where(metrics['total_trades'] < 10, 0.0, score)
     
     def _apply_filters(self, df: pd.DataFrame, params: Dict[str, Any]) -> pd.DataFrame:
         """
@@ -121,27 +323,30 @@ class ParameterTuner:
         Returns:
             필터링된 DataFrame
         """
-        filtered = df[df['signal'] == self.signal_type].copy()
-        
-        # RSI 필터
-        if self.signal_type == 'BUY':
-            filtered = filtered[filtered['rsi'] > params['rsi_buy_th']]
-        else:
-            filtered = filtered[filtered['rsi'] < params['rsi_sell_th']]
-        
-        # Volume 필터
-        if self.signal_type == 'BUY':
-            filtered = filtered[filtered['vol_mult'] > params['vol_mult_buy']]
-        else:
-            filtered = filtered[filtered['vol_mult'] > params['vol_mult_sell']]
+        mask = (df['signal'] == self.signal_type).to_numpy().copy()
+        for column, op, param in FILTER_RULES[self.signal_type]:
+            values = df[column].to_numpy()
+            mask &= values > params[param] if op == '>' else values < params[param]
         
-        # VCP 필터
-        filtered = filtered[filtered['vcp_ratio'] < params['vcp_ratio_th']]
+        filtered = df[mask]
+        return filtered
+    
+    def _optimize_parallel(self):
+        """n_jobs개 프로세스가 같은 스터디에 trial을 나눠 실행"""
+        per_worker = [self.n_trials // self.n_jobs + (1 if i < self.n_trials % self.n_jobs else 0)
+                      for i in range(self.n_jobs)]
         
-        # ATH 거리 필터
-        filtered = filtered[filtered['dist_ath'] < params['dist_ath_max']]
+        with ProcessPoolExecutor(max_workers=self.n_jobs) as executor:
+            futures = [
+                executor.submit(
+                    _optimize_worker, self.storage, self.study_name, self.signal_type,
+                    n_trials, self.timeout, 42 + i, self.resimulate
+                )
+                for i, n_trials in enumerate(per_worker) if n_trials > 0
+            ]
+            completed = sum(future.result() for future in futures)
         
-        return filtered
+        print(f"   Workers finished: {completed} trials")
     
     def optimize(self) -> Dict[str, Any]:
         """
@@ -151,19 +356,33 @@ class ParameterTuner:
             최적 파라미터 및 성능 지표
         """
         print(f"\n🔄 Starting optimization for {self.signal_type} signals...")
-        print(f"   Trials: {self.n_trials}, Timeout: {self.timeout}s")
+        print(f"   Trials: {self.n_trials}, Timeout: {self.timeout}s, Workers: {self.n_jobs}")
         
-        study = optuna.create_study(
-            direction='maximize',
-            sampler=optuna.samplers.TPESampler(seed=42)
-        )
+        if self.storage is None:
+            study = optuna.create_study(
+                direction='maximize',
+                sampler=optuna.samplers.TPESampler(seed=42)
+            )
+        else:
+            study = optuna.create_study(
+                study_name=self.study_name,
+                storage=create_storage(self.storage),
+                direction='maximize',
+                sampler=optuna.samplers.TPESampler(seed=42),
+                load_if_exists=True
+            )
+            print(f"   Study: {self.study_name} @ {self.storage} ({len(study.trials)} previous trials)")
         
-        study.optimize(
-            self.objective,
-            n_trials=self.n_trials,
-            timeout=self.timeout,
-            show_progress_bar=True
-        )
+        if self.n_jobs == 1:
+            study.optimize(
+                self.objective,
+                n_trials=self.n_trials,
+                timeout=self.timeout,
+                show_progress_bar=True
+            )
+        else:
+            self._optimize_parallel()
+            study = optuna.load_study(study_name=self.study_name, storage=create_storage(self.storage))
         
         best_params = study.best_params
         best_value = study.best_value
@@ -173,8 +392,12 @@ class ParameterTuner:
         print(f"   Best params: {best_params}")
         
         # 테스트 세트에서 검증
-        test_filtered = self._apply_filters(self.test_df, best_params)
-        test_metrics = PerformanceMetrics.calculate_all_metrics(test_filtered, self.signal_type)
+        if self.resimulate:
+            selected = self.test_index.select(best_params)
+            test_metrics = PerformanceMetrics.metrics_from_returns(self.test_index.returns[selected], self.signal_type)
+        else:
+            test_filtered = self._apply_filters(self.test_df, best_params)
+            test_metrics = PerformanceMetrics.calculate_all_metrics(test_filtered, self.signal_type)
         
         print(f"\n📊 Test Set Performance:")
         print(f"   - Profit Factor: {test_metrics['pf']:.2f}")
@@ -190,6 +413,7 @@ class ParameterTuner:
             metrics=test_metrics
         )
         self.db.add(experiment)
+        record_experiments(self.db)
         self.db.commit()
         
         return {
@@ -204,7 +428,11 @@ def run_optimization(
     db: Session,
     signal_type: str = 'BUY',
     n_trials: int = 100,
-    timeout: int = 3600
+    timeout: int = 3600,
+    storage: Optional[str] = DEFAULT_STORAGE,
+    study_name: Optional[str] = None,
+    n_jobs: int = 1,
+    resimulate: bool = False
 ) -> Dict[str, Any]:
     """
     최적화 실행 (편의 함수)
@@ -214,11 +442,18 @@ def run_optimization(
         signal_type: BUY 또는 SELL
         n_trials: 시도 횟수
         timeout: 타임아웃 (초)
+        storage: Optuna 스토리지 URL (None이면 인메모리)
+        study_name: 스터디 이름
+        n_jobs: 워커 프로세스 수
+        resimulate: 바에서 신호 재생성 모드
     
     Returns:
         최적화 결과
     """
-    tuner = ParameterTuner(db, n_trials=n_trials, timeout=timeout, signal_type=signal_type)
+    tuner = ParameterTuner(
+        db, n_trials=n_trials, timeout=timeout, signal_type=signal_type,
+        storage=storage, study_name=study_name, n_jobs=n_jobs, resimulate=resimulate
+    )
     result = tuner.optimize()
     
     return result
@@ -239,6 +474,15 @@ if __name__ == "__main__":
                         help='Timeout in seconds (default: 3600)')
     parser.add_argument('--save-preset', action='store_true',
                         help='Save best parameters to preset_B_candidate.json')
+    parser.add_argument('--storage', type=str, default=DEFAULT_STORAGE,
+                        help='Optuna storage URL, e.g. sqlite:///optuna.db or journal:./data/optuna_journal.log '
+                             '(default: OPTUNA_STORAGE, in-memory if unset)')
+    parser.add_argument('--study-name', type=str, default=None,
+                        help='Study name to create or resume (default: vmsi_sdm_<signal-type>)')
+    parser.add_argument('--jobs', type=int, default=int(os.getenv('OPTUNA_JOBS', '1')),
+                        help='Number of worker processes (default: OPTUNA_JOBS or 1)')
+    parser.add_argument('--resimulate', action='store_true',
+                        help='Regenerate v5 signals from cached bars for each trial instead of filtering stored signals')
     
     args = parser.parse_args()
     
@@ -246,6 +490,7 @@ if __name__ == "__main__":
     print(f"[INFO] Signal Type: {args.signal_type}")
     print(f"[INFO] Trials: {args.trials}")
     print(f"[INFO] Timeout: {args.timeout}s")
+    print(f"[INFO] Workers: {args.jobs}, Storage: {args.storage or 'in-memory'}")
     
     # DB 초기화 (클라우드 환경에서는 이미 초기화되어 있을 수 있음)
     try:
@@ -261,7 +506,11 @@ if __name__ == "__main__":
             db, 
             signal_type=args.signal_type, 
             n_trials=args.trials, 
-            timeout=args.timeout
+            timeout=args.timeout,
+            storage=args.storage,
+            study_name=args.study_name,
+            n_jobs=args.jobs,
+            resimulate=args.resimulate
         )
         
         print("\n[OK] Optimization result saved to database")
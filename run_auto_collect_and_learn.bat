@@ -16,7 +16,7 @@ echo [1/3] Checking FastAPI server...
 tasklist /FI "WINDOWTITLE eq FastAPI*" 2>NUL | find /I /N "cmd.exe">NUL
 if "%ERRORLEVEL%"=="1" (
     echo [INFO] Starting FastAPI server...
-    start "FastAPI" cmd /k "python -m uvicorn server.app:app --host 0.0.0.0 --port 8000"
+    start "FastAPI" cmd /k "python -m uvicorn server.app:app --host 0.0.0.0 --port 8000 --timeout-graceful-shutdown 5"
     timeout /t 5 /nobreak > nul
 ) else (
     echo [OK] FastAPI already running
@@ -30,7 +30,7 @@ python tools/auto_collect_data.py --symbols SPX NASDAQ QQQ --period 3y --interva
 REM 3. Run learning
 echo.
 echo [3/3] Running Optuna learning...
-python learner/tune.py --signal-type BUY --trials 30 --timeout 1800
+python learner/tune.py --signal-type BUY --trials 30 --timeout 1800 --jobs 4 --storage journal:./data/optuna_journal.log
 
 echo.
 echo ========================================
@@ -4,16 +4,34 @@ TradingView 알럿을 수신하고 DB에 저장하는 메인 서버
 """
 
 import os
-from typing import List
-from fastapi import FastAPI, Depends, HTTPException, BackgroundTasks
+import json
+import codecs
+from typing import List, Optional
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from datetime import datetime
 import uvicorn
 
-from server.db import get_db, init_db, Signal, Label, Experiment
-from server.schemas import TradingViewAlert, SignalResponse, LabelResult
+from server.db import get_db, init_db, SessionLocal, Signal, Label, Experiment
+from server.schemas import (
+    TradingViewAlert, SignalResponse, LabelResult,
+    BatchAlertResponse, BatchItemResult, SignalGenerateRequest, SignalGenerateResponse
+)
+from server.ingest import (
+    alert_to_signal_row, validate_alerts, parse_ndjson_lines, bulk_insert_signals,
+    WriteBehindBuffer, IngestQueueFull
+)
+from server.indicators import generate_signals, signal_records
+from server.stats import read_stats, record_signals, seed_stats
+from server.events import EventHub
+from server.signal_query import InvalidQuery, fetch_signal_page, iter_signal_ndjson, parse_fields
 from server.labeler import MarketDataLabeler
+from server.label_worker import (
+    enqueue_label_jobs, enqueue_unlabeled, enqueue_bulk_label_job, create_worker_pool_from_env
+)
 
 # FastAPI 앱 초기화
 app = FastAPI(
@@ -31,25 +49,74 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# 라벨러 인스턴스
-labeler = MarketDataLabeler()
+# 신호 / 라벨 완료 이벤트 허브 (/signals/stream)
+signal_hub = EventHub()
+
+# 라벨링 워커 풀 (LABEL_WORKERS, LABEL_PROVIDER_LIMITS)
+label_pool = create_worker_pool_from_env(on_labeled=signal_hub.publish_labels)
+
+# 쓰기 버퍼 설정 (INGEST_WRITE_BEHIND=false 면 요청 내 동기 커밋)
+WRITE_BEHIND_ENABLED = os.getenv("INGEST_WRITE_BEHIND", "true").lower() in ("1", "true", "yes")
+
+# /signals JSON 응답 최대 페이지 크기 (더 많으면 커서 페이지네이션 또는 NDJSON)
+MAX_SIGNAL_PAGE = 10_000
+
+
+def _enqueue_buffer_labels(db, committed):
+    """쓰기 버퍼 그룹 커밋과 같은 트랜잭션에서 BUY/SELL 라벨링 작업 등록"""
+    enqueue_label_jobs(db, [
+        signal_id for _, signal_id, row in committed if row["signal"] in ["BUY", "SELL"]
+    ])
+
+
+def _on_buffer_commit(committed):
+    """쓰기 버퍼 그룹 커밋 후 라벨 워커 깨우기 + 신호 이벤트 발행"""
+    label_pool.notify()
+    signal_hub.publish_signals((signal_id, row) for _, signal_id, row in committed)
+
+
+ingest_buffer = WriteBehindBuffer(
+    max_queue=int(os.getenv("INGEST_QUEUE_SIZE", "10000")),
+    batch_size=int(os.getenv("INGEST_BATCH_SIZE", "500")),
+    flush_interval_ms=int(os.getenv("INGEST_FLUSH_MS", "50")),
+    max_retries=int(os.getenv("INGEST_MAX_RETRIES", "3")),
+    on_insert=_enqueue_buffer_labels,
+    on_commit=_on_buffer_commit
+)
 
 
 # ─────────────── Startup Event ───────────────
 
 @app.on_event("startup")
 def startup_event():
-    """서버 시작 시 DB 초기화"""
+    """서버 시작 시 DB 초기화 (stats 카운터가 비어 있으면 시드)"""
     init_db()
+    db = SessionLocal()
+    try:
+        seed_stats(db)
+    finally:
+        db.close()
+    label_pool.start()
+    if WRITE_BEHIND_ENABLED:
+        ingest_buffer.start()
     print("[VMSI-SDM] Server Started")
 
 
+@app.on_event("shutdown")
+def shutdown_event():
+    """서버 종료 시 쓰기 버퍼 드레인 (미커밋 신호 유실 방지)"""
+    signal_hub.close()
+    if WRITE_BEHIND_ENABLED:
+        ingest_buffer.stop(drain=True)
+    label_pool.stop()
+    print("[VMSI-SDM] Server Stopped")
+
+
 # ─────────────── Webhook Endpoints ───────────────
 
 @app.post("/alert", response_model=SignalResponse)
 async def receive_alert(
     alert: TradingViewAlert,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ):
     """
@@ -58,39 +125,38 @@ async def receive_alert(
     - **symbol**: 심볼 (SPX, AAPL 등)
     - **action**: BUY, SELL
     - **trend_score**, **prob**, **rsi** 등: 단순화된 flat 구조
+    
+    쓰기 버퍼 사용 시 검증 후 즉시 `queued` 응답 (provisional_id 반환),
+    버퍼가 가득 차면 429를 반환합니다.
     """
-    try:
-        # 신호 저장 (v2.1 simplified structure)
-        features_json = {
-            "trend_score": alert.trend_score,
-            "prob": alert.prob,
-            "rsi": alert.rsi,
-            "vol_mult": alert.vol_mult,
-            "vcp_ratio": alert.vcp_ratio,
-            "dist_ath": alert.dist_ath,
-            "ema1": alert.ema1,
-            "ema2": alert.ema2,
-            "bar_state": alert.bar_state,
-            "fast_mode": alert.fast_mode,
-            "realtime_macro": alert.realtime_macro,
-            "version": alert.version
-        }
+    row = alert_to_signal_row(alert)
+    
+    if WRITE_BEHIND_ENABLED:
+        try:
+            provisional_id = ingest_buffer.submit(row)
+        except IngestQueueFull as e:
+            raise HTTPException(status_code=429, detail=str(e), headers={"Retry-After": "1"})
         
-        signal = Signal(
-            ts=str(alert.ts_unix),
-            symbol=alert.symbol,
-            tf=alert.timeframe,
-            signal=alert.action,
-            features_json=features_json,
-            params_json={}  # Params는 features에 포함
+        return SignalResponse(
+            status="queued",
+            provisional_id=provisional_id,
+            message="Signal queued"
         )
+    
+    try:
+        # 신호 저장 (v2.1 simplified structure)
+        signal = Signal(**row, created_at=datetime.utcnow())
         db.add(signal)
-        db.commit()
-        db.refresh(signal)
+        db.flush()
+        record_signals(db, [{**row, "created_at": signal.created_at}])
         
-        # 백그라운드에서 라벨링 수행 (비동기)
+        # 라벨링 작업 등록 (신호와 같은 트랜잭션, 워커 풀이 처리)
         if alert.action in ["BUY", "SELL"]:
-            background_tasks.add_task(labeler.label_signal, db, signal)
+            enqueue_label_jobs(db, [signal.id])
+        
+        db.commit()
+        label_pool.notify()
+        signal_hub.publish_signals([(signal.id, {**row, "created_at": signal.created_at})])
         
         return SignalResponse(
             status="success",
@@ -102,6 +168,145 @@ async def receive_alert(
         raise HTTPException(status_code=500, detail=f"Error processing alert: {str(e)}")
 
 
+@app.get("/ingest/stats")
+def get_ingest_stats():
+    """쓰기 버퍼 상태 조회 (대기 행 수, 커밋 수 등)"""
+    return {"write_behind": WRITE_BEHIND_ENABLED, **ingest_buffer.stats()}
+
+
+@app.post("/alerts/batch", response_model=BatchAlertResponse)
+async def receive_alerts_batch(
+    request: Request,
+    db: Session = Depends(get_db)
+):
+    """
+    TradingView 알럿 배치 수신 (백필용)
+    
+    - Body: `TradingViewAlert` JSON 배열 또는 NDJSON 스트림
+      (`Content-Type: application/x-ndjson`)
+    - 전체 검증 후 유효 항목을 단일 트랜잭션 벌크 INSERT로 저장
+    - BUY/SELL 신호는 라벨링 대기열에 등록
+    - 항목별 signal_id 또는 에러 반환
+    
+    본문 수신만 이벤트 루프에서 하고 파싱/검증/저장은 스레드풀에서 실행
+    (대용량 백필 배치가 `/alert`, `/signals/stream`을 막지 않음)
+    """
+    content_type = request.headers.get("content-type", "")
+    
+    if "ndjson" in content_type or "jsonlines" in content_type:
+        # 청크 경계를 넘는 라인 / 멀티바이트 문자를 이어 붙이며 스트림 파싱
+        lines = []
+        buffer = ""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        try:
+            async for chunk in request.stream():
+                buffer += decoder.decode(chunk)
+                *complete, buffer = buffer.split("\n")
+                lines.extend(complete)
+            buffer += decoder.decode(b"", final=True)
+        except UnicodeDecodeError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid UTF-8 body: {str(e)}")
+        lines.append(buffer)
+        items = await run_in_threadpool(parse_ndjson_lines, lines)
+    else:
+        body = await request.body()
+        try:
+            items = await run_in_threadpool(json.loads, body)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid JSON body: {str(e)}")
+        if not isinstance(items, list):
+            raise HTTPException(status_code=400, detail="Body must be a JSON array of alerts")
+    
+    return await run_in_threadpool(_store_alert_batch, db, items)
+
+
+def _store_alert_batch(db: Session, items: list) -> BatchAlertResponse:
+    """
+    /alerts/batch 본문 검증 + 벌크 저장 + 라벨링 작업 등록 (스레드풀에서 실행)
+    
+    Args:
+        db: DB 세션
+        items: 파싱된 알럿 페이로드 목록
+    
+    Returns:
+        배치 응답
+    """
+    valid, errors = validate_alerts(items)
+    
+    rows = [alert_to_signal_row(alert) for _, alert in valid]
+    try:
+        signal_ids = bulk_insert_signals(db, rows)
+        enqueue_label_jobs(db, [
+            signal_id for (_, alert), signal_id in zip(valid, signal_ids)
+            if alert.action in ["BUY", "SELL"]
+        ])
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error processing batch: {str(e)}")
+    signal_hub.publish_signals(zip(signal_ids, rows))
+    
+    results = [
+        BatchItemResult(index=i, status="success", signal_id=signal_id)
+        for (i, _), signal_id in zip(valid, signal_ids)
+    ]
+    results.extend(BatchItemResult(index=i, status="error", error=error) for i, error in errors)
+    results.sort(key=lambda r: r.index)
+    
+    label_pool.notify()
+    
+    return BatchAlertResponse(
+        status="success" if not errors else "partial",
+        received=len(items),
+        inserted=len(signal_ids),
+        failed=len(errors),
+        results=results
+    )
+
+
+@app.post("/signals/generate", response_model=SignalGenerateResponse)
+def generate_signals_from_bars(
+    request: SignalGenerateRequest,
+    db: Session = Depends(get_db)
+):
+    """
+    캐시된 OHLC 바로 v5 신호 재생성 (server.indicators 벡터화 엔진)
+    
+    - 바는 라벨러 바 캐시에서 로드 (누락 구간만 제공자에서 다운로드)
+    - **params**: 프리셋/Pine 입력 파라미터 (생략 시 v5 기본값)
+    - **ingest**: true면 `/alerts/batch`와 같은 경로로 벌크 저장 + 라벨링 대기열 등록
+    """
+    labeler = MarketDataLabeler()
+    start = datetime.utcfromtimestamp(request.start_ts)
+    end = datetime.utcfromtimestamp(request.end_ts) if request.end_ts else datetime.utcnow()
+    bars = labeler.fetch_ohlc(request.symbol, start, end, labeler._convert_tf_to_yf_interval(request.timeframe))
+    if bars is None or bars.empty:
+        raise HTTPException(status_code=404, detail=f"No bars for {request.symbol} {request.timeframe}")
+    
+    try:
+        signals = generate_signals(bars, request.params)
+    except (TypeError, ValueError) as e:
+        raise HTTPException(status_code=400, detail=f"Invalid params: {str(e)}")
+    records = signal_records(signals, request.symbol, request.timeframe, mode="generated")
+    
+    inserted = 0
+    if request.ingest and records:
+        valid, _ = validate_alerts(records)
+        rows = [alert_to_signal_row(alert) for _, alert in valid]
+        try:
+            signal_ids = bulk_insert_signals(db, rows)
+            enqueue_label_jobs(db, signal_ids)
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            raise HTTPException(status_code=500, detail=f"Error storing signals: {str(e)}")
+        inserted = len(signal_ids)
+        label_pool.notify()
+        signal_hub.publish_signals(zip(signal_ids, rows))
+    
+    return SignalGenerateResponse(bars=len(bars), generated=len(records), inserted=inserted, signals=records)
+
+
 @app.get("/")
 def root():
     """Health check"""
@@ -117,41 +322,94 @@ def root():
 
 @app.get("/signals", response_model=List[dict])
 def get_signals(
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    limit: Optional[int] = Query(None, ge=1),
     signal_type: str = None,
     symbol: str = None,
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    ts_from: Optional[int] = None,
+    ts_to: Optional[int] = None,
+    format: str = "json",
     db: Session = Depends(get_db)
 ):
     """
-    저장된 신호 조회
+    저장된 신호 조회 (최신순, created_at/id 키셋 페이지네이션)
     
-    - **limit**: 조회할 최대 개수
+    - **limit**: 페이지 크기 (JSON 기본 100, 최대 10000 — 초과 시 400 / NDJSON 기본 전체)
     - **signal_type**: 필터 (BUY, SELL, WATCH_UP, WATCH_DOWN)
     - **symbol**: 심볼 필터
+    - **cursor**: 이전 응답의 `X-Next-Cursor` 헤더 값
+    - **fields**: 쉼표 구분 응답 필드 (예: `id,ts,symbol,rsi`, 기본: id,ts,symbol,tf,signal,features,params,created_at)
+    - **ts_from / ts_to**: 신호 시각 범위 (unix 초, 포함)
+    - **format**: `json` (배열) 또는 `ndjson` (스트리밍, `Accept: application/x-ndjson`도 가능)
     """
-    query = db.query(Signal)
+    try:
+        selected = parse_fields(fields)
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    filters = dict(signal_type=signal_type, symbol=symbol, ts_from=ts_from, ts_to=ts_to, cursor=cursor)
+    
+    if format == "ndjson" or "ndjson" in request.headers.get("accept", ""):
+        stream = iter_signal_ndjson(selected, limit=limit, **filters)
+        try:
+            first = next(stream, "")  # 커서 오류를 스트리밍 시작 전에 400으로 반환
+        except InvalidQuery as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return StreamingResponse(
+            (chunk for part in ([first], stream) for chunk in part),
+            media_type="application/x-ndjson"
+        )
     
-    if signal_type:
-        query = query.filter(Signal.signal == signal_type.upper())
+    if limit is not None and limit > MAX_SIGNAL_PAGE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"limit must be <= {MAX_SIGNAL_PAGE} for JSON (use cursor paging or format=ndjson)"
+        )
+    try:
+        rows, next_cursor = fetch_signal_page(db, selected, limit or 100, **filters)
+    except InvalidQuery as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    if symbol:
-        query = query.filter(Signal.symbol == symbol.upper())
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return rows
+
+
+@app.get("/signals/stream")
+async def stream_signals(
+    request: Request,
+    last_event_id: Optional[int] = Query(None, description="마지막으로 받은 이벤트 id (Last-Event-ID 헤더와 동일)")
+):
+    """
+    신규 신호 / 라벨 완료 실시간 스트림 (Server-Sent Events)
     
-    signals = query.order_by(Signal.created_at.desc()).limit(limit).all()
+    - `event: signal` — 커밋된 신호 1건 (`/signals` 기본 필드)
+    - `event: label` — 라벨링이 완료된 `signal_ids` 목록
+    - `event: reset` — 재전송 범위 밖의 id로 재접속 (전체 재조회 필요)
+    - **last_event_id** 또는 `Last-Event-ID` 헤더로 재접속 시 놓친 이벤트부터 재전송
+    """
+    header = request.headers.get("last-event-id")
+    if last_event_id is None and header:
+        try:
+            last_event_id = int(header)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid Last-Event-ID: {header}")
     
-    return [
-        {
-            "id": s.id,
-            "ts": s.ts,
-            "symbol": s.symbol,
-            "tf": s.tf,
-            "signal": s.signal,
-            "features": s.features_json,
-            "params": s.params_json,
-            "created_at": s.created_at.isoformat()
-        }
-        for s in signals
-    ]
+    subscription = signal_hub.subscribe(last_event_id)
+    return StreamingResponse(
+        signal_hub.stream(subscription, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/signals/stream/stats")
+def get_stream_stats():
+    """스트림 허브 상태 조회 (구독자 수, 마지막 이벤트 id, 큐 초과로 끊긴 구독 수 등)"""
+    return signal_hub.stats()
 
 
 @app.get("/signals/{signal_id}/labels", response_model=List[LabelResult])
@@ -179,20 +437,42 @@ def get_signal_labels(signal_id: int, db: Session = Depends(get_db)):
 
 
 @app.post("/labels/generate")
-def generate_labels(limit: int = 100, db: Session = Depends(get_db)):
+def generate_labels(limit: int = 100, bulk: bool = False, db: Session = Depends(get_db)):
     """
-    라벨이 없는 신호들에 대해 라벨 생성
+    라벨이 없는 신호들을 라벨링 작업 큐에 등록 (워커 풀이 비동기 처리)
     
-    - **limit**: 한 번에 처리할 최대 개수
+    - **limit**: 한 번에 등록할 최대 개수
+    - **bulk**: True면 라벨 없는 신호 전체를 (symbol, tf) 단위 벌크 라벨링하는 작업 1건 등록
     """
-    count = labeler.label_all_unlabeled(db, limit)
+    if bulk:
+        job_id = enqueue_bulk_label_job(db)
+        db.commit()
+        label_pool.notify()
+        return {
+            "status": "queued",
+            "job_id": job_id,
+            "message": "Queued bulk labeling job"
+        }
+    
+    count = enqueue_unlabeled(db, limit)
+    label_pool.notify()
     return {
-        "status": "success",
-        "labeled_count": count,
-        "message": f"Labeled {count} signals"
+        "status": "queued",
+        "queued_count": count,
+        "message": f"Queued {count} signals for labeling"
     }
 
 
+@app.get("/labels/queue")
+def get_label_queue(db: Session = Depends(get_db)):
+    """
+    라벨링 큐 상태 조회
+    
+    - 대기/진행/완료/실패 작업 수, 워커 수 및 사용률
+    """
+    return label_pool.stats(db)
+
+
 @app.get("/experiments", response_model=List[dict])
 def get_experiments(limit: int = 20, db: Session = Depends(get_db)):
     """
@@ -215,25 +495,19 @@ def get_experiments(limit: int = 20, db: Session = Depends(get_db)):
 
 
 @app.get("/stats")
-def get_stats(db: Session = Depends(get_db)):
-    """
-    전체 통계 조회
+def get_stats(
+    by: Optional[str] = Query(None, description="symbol / tf / signal / day 별 분해"),
+    db: Session = Depends(get_db)
+):
     """
-    total_signals = db.query(Signal).count()
-    total_labels = db.query(Label).count()
-    total_experiments = db.query(Experiment).count()
-    
-    buy_signals = db.query(Signal).filter(Signal.signal == "BUY").count()
-    sell_signals = db.query(Signal).filter(Signal.signal == "SELL").count()
+    전체 통계 조회 (stats_counters 요약 테이블, 원본 테이블 COUNT 없음)
     
-    return {
-        "total_signals": total_signals,
-        "total_labels": total_labels,
-        "total_experiments": total_experiments,
-        "buy_signals": buy_signals,
-        "sell_signals": sell_signals,
-        "watch_signals": total_signals - buy_signals - sell_signals
-    }
+    - **by**: symbol, tf, signal, day 중 하나면 `breakdown`에 차원별 신호/라벨 건수 포함
+    """
+    try:
+        return read_stats(db, by)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 
 # ─────────────── Main ───────────────
@@ -242,11 +516,13 @@ if __name__ == "__main__":
     host = os.getenv("SERVER_HOST", "0.0.0.0")
     port = int(os.getenv("SERVER_PORT", "8000"))
     
+    # 열린 /signals/stream 연결을 기다리지 않고 종료 이벤트(쓰기 버퍼 드레인)로 진행
     uvicorn.run(
         "server.app:app",
         host=host,
         port=port,
         reload=True,
-        log_level="info"
+        log_level="info",
+        timeout_graceful_shutdown=int(os.getenv("SERVER_GRACEFUL_TIMEOUT", "5"))
     )
 
@@ -0,0 +1,373 @@
+"""
+VMSI-SDM Bar Store
+(symbol, interval) 단위 OHLC 바 로컬 캐시 (SQLite)
+
+- 범위 조회 및 이미 받은 구간(coverage) 추적
+- 누락 구간만 외부 제공자에서 받아 증분 병합
+- BAR_CACHE_OFFLINE=1 이면 외부 호출 없이 캐시만 사용 (사전 시드 파일로 오프라인 라벨링)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from typing import Callable, List, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# interval → 초 (진행 중인 마지막 봉을 coverage에서 제외할 때 사용)
+INTERVAL_SECONDS = {
+    "1m": 60,
+    "5m": 300,
+    "15m": 900,
+    "30m": 1800,
+    "1h": 3600,
+    "4h": 14400,
+    "1d": 86400,
+    "1wk": 604800,
+    "1mo": 2678400,
+}
+
+# TradingView 타임프레임 → interval
+TF_INTERVALS = {
+    "1": "1m",
+    "5": "5m",
+    "15": "15m",
+    "30": "30m",
+    "60": "1h",
+    "1H": "1h",
+    "4H": "4h",
+    "1D": "1d",
+    "1W": "1wk",
+    "1M": "1mo",
+}
+
+OHLC_COLUMNS = ["Open", "High", "Low", "Close", "Volume"]
+
+TimeLike = Union[datetime, pd.Timestamp, int, float]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS bars (
+    symbol   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    ts       INTEGER NOT NULL,
+    open     REAL,
+    high     REAL,
+    low      REAL,
+    close    REAL,
+    volume   REAL,
+    PRIMARY KEY (symbol, interval, ts)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS coverage (
+    symbol   TEXT    NOT NULL,
+    interval TEXT    NOT NULL,
+    start_ts INTEGER NOT NULL,
+    end_ts   INTEGER NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS ix_coverage_key ON coverage (symbol, interval);
+"""
+
+
+def to_epoch(value: TimeLike) -> int:
+    """datetime/Timestamp/epoch → UTC epoch 초 (naive datetime은 UTC로 간주)"""
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        return int(value)
+    ts = pd.Timestamp(value)
+    if ts.tzinfo is None:
+        ts = ts.tz_localize("UTC")
+    return int(ts.timestamp())
+
+
+class BarStore:
+    """SQLite 기반 OHLC 바 캐시"""
+
+    def __init__(self, path: Optional[str] = None, offline: Optional[bool] = None):
+        """
+        Args:
+            path: 캐시 파일 경로 (기본: BAR_CACHE_PATH 또는 ./bar_cache.db)
+            offline: True면 외부 fetch 금지 (기본: BAR_CACHE_OFFLINE)
+        """
+        self.path = path or os.getenv("BAR_CACHE_PATH", "./bar_cache.db")
+        if offline is None:
+            offline = os.getenv("BAR_CACHE_OFFLINE", "false").lower() in ("1", "true", "yes")
+        self.offline = offline
+
+        self._local = threading.local()
+        self._write_lock = threading.Lock()
+        self._conn().executescript(_SCHEMA)
+
+    def _conn(self) -> sqlite3.Connection:
+        """스레드별 SQLite 연결 (라벨링 워커 스레드 간 공유 금지)"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ─────────────── Read ───────────────
+
+    def get_bars(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> pd.DataFrame:
+        """
+        캐시된 바 범위 조회 [start, end)
+
+        Args:
+            symbol: 심볼
+            interval: yfinance interval (1d, 1h 등)
+            start: 시작 시각
+            end: 종료 시각 (미포함)
+
+        Returns:
+            UTC DatetimeIndex + Open/High/Low/Close/Volume DataFrame
+        """
+        rows = self._conn().execute(
+            "SELECT ts, open, high, low, close, volume FROM bars "
+            "WHERE symbol = ? AND interval = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (symbol, interval, to_epoch(start), to_epoch(end))
+        ).fetchall()
+        return self._rows_to_frame(rows)
+
+    def get_arrays(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        캐시된 바 범위를 NumPy 배열로 조회 (벌크 계산용)
+
+        Returns:
+            (ts int64[n], ohlcv float64[n, 5])
+        """
+        rows = self._conn().execute(
+            "SELECT ts, open, high, low, close, volume FROM bars "
+            "WHERE symbol = ? AND interval = ? AND ts >= ? AND ts < ? ORDER BY ts",
+            (symbol, interval, to_epoch(start), to_epoch(end))
+        ).fetchall()
+        if not rows:
+            return np.empty(0, dtype=np.int64), np.empty((0, 5), dtype=np.float64)
+        data = np.asarray(rows, dtype=np.float64)
+        return data[:, 0].astype(np.int64), data[:, 1:]
+
+    def coverage(self, symbol: str, interval: str) -> List[Tuple[int, int]]:
+        """이미 받은 구간 목록 [(start_ts, end_ts)] (정렬, 병합됨)"""
+        return [
+            (int(s), int(e)) for s, e in self._conn().execute(
+                "SELECT start_ts, end_ts FROM coverage WHERE symbol = ? AND interval = ? ORDER BY start_ts",
+                (symbol, interval)
+            )
+        ]
+
+    def missing_ranges(self, symbol: str, interval: str, start: TimeLike, end: TimeLike) -> List[Tuple[int, int]]:
+        """
+        [start, end) 중 아직 받지 않은 구간 (gap) 목록
+
+        Returns:
+            [(gap_start_ts, gap_end_ts)]
+        """
+        start_ts, end_ts = to_epoch(start), to_epoch(end)
+        gaps = []
+        cursor = start_ts
+        for cov_start, cov_end in self.coverage(symbol, interval):
+            if cov_end <= cursor:
+                continue
+            if cov_start >= end_ts:
+                break
+            if cov_start > cursor:
+                gaps.append((cursor, cov_start))
+            cursor = max(cursor, cov_end)
+            if cursor >= end_ts:
+                break
+        if cursor < end_ts:
+            gaps.append((cursor, end_ts))
+        return gaps
+
+    # ─────────────── Write ───────────────
+
+    def upsert_bars(
+        self,
+        symbol: str,
+        interval: str,
+        df: pd.DataFrame,
+        start: Optional[TimeLike] = None,
+        end: Optional[TimeLike] = None
+    ) -> int:
+        """
+        바 저장 및 coverage 병합
+
+        Args:
+            symbol: 심볼
+            interval: interval
+            df: DatetimeIndex + OHLCV DataFrame (대소문자 무관)
+            start: 이 데이터가 대표하는 구간 시작 (기본: 첫 바)
+            end: 구간 끝 (기본: 마지막 바 다음), 진행 중인 봉 구간은 coverage에서 제외
+
+        Returns:
+            저장된 바 수
+        """
+        frame = self._normalize(df)
+        ts = frame.index.asi8 // 10**9 if len(frame) else np.empty(0, dtype=np.int64)
+
+        if start is None and len(frame) == 0:
+            return 0
+        start_ts = to_epoch(start) if start is not None else int(ts[0])
+        end_ts = to_epoch(end) if end is not None else int(ts[-1]) + INTERVAL_SECONDS.get(interval, 86400)
+
+        # 아직 끝나지 않은 봉(미래 구간 포함)은 다음 조회 때 다시 받도록 coverage에서 제외
+        open_bar_start = int(time.time()) - INTERVAL_SECONDS.get(interval, 86400)
+        end_ts = min(end_ts, open_bar_start)
+
+        values = frame[OHLC_COLUMNS].to_numpy(dtype=np.float64)
+        rows = [
+            (symbol, interval, int(t), *map(float, v))
+            for t, v in zip(ts, values)
+        ]
+
+        with self._write_lock:
+            conn = self._conn()
+            with conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO bars (symbol, interval, ts, open, high, low, close, volume) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows
+                )
+                if end_ts > start_ts:
+                    self._merge_coverage(conn, symbol, interval, start_ts, end_ts)
+        return len(rows)
+
+    def _merge_coverage(self, conn: sqlite3.Connection, symbol: str, interval: str, start_ts: int, end_ts: int):
+        """겹치거나 맞닿은 coverage 구간을 하나로 병합"""
+        overlapping = conn.execute(
+            "SELECT start_ts, end_ts FROM coverage "
+            "WHERE symbol = ? AND interval = ? AND start_ts <= ? AND end_ts >= ?",
+            (symbol, interval, end_ts, start_ts)
+        ).fetchall()
+        if overlapping:
+            start_ts = min(start_ts, *(s for s, _ in overlapping))
+            end_ts = max(end_ts, *(e for _, e in overlapping))
+            conn.execute(
+                "DELETE FROM coverage WHERE symbol = ? AND interval = ? AND start_ts <= ? AND end_ts >= ?",
+                (symbol, interval, end_ts, start_ts)
+            )
+        conn.execute(
+            "INSERT INTO coverage (symbol, interval, start_ts, end_ts) VALUES (?, ?, ?, ?)",
+            (symbol, interval, start_ts, end_ts)
+        )
+
+    def seed_csv(self, csv_path: str, symbol: str, interval: str, time_column: str = "time") -> int:
+        """
+        CSV 파일로 캐시 사전 시드 (오프라인 라벨링/테스트용)
+
+        Args:
+            csv_path: time(UTC epoch 초 또는 날짜 문자열), open/high/low/close[/volume] 컬럼을 가진 CSV
+            symbol: 심볼
+            interval: interval
+            time_column: 시각 컬럼명
+
+        Returns:
+            저장된 바 수
+        """
+        df = pd.read_csv(csv_path)
+        times = df[time_column]
+        if pd.api.types.is_numeric_dtype(times):
+            index = pd.to_datetime(times, unit="s", utc=True)
+        else:
+            index = pd.to_datetime(times, utc=True)
+        df = df.drop(columns=[time_column]).set_index(index)
+        return self.upsert_bars(symbol, interval, df)
+
+    # ─────────────── Fetch-through ───────────────
+
+    def fetch(
+        self,
+        symbol: str,
+        interval: str,
+        start: TimeLike,
+        end: TimeLike,
+        fetcher: Optional[Callable[[str, datetime, datetime, str], pd.DataFrame]] = None
+    ) -> pd.DataFrame:
+        """
+        캐시 우선 조회: 누락 구간만 fetcher로 받아 병합 후 [start, end) 반환
+
+        Args:
+            symbol: 심볼
+            interval: interval
+            start: 시작 시각
+            end: 종료 시각
+            fetcher: (symbol, start, end, interval) → OHLC DataFrame (오프라인 모드에선 무시)
+
+        Returns:
+            OHLC DataFrame
+        """
+        if fetcher is not None and not self.offline:
+            for gap_start, gap_end in self.missing_ranges(symbol, interval, start, end):
+                gap_df = fetcher(
+                    symbol,
+                    datetime.fromtimestamp(gap_start, tz=timezone.utc),
+                    datetime.fromtimestamp(gap_end, tz=timezone.utc),
+                    interval
+                )
+                if gap_df is None:
+                    continue  # fetch 실패 구간은 coverage에 기록하지 않음 (다음 조회 때 재시도)
+                self.upsert_bars(symbol, interval, gap_df, gap_start, gap_end)
+
+        return self.get_bars(symbol, interval, start, end)
+
+    # ─────────────── Helpers ───────────────
+
+    @staticmethod
+    def _normalize(df: pd.DataFrame) -> pd.DataFrame:
+        """컬럼명/인덱스 정규화 (Open/High/Low/Close/Volume, UTC DatetimeIndex)"""
+        if df is None or len(df) == 0:
+            return pd.DataFrame(columns=OHLC_COLUMNS, index=pd.DatetimeIndex([], tz="UTC"))
+
+        frame = df.rename(columns={c: c.capitalize() for c in df.columns if isinstance(c, str)})
+        if "Volume" not in frame.columns:
+            frame = frame.assign(Volume=0.0)
+
+        index = pd.DatetimeIndex(frame.index)
+        index = index.tz_localize("UTC") if index.tz is None else index.tz_convert("UTC")
+        frame = frame.set_axis(index.as_unit("ns"), axis=0)
+        return frame[OHLC_COLUMNS]
+
+    @staticmethod
+    def _rows_to_frame(rows: list) -> pd.DataFrame:
+        """SELECT 결과 → OHLC DataFrame"""
+        if not rows:
+            return pd.DataFrame(columns=OHLC_COLUMNS, index=pd.DatetimeIndex([], tz="UTC", name="Date"))
+        data = np.asarray(rows, dtype=np.float64)
+        index = pd.to_datetime(data[:, 0].astype(np.int64), unit="s", utc=True)
+        return pd.DataFrame(data[:, 1:], index=index.rename("Date"), columns=OHLC_COLUMNS)
+
+
+_default_store: Optional[BarStore] = None
+_default_lock = threading.Lock()
+
+
+def get_default_bar_store() -> BarStore:
+    """프로세스 공용 BarStore (환경변수 설정 사용)"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = BarStore()
+        return _default_store
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="VMSI-SDM bar cache seeding / inspection")
+    parser.add_argument("--seed", type=str, help="CSV file to load into the cache (time, open, high, low, close[, volume])")
+    parser.add_argument("--symbol", type=str, required=True, help="Symbol (e.g. SPX, AAPL)")
+    parser.add_argument("--interval", type=str, default="1d", help="yfinance interval (1d, 1wk, 1h, ...)")
+    parser.add_argument("--time-column", type=str, default="time", help="Timestamp column in the CSV")
+    args = parser.parse_args()
+
+    store = BarStore(offline=True)
+    if args.seed:
+        count = store.seed_csv(args.seed, args.symbol, args.interval, args.time_column)
+        print(f"[OK] Seeded {count} bars for {args.symbol} {args.interval} into {store.path}")
+
+    for cov_start, cov_end in store.coverage(args.symbol, args.interval):
+        print(f"  coverage: {datetime.fromtimestamp(cov_start, tz=timezone.utc)} → {datetime.fromtimestamp(cov_end, tz=timezone.utc)}")
@@ -4,11 +4,12 @@ SQLAlchemy ORM 모델 정의
 """
 
 import os
-from typing import Generator
+from typing import Any, Dict, Generator, List, Optional, Sequence, Tuple
 from sqlalchemy import (
-    create_engine, Column, Integer, String, Float, Boolean, 
-    DateTime, JSON, ForeignKey, Text
+    create_engine, Column, Integer, BigInteger, String, Float, Boolean, 
+    DateTime, JSON, ForeignKey, Index, Text, UniqueConstraint, inspect, select, text
 )
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, Session, relationship
 from datetime import datetime
@@ -28,6 +29,29 @@ SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+# features_json에서 승격한 v5 핵심 피처 컬럼 (SQL 필터/집계용)
+FEATURE_COLUMNS = [
+    "trend_score", "rsi", "vol_mult", "vcp_ratio",
+    "ema1", "ema2", "price", "atr", "sl_price", "tp_price"
+]
+
+# 컬럼 → features_json 키 (레거시 camelCase 키 포함, 앞쪽 우선)
+FEATURE_JSON_KEYS = {
+    "trend_score": ["trend_score", "trendScore"],
+    "rsi": ["rsi"],
+    "vol_mult": ["vol_mult", "volMult"],
+    "vcp_ratio": ["vcp_ratio", "vcpRatio"],
+    "ema1": ["ema1"],
+    "ema2": ["ema2"],
+    "price": ["price", "close"],
+    "atr": ["atr"],
+    "sl_price": ["sl_price"],
+    "tp_price": ["tp_price"],
+}
+
+# signals.ts가 이 값보다 크면 밀리초로 간주
+TS_MILLIS_THRESHOLD = 100_000_000_000
+
 
 # ─────────────── Models ───────────────
 
@@ -37,6 +61,7 @@ class Signal(Base):
     
     id = Column(Integer, primary_key=True, index=True)
     ts = Column(String, nullable=False, index=True)  # TradingView timestamp
+    ts_sec = Column(BigInteger, nullable=True, index=True)  # ts 정규화 unix 초 (ts_from/ts_to 범위 필터)
     symbol = Column(String, nullable=False, index=True)
     tf = Column(String, nullable=False)  # timeframe
     signal = Column(String, nullable=False, index=True)  # BUY/SELL/WATCH_UP/WATCH_DOWN
@@ -45,6 +70,18 @@ class Signal(Base):
     features_json = Column(JSON, nullable=False)
     params_json = Column(JSON, nullable=False)
     
+    # v5 핵심 피처 (features_json 사본, 필터 대상은 인덱스)
+    trend_score = Column(Float, nullable=True, index=True)
+    rsi = Column(Float, nullable=True, index=True)
+    vol_mult = Column(Float, nullable=True, index=True)
+    vcp_ratio = Column(Float, nullable=True, index=True)
+    ema1 = Column(Float, nullable=True)
+    ema2 = Column(Float, nullable=True)
+    price = Column(Float, nullable=True)
+    atr = Column(Float, nullable=True)
+    sl_price = Column(Float, nullable=True)
+    tp_price = Column(Float, nullable=True)
+    
     # OHLC 보강 데이터 (labeler가 채움)
     bar_o = Column(Float, nullable=True)
     bar_h = Column(Float, nullable=True)
@@ -55,6 +92,9 @@ class Signal(Base):
     
     # Relationships
     labels = relationship("Label", back_populates="signal", cascade="all, delete-orphan")
+    
+    # /signals 키셋 페이지네이션 (created_at, id 내림차순)
+    __table_args__ = (Index("ix_signals_created_at_id", "created_at", "id"),)
 
 
 class Label(Base):
@@ -62,7 +102,7 @@ class Label(Base):
     __tablename__ = "labels"
     
     id = Column(Integer, primary_key=True, index=True)
-    signal_id = Column(Integer, ForeignKey("signals.id"), nullable=False)
+    signal_id = Column(Integer, ForeignKey("signals.id"), nullable=False, index=True)
     
     fwd_n = Column(Integer, nullable=False)  # 3, 5, 10, 20
     fwd_ret = Column(Float, nullable=False)  # 수익률
@@ -72,6 +112,39 @@ class Label(Base):
     created_at = Column(DateTime, default=datetime.utcnow)
     
     signal = relationship("Signal", back_populates="labels")
+    
+    # 신호당 forward window 라벨 1행 (동시 라벨링 작업의 중복 저장 방지, insert_labels 참고)
+    __table_args__ = (UniqueConstraint("signal_id", "fwd_n", name="uq_labels_signal_fwd_n"),)
+
+
+class LabelJob(Base):
+    """라벨링 작업 큐 (워커 풀이 소비)"""
+    __tablename__ = "label_jobs"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(String, nullable=False, default="signal")  # signal: 단일 신호 / bulk: 라벨 없는 신호 일괄
+    signal_id = Column(Integer, ForeignKey("signals.id"), nullable=True, index=True)  # kind=bulk면 NULL
+    provider = Column(String, nullable=False, default="yahoo")  # 데이터 제공자 (동시성 제한 단위)
+    
+    status = Column(String, nullable=False, default="pending", index=True)  # pending/running/done/failed
+    attempts = Column(Integer, nullable=False, default=0)
+    error = Column(Text, nullable=True)
+    next_attempt_at = Column(DateTime, nullable=True)  # 실패 후 재시도 가능 시각 (NULL = 즉시)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+
+class IngestDeadLetter(Base):
+    """쓰기 버퍼에서 재시도 후에도 저장하지 못한 신호 행 (원인 확인 후 수동 재처리)"""
+    __tablename__ = "ingest_dead_letters"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    provisional_id = Column(String, nullable=False, index=True)  # /alert 응답의 provisional_id
+    row_json = Column(JSON, nullable=False)  # alert_to_signal_row() 결과
+    error = Column(Text, nullable=True)
+    
+    created_at = Column(DateTime, default=datetime.utcnow)
 
 
 class Experiment(Base):
@@ -105,6 +178,24 @@ class Report(Base):
     experiment = relationship("Experiment", back_populates="reports")
 
 
+class StatsCounter(Base):
+    """/stats 요약 카운터 (신호/라벨/실험 INSERT와 같은 트랜잭션에서 증분, server.stats 참고)"""
+    __tablename__ = "stats_counters"
+    
+    id = Column(Integer, primary_key=True)
+    metric = Column(String, nullable=False)  # signals / labels / experiments
+    symbol = Column(String, nullable=False, default="")  # 해당 없음 = ""
+    tf = Column(String, nullable=False, default="")
+    signal = Column(String, nullable=False, default="")
+    day = Column(String, nullable=False, default="")  # YYYY-MM-DD (created_at UTC), "" = 전체 기간 롤업
+    count = Column(Integer, nullable=False, default=0)
+    
+    __table_args__ = (
+        UniqueConstraint("metric", "symbol", "tf", "signal", "day", name="uq_stats_counters_key"),
+        Index("ix_stats_counters_metric_day", "metric", "day"),
+    )
+
+
 # ─────────────── Database Utilities ───────────────
 
 def get_db() -> Generator[Session, None, None]:
@@ -116,9 +207,359 @@ def get_db() -> Generator[Session, None, None]:
         db.close()
 
 
+def _driver_value(value: Any, dialect_name: str) -> Any:
+    """DBAPI 드라이버에 직접 넘길 값 변환 (SQLite는 SQLAlchemy와 같은 DateTime 문자열 포맷 사용)"""
+    if dialect_name == "sqlite" and isinstance(value, datetime):
+        return value.strftime("%Y-%m-%d %H:%M:%S.%f")
+    return value
+
+
+def _driver_rows(rows: List[Sequence[Any]], dialect_name: str) -> List[Sequence[Any]]:
+    """executemany 파라미터 변환 (첫 행에서 datetime인 컬럼만 _driver_value 적용)"""
+    columns = [i for i, v in enumerate(rows[0]) if _driver_value(v, dialect_name) is not v]
+    if not columns:
+        return rows
+    converted = []
+    for row in rows:
+        row = list(row)
+        for i in columns:
+            row[i] = _driver_value(row[i], dialect_name)
+        converted.append(tuple(row))
+    return converted
+
+
+def _placeholder(paramstyle: str) -> str:
+    """DBAPI positional placeholder"""
+    return "?" if paramstyle == "qmark" else "%s"
+
+
+def bulk_insert_raw(db: Session, table: str, columns: Sequence[str], rows: List[Sequence[Any]]) -> int:
+    """
+    대량 INSERT (DBAPI executemany 직접 호출, ORM/Core 행 처리 생략)
+    
+    세션의 현재 트랜잭션 안에서 실행되며 커밋은 호출자 책임입니다.
+    컬럼 기본값은 적용되지 않으므로 created_at 등은 rows에 직접 포함해야 합니다.
+    
+    Args:
+        db: DB 세션
+        table: 테이블명
+        columns: 컬럼명 목록
+        rows: 컬럼 순서와 같은 값 튜플 목록
+    
+    Returns:
+        INSERT된 행 수
+    """
+    if not rows:
+        return 0
+    
+    dialect = db.get_bind().dialect
+    ph = _placeholder(dialect.paramstyle)
+    sql = f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([ph] * len(columns))})"
+    db.connection().exec_driver_sql(sql, _driver_rows(rows, dialect.name))
+    return len(rows)
+
+
+def bulk_update_raw(db: Session, table: str, key: str, columns: Sequence[str], rows: List[Sequence[Any]]) -> int:
+    """
+    키 기준 대량 UPDATE (DBAPI executemany 직접 호출)
+    
+    Args:
+        db: DB 세션
+        table: 테이블명
+        key: WHERE 조건 컬럼 (예: id)
+        columns: 갱신할 컬럼명 목록
+        rows: (컬럼 값..., 키 값) 튜플 목록
+    
+    Returns:
+        처리한 행 수
+    """
+    if not rows:
+        return 0
+    
+    dialect = db.get_bind().dialect
+    ph = _placeholder(dialect.paramstyle)
+    sql = f"UPDATE {table} SET {', '.join(f'{c} = {ph}' for c in columns)} WHERE {key} = {ph}"
+    db.connection().exec_driver_sql(sql, _driver_rows(rows, dialect.name))
+    return len(rows)
+
+
+def bulk_increment_raw(
+    db: Session, table: str, keys: Sequence[str], column: str, rows: List[Sequence[Any]]
+) -> int:
+    """
+    키 기준 카운터 증분 UPSERT (INSERT ... ON CONFLICT DO UPDATE, SQLite 3.24+ / PostgreSQL)
+    
+    keys 컬럼에 UNIQUE 제약이 있어야 합니다. 커밋은 호출자 책임입니다.
+    
+    Args:
+        db: DB 세션
+        table: 테이블명
+        keys: 충돌 판정 키 컬럼 목록
+        column: 증분할 컬럼
+        rows: (키 값..., 증분) 튜플 목록
+    
+    Returns:
+        처리한 행 수
+    """
+    if not rows:
+        return 0
+    
+    dialect = db.get_bind().dialect
+    ph = _placeholder(dialect.paramstyle)
+    columns = [*keys, column]
+    sql = (
+        f"INSERT INTO {table} ({', '.join(columns)}) VALUES ({', '.join([ph] * len(columns))}) "
+        f"ON CONFLICT ({', '.join(keys)}) DO UPDATE SET {column} = {table}.{column} + excluded.{column}"
+    )
+    db.connection().exec_driver_sql(sql, rows)
+    return len(rows)
+
+
+def insert_labels(db: Session, rows: List[Dict[str, Any]]) -> List[Tuple[int, int]]:
+    """
+    라벨 INSERT (같은 (signal_id, fwd_n) 라벨이 이미 있으면 건너뜀, SQLite 3.35+ / PostgreSQL)
+    
+    중복 여부는 uq_labels_signal_fwd_n 제약으로 판정하므로 같은 신호를 동시에 처리한
+    단건 / 벌크 라벨링 작업 중 먼저 커밋한 쪽의 라벨만 남습니다. 커밋은 호출자 책임입니다.
+    
+    Args:
+        db: DB 세션
+        rows: signal_id / fwd_n / fwd_ret / broke_high / broke_low (/ created_at) dict 목록
+    
+    Returns:
+        실제로 INSERT된 행의 (signal_id, fwd_n) 목록 (건너뛴 행 제외)
+    """
+    if not rows:
+        return []
+    
+    dialect_insert = postgresql.insert if db.get_bind().dialect.name == "postgresql" else sqlite.insert
+    stmt = (
+        dialect_insert(Label)
+        .on_conflict_do_nothing(index_elements=["signal_id", "fwd_n"])
+        .returning(Label.signal_id, Label.fwd_n)
+    )
+    return [tuple(row) for row in db.execute(stmt, rows).all()]
+
+
+def extract_feature_columns(features: Optional[Dict[str, Any]]) -> Dict[str, Optional[float]]:
+    """
+    features_json → 승격 피처 컬럼 값
+    
+    Args:
+        features: features_json dict
+    
+    Returns:
+        {컬럼명: float 또는 None}
+    """
+    features = features or {}
+    values = {}
+    for column in FEATURE_COLUMNS:
+        value = None
+        for key in FEATURE_JSON_KEYS[column]:
+            if features.get(key) is not None:
+                value = features[key]
+                break
+        try:
+            values[column] = float(value) if value is not None else None
+        except (TypeError, ValueError):
+            values[column] = None
+    return values
+
+
+def ts_to_seconds(ts: Any) -> Optional[int]:
+    """
+    signals.ts 값 (unix 초 또는 밀리초) → unix 초
+    
+    Args:
+        ts: 알럿 ts_unix 또는 ts 문자열
+    
+    Returns:
+        unix 초 (숫자가 아니면 None)
+    """
+    try:
+        value = int(ts)
+    except (TypeError, ValueError):
+        return None
+    return value // 1000 if value > TS_MILLIS_THRESHOLD else value
+
+
+def backfill_ts_seconds(bind=None, chunk_size: int = 5000) -> int:
+    """
+    ts_sec이 비어 있는 기존 신호를 ts 문자열에서 채움 (ts_to_seconds() 적용)
+    
+    숫자가 아닌 ts(레거시 행)는 NULL로 남겨 ts_from/ts_to 필터에서 제외되며,
+    청크마다 커밋하므로 중단되더라도 다시 실행하면 이어서 처리합니다.
+    
+    Args:
+        bind: 엔진 (기본: 전역 engine)
+        chunk_size: 청크당 행 수
+    
+    Returns:
+        갱신된 행 수
+    """
+    bind = bind if bind is not None else engine
+    table = Signal.__table__
+    
+    updated = 0
+    last_id = 0
+    db = Session(bind=bind)
+    try:
+        while True:
+            rows = db.execute(
+                select(table.c.id, table.c.ts)
+                .where(table.c.id > last_id, table.c.ts_sec.is_(None))
+                .order_by(table.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            
+            update_rows = []
+            for signal_id, ts in rows:
+                seconds = ts_to_seconds(ts)
+                if seconds is not None:
+                    update_rows.append((seconds, signal_id))
+            updated += bulk_update_raw(db, "signals", "id", ["ts_sec"], update_rows)
+            db.commit()
+            last_id = rows[-1][0]
+    finally:
+        db.close()
+    
+    return updated
+
+
+def backfill_feature_columns(bind=None, chunk_size: int = 5000) -> int:
+    """
+    기존 신호의 features_json을 피처 컬럼으로 복사 (일회성 마이그레이션)
+    
+    피처 컬럼이 모두 NULL인 행만 대상으로 하며 청크마다 커밋하므로
+    중단되더라도 다시 실행하면 이어서 처리합니다.
+    
+    Args:
+        bind: 엔진 (기본: 전역 engine)
+        chunk_size: 청크당 행 수
+    
+    Returns:
+        갱신된 행 수
+    """
+    bind = bind if bind is not None else engine
+    table = Signal.__table__
+    all_null = [table.c[column].is_(None) for column in FEATURE_COLUMNS]
+    
+    updated = 0
+    last_id = 0
+    db = Session(bind=bind)
+    try:
+        while True:
+            rows = db.execute(
+                select(table.c.id, table.c.features_json)
+                .where(table.c.id > last_id, *all_null)
+                .order_by(table.c.id)
+                .limit(chunk_size)
+            ).all()
+            if not rows:
+                break
+            
+            update_rows = []
+            for signal_id, features in rows:
+                values = extract_feature_columns(features)
+                if any(v is not None for v in values.values()):
+                    update_rows.append((*(values[c] for c in FEATURE_COLUMNS), signal_id))
+            
+            updated += bulk_update_raw(db, "signals", "id", FEATURE_COLUMNS, update_rows)
+            db.commit()
+            last_id = rows[-1][0]
+    finally:
+        db.close()
+    
+    return updated
+
+
+def _ensure_label_uniqueness(bind) -> int:
+    """
+    기존 labels 테이블에 (signal_id, fwd_n) UNIQUE 인덱스 추가 (create_all은 기존 테이블 제약을 바꾸지 않음)
+    
+    인덱스가 없던 DB의 중복 라벨은 가장 먼저 저장된 행만 남기고 삭제하며,
+    이 경우 stats 카운터를 비워 서버 시작 시(seed_stats) 다시 계산되도록 합니다.
+    
+    Returns:
+        삭제한 중복 라벨 수
+    """
+    inspector = inspect(bind)
+    if not inspector.has_table("labels"):
+        return 0
+    key = ["signal_id", "fwd_n"]
+    if any(c["column_names"] == key for c in inspector.get_unique_constraints("labels")) or \
+            any(i["unique"] and i["column_names"] == key for i in inspector.get_indexes("labels")):
+        return 0
+    
+    with bind.begin() as conn:
+        removed = conn.execute(text(
+            "DELETE FROM labels WHERE id NOT IN (SELECT MIN(id) FROM labels GROUP BY signal_id, fwd_n)"
+        )).rowcount
+        conn.execute(text("CREATE UNIQUE INDEX uq_labels_signal_fwd_n ON labels (signal_id, fwd_n)"))
+        if removed and inspector.has_table("stats_counters"):
+            conn.execute(text("DELETE FROM stats_counters"))
+    
+    if removed:
+        print(f"⚠️  Removed {removed} duplicate labels (stats counters will be rebuilt)")
+    return removed
+
+
+def migrate_db(bind=None) -> List[str]:
+    """
+    기존 DB 스키마 보강 (create_all이 처리하지 못하는 컬럼/인덱스 추가)
+    
+    - 누락된 컬럼 ALTER TABLE ADD COLUMN
+    - 모델에 정의된 인덱스 중 없는 것 생성
+    - labels (signal_id, fwd_n) UNIQUE 인덱스 추가 (중복 라벨 정리)
+    - 피처 컬럼을 새로 추가한 경우 features_json 백필
+    - signals.ts_sec을 새로 추가한 경우 ts에서 백필
+    
+    Args:
+        bind: 엔진 (기본: 전역 engine)
+    
+    Returns:
+        추가된 컬럼 목록 ("table.column")
+    """
+    bind = bind if bind is not None else engine
+    inspector = inspect(bind)
+    added = []
+    
+    with bind.begin() as conn:
+        for table in Base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                col_type = column.type.compile(dialect=bind.dialect)
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {col_type}"))
+                added.append(f"{table.name}.{column.name}")
+    
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+    _ensure_label_uniqueness(bind)
+    
+    if added:
+        print(f"[OK] Added columns: {', '.join(added)}")
+    
+    if any(name.split(".", 1)[1] in FEATURE_COLUMNS for name in added if name.startswith("signals.")):
+        count = backfill_feature_columns(bind)
+        print(f"[OK] Backfilled feature columns for {count} signals")
+    
+    if "signals.ts_sec" in added:
+        print(f"[OK] Backfilled ts_sec for {backfill_ts_seconds(bind)} signals")
+    
+    return added
+
+
 def init_db():
-    """데이터베이스 초기화 (테이블 생성)"""
+    """데이터베이스 초기화 (테이블 생성 + 기존 스키마 마이그레이션)"""
     Base.metadata.create_all(bind=engine)
+    migrate_db()
     print("[OK] Database initialized")
 
 
@@ -130,6 +571,10 @@ def reset_db():
 
 
 if __name__ == "__main__":
-    # 직접 실행 시 DB 초기화
+    import sys
+    
+    # 직접 실행 시 DB 초기화 (--backfill-features: 피처 컬럼 백필 재실행)
     init_db()
+    if "--backfill-features" in sys.argv:
+        print(f"[OK] Backfilled feature columns for {backfill_feature_columns()} signals")
 
@@ -0,0 +1,274 @@
+"""
+VMSI-SDM Event Hub
+커밋된 신호 / 라벨 완료 이벤트를 구독자에게 팬아웃하는 인메모리 허브 (/signals/stream SSE)
+
+발행은 커밋 후 어느 스레드(요청 스레드풀, 쓰기 버퍼 flusher, 라벨 워커)에서든 가능하며,
+구독자는 이벤트 루프에서 자신의 유한 큐를 소비합니다. 최근 이벤트는 링 버퍼에 보관해
+Last-Event-ID 재접속 시 놓친 이벤트를 재전송하고, 버퍼 밖이면 reset 이벤트로 전체 재조회를 요청합니다.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+
+# 재접속 재전송용으로 보관할 최근 이벤트 수
+DEFAULT_HISTORY = int(os.getenv("STREAM_HISTORY", "5000"))
+
+# 구독자별 대기 이벤트 상한 (초과 시 해당 구독 종료 → 클라이언트가 Last-Event-ID로 재접속)
+DEFAULT_SUBSCRIBER_QUEUE = int(os.getenv("STREAM_QUEUE_SIZE", "1000"))
+
+# 유휴 연결 keep-alive 주석 간격 (초)
+DEFAULT_HEARTBEAT = float(os.getenv("STREAM_HEARTBEAT_SEC", "15"))
+
+# 라벨 이벤트 1건당 최대 signal id 수 (벌크 라벨링 분할)
+LABEL_EVENT_CHUNK = 1000
+
+
+class StreamEvent(NamedTuple):
+    """허브 이벤트 (id는 허브 내 단조 증가)"""
+    id: int
+    event: str
+    data: Dict[str, Any]
+
+    def encode(self) -> str:
+        """SSE 메시지 문자열"""
+        payload = json.dumps(self.data, separators=(",", ":"), default=str)
+        return f"id: {self.id}\nevent: {self.event}\ndata: {payload}\n\n"
+
+
+def signal_event_data(signal_id: int, row: Mapping[str, Any]) -> Dict[str, Any]:
+    """
+    신호 행 → signal 이벤트 데이터 (/signals 기본 필드와 같은 구성)
+
+    Args:
+        signal_id: 커밋된 signal id
+        row: alert_to_signal_row() 결과 (bulk_insert_signals가 created_at을 채운 행)
+
+    Returns:
+        이벤트 데이터 dict
+    """
+    created_at = row.get("created_at")
+    return {
+        "id": signal_id,
+        "ts": row["ts"],
+        "symbol": row["symbol"],
+        "tf": row["tf"],
+        "signal": row["signal"],
+        "features": row.get("features_json") or {},
+        "params": row.get("params_json") or {},
+        "created_at": created_at.isoformat() if isinstance(created_at, datetime) else created_at,
+    }
+
+
+class Subscription:
+    """
+    구독자 1명의 유한 이벤트 큐 (이벤트 루프 전용)
+
+    허브는 call_soon_threadsafe로 이벤트를 넣으며, 큐가 가득 차면 더 넣지 않고
+    overflowed로 표시합니다. 소비자는 남은 이벤트를 모두 보낸 뒤 연결을 종료합니다.
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, replay: List[StreamEvent], max_queue: int):
+        self.loop = loop
+        self.replay = replay
+        self.queue: "asyncio.Queue[Optional[StreamEvent]]" = asyncio.Queue(maxsize=max_queue)
+        self.overflowed = False
+        self.closed = False
+
+    def offer(self, event: Optional[StreamEvent]):
+        """이벤트 추가 (루프 스레드에서 호출, None은 종료 신호)"""
+        if event is None:
+            self.closed = True
+            if self.queue.full():
+                return
+        elif self.overflowed or self.closed:
+            return
+        elif self.queue.full():
+            self.overflowed = True
+            return
+        self.queue.put_nowait(event)
+
+
+class EventHub:
+    """
+    신호 / 라벨 이벤트 팬아웃 허브 (스레드 안전)
+
+    이벤트 id는 프로세스 시작 시각(밀리초)에서 시작해 1씩 증가하므로,
+    서버 재시작 전 id로 재접속한 클라이언트는 범위 밖으로 판정되어 reset을 받습니다.
+    """
+
+    def __init__(self, history: int = DEFAULT_HISTORY, max_queue: int = DEFAULT_SUBSCRIBER_QUEUE):
+        """
+        Args:
+            history: 재전송용 링 버퍼 크기
+            max_queue: 구독자별 큐 크기
+        """
+        self.max_queue = max_queue
+        self._history: "deque[StreamEvent]" = deque(maxlen=history)
+        self._subscribers: List[Subscription] = []
+        self._lock = threading.Lock()
+        self._last_id = int(time.time() * 1000)
+
+        self.published = 0
+        self.overflows = 0
+        self.resets = 0
+
+    # ─────────────── Publish ───────────────
+
+    def publish(self, event: str, data: Dict[str, Any]) -> int:
+        """
+        이벤트 발행 (커밋 후 호출)
+
+        Args:
+            event: 이벤트 이름 (signal / label)
+            data: JSON 직렬화 가능한 데이터
+
+        Returns:
+            부여된 이벤트 id
+        """
+        with self._lock:
+            self._last_id += 1
+            item = StreamEvent(self._last_id, event, data)
+            self._history.append(item)
+            self.published += 1
+            self._fan_out(item)
+        return item.id
+
+    def publish_signals(self, committed: Iterable[Tuple[int, Mapping[str, Any]]]) -> int:
+        """
+        커밋된 신호마다 signal 이벤트 발행
+
+        Args:
+            committed: [(signal_id, row)]
+
+        Returns:
+            발행한 이벤트 수
+        """
+        count = 0
+        for signal_id, row in committed:
+            self.publish("signal", signal_event_data(signal_id, row))
+            count += 1
+        return count
+
+    def publish_labels(self, signal_ids: List[int]) -> int:
+        """
+        라벨링 완료 이벤트 발행 (LABEL_EVENT_CHUNK개씩 분할)
+
+        Args:
+            signal_ids: 라벨이 저장된 signal id 목록
+
+        Returns:
+            발행한 이벤트 수
+        """
+        count = 0
+        for offset in range(0, len(signal_ids), LABEL_EVENT_CHUNK):
+            self.publish("label", {"signal_ids": list(signal_ids[offset:offset + LABEL_EVENT_CHUNK])})
+            count += 1
+        return count
+
+    def _fan_out(self, item: Optional[StreamEvent]):
+        """모든 구독자 큐에 전달 (락 보유 상태에서 호출 → 구독자별 순서 보장)"""
+        for subscription in list(self._subscribers):
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.offer, item)
+            except RuntimeError:
+                # 이벤트 루프가 이미 닫힘
+                self._subscribers.remove(subscription)
+
+    # ─────────────── Subscribe ───────────────
+
+    def subscribe(self, last_event_id: Optional[int] = None) -> Subscription:
+        """
+        구독 등록 (이벤트 루프 안에서 호출)
+
+        Args:
+            last_event_id: 클라이언트가 마지막으로 받은 이벤트 id (None이면 지금부터)
+
+        Returns:
+            재전송 이벤트(replay)가 채워진 Subscription
+        """
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if last_event_id is None or last_event_id == self._last_id:
+                replay = []
+            elif self._history and self._history[0].id - 1 <= last_event_id < self._last_id:
+                replay = [item for item in self._history if item.id > last_event_id]
+            else:
+                # 링 버퍼 밖 (오래됨 / 재시작 전 id) → 전체 재조회 요청
+                self.resets += 1
+                replay = [StreamEvent(self._last_id, "reset", {"last_event_id": last_event_id})]
+            subscription = Subscription(loop, replay, self.max_queue)
+            self._subscribers.append(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """구독 해제"""
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.remove(subscription)
+            if subscription.overflowed:
+                self.overflows += 1
+
+    def close(self):
+        """모든 구독 종료 (서버 종료 시)"""
+        with self._lock:
+            self._fan_out(None)
+            self._subscribers = []
+
+    async def stream(
+        self,
+        subscription: Subscription,
+        is_disconnected: Callable[[], Awaitable[bool]],
+        heartbeat: float = DEFAULT_HEARTBEAT
+    ) -> AsyncIterator[str]:
+        """
+        SSE 본문 생성기 (재전송 → 실시간 이벤트, 유휴 시 keep-alive 주석)
+
+        Args:
+            subscription: subscribe() 결과
+            is_disconnected: 클라이언트 연결 종료 확인 함수 (Request.is_disconnected)
+            heartbeat: keep-alive 간격 (초)
+        """
+        try:
+            yield f"retry: {int(heartbeat * 1000)}\n\n"
+            for item in subscription.replay:
+                yield item.encode()
+
+            while True:
+                try:
+                    item = await asyncio.wait_for(subscription.queue.get(), heartbeat)
+                except asyncio.TimeoutError:
+                    if subscription.closed or await is_disconnected():
+                        return
+                    yield ": keep-alive\n\n"
+                    continue
+                if item is None:
+                    return
+                yield item.encode()
+                if (subscription.overflowed or subscription.closed) and subscription.queue.empty():
+                    # 느린 구독자: 받은 데까지 보낸 뒤 종료 (Last-Event-ID로 재접속해 이어 받음)
+                    return
+        finally:
+            self.unsubscribe(subscription)
+
+    # ─────────────── Stats ───────────────
+
+    def stats(self) -> Dict[str, Any]:
+        """허브 상태"""
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "last_event_id": self._last_id,
+                "history": len(self._history),
+                "history_capacity": self._history.maxlen,
+                "queue_capacity": self.max_queue,
+                "published": self.published,
+                "overflows": self.overflows,
+                "resets": self.resets,
+            }
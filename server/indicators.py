@@ -0,0 +1,740 @@
+"""
+VMSI-SDM Indicators
+v5 Final 인디케이터/신호 로직의 벡터화 구현 (pine/indicator_sdm_v5_final.pine)
+
+Pine ta.* 함수와 같은 초기값(SMA 시드)과 na 처리로 계산하므로
+캐시된 바에서 TradingView와 같은 BUY/SELL 신호 스트림을 재생성할 수 있습니다.
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+
+# v5 Final 기본 파라미터 (프리셋 키 이름 기준)
+DEFAULT_PARAMS: Dict[str, Any] = {
+    "ema1": 20,
+    "ema2": 50,
+    "rsi": 14,
+    "vcp": 20,
+    "atr": 14,
+    "vol_avg": 20,
+    "trend_score_buy": 50.0,
+    "rsi_buy_th": 45.0,
+    "vol_mult_buy": 1.0,
+    "trend_score_sell": 50.0,
+    "rsi_sell_th": 55.0,
+    "vol_mult_sell": 1.0,
+    "use_ema_filter": False,
+    # RSI 밴드 상/하한 (v5 Pine에는 없음, CSV 임포트 규칙용 — 기본값은 제한 없음)
+    "rsi_buy_max": np.inf,
+    "rsi_sell_min": -np.inf,
+    "alpha": 0.8,
+    "beta": 0.35,
+    "gamma": 0.7,
+    "delta": 0.6,
+    # 1 / 0 이면 v5 Final과 동일 (v2 방식 trend score SMA 평활 / 신호 간 최소 봉 수)
+    "hysteresis_len": 1,
+    "cooldown_bars": 0,
+    "use_atr_based": True,
+    "atr_sl_mult": 1.5,
+    "atr_tp_mult": 2.5,
+    "fixed_sl_pct": 5.0,
+    "fixed_tp_pct": 10.0,
+}
+
+# Pine 입력 이름 → 프리셋 키
+PARAM_ALIASES = {
+    "ema1_len": "ema1",
+    "ema2_len": "ema2",
+    "rsi_len": "rsi",
+    "vcp_len": "vcp",
+    "atr_len": "atr",
+    "rsi_buy_min": "rsi_buy_th",
+    "rsi_sell_max": "rsi_sell_th",
+}
+
+INDICATOR_LENGTH_KEYS = ("ema1", "ema2", "rsi", "vcp", "atr", "vol_avg")
+
+INDICATOR_COLUMNS = ("ema1", "ema2", "rsi", "vol_mult", "vcp_ratio", "atr")
+
+SIGNAL_COLUMNS = [
+    "bar_index", "time", "action", "price", "signal_number", "trend_score", "rsi", "vol_mult",
+    "vcp_ratio", "ema1", "ema2", "atr", "sl_price", "tp_price",
+]
+
+BarsLike = Union[pd.DataFrame, Mapping[str, np.ndarray]]
+
+
+def resolve_params(params: Optional[Mapping[str, Any]] = None) -> Dict[str, Any]:
+    """
+    기본값 + 프리셋/Pine 파라미터 병합
+
+    Args:
+        params: 프리셋 params 또는 Pine 입력 이름 딕셔너리 (없는 키는 v5 기본값)
+
+    Returns:
+        프리셋 키 기준 전체 파라미터
+    """
+    resolved = dict(DEFAULT_PARAMS)
+    for key, value in (params or {}).items():
+        key = PARAM_ALIASES.get(key, key)
+        if key in resolved:
+            resolved[key] = value
+    return resolved
+
+
+# ─────────────── Pine ta.* ───────────────
+
+def sma(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.sma (창 안에 na가 있으면 na)"""
+    return pd.Series(values).rolling(int(length), min_periods=int(length)).mean().to_numpy()
+
+
+def _seeded_ewm(values: np.ndarray, length: int, alpha: float) -> np.ndarray:
+    """SMA로 시드한 지수 이동평균 (ta.ema / ta.rma 공통)"""
+    out = np.full(len(values), np.nan)
+    seed = sma(values, length)
+    start = np.flatnonzero(np.isfinite(seed))
+    if len(start) == 0:
+        return out
+
+    start = start[0]
+    tail = values[start:].copy()
+    tail[0] = seed[start]
+    out[start:] = pd.Series(tail).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    return out
+
+
+def ema(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.ema"""
+    return _seeded_ewm(np.asarray(values, dtype=np.float64), length, 2.0 / (length + 1))
+
+
+def rma(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.rma (Wilder)"""
+    return _seeded_ewm(np.asarray(values, dtype=np.float64), length, 1.0 / length)
+
+
+def rsi(close: np.ndarray, length: int) -> np.ndarray:
+    """ta.rsi"""
+    change = np.diff(close, prepend=np.nan)
+    up = rma(np.maximum(change, 0.0), length)
+    down = rma(np.maximum(-change, 0.0), length)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(down == 0, 100.0, np.where(up == 0, 0.0, 100.0 - 100.0 / (1.0 + up / down)))
+    return np.where(np.isnan(up) | np.isnan(down), np.nan, value)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, length: int) -> np.ndarray:
+    """ta.atr (첫 봉 true range = high - low)"""
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    true_range = np.fmax(high - low, np.fmax(np.abs(high - prev_close), np.abs(low - prev_close)))
+    return rma(true_range, length)
+
+
+def highest(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.highest"""
+    return pd.Series(values).rolling(int(length), min_periods=int(length)).max().to_numpy()
+
+
+def lowest(values: np.ndarray, length: int) -> np.ndarray:
+    """ta.lowest"""
+    return pd.Series(values).rolling(int(length), min_periods=int(length)).min().to_numpy()
+
+
+def _safe_div(a: np.ndarray, b: np.ndarray, fallback: float) -> np.ndarray:
+    """safe_div(a, b, fallback) = nz(b > 0 ? a / b : fallback, fallback)"""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        value = np.where(b > 0, a / b, fallback)
+    return np.where(np.isnan(value), fallback, value)
+
+
+# ─────────────── Indicators ───────────────
+
+def bar_arrays(bars: BarsLike) -> Dict[str, np.ndarray]:
+    """
+    바 데이터 → float64 배열 (Open/open 등 대소문자, time 컬럼 또는 DatetimeIndex 지원)
+
+    Args:
+        bars: OHLCV DataFrame 또는 배열 딕셔너리
+
+    Returns:
+        {'time', 'open', 'high', 'low', 'close', 'volume'} (time은 unix 초, 없으면 바 인덱스)
+    """
+    def column(name: str) -> Optional[np.ndarray]:
+        for key in (name, name.capitalize(), name.upper()):
+            if key in bars:
+                return np.asarray(bars[key], dtype=np.float64)
+        return None
+
+    arrays = {name: column(name) for name in ("open", "high", "low", "close", "volume")}
+    if arrays["close"] is None:
+        raise ValueError("Bars must include a close column")
+
+    n = len(arrays["close"])
+    for name in ("open", "high", "low"):
+        if arrays[name] is None:
+            arrays[name] = arrays["close"]
+    if arrays["volume"] is None:
+        arrays["volume"] = np.zeros(n)
+
+    if "time" in bars:
+        arrays["time"] = np.asarray(bars["time"], dtype=np.int64)
+    elif isinstance(bars, pd.DataFrame) and isinstance(bars.index, pd.DatetimeIndex):
+        arrays["time"] = bars.index.as_unit("s").asi8
+    else:
+        arrays["time"] = np.arange(n, dtype=np.int64)
+    return arrays
+
+
+def compute_indicators(bars: BarsLike, params: Optional[Mapping[str, Any]] = None) -> Dict[str, np.ndarray]:
+    """
+    v5 인디케이터 계산 (파라미터 중 기간 값만 사용)
+
+    Args:
+        bars: OHLCV 바
+        params: 파라미터 (resolve_params 참고)
+
+    Returns:
+        bar_arrays() 배열 + ema1, ema2, rsi, vol_mult, vcp_ratio, atr
+    """
+    p = resolve_params(params)
+    arrays = bar_arrays(bars)
+    high, low, close, volume = arrays["high"], arrays["low"], arrays["close"], arrays["volume"]
+
+    vcp_high = highest(high, p["vcp"])
+    vcp_low = lowest(low, p["vcp"])
+
+    arrays.update({
+        "ema1": ema(close, int(p["ema1"])),
+        "ema2": ema(close, int(p["ema2"])),
+        "rsi": rsi(close, int(p["rsi"])),
+        "vol_mult": _safe_div(volume, sma(volume, int(p["vol_avg"])), 1.0),
+        "vcp_ratio": _safe_div(vcp_high - vcp_low, vcp_high, 0.5),
+        "atr": atr(high, low, close, int(p["atr"])),
+    })
+    return arrays
+
+
+def trend_score(
+    indicators: Mapping[str, np.ndarray],
+    alpha: Any = DEFAULT_PARAMS["alpha"],
+    beta: Any = DEFAULT_PARAMS["beta"],
+    gamma: Any = DEFAULT_PARAMS["gamma"],
+    delta: Any = DEFAULT_PARAMS["delta"]
+) -> np.ndarray:
+    """
+    calc_trend_score() 벡터화 (가중치에 [P, 1] 배열을 주면 [P, n]으로 브로드캐스트)
+
+    Args:
+        indicators: compute_indicators() 결과
+        alpha, beta, gamma, delta: EMA/RSI/거래량/VCP 가중치
+
+    Returns:
+        0~100 trend score (RSI 워밍업 구간은 NaN)
+    """
+    ema_above = (indicators["ema1"] > indicators["ema2"]).astype(np.float64)
+    rsi_norm = indicators["rsi"] / 100.0
+    vol_norm = np.minimum(indicators["vol_mult"] / 3.0, 1.0)
+    vcp_norm = 1.0 - indicators["vcp_ratio"]
+    raw = (alpha * ema_above + beta * rsi_norm + gamma * vol_norm + delta * vcp_norm) * 100.0
+    return np.clip(raw, 0.0, 100.0)
+
+
+def signal_conditions(
+    indicators: Mapping[str, np.ndarray],
+    score: np.ndarray,
+    params: Mapping[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    매수/매도 조건 마스크 (hysteresis_len > 1이면 평활한 trend score 사용)
+
+    Args:
+        indicators: compute_indicators() 결과
+        score: trend_score() 결과
+        params: resolve_params() 결과
+
+    Returns:
+        (buy, sell) bool 배열
+    """
+    if int(params["hysteresis_len"]) > 1:
+        score = sma(score, int(params["hysteresis_len"]))
+
+    rsi_values = indicators["rsi"]
+    vol_mult = indicators["vol_mult"]
+
+    buy = (score >= params["trend_score_buy"]) & (rsi_values > params["rsi_buy_th"]) & (vol_mult > params["vol_mult_buy"])
+    sell = (score <= params["trend_score_sell"]) & (rsi_values < params["rsi_sell_th"]) & (vol_mult > params["vol_mult_sell"])
+    buy &= rsi_values < params["rsi_buy_max"]
+    sell &= rsi_values > params["rsi_sell_min"]
+
+    if params["use_ema_filter"]:
+        buy &= indicators["ema1"] > indicators["ema2"]
+        sell &= indicators["ema1"] < indicators["ema2"]
+    return buy, sell
+
+
+def apply_cooldown(buy: np.ndarray, sell: np.ndarray, cooldown_bars: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    신호 간 최소 봉 수 적용 (v2 상태 머신: 직전 신호 후 cooldown_bars 이상 지나야 발생, 같은 봉이면 매수 우선)
+
+    후보 봉만 순회하며 다음 허용 봉을 이진 탐색으로 건너뛰므로 반복 횟수 = 발생 신호 수
+
+    Args:
+        buy, sell: 조건 마스크
+        cooldown_bars: 최소 간격 (0 이하면 그대로 반환 → v5 Final)
+
+    Returns:
+        (buy, sell) 쿨다운 적용 마스크
+    """
+    if cooldown_bars <= 0:
+        return buy, sell
+
+    candidates = np.flatnonzero(buy | sell).tolist()
+    kept = []
+    pos = 0
+    while pos < len(candidates):
+        bar = candidates[pos]
+        kept.append(bar)
+        pos = bisect_left(candidates, bar + cooldown_bars, pos + 1)
+
+    kept = np.asarray(kept, dtype=np.int64)
+    out_buy = np.zeros_like(buy)
+    out_sell = np.zeros_like(sell)
+    out_buy[kept] = buy[kept]
+    out_sell[kept] = sell[kept] & ~buy[kept]
+    return out_buy, out_sell
+
+
+def sl_tp_distance(
+    indicators: Mapping[str, np.ndarray],
+    score: np.ndarray,
+    params: Mapping[str, Any]
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    calc_dynamic_sl_tp() 벡터화
+
+    Args:
+        indicators: compute_indicators() 결과
+        score: trend_score() 결과 (평활 전)
+        params: resolve_params() 결과
+
+    Returns:
+        (손절 거리, 익절 거리)
+    """
+    if params["use_atr_based"]:
+        adjustment = 1.0 + indicators["vcp_ratio"] * 0.5
+        sl_distance = indicators["atr"] * params["atr_sl_mult"] * adjustment
+        tp_distance = indicators["atr"] * params["atr_tp_mult"] * adjustment
+    else:
+        sl_distance = indicators["close"] * (params["fixed_sl_pct"] / 100.0)
+        tp_distance = indicators["close"] * (params["fixed_tp_pct"] / 100.0)
+
+    tp_distance = np.where((score >= 70) | (score <= 30), tp_distance * 1.2, tp_distance)
+    return sl_distance, tp_distance
+
+
+# ─────────────── Signals ───────────────
+
+def generate_signals(
+    bars: BarsLike,
+    params: Optional[Mapping[str, Any]] = None,
+    indicators: Optional[Mapping[str, np.ndarray]] = None
+) -> pd.DataFrame:
+    """
+    바 시계열에서 BUY/SELL 신호 스트림 재생성
+
+    Args:
+        bars: OHLCV 바 (시간 오름차순)
+        params: 파라미터 (프리셋 params / Pine 입력 이름)
+        indicators: 같은 기간 파라미터로 미리 계산한 인디케이터 (재사용 시)
+
+    Returns:
+        신호 DataFrame (SIGNAL_COLUMNS, 바 순서)
+    """
+    p = resolve_params(params)
+    ind = indicators if indicators is not None else compute_indicators(bars, p)
+
+    score = trend_score(ind, p["alpha"], p["beta"], p["gamma"], p["delta"])
+    buy, sell = signal_conditions(ind, score, p)
+    buy, sell = apply_cooldown(buy, sell, int(p["cooldown_bars"]))
+
+    # 같은 봉 BUY/SELL 동시 발생 시 (v5, 쿨다운 없음) Pine 알럿처럼 둘 다 기록 (BUY 먼저)
+    buy_rows = np.flatnonzero(buy)
+    sell_rows = np.flatnonzero(sell)
+    rows = np.concatenate([buy_rows, sell_rows])
+    is_buy = np.arange(len(rows)) < len(buy_rows)
+    signal_number = np.concatenate([np.arange(1, len(buy_rows) + 1), np.arange(1, len(sell_rows) + 1)])
+
+    order = np.argsort(rows, kind="stable")
+    rows, is_buy, signal_number = rows[order], is_buy[order], signal_number[order]
+
+    side = np.where(is_buy, 1.0, -1.0)
+    sl_distance, tp_distance = sl_tp_distance(ind, score, p)
+    close = ind["close"][rows]
+
+    return pd.DataFrame({
+        "bar_index": rows,
+        "time": ind["time"][rows],
+        "action": np.where(is_buy, "BUY", "SELL"),
+        "price": close,
+        "signal_number": signal_number,
+        "trend_score": score[rows],
+        "rsi": ind["rsi"][rows],
+        "vol_mult": ind["vol_mult"][rows],
+        "vcp_ratio": ind["vcp_ratio"][rows],
+        "ema1": ind["ema1"][rows],
+        "ema2": ind["ema2"][rows],
+        "atr": ind["atr"][rows],
+        "sl_price": close - side * sl_distance[rows],
+        "tp_price": close + side * tp_distance[rows],
+    }, columns=SIGNAL_COLUMNS)
+
+
+def generate_signals_bulk(
+    bars_by_symbol: Union[Mapping[Any, BarsLike], Iterable[Tuple[Any, BarsLike]]],
+    params: Optional[Mapping[str, Any]] = None
+) -> pd.DataFrame:
+    """
+    여러 심볼의 신호를 한 번에 재생성
+
+    Args:
+        bars_by_symbol: {심볼(또는 (심볼, tf)): 바} 또는 (키, 바) 이터러블
+        params: 파라미터
+
+    Returns:
+        symbol 컬럼이 추가된 신호 DataFrame
+    """
+    items = bars_by_symbol.items() if isinstance(bars_by_symbol, Mapping) else bars_by_symbol
+    frames = []
+    for key, bars in items:
+        signals = generate_signals(bars, params)
+        if len(signals):
+            signals.insert(0, "symbol", [key] * len(signals) if isinstance(key, tuple) else key)
+            frames.append(signals)
+
+    if not frames:
+        return pd.DataFrame(columns=["symbol"] + SIGNAL_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+# 웹훅 알럿 필수 실수 필드 (워밍업으로 NaN이면 Pine 알럿도 유효한 JSON이 아니므로 제외)
+ALERT_REQUIRED_FIELDS = ("price", "trend_score", "rsi", "vol_mult", "vcp_ratio", "ema1", "ema2")
+
+
+def signal_records(
+    signals: pd.DataFrame,
+    symbol: str,
+    timeframe: str,
+    mode: str = "predictive",
+    version: str = "vmsi_sdm_v5_final"
+) -> List[Dict[str, Any]]:
+    """
+    신호 DataFrame → /alert 페이로드 딕셔너리 목록 (TradingViewAlert 형식, 일괄 변환)
+
+    Args:
+        signals: generate_signals() 결과
+        symbol: 심볼
+        timeframe: 타임프레임 (1W, 1D 등)
+        mode: 데이터 소스 표시 (predictive, yfinance, real_data 등)
+        version: 인디케이터 버전 문자열
+
+    Returns:
+        알럿 딕셔너리 목록 (필수 값이 NaN인 워밍업 신호 제외, signal_number는 제외 후 방향별 1부터)
+    """
+    complete = np.isfinite(signals[list(ALERT_REQUIRED_FIELDS)].to_numpy(dtype=np.float64)).all(axis=1)
+    signals = signals[complete]
+    # 워밍업 신호를 뺀 뒤 방향별로 다시 번호 매김 (Pine 방향별 카운터처럼 1부터 연속)
+    signal_number = signals.groupby("action", sort=False).cumcount() + 1
+
+    def optional(column: str) -> pd.Series:
+        values = signals[column].astype(object)
+        return values.where(signals[column].notna(), None)
+
+    records = pd.DataFrame({
+        "ts_unix": signals["time"].astype(np.int64),
+        "symbol": symbol,
+        "timeframe": timeframe,
+        "action": signals["action"],
+        "price": signals["price"],
+        "signal_number": signal_number.astype(np.int64),
+        "trend_score": signals["trend_score"],
+        "prob": signals["trend_score"] / 100.0,
+        "rsi": signals["rsi"],
+        "vol_mult": signals["vol_mult"],
+        "vcp_ratio": signals["vcp_ratio"],
+        "dist_ath": 0.0,
+        "ema1": signals["ema1"],
+        "ema2": signals["ema2"],
+        "sl_price": optional("sl_price"),
+        "tp_price": optional("tp_price"),
+        "atr": optional("atr"),
+        "bar_state": "close",
+        "fast_mode": False,
+        "realtime_macro": False,
+        "mode": mode,
+        "version": version,
+    })
+    return records.to_dict("records")
+
+
+# ─────────────── Parameter grid ───────────────
+
+# 그리드로 바꿀 수 있는 파라미터 (기간 파라미터는 인디케이터를 공유해야 하므로 제외)
+GRID_PARAM_KEYS = (
+    "trend_score_buy", "rsi_buy_th", "vol_mult_buy", "rsi_buy_max",
+    "trend_score_sell", "rsi_sell_th", "vol_mult_sell", "rsi_sell_min",
+    "alpha", "beta", "gamma", "delta",
+    "hysteresis_len", "cooldown_bars", "use_ema_filter",
+)
+
+
+def params_matrix(params: Union[pd.DataFrame, Iterable[Mapping[str, Any]]]) -> Dict[str, np.ndarray]:
+    """
+    파라미터 조합 P개 → 키별 길이 P 배열 (없는 키는 v5 기본값)
+
+    Args:
+        params: P행 DataFrame (컬럼 = 프리셋/Pine 키) 또는 파라미터 딕셔너리 목록
+
+    Returns:
+        {GRID_PARAM_KEYS: [P] 배열}
+    """
+    if isinstance(params, pd.DataFrame):
+        frame = params.rename(columns=PARAM_ALIASES)
+    else:
+        frame = pd.DataFrame([{PARAM_ALIASES.get(k, k): v for k, v in p.items()} for p in params])
+
+    matrix = {}
+    for key in GRID_PARAM_KEYS:
+        values = frame[key].to_numpy() if key in frame else np.full(len(frame), DEFAULT_PARAMS[key])
+        if key in ("hysteresis_len", "cooldown_bars"):
+            matrix[key] = values.astype(np.int64)
+        elif key == "use_ema_filter":
+            matrix[key] = values.astype(bool)
+        else:
+            matrix[key] = values.astype(np.float64)
+    return matrix
+
+
+def _row_sma(values: np.ndarray, length: int, missing: np.ndarray) -> np.ndarray:
+    """
+    [P, n] 행별 SMA (ta.sma와 동일하게 창 안에 결측 봉이 있으면 NaN)
+
+    Args:
+        values: [P, n] 값 (결측 봉은 0으로 채워 둔 상태)
+        length: 창 길이
+        missing: [n] 모든 행에 공통인 결측 봉 마스크
+    """
+    n = values.shape[1]
+    out = np.full(values.shape, np.nan)
+    if length > n:
+        return out
+
+    csum = np.zeros((values.shape[0], n + 1))
+    np.cumsum(values, axis=1, out=csum[:, 1:])
+    cmiss = np.concatenate(([0], np.cumsum(missing)))
+    window_missing = (cmiss[length:] - cmiss[:-length]) > 0
+
+    out[:, length - 1:] = (csum[:, length:] - csum[:, :-length]) / length
+    out[:, length - 1:][:, window_missing] = np.nan
+    return out
+
+
+def _grid_cooldown(buy: np.ndarray, sell: np.ndarray, cooldown: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    [P, n] 조건에 행별 쿨다운을 동시에 적용하는 상태 스캔
+
+    후보가 하나라도 있는 봉만 순회하며, 각 봉에서 P개 행의 마지막 신호 봉을 벡터로 갱신합니다.
+
+    Args:
+        buy, sell: [P, n] 조건 마스크
+        cooldown: [P] 최소 간격 (0 이하 행은 조건 그대로)
+
+    Returns:
+        (buy, sell) 쿨다운 적용 마스크
+    """
+    active = cooldown > 0
+    if not active.any():
+        return buy, sell
+
+    rows = np.flatnonzero(active)
+    candidate = buy[rows] | sell[rows]
+    columns = np.flatnonzero(candidate.any(axis=0))
+
+    # 봉 단위로 순회하므로 [m, P'] 연속 배열로 전치
+    candidate_t = np.ascontiguousarray(candidate[:, columns].T)
+    emitted_t = np.zeros_like(candidate_t)
+    last = np.full(len(rows), np.iinfo(np.int64).min // 2)
+    row_cooldown = cooldown[rows]
+
+    for j, bar in enumerate(columns):
+        allowed = candidate_t[j] & (bar - last >= row_cooldown)
+        emitted_t[j] = allowed
+        last[allowed] = bar
+
+    emitted = np.zeros(candidate.shape, dtype=bool)
+    emitted[:, columns] = emitted_t.T
+
+    out_buy = buy.copy()
+    out_sell = sell.copy()
+    out_buy[rows] = emitted & buy[rows]
+    out_sell[rows] = emitted & sell[rows] & ~buy[rows]
+    return out_buy, out_sell
+
+
+def grid_signal_masks(
+    indicators: Mapping[str, np.ndarray],
+    params: Union[pd.DataFrame, Iterable[Mapping[str, Any]], Mapping[str, np.ndarray]],
+    chunk_elements: int = 4_000_000
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    파라미터 조합 P개의 BUY/SELL 신호 마스크를 한 번에 계산
+
+    인디케이터는 공유하고, trend score는 [P, 4] 가중치 × [4, n] 정규화 피처 행렬곱,
+    임계값 비교는 [P, 1] 브로드캐스트, 히스테리시스는 길이별 행 SMA,
+    쿨다운은 후보 봉만 도는 상태 스캔으로 처리합니다 (generate_signals와 같은 규칙).
+
+    Args:
+        indicators: compute_indicators() 결과 (기간 파라미터는 모든 조합 공통)
+        params: P행 DataFrame / 딕셔너리 목록 / params_matrix() 결과
+        chunk_elements: 한 번에 계산할 P × n 원소 수 (메모리 상한)
+
+    Returns:
+        (buy, sell) [P, n] bool 배열
+    """
+    is_matrix = isinstance(params, Mapping) and all(key in params for key in GRID_PARAM_KEYS)
+    grid = params if is_matrix else params_matrix(params)
+    n_params = len(grid["alpha"])
+    n = len(indicators["close"])
+
+    # 정규화 피처 [4, n] (calc_trend_score 항 순서: EMA, RSI, 거래량, VCP)
+    features = np.vstack([
+        (indicators["ema1"] > indicators["ema2"]).astype(np.float64),
+        indicators["rsi"] / 100.0,
+        np.minimum(indicators["vol_mult"] / 3.0, 1.0),
+        1.0 - indicators["vcp_ratio"],
+    ])
+    warmup = np.isnan(features).any(axis=0)
+    features = np.where(np.isnan(features), 0.0, features)
+    ema_up = indicators["ema1"] > indicators["ema2"]
+    ema_down = indicators["ema1"] < indicators["ema2"]
+    rsi_values = indicators["rsi"]
+    vol_mult = indicators["vol_mult"]
+
+    buy = np.zeros((n_params, n), dtype=bool)
+    sell = np.zeros((n_params, n), dtype=bool)
+    chunk = max(1, chunk_elements // max(n, 1))
+
+    for start in range(0, n_params, chunk):
+        part = slice(start, min(start + chunk, n_params))
+        weights = np.column_stack([grid["alpha"][part], grid["beta"][part], grid["gamma"][part], grid["delta"][part]])
+        score = np.clip(weights @ features * 100.0, 0.0, 100.0)
+
+        hysteresis = grid["hysteresis_len"][part]
+        for length in np.unique(hysteresis[hysteresis > 1]):
+            rows = np.flatnonzero(hysteresis == length)
+            score[rows] = _row_sma(score[rows], int(length), warmup)
+        score[:, warmup] = np.nan
+
+        def col(key: str, part: slice = part) -> np.ndarray:
+            return grid[key][part][:, None]
+
+        part_buy = (score >= col("trend_score_buy")) & (rsi_values > col("rsi_buy_th")) & (vol_mult > col("vol_mult_buy"))
+        part_sell = (score <= col("trend_score_sell")) & (rsi_values < col("rsi_sell_th")) & (vol_mult > col("vol_mult_sell"))
+        part_buy &= rsi_values < col("rsi_buy_max")
+        part_sell &= rsi_values > col("rsi_sell_min")
+
+        ema_filter = grid["use_ema_filter"][part]
+        if ema_filter.any():
+            part_buy[ema_filter] &= ema_up
+            part_sell[ema_filter] &= ema_down
+
+        buy[part], sell[part] = part_buy, part_sell
+
+    # 쿨다운 스캔은 전체 P에 대해 한 번 (봉당 P 벡터 연산)
+    return _grid_cooldown(buy, sell, grid["cooldown_bars"])
+
+
+# ─────────────── Golden check ───────────────
+
+def compare_with_export(
+    export: pd.DataFrame,
+    params: Optional[Mapping[str, Any]] = None,
+    warmup: Optional[int] = None,
+    rtol: float = 1e-3
+) -> Dict[str, Any]:
+    """
+    TradingView 차트 내보내기(CSV)와 계산 결과 비교
+
+    내보내기 시작 시점 이전 이력이 없어 EMA/RMA 초기값이 다르므로 warmup 봉 이후만 비교합니다.
+    플롯 컬럼(EMA1, EMA2, 있으면 RSI/Trend)과 신호 컬럼(Buy/Sell, 값이 있으면 발생)을 확인합니다.
+
+    Args:
+        export: TradingView CSV DataFrame (time, open, high, low, close, Volume, EMA1, EMA2, ...)
+        params: 차트에 적용한 파라미터
+        warmup: 비교 제외 봉 수 (기본: 최장 기간 × 5)
+        rtol: 상대 허용 오차
+
+    Returns:
+        {'compared_bars', 'columns': {이름: 최대 상대오차}, 'signal_mismatches': {이름: 불일치 수}, 'ok'}
+    """
+    p = resolve_params(params)
+    ind = compute_indicators(export, p)
+    score = trend_score(ind, p["alpha"], p["beta"], p["gamma"], p["delta"])
+    buy, sell = apply_cooldown(*signal_conditions(ind, score, p), int(p["cooldown_bars"]))
+
+    if warmup is None:
+        warmup = 5 * max(int(p[key]) for key in INDICATOR_LENGTH_KEYS)
+    window = slice(warmup, None)
+
+    computed = {"EMA1": ind["ema1"], "EMA2": ind["ema2"], "RSI": ind["rsi"], "Trend": score}
+    columns = {}
+    for name, values in computed.items():
+        if name not in export:
+            continue
+        expected = export[name].to_numpy(dtype=np.float64)[window]
+        actual = values[window]
+        both = np.isfinite(expected) & np.isfinite(actual)
+        error = np.abs(actual[both] - expected[both]) / np.maximum(np.abs(expected[both]), 1e-12)
+        columns[name] = float(error.max()) if len(error) else 0.0
+
+    signal_mismatches = {}
+    for name, flags in (("Buy", buy), ("Sell", sell)):
+        if name not in export:
+            continue
+        expected = export[name].notna().to_numpy() & (export[name].fillna(0).to_numpy() != 0)
+        signal_mismatches[name] = int((expected[window] != flags[window]).sum())
+
+    return {
+        "compared_bars": max(len(export) - warmup, 0),
+        "columns": columns,
+        "signal_mismatches": signal_mismatches,
+        "ok": all(error <= rtol for error in columns.values()) and not any(signal_mismatches.values()),
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="VMSI-SDM v5 indicator (vectorized)")
+    parser.add_argument("--golden", type=str, required=True, help="TradingView chart export CSV")
+    parser.add_argument("--preset", type=str, default=None, help="Preset JSON applied on the chart")
+    parser.add_argument("--warmup", type=int, default=None, help="Bars to skip before comparing")
+    args = parser.parse_args()
+
+    preset_params = None
+    if args.preset:
+        with open(args.preset, "r", encoding="utf-8") as f:
+            preset_params = json.load(f).get("params", {})
+
+    result = compare_with_export(pd.read_csv(args.golden), preset_params, warmup=args.warmup)
+    print(f"Compared {result['compared_bars']} bars")
+    for name, error in result["columns"].items():
+        print(f"  {'✓' if error <= 1e-3 else '❌'} {name}: max rel error {error:.2e}")
+    for name, mismatches in result["signal_mismatches"].items():
+        print(f"  {'✓' if mismatches == 0 else '❌'} {name}: {mismatches} mismatched bars")
+    print("[OK] Matches TradingView export" if result["ok"] else "❌ Export mismatch")
@@ -0,0 +1,689 @@
+"""
+VMSI-SDM Ingestion Helpers
+TradingView 알럿 → Signal 행 변환 및 벌크 저장
+"""
+
+import json
+import queue
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union, get_args
+
+import numpy as np
+import pandas as pd
+from pydantic import ValidationError
+from sqlalchemy import exc, insert
+from sqlalchemy.orm import Session
+
+from server.db import (
+    FEATURE_COLUMNS, TS_MILLIS_THRESHOLD, IngestDeadLetter, SessionLocal, Signal, bulk_insert_raw,
+    extract_feature_columns, ts_to_seconds
+)
+from server.schemas import TradingViewAlert
+from server.stats import record_counts, record_signals
+
+
+def alert_to_signal_row(alert: TradingViewAlert) -> Dict[str, Any]:
+    """
+    TradingViewAlert를 signals 테이블 INSERT용 dict로 변환
+
+    Args:
+        alert: 검증된 알럿 페이로드
+
+    Returns:
+        Signal 컬럼 매핑 dict (승격 피처 컬럼 포함)
+    """
+    features_json = {
+        "price": alert.price,
+        "trend_score": alert.trend_score,
+        "prob": alert.prob,
+        "rsi": alert.rsi,
+        "vol_mult": alert.vol_mult,
+        "vcp_ratio": alert.vcp_ratio,
+        "dist_ath": alert.dist_ath,
+        "ema1": alert.ema1,
+        "ema2": alert.ema2,
+        "bar_state": alert.bar_state,
+        "fast_mode": alert.fast_mode,
+        "realtime_macro": alert.realtime_macro,
+        "version": alert.version,
+        "signal_number": alert.signal_number,
+        "sl_price": alert.sl_price,
+        "tp_price": alert.tp_price,
+        "atr": alert.atr,
+        "mode": alert.mode
+    }
+
+    return {
+        "ts": str(alert.ts_unix),
+        "ts_sec": ts_to_seconds(alert.ts_unix),
+        "symbol": alert.symbol,
+        "tf": alert.timeframe,
+        "signal": alert.action,
+        "features_json": features_json,
+        "params_json": {},  # Params는 features에 포함
+        **extract_feature_columns(features_json)
+    }
+
+
+def validate_alerts(items: Iterable[Any]) -> Tuple[List[Tuple[int, TradingViewAlert]], List[Tuple[int, str]]]:
+    """
+    알럿 페이로드 목록 검증
+
+    Args:
+        items: dict 페이로드 (또는 파싱 실패 시 예외 객체) 목록
+
+    Returns:
+        ([(index, alert)], [(index, error)])
+    """
+    valid = []
+    errors = []
+
+    for i, item in enumerate(items):
+        if isinstance(item, Exception):
+            errors.append((i, f"Invalid JSON: {item}"))
+            continue
+        try:
+            valid.append((i, TradingViewAlert.model_validate(item)))
+        except ValidationError as e:
+            errors.append((i, "; ".join(
+                f"{'.'.join(str(p) for p in err['loc'])}: {err['msg']}" for err in e.errors()
+            )))
+
+    return valid, errors
+
+
+def parse_ndjson_lines(lines: Iterable[str]) -> List[Any]:
+    """
+    NDJSON 라인 파싱 (빈 줄 무시, 파싱 실패 라인은 예외 객체로 보존)
+
+    Args:
+        lines: NDJSON 텍스트 라인
+
+    Returns:
+        dict 또는 ValueError 목록 (입력 순서 유지)
+    """
+    items = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError as e:
+            items.append(e)
+    return items
+
+
+def bulk_insert_signals(db: Session, rows: List[Dict[str, Any]]) -> List[int]:
+    """
+    Signal 행들을 단일 executemany INSERT로 저장하고 stats 카운터 증분 (커밋은 호출자 책임)
+
+    Args:
+        db: DB 세션
+        rows: alert_to_signal_row() 결과 목록 (created_at 없는 행은 현재 UTC로 채움)
+
+    Returns:
+        입력 순서와 동일한 signal id 목록
+    """
+    if not rows:
+        return []
+
+    # 카운터 일자 / 스트림 이벤트의 created_at이 저장 값과 같도록 기본값을 미리 채움
+    now = datetime.utcnow()
+    for row in rows:
+        if not row.get("created_at"):
+            row["created_at"] = now
+    result = db.execute(
+        insert(Signal).returning(Signal.id, sort_by_parameter_order=True),
+        rows
+    )
+    record_signals(db, rows)
+    return list(result.scalars())
+
+
+# ─────────────── Write-Behind Buffer ───────────────
+
+class IngestQueueFull(Exception):
+    """쓰기 버퍼가 가득 찬 경우 (호출자는 429로 응답)"""
+
+
+def is_transient_error(error: Exception) -> bool:
+    """
+    재시도하면 성공할 수 있는 DB 오류인지 판정
+
+    연결 끊김 / 풀 타임아웃 / OperationalError(잠금, 연결 실패 등)는 일시적,
+    제약 조건 위반 / 데이터 오류 / 바인딩 오류 등은 같은 행으로 다시 시도해도 실패합니다.
+    """
+    if isinstance(error, exc.DBAPIError) and error.connection_invalidated:
+        return True
+    return isinstance(error, (exc.OperationalError, exc.DisconnectionError, exc.TimeoutError))
+
+
+class WriteBehindBuffer:
+    """
+    웹훅 응답과 DB 커밋을 분리하는 인프로세스 쓰기 버퍼
+
+    핸들러는 submit()으로 행을 큐에 넣고 즉시 반환하며,
+    백그라운드 flusher 스레드가 batch_size 행 또는 flush_interval_ms 마다
+    그룹 커밋합니다.
+
+    그룹 커밋이 max_retries회 연속 실패하면 배치를 행 단위로 나눠 커밋합니다.
+    일시적 오류(is_transient_error)로 실패한 행은 큐에 남아 재시도하고,
+    그 외 오류로 실패한 행은 ingest_dead_letters 테이블(기록 실패 시 로그)로 옮겨
+    한 행 때문에 이후 수집 전체가 막히지 않도록 합니다.
+    """
+
+    def __init__(
+        self,
+        session_factory: Callable[[], Session] = SessionLocal,
+        max_queue: int = 10000,
+        batch_size: int = 500,
+        flush_interval_ms: int = 50,
+        max_retries: int = 3,
+        on_insert: Optional[Callable[[Session, List[Tuple[str, int, Dict[str, Any]]]], None]] = None,
+        on_commit: Optional[Callable[[List[Tuple[str, int, Dict[str, Any]]]], None]] = None
+    ):
+        """
+        Args:
+            session_factory: flusher 전용 세션 생성 함수
+            max_queue: 큐 최대 길이 (초과 시 IngestQueueFull)
+            batch_size: 그룹 커밋 최대 행 수
+            flush_interval_ms: 첫 행 대기 후 최대 지연 (밀리초)
+            max_retries: 그룹 커밋 연속 실패 허용 횟수 (초과 시 행 단위 커밋)
+            on_insert: INSERT 직후 같은 트랜잭션에서 (db, [(provisional_id, signal_id, row)]) 콜백
+            on_commit: 커밋 후 [(provisional_id, signal_id, row)] 콜백
+        """
+        self.session_factory = session_factory
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000.0
+        self.max_retries = max_retries
+        self.on_insert = on_insert
+        self.on_commit = on_commit
+
+        self._queue: "queue.Queue[Tuple[str, Dict[str, Any]]]" = queue.Queue(maxsize=max_queue)
+        self._pending: List[Tuple[str, Dict[str, Any]]] = []
+        self._attempts = 0  # _pending 배치의 연속 실패 횟수
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self.committed = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dead_lettered = 0
+
+    def start(self):
+        """flusher 스레드 시작"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="ingest-flusher", daemon=True)
+        self._thread.start()
+
+    def submit(self, row: Dict[str, Any]) -> str:
+        """
+        Signal 행을 큐에 등록
+
+        Args:
+            row: alert_to_signal_row() 결과
+
+        Returns:
+            임시 ID (provisional_id)
+
+        Raises:
+            IngestQueueFull: 큐가 가득 찬 경우
+        """
+        if self._stop.is_set():
+            raise IngestQueueFull("Ingest buffer is shutting down")
+
+        provisional_id = uuid.uuid4().hex
+        try:
+            self._queue.put_nowait((provisional_id, row))
+        except queue.Full:
+            raise IngestQueueFull(f"Ingest queue is full ({self._queue.maxsize} rows)")
+        return provisional_id
+
+    def stop(self, drain: bool = True, timeout: float = 30.0):
+        """
+        flusher 중지
+
+        Args:
+            drain: True면 큐에 남은 행을 모두 커밋한 뒤 종료
+            timeout: 최대 대기 시간 (초)
+        """
+        self._stop.set()
+        if self._thread is not None:
+            # 진행 중인 flush가 끝날 때까지 대기 (아래 drain과 같은 배치를 동시에 커밋하지 않도록)
+            self._thread.join()
+            self._thread = None
+
+        if drain:
+            deadline = time.monotonic() + timeout
+            while (self._pending or not self._queue.empty()) and time.monotonic() < deadline:
+                self._collect(block=False)
+                if not self._flush():
+                    time.sleep(0.1)
+
+        lost = len(self._pending) + self._queue.qsize()
+        if lost:
+            print(f"❌ Ingest buffer stopped with {lost} uncommitted rows")
+
+    def stats(self) -> Dict[str, Any]:
+        """버퍼 상태"""
+        return {
+            "queued": self._queue.qsize() + len(self._pending),
+            "capacity": self._queue.maxsize,
+            "committed": self.committed,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dead_lettered": self.dead_lettered,
+        }
+
+    def _run(self):
+        """flusher 루프: batch_size 또는 flush_interval 도달 시 커밋"""
+        while not self._stop.is_set():
+            self._collect(block=True)
+            if self._pending and not self._flush():
+                time.sleep(min(1.0, self.flush_interval * 10))  # DB 오류 시 백오프 후 재시도
+
+    def _collect(self, block: bool):
+        """큐에서 최대 batch_size 행을 _pending으로 이동"""
+        deadline = None
+        while len(self._pending) < self.batch_size:
+            try:
+                if block and not self._pending:
+                    item = self._queue.get(timeout=0.2)
+                    deadline = time.monotonic() + self.flush_interval
+                elif block and deadline is not None:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    item = self._queue.get(timeout=remaining)
+                else:
+                    item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._pending.append(item)
+
+    def _flush(self) -> bool:
+        """
+        _pending 행 그룹 커밋
+
+        실패 시 행을 유지하고 False 반환하며, max_retries회 연속 실패하면 행 단위로 커밋합니다.
+        """
+        if not self._pending:
+            return True
+
+        batch = self._pending
+        try:
+            committed = self._insert(batch)
+        except Exception as e:
+            self.failures += 1
+            self._attempts += 1
+            if self._attempts < self.max_retries:
+                print(f"❌ Ingest flush failed ({len(batch)} rows, attempt {self._attempts}/{self.max_retries}): {e}")
+                return False
+            print(f"⚠️  Ingest flush failed {self._attempts} times, committing {len(batch)} rows one by one: {e}")
+            return self._flush_rows()
+
+        self._pending = []
+        self._attempts = 0
+        self.flushes += 1
+        self._committed(committed)
+        return True
+
+    def _flush_rows(self) -> bool:
+        """
+        _pending 행을 한 행씩 커밋 (실패 행: 일시적 오류면 유지, 그 외는 dead-letter)
+
+        Returns:
+            모든 행을 처리했으면 True (일시적 오류로 남은 행이 있으면 False)
+        """
+        committed = []
+        remaining = []
+        for index, item in enumerate(self._pending):
+            try:
+                committed.extend(self._insert([item]))
+            except Exception as e:
+                if is_transient_error(e):
+                    # DB를 사용할 수 없는 상태 → 나머지 행도 그대로 두고 백오프 후 재시도
+                    remaining = self._pending[index:]
+                    break
+                self._dead_letter(item, e)
+
+        self._pending = remaining
+        self._attempts = 0
+        self.flushes += bool(committed)
+        self._committed(committed)
+        return not remaining
+
+    def _insert(self, batch: List[Tuple[str, Dict[str, Any]]]) -> List[Tuple[str, int, Dict[str, Any]]]:
+        """배치 INSERT + on_insert 후 커밋 (실패 시 롤백 후 예외 전달)"""
+        db = self.session_factory()
+        try:
+            signal_ids = bulk_insert_signals(db, [row for _, row in batch])
+            committed = [
+                (provisional_id, signal_id, row)
+                for (provisional_id, row), signal_id in zip(batch, signal_ids)
+            ]
+            if self.on_insert is not None:
+                self.on_insert(db, committed)
+            db.commit()
+            return committed
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    def _dead_letter(self, item: Tuple[str, Dict[str, Any]], error: Exception):
+        """저장할 수 없는 행을 ingest_dead_letters에 기록 (기록도 실패하면 로그로 남김)"""
+        provisional_id, row = item
+        self.dead_lettered += 1
+        print(f"❌ Ingest row {provisional_id} moved to dead letters: {error}")
+
+        db = self.session_factory()
+        try:
+            db.add(IngestDeadLetter(
+                provisional_id=provisional_id,
+                row_json=json.loads(json.dumps(row, default=str)),
+                error=str(error)
+            ))
+            db.commit()
+        except Exception as e:
+            db.rollback()
+            print(f"❌ Dead letter write failed ({e}), row: {json.dumps(row, default=str)}")
+        finally:
+            db.close()
+
+    def _committed(self, committed: List[Tuple[str, int, Dict[str, Any]]]):
+        """커밋 카운트 갱신 후 on_commit 콜백"""
+        if not committed:
+            return
+        self.committed += len(committed)
+
+        if self.on_commit is not None:
+            try:
+                self.on_commit(committed)
+            except Exception as e:
+                print(f"❌ Ingest on_commit callback failed: {e}")
+
+
+# ─────────────── Direct Bulk Import ───────────────
+
+# alert_to_signal_row()의 features_json 키 순서
+FEATURE_JSON_FIELDS = [
+    "price", "trend_score", "prob", "rsi", "vol_mult", "vcp_ratio", "dist_ath", "ema1", "ema2",
+    "bar_state", "fast_mode", "realtime_macro", "version", "signal_number", "sl_price", "tp_price",
+    "atr", "mode"
+]
+
+SIGNAL_INSERT_COLUMNS = ["ts", "ts_sec", "symbol", "tf", "signal", "features_json", "params_json", *FEATURE_COLUMNS, "created_at"]
+
+_BOUND_MESSAGES = {
+    "ge": ("greater than or equal to", np.less),
+    "gt": ("greater than", np.less_equal),
+    "le": ("less than or equal to", np.greater),
+    "lt": ("less than", np.greater_equal),
+}
+
+_BOOL_VALUES = {
+    "true": True, "t": True, "yes": True, "y": True, "on": True, "1": True,
+    "false": False, "f": False, "no": False, "n": False, "off": False, "0": False,
+}
+
+
+def _to_bool(value: Any) -> Optional[bool]:
+    """pydantic bool 변환 규칙 (문자열 true/false/yes/no/on/off/1/0, 숫자 0/1)"""
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, str):
+        return _BOOL_VALUES.get(value.strip().lower())
+    if isinstance(value, (int, float, np.integer, np.floating)) and value in (0, 1):
+        return bool(value)
+    return None
+
+
+def _alert_field_rules() -> Dict[str, Tuple[type, bool, List[Tuple[str, float]]]]:
+    """TradingViewAlert 필드 → (기본 타입, 필수 여부, [(ge/le.., 경계값)]) (스키마와 같은 규칙 공유)"""
+    rules = {}
+    for name, field in TradingViewAlert.model_fields.items():
+        base = next((arg for arg in get_args(field.annotation) if arg is not type(None)), field.annotation)
+        bounds = [
+            (op, getattr(meta, op))
+            for meta in field.metadata for op in _BOUND_MESSAGES if getattr(meta, op, None) is not None
+        ]
+        rules[name] = (base, field.is_required(), bounds)
+    return rules
+
+
+ALERT_FIELD_RULES = _alert_field_rules()
+
+
+def validate_alert_frame(frame: pd.DataFrame) -> Tuple[pd.DataFrame, List[Tuple[Any, str]]]:
+    """
+    알럿 DataFrame 벡터화 검증 (validate_alerts와 같은 TradingViewAlert 규칙, 컬럼 단위 처리)
+
+    - 필수 필드 누락/NaN, 숫자/정수/불리언 변환 실패, 문자열 아닌 str 필드, ge/le 경계 위반을 행별 에러로 수집
+    - 선택 필드의 NaN은 None으로 처리
+
+    Args:
+        frame: 알럿 필드 컬럼을 가진 DataFrame (행 = 알럿 1개)
+
+    Returns:
+        (타입 정규화된 유효 행 DataFrame, [(index, error)])
+    """
+    n = len(frame)
+    out = pd.DataFrame(index=frame.index)
+    failures: List[Tuple[np.ndarray, str]] = []
+
+    def fail(mask: np.ndarray, name: str, message: str):
+        if mask.any():
+            failures.append((mask, f"{name}: {message}"))
+
+    for name, (base, required, bounds) in ALERT_FIELD_RULES.items():
+        if name not in frame:
+            if required:
+                fail(np.ones(n, dtype=bool), name, "Field required")
+            out[name] = None
+            continue
+
+        raw = frame[name]
+        missing = raw.isna().to_numpy()
+        if required:
+            fail(missing, name, "Field required")
+
+        if base in (int, float):
+            values = pd.to_numeric(raw, errors="coerce").to_numpy(dtype=np.float64)
+            unparsed = ~missing & np.isnan(values)
+            is_text = raw.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool) if unparsed.any() else unparsed
+            fail(unparsed & is_text, name, "Input should be a valid number, unable to parse string as a number")
+            fail(unparsed & ~is_text, name, "Input should be a valid number")
+            if base is int:
+                fail(np.isfinite(values) & (values != np.floor(values)), name,
+                     "Input should be a valid integer, got a number with a fractional part")
+            for op, bound in bounds:
+                label, violates = _BOUND_MESSAGES[op]
+                fail(violates(values, bound, where=~np.isnan(values), out=np.zeros(n, dtype=bool)), name,
+                     f"Input should be {label} {bound}")
+            out[name] = values
+        elif base is bool:
+            mapped = raw.map(_to_bool, na_action="ignore").astype(object)
+            fail(~missing & mapped.isna().to_numpy(), name, "Input should be a valid boolean")
+            out[name] = mapped
+        else:
+            # pydantic str 필드는 숫자 등 다른 타입을 문자열로 변환하지 않고 거부
+            is_text = raw.map(lambda v: isinstance(v, str)).to_numpy(dtype=bool)
+            fail(~missing & ~is_text, name, "Input should be a valid string")
+            out[name] = raw
+
+    invalid = np.zeros(n, dtype=bool)
+    for mask, _ in failures:
+        invalid |= mask
+    errors = [
+        (index, "; ".join(message for mask, message in failures if mask[row]))
+        for row, index in zip(np.flatnonzero(invalid), frame.index[invalid])
+    ]
+
+    valid = out[~invalid]
+    for name, (base, _, _) in ALERT_FIELD_RULES.items():
+        if base is int:
+            valid[name] = valid[name].astype("Int64")
+    return valid, errors
+
+
+def _json_literals(values: pd.Series) -> List[str]:
+    """컬럼 값 → json.dumps()와 같은 JSON 리터럴 문자열 (결측은 null)"""
+    if values.dtype == np.float64 or isinstance(values.dtype, pd.Int64Dtype):
+        arr = values.to_numpy(dtype=np.float64, na_value=np.nan)
+        if values.dtype == np.float64:
+            literals = list(map(float.__repr__, arr.tolist()))
+        else:
+            literals = list(map(int.__repr__, values.fillna(0).astype(np.int64).tolist()))
+        for i in np.flatnonzero(~np.isfinite(arr)):
+            literals[i] = "null" if np.isnan(arr[i]) else ("Infinity" if arr[i] > 0 else "-Infinity")
+        return literals
+
+    codes, uniques = pd.factorize(values.astype(object), use_na_sentinel=True)
+    table = np.array([json.dumps(value.item() if hasattr(value, "item") else value) for value in uniques] + ["null"],
+                     dtype=object)
+    return table[codes].tolist()
+
+
+# json.dumps(features_json) 형식 템플릿
+_FEATURE_JSON_TEMPLATE = "{{" + ", ".join(f'"{key}": {{}}' for key in FEATURE_JSON_FIELDS) + "}}"
+
+
+def alert_frame_rows(frame: pd.DataFrame, created_at: Optional[datetime] = None) -> List[Tuple[Any, ...]]:
+    """
+    검증된 알럿 DataFrame → bulk_insert_raw()용 signals 행 튜플 (SIGNAL_INSERT_COLUMNS 순서)
+
+    features_json / 승격 피처 컬럼은 alert_to_signal_row()와 같은 값을 만들며,
+    JSON 문자열은 행 dict 없이 컬럼 단위로 조립합니다.
+
+    Args:
+        frame: validate_alert_frame() 결과
+        created_at: 생성 시각 (기본: 현재 UTC)
+
+    Returns:
+        행 튜플 목록
+    """
+    if frame.empty:
+        return []
+
+    created_at = created_at or datetime.utcnow()
+    literals = [_json_literals(frame[field]) for field in FEATURE_JSON_FIELDS]
+    features_json = [_FEATURE_JSON_TEMPLATE.format(*row) for row in zip(*literals)]
+
+    promoted = []
+    for column in FEATURE_COLUMNS:
+        values = frame[column].to_numpy(dtype=np.float64)
+        promoted.append(np.where(np.isnan(values), None, values).tolist())
+
+    n = len(frame)
+    ts = frame["ts_unix"].astype("int64")
+    return list(zip(
+        ts.astype(str).tolist(),
+        np.where(ts > TS_MILLIS_THRESHOLD, ts // 1000, ts).tolist(),
+        frame["symbol"].tolist(),
+        frame["timeframe"].tolist(),
+        frame["action"].tolist(),
+        features_json,
+        ["{}"] * n,
+        *promoted,
+        [created_at] * n
+    ))
+
+
+def bulk_import_alerts(
+    chunks: Iterable[Union[pd.DataFrame, List[Dict[str, Any]]]],
+    session_factory: Callable[[], Session] = SessionLocal,
+    enqueue_labels: bool = True,
+    defer_indexes: bool = False,
+    max_errors: int = 20,
+    verbose: bool = True
+) -> Dict[str, Any]:
+    """
+    알럿 청크를 서버 없이 DB에 직접 벌크 저장 (/alerts/batch와 같은 검증 규칙)
+
+    청크마다 벡터화 검증 → executemany INSERT → 커밋하고,
+    마지막에 벌크 라벨링 작업 1건만 등록합니다 (서버 워커 풀이 소비).
+    defer_indexes면 signals 보조 인덱스를 삭제 후 적재하고 끝에 다시 생성합니다
+    (대량 적재 시 행별 인덱스 갱신보다 빠름, 적재 중 조회는 느려짐).
+
+    Args:
+        chunks: 알럿 DataFrame 또는 dict 목록 이터러블 (청크당 1 트랜잭션)
+        session_factory: 세션 생성 함수
+        enqueue_labels: BUY/SELL 저장 시 벌크 라벨링 작업 등록 여부
+        defer_indexes: 적재 중 signals 보조 인덱스 삭제 후 재생성
+        max_errors: 결과에 보관할 최대 에러 수
+        verbose: 청크별 진행 로그 출력
+
+    Returns:
+        {'received', 'inserted', 'failed', 'errors', 'label_job_id', 'elapsed_sec'}
+    """
+    from server.label_worker import enqueue_bulk_label_job
+
+    started = time.time()
+    received = inserted = failed = 0
+    labelable = 0
+    errors: List[Tuple[Any, str]] = []
+    label_job_id = None
+
+    db = session_factory()
+    bind = db.get_bind()
+    indexes = list(Signal.__table__.indexes) if defer_indexes else []
+    for index in indexes:
+        index.drop(bind=bind, checkfirst=True)
+
+    try:
+        for chunk in chunks:
+            frame = chunk if isinstance(chunk, pd.DataFrame) else pd.DataFrame(list(chunk))
+            if frame.empty:
+                continue
+            frame = frame.set_axis(pd.RangeIndex(received, received + len(frame)))
+
+            valid, chunk_errors = validate_alert_frame(frame)
+            created_at = datetime.utcnow()
+            try:
+                inserted += bulk_insert_raw(db, "signals", SIGNAL_INSERT_COLUMNS, alert_frame_rows(valid, created_at))
+                day = created_at.strftime("%Y-%m-%d")
+                record_counts(db, "signals", {
+                    (symbol, tf, action, day): n
+                    for (symbol, tf, action), n in valid.groupby(["symbol", "timeframe", "action"]).size().items()
+                })
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+
+            received += len(frame)
+            failed += len(chunk_errors)
+            labelable += int(valid["action"].isin(["BUY", "SELL"]).sum())
+            errors.extend(chunk_errors[:max(0, max_errors - len(errors))])
+
+            if verbose:
+                elapsed = max(time.time() - started, 1e-9)
+                print(f"✓ Imported {inserted}/{received} rows ({received / elapsed:,.0f} rows/s)")
+
+        if enqueue_labels and labelable:
+            label_job_id = enqueue_bulk_label_job(db)
+            db.commit()
+    finally:
+        db.close()
+        if indexes:
+            if verbose:
+                print(f"⏳ Rebuilding {len(indexes)} signal indexes...")
+            for index in indexes:
+                index.create(bind=bind, checkfirst=True)
+
+    return {
+        "received": received,
+        "inserted": inserted,
+        "failed": failed,
+        "errors": errors,
+        "label_job_id": label_job_id,
+        "elapsed_sec": time.time() - started,
+    }
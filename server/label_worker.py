@@ -0,0 +1,390 @@
+"""
+VMSI-SDM Label Worker Pool
+label_jobs 테이블 기반 라벨링 작업 큐 및 워커 스레드 풀
+"""
+
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import func, insert, or_, select, update
+from sqlalchemy.orm import Session
+
+from server.db import SessionLocal, Signal, Label, LabelJob
+from server.labeler import MarketDataLabeler
+
+
+DEFAULT_PROVIDER = os.getenv("DATA_PROVIDER", "yahoo")
+
+
+def enqueue_label_jobs(db: Session, signal_ids: List[int], provider: str = DEFAULT_PROVIDER) -> int:
+    """
+    라벨링 작업 등록 (커밋은 호출자 책임 → 신호 INSERT와 같은 트랜잭션 사용 가능)
+
+    Args:
+        db: DB 세션
+        signal_ids: 라벨링할 신호 ID 목록
+        provider: 데이터 제공자
+
+    Returns:
+        등록된 작업 수
+    """
+    if not signal_ids:
+        return 0
+
+    now = datetime.utcnow()
+    db.execute(
+        insert(LabelJob),
+        [
+            {"kind": "signal", "signal_id": signal_id, "provider": provider, "status": "pending",
+             "attempts": 0, "created_at": now, "updated_at": now}
+            for signal_id in signal_ids
+        ]
+    )
+    return len(signal_ids)
+
+
+def enqueue_bulk_label_job(db: Session, provider: str = DEFAULT_PROVIDER) -> int:
+    """
+    라벨 없는 신호 전체를 벌크 모드로 라벨링하는 작업 1건 등록 (커밋은 호출자 책임)
+
+    Args:
+        db: DB 세션
+        provider: 데이터 제공자
+
+    Returns:
+        등록된 작업 ID
+    """
+    job = LabelJob(kind="bulk", provider=provider, status="pending", attempts=0)
+    db.add(job)
+    db.flush()
+    return job.id
+
+
+def enqueue_unlabeled(db: Session, limit: int = 100, provider: str = DEFAULT_PROVIDER) -> int:
+    """
+    라벨도 대기 작업도 없는 BUY/SELL 신호를 작업 큐에 등록
+
+    Args:
+        db: DB 세션
+        limit: 한 번에 등록할 최대 개수
+        provider: 데이터 제공자
+
+    Returns:
+        등록된 작업 수
+    """
+    has_open_job = (
+        select(LabelJob.id)
+        .where(LabelJob.signal_id == Signal.id, LabelJob.status.in_(["pending", "running"]))
+        .exists()
+    )
+    signal_ids = db.scalars(
+        select(Signal.id)
+        .where(Signal.signal.in_(["BUY", "SELL"]), ~Signal.labels.any(), ~has_open_job)
+        .order_by(Signal.id)
+        .limit(limit)
+    ).all()
+
+    count = enqueue_label_jobs(db, list(signal_ids), provider)
+    db.commit()
+    return count
+
+
+def parse_provider_limits(spec: str) -> Dict[str, int]:
+    """
+    제공자별 동시성 제한 파싱
+
+    Args:
+        spec: "yahoo=2,polygon=8" 형식 문자열
+
+    Returns:
+        {provider: limit}
+    """
+    limits = {}
+    for part in spec.split(","):
+        if "=" not in part:
+            continue
+        name, value = part.split("=", 1)
+        limits[name.strip()] = max(1, int(value))
+    return limits
+
+
+class LabelWorkerPool:
+    """
+    라벨링 워커 스레드 풀
+
+    각 워커는 자신의 DB 세션과 라벨러를 소유하며 label_jobs에서 작업을
+    선점(pending → running)해 처리합니다. 데이터 제공자별 세마포어로
+    외부 API 동시 호출 수를 제한합니다. 실패한 작업은 지수 백오프
+    (retry_backoff × 2^(attempts-1), 최대 max_backoff) 후에 다시 선점됩니다.
+    """
+
+    def __init__(
+        self,
+        num_workers: int = 4,
+        provider_limits: Optional[Dict[str, int]] = None,
+        max_attempts: int = 3,
+        poll_interval: float = 1.0,
+        retry_backoff: float = 30.0,
+        max_backoff: float = 3600.0,
+        session_factory: Callable[[], Session] = SessionLocal,
+        labeler_factory: Callable[[str], MarketDataLabeler] = MarketDataLabeler,
+        on_labeled: Optional[Callable[[List[int]], None]] = None
+    ):
+        """
+        Args:
+            num_workers: 워커 스레드 수
+            provider_limits: 제공자별 최대 동시 작업 수 (미지정 제공자는 num_workers)
+            max_attempts: 작업당 최대 시도 횟수
+            poll_interval: 작업이 없을 때 대기 간격 (초)
+            retry_backoff: 첫 실패 후 재시도 대기 (초, 실패마다 2배)
+            max_backoff: 재시도 대기 상한 (초)
+            session_factory: 워커 전용 세션 생성 함수
+            labeler_factory: provider → 라벨러 생성 함수
+            on_labeled: 작업 커밋 후 새로 라벨링된 [signal_id] 콜백 (워커 스레드에서 호출)
+        """
+        self.num_workers = num_workers
+        self.provider_limits = provider_limits or {}
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self.retry_backoff = retry_backoff
+        self.max_backoff = max_backoff
+        self.session_factory = session_factory
+        self.labeler_factory = labeler_factory
+        self.on_labeled = on_labeled
+
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._semaphore_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._threads: List[threading.Thread] = []
+
+        self._stats_lock = threading.Lock()
+        self._busy = 0
+        self._busy_seconds = 0.0
+        self._started_at: Optional[float] = None
+        self.processed = 0
+        self.failed = 0
+
+    # ─────────────── Lifecycle ───────────────
+
+    def start(self):
+        """중단된 작업 복구 후 워커 시작"""
+        if self._threads:
+            return
+
+        # 이전 프로세스에서 running 상태로 남은 작업 재등록
+        db = self.session_factory()
+        try:
+            db.execute(
+                update(LabelJob)
+                .where(LabelJob.status == "running")
+                .values(status="pending", updated_at=datetime.utcnow())
+            )
+            db.commit()
+        finally:
+            db.close()
+
+        self._stop.clear()
+        self._started_at = time.monotonic()
+        for i in range(self.num_workers):
+            thread = threading.Thread(target=self._worker_loop, name=f"label-worker-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def stop(self, timeout: float = 10.0):
+        """워커 중지 (진행 중 작업은 완료 대기, 미완료는 다음 시작 시 복구)"""
+        self._stop.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        """새 작업 등록 알림 (대기 중인 워커 즉시 깨움)"""
+        self._wakeup.set()
+
+    # ─────────────── Stats ───────────────
+
+    def stats(self, db: Session) -> Dict[str, Any]:
+        """
+        큐 깊이 및 워커 사용률
+
+        Args:
+            db: DB 세션
+
+        Returns:
+            상태 딕셔너리
+        """
+        by_status = dict(
+            db.execute(select(LabelJob.status, func.count()).group_by(LabelJob.status)).all()
+        )
+        retry_waiting = db.scalar(
+            select(func.count())
+            .where(LabelJob.status == "pending", LabelJob.next_attempt_at > datetime.utcnow())
+        )
+
+        with self._stats_lock:
+            busy = self._busy
+            busy_seconds = self._busy_seconds
+
+        elapsed = time.monotonic() - self._started_at if self._started_at else 0.0
+        capacity = elapsed * self.num_workers
+
+        return {
+            "queue_depth": by_status.get("pending", 0),
+            "retry_waiting": retry_waiting,
+            "running": by_status.get("running", 0),
+            "done": by_status.get("done", 0),
+            "failed": by_status.get("failed", 0),
+            "workers": self.num_workers,
+            "workers_busy": busy,
+            "utilization": round(busy_seconds / capacity, 4) if capacity > 0 else 0.0,
+            "provider_limits": self.provider_limits,
+            "processed": self.processed,
+            "errors": self.failed,
+        }
+
+    # ─────────────── Worker ───────────────
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        """제공자별 세마포어 (지연 생성)"""
+        with self._semaphore_lock:
+            if provider not in self._semaphores:
+                limit = self.provider_limits.get(provider, self.num_workers)
+                self._semaphores[provider] = threading.BoundedSemaphore(limit)
+            return self._semaphores[provider]
+
+    def _retry_delay(self, attempts: int) -> float:
+        """attempts회 실패한 작업의 재시도 대기 (초)"""
+        return min(self.retry_backoff * 2 ** max(attempts - 1, 0), self.max_backoff)
+
+    def _claim(self, db: Session) -> Optional[LabelJob]:
+        """재시도 대기가 끝난 pending 작업 1건 선점 (다른 워커와 경합 시 다음 후보 시도)"""
+        now = datetime.utcnow()
+        candidates = db.scalars(
+            select(LabelJob.id)
+            .where(
+                LabelJob.status == "pending",
+                or_(LabelJob.next_attempt_at.is_(None), LabelJob.next_attempt_at <= now)
+            )
+            .order_by(LabelJob.id)
+            .limit(self.num_workers * 2)
+        ).all()
+
+        for job_id in candidates:
+            result = db.execute(
+                update(LabelJob)
+                .where(LabelJob.id == job_id, LabelJob.status == "pending")
+                .values(status="running", attempts=LabelJob.attempts + 1, updated_at=datetime.utcnow())
+            )
+            db.commit()
+            if result.rowcount == 1:
+                return db.get(LabelJob, job_id)
+        return None
+
+    def _worker_loop(self):
+        """워커 스레드 본문"""
+        db = self.session_factory()
+        labelers: Dict[str, MarketDataLabeler] = {}
+
+        try:
+            while not self._stop.is_set():
+                try:
+                    job = self._claim(db)
+                except Exception as e:
+                    db.rollback()
+                    print(f"❌ Label job claim failed: {e}")
+                    job = None
+
+                if job is None:
+                    self._wakeup.wait(self.poll_interval)
+                    self._wakeup.clear()
+                    continue
+
+                if job.provider not in labelers:
+                    labelers[job.provider] = self.labeler_factory(job.provider)
+
+                started = time.monotonic()
+                with self._stats_lock:
+                    self._busy += 1
+                try:
+                    with self._semaphore(job.provider):
+                        self._process(db, labelers[job.provider], job)
+                finally:
+                    with self._stats_lock:
+                        self._busy -= 1
+                        self._busy_seconds += time.monotonic() - started
+        finally:
+            db.close()
+
+    def _process(self, db: Session, labeler: MarketDataLabeler, job: LabelJob):
+        """작업 1건 처리 및 상태 기록"""
+        try:
+            if job.kind == "bulk":
+                labeled_ids = labeler.label_pending_bulk_ids(db)
+                job = db.get(LabelJob, job.id)
+                job.status = "done"
+                job.error = None
+                db.commit()
+                with self._stats_lock:
+                    self.processed += 1
+                self._notify_labeled(labeled_ids)
+                return
+
+            signal = db.get(Signal, job.signal_id)
+            if signal is None:
+                raise ValueError(f"Signal {job.signal_id} not found")
+
+            # 중복 저장은 labels UNIQUE 제약이 막으므로 사전 확인은 데이터 조회 생략용
+            def has_labels() -> bool:
+                return db.scalar(select(func.count()).where(Label.signal_id == signal.id)) > 0
+
+            labeled = False
+            if not has_labels():
+                labeled = bool(labeler.label_signal(db, signal))
+                if not labeled and not has_labels():
+                    raise ValueError(f"No market data for {signal.symbol}")
+
+            job.status = "done"
+            job.error = None
+            db.commit()
+            with self._stats_lock:
+                self.processed += 1
+            if labeled:
+                self._notify_labeled([job.signal_id])
+
+        except Exception as e:
+            db.rollback()
+            job = db.get(LabelJob, job.id)
+            job.status = "pending" if job.attempts < self.max_attempts else "failed"
+            job.error = str(e)[:500]
+            if job.status == "pending":
+                # 같은 워커가 즉시 재선점하지 않도록 (일시적 제공자 장애 동안 시도 소진 방지)
+                job.next_attempt_at = datetime.utcnow() + timedelta(seconds=self._retry_delay(job.attempts))
+            db.commit()
+            with self._stats_lock:
+                self.failed += 1
+            print(f"❌ Label job {job.id} ({job.kind} {job.signal_id or ''}) failed [{job.attempts}/{self.max_attempts}]: {e}")
+
+    def _notify_labeled(self, signal_ids: List[int]):
+        """on_labeled 콜백 호출 (콜백 오류는 작업 상태에 영향 없음)"""
+        if self.on_labeled is None or not signal_ids:
+            return
+        try:
+            self.on_labeled(signal_ids)
+        except Exception as e:
+            print(f"❌ Label on_labeled callback failed: {e}")
+
+
+def create_worker_pool_from_env(**kwargs) -> LabelWorkerPool:
+    """환경변수 기반 워커 풀 생성 (LABEL_WORKERS, LABEL_PROVIDER_LIMITS, LABEL_MAX_ATTEMPTS, LABEL_RETRY_BACKOFF, 나머지는 kwargs)"""
+    return LabelWorkerPool(
+        num_workers=int(os.getenv("LABEL_WORKERS", "4")),
+        provider_limits=parse_provider_limits(os.getenv("LABEL_PROVIDER_LIMITS", "yahoo=2")),
+        max_attempts=int(os.getenv("LABEL_MAX_ATTEMPTS", "3")),
+        retry_backoff=float(os.getenv("LABEL_RETRY_BACKOFF", "30")),
+        **kwargs
+    )
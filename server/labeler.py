@@ -5,27 +5,39 @@ VMSI-SDM Labeler
 
 import os
 from typing import List, Tuple, Optional
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import numpy as np
 import yfinance as yf
 import pandas as pd
+from sqlalchemy import select, update
 from sqlalchemy.orm import Session
-from server.db import Signal, Label
+from server.db import Signal, Label, LabelJob, bulk_update_raw, insert_labels
+from server.stats import record_labels
+from server.bar_store import BarStore, TF_INTERVALS, get_default_bar_store
+
+
+# _compute_labels_vectorized() 라벨 튜플 컬럼 순서
+LABEL_INSERT_COLUMNS = ["signal_id", "fwd_n", "fwd_ret", "broke_high", "broke_low", "created_at"]
 
 
 class MarketDataLabeler:
     """시장 데이터 기반 라벨러"""
     
-    def __init__(self, provider: str = "yahoo"):
+    def __init__(self, provider: str = "yahoo", bar_store: Optional[BarStore] = None):
         """
         Args:
             provider: 데이터 제공자 (yahoo, polygon 등)
+            bar_store: OHLC 바 캐시 (기본: 프로세스 공용 캐시)
         """
         self.provider = provider
+        self.bar_store = bar_store if bar_store is not None else get_default_bar_store()
         self.forward_windows = [3, 5, 10, 20]  # N봉 후 결과 확인
+        self.lookahead_days = 30  # 신호 이후 조회 구간
+        self.break_threshold = 0.03  # 고가 돌파/저가 이탈 기준 (±3%)
     
     def fetch_ohlc(self, symbol: str, start_date: datetime, end_date: datetime, interval: str = "1d") -> pd.DataFrame:
         """
-        OHLC 데이터 가져오기
+        OHLC 데이터 가져오기 (바 캐시 우선, 누락 구간만 제공자에서 다운로드)
         
         Args:
             symbol: 심볼 (AAPL, BTCUSD 등)
@@ -36,17 +48,26 @@ class MarketDataLabeler:
         Returns:
             OHLC DataFrame
         """
+        try:
+            return self.bar_store.fetch(symbol, interval, start_date, end_date, self._download)
+        except Exception as e:
+            print(f"❌ Error fetching data for {symbol}: {e}")
+            return pd.DataFrame()
+    
+    def _download(self, symbol: str, start_date: datetime, end_date: datetime, interval: str) -> Optional[pd.DataFrame]:
+        """
+        제공자에서 OHLC 직접 다운로드 (실패 시 None → 캐시 coverage 미기록)
+        """
         try:
             if self.provider == "yahoo":
                 ticker = yf.Ticker(symbol)
-                df = ticker.history(start=start_date, end=end_date, interval=interval)
-                return df
+                return ticker.history(start=start_date, end=end_date, interval=interval)
             else:
                 # 추후 Polygon, Binance 등 추가 가능
                 raise NotImplementedError(f"Provider {self.provider} not implemented")
         except Exception as e:
-            print(f"❌ Error fetching data for {symbol}: {e}")
-            return pd.DataFrame()
+            print(f"❌ Error downloading data for {symbol}: {e}")
+            return None
     
     def calculate_forward_return(self, entry_price: float, future_prices: pd.DataFrame, n: int) -> Tuple[float, bool, bool]:
         """
@@ -73,10 +94,10 @@ class MarketDataLabeler:
         low_min = slice_data['Low'].min()
         
         # 고가 돌파: 진입가 대비 +3% 이상
-        broke_high = (high_max - entry_price) / entry_price > 0.03
+        broke_high = (high_max - entry_price) / entry_price > self.break_threshold
         
         # 저가 이탈: 진입가 대비 -3% 이상
-        broke_low = (entry_price - low_min) / entry_price > 0.03
+        broke_low = (entry_price - low_min) / entry_price > self.break_threshold
         
         return fwd_ret, broke_high, broke_low
     
@@ -89,13 +110,13 @@ class MarketDataLabeler:
             signal: 라벨링할 신호
         
         Returns:
-            생성된 Label 리스트
+            새로 저장된 Label 리스트 (데이터가 없거나 이미 라벨이 있으면 빈 리스트)
         """
         # 신호 발생 시각
-        ts = datetime.fromtimestamp(int(signal.ts) / 1000)  # 밀리초 → 초
+        ts = self._parse_signal_ts(signal.ts)
         
         # 데이터 가져오기 (신호 이후 30봉 정도)
-        end_date = ts + timedelta(days=30)
+        end_date = ts + timedelta(days=self.lookahead_days)
         interval = self._convert_tf_to_yf_interval(signal.tf)
         
         df = self.fetch_ohlc(signal.symbol, ts, end_date, interval)
@@ -115,21 +136,28 @@ class MarketDataLabeler:
             signal.bar_c = float(df.iloc[0]['Close'])
             db.commit()
         
-        # 각 forward window에 대해 라벨 생성
-        labels = []
+        # 각 forward window에 대해 라벨 생성 (다른 작업이 이미 저장한 window는 건너뜀)
+        now = datetime.utcnow()
+        rows = []
         for n in self.forward_windows:
             fwd_ret, broke_high, broke_low = self.calculate_forward_return(entry_price, df, n)
-            
-            label = Label(
-                signal_id=signal.id,
-                fwd_n=n,
-                fwd_ret=fwd_ret,
-                broke_high=broke_high,
-                broke_low=broke_low
-            )
-            db.add(label)
-            labels.append(label)
+            rows.append({
+                "signal_id": signal.id,
+                "fwd_n": n,
+                "fwd_ret": fwd_ret,
+                "broke_high": broke_high,
+                "broke_low": broke_low,
+                "created_at": now
+            })
+        
+        inserted = {fwd_n for _, fwd_n in insert_labels(db, rows)}
+        labels = [Label(**row) for row in rows if row["fwd_n"] in inserted]
+        if not labels:
+            db.commit()
+            print(f"⚠️  Signal {signal.id} already labeled by another job")
+            return []
         
+        record_labels(db, [(signal.symbol, signal.tf, signal.signal)], per_signal=len(labels), created_at=now)
         db.commit()
         print(f"[OK] Labeled signal {signal.id} ({signal.symbol} {signal.signal}) with {len(labels)} windows")
         
@@ -137,7 +165,7 @@ class MarketDataLabeler:
     
     def label_all_unlabeled(self, db: Session, limit: int = 100) -> int:
         """
-        라벨이 없는 모든 신호에 대해 라벨링 수행
+        라벨이 없는 모든 신호에 대해 라벨링 수행 (벌크 모드)
         
         Args:
             db: DB 세션
@@ -146,18 +174,182 @@ class MarketDataLabeler:
         Returns:
             라벨링된 신호 개수
         """
-        # 라벨이 없는 신호 조회
-        unlabeled_signals = db.query(Signal).filter(~Signal.labels.any()).limit(limit).all()
+        return self.label_pending_bulk(db, limit=limit)
+    
+    def label_pending_bulk(
+        self,
+        db: Session,
+        signal_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+        chunk_size: int = 100000
+    ) -> int:
+        """
+        라벨 없는 신호 벌크 라벨링 (label_pending_bulk_ids 참고)
+        
+        Returns:
+            라벨링된 신호 개수
+        """
+        return len(self.label_pending_bulk_ids(db, signal_ids, limit, chunk_size))
+    
+    def label_pending_bulk_ids(
+        self,
+        db: Session,
+        signal_ids: Optional[List[int]] = None,
+        limit: Optional[int] = None,
+        chunk_size: int = 100000
+    ) -> List[int]:
+        """
+        라벨 없는 신호를 (symbol, tf) 단위로 묶어 한 번에 라벨링
         
-        count = 0
-        for signal in unlabeled_signals:
-            try:
-                self.label_signal(db, signal)
-                count += 1
-            except Exception as e:
-                print(f"❌ Error labeling signal {signal.id}: {e}")
+        심볼/타임프레임별로 바 시계열을 한 번만 로드하고, searchsorted로 각 신호의
+        진입 봉을 찾은 뒤 모든 forward window의 수익률·고가/저가 돌파를
+        NumPy 배열 연산으로 계산합니다. 결과는 벌크 INSERT로 저장하며, 조회 이후 다른 작업이
+        먼저 저장한 (signal_id, fwd_n) 라벨은 건너뜁니다 (insert_labels).
         
-        return count
+        Args:
+            db: DB 세션
+            signal_ids: 대상 신호 ID (None이면 라벨 없는 전체 신호)
+            limit: 최대 처리 개수
+            chunk_size: 한 번에 계산할 신호 수 (메모리 상한)
+        
+        Returns:
+            라벨링된 signal id 목록 (커밋 완료)
+        """
+        # ts_sec이 NULL인 신호(숫자가 아닌 레거시 ts)는 바 조회 구간을 정할 수 없어 제외
+        query = select(Signal.id, Signal.ts_sec, Signal.symbol, Signal.tf, Signal.signal).where(
+            ~Signal.labels.any(), Signal.ts_sec.isnot(None)
+        )
+        if signal_ids is not None:
+            query = query.where(Signal.id.in_(signal_ids))
+        query = query.order_by(Signal.id)
+        if limit is not None:
+            query = query.limit(limit)
+        
+        pending = pd.DataFrame(db.execute(query).all(), columns=["id", "ts_sec", "symbol", "tf", "signal"])
+        if pending.empty:
+            return []
+        
+        lookahead = self.lookahead_days * 86400
+        labeled_ids = []
+        
+        for (symbol, tf), group in pending.groupby(["symbol", "tf"], sort=False):
+            interval = self._convert_tf_to_yf_interval(tf)
+            group = group.sort_values("ts_sec")
+            start = datetime.fromtimestamp(int(group["ts_sec"].iloc[0]), tz=timezone.utc)
+            end = datetime.fromtimestamp(int(group["ts_sec"].iloc[-1]) + lookahead, tz=timezone.utc)
+            
+            bars = self.fetch_ohlc(symbol, start, end, interval)
+            if bars.empty:
+                print(f"⚠️  No data for {symbol} {tf} ({len(group)} signals)")
+                continue
+            
+            bar_ts = bars.index.as_unit("s").asi8
+            ohlc = bars[["Open", "High", "Low", "Close"]].to_numpy(dtype=np.float64)
+            
+            for offset in range(0, len(group), chunk_size):
+                chunk = group.iloc[offset:offset + chunk_size]
+                label_rows, bar_rows = self._compute_labels_vectorized(
+                    chunk["id"].to_numpy(), chunk["ts_sec"].to_numpy(), bar_ts, ohlc, lookahead
+                )
+                if not bar_rows:
+                    continue
+                
+                bulk_update_raw(db, "signals", "id", ["bar_o", "bar_h", "bar_l", "bar_c"], bar_rows)
+                # 조회 이후 단건 / 다른 벌크 작업이 먼저 저장한 라벨은 건너뜀 (uq_labels_signal_fwd_n)
+                inserted = insert_labels(db, [dict(zip(LABEL_INSERT_COLUMNS, row)) for row in label_rows])
+                if not inserted:
+                    continue
+                
+                keys = dict(zip(chunk["id"].tolist(), chunk[["symbol", "tf", "signal"]].itertuples(index=False, name=None)))
+                record_labels(db, [keys[signal_id] for signal_id, _ in inserted], created_at=label_rows[0][-1])
+                labeled_ids.extend(dict.fromkeys(signal_id for signal_id, _ in inserted))
+        
+        # 같은 신호의 단건 작업은 완료 처리 (SQLite 바인드 변수 제한 내로 분할)
+        for offset in range(0, len(labeled_ids), 500):
+            db.execute(
+                update(LabelJob)
+                .where(
+                    LabelJob.signal_id.in_(labeled_ids[offset:offset + 500]),
+                    LabelJob.status.in_(["pending", "running"])
+                )
+                .values(status="done", updated_at=datetime.utcnow())
+            )
+        db.commit()
+        
+        print(f"[OK] Bulk labeled {len(labeled_ids)}/{len(pending)} signals")
+        return labeled_ids
+    
+    def _compute_labels_vectorized(
+        self,
+        signal_ids: np.ndarray,
+        signal_ts: np.ndarray,
+        bar_ts: np.ndarray,
+        ohlc: np.ndarray,
+        lookahead: int
+    ) -> Tuple[List[tuple], List[tuple]]:
+        """
+        신호 배열에 대한 forward window 라벨 일괄 계산 (calculate_forward_return과 동일한 정의)
+        
+        Args:
+            signal_ids: 신호 ID [S]
+            signal_ts: 신호 시각 (epoch 초) [S]
+            bar_ts: 바 시각 (epoch 초, 오름차순) [B]
+            ohlc: Open/High/Low/Close [B, 4]
+            lookahead: 신호 이후 조회 구간 (초)
+        
+        Returns:
+            (labels INSERT 튜플 목록, signals OHLC UPDATE 튜플 목록)
+        """
+        # 진입 봉 = 신호 시각 이후 첫 봉, 사용 가능한 봉 수 = lookahead 구간 내 봉 수
+        entry_idx = np.searchsorted(bar_ts, signal_ts, side="left")
+        available = np.searchsorted(bar_ts, signal_ts + lookahead, side="left") - entry_idx
+        
+        has_data = available > 0
+        signal_ids, entry_idx, available = signal_ids[has_data], entry_idx[has_data], available[has_data]
+        if len(signal_ids) == 0:
+            return [], []
+        
+        # [S, W] 윈도우 인덱스 행렬 → 누적 최대/최소로 모든 window를 한 번에 계산
+        max_window = max(self.forward_windows)
+        window_idx = np.minimum(entry_idx[:, None] + np.arange(max_window), len(bar_ts) - 1)
+        highs = np.maximum.accumulate(ohlc[window_idx, 1], axis=1)
+        lows = np.minimum.accumulate(ohlc[window_idx, 2], axis=1)
+        closes = ohlc[window_idx, 3]
+        entry_price = closes[:, 0]
+        
+        now = datetime.utcnow()
+        ids = signal_ids.tolist()
+        label_rows = []
+        for n in self.forward_windows:
+            valid = available >= n
+            fwd_ret = np.where(valid, (closes[:, n - 1] - entry_price) / entry_price, 0.0)
+            broke_high = valid & ((highs[:, n - 1] - entry_price) / entry_price > self.break_threshold)
+            broke_low = valid & ((entry_price - lows[:, n - 1]) / entry_price > self.break_threshold)
+            
+            label_rows.extend(zip(
+                ids, [n] * len(ids), fwd_ret.tolist(), broke_high.tolist(), broke_low.tolist(), [now] * len(ids)
+            ))
+        
+        # (bar_o, bar_h, bar_l, bar_c, id)
+        bar_rows = [(*bar, sid) for sid, bar in zip(ids, ohlc[entry_idx].tolist())]
+        
+        return label_rows, bar_rows
+    
+    @staticmethod
+    def _parse_signal_ts(ts: str) -> datetime:
+        """
+        신호 timestamp 파싱 (TradingView 밀리초 / ts_unix 초 모두 지원)
+        
+        Args:
+            ts: Signal.ts 문자열
+        
+        Returns:
+            UTC datetime
+        """
+        value = int(float(ts))
+        if value > 10**11:  # 밀리초
+            value //= 1000
+        return datetime.fromtimestamp(value, tz=timezone.utc)
     
     def _convert_tf_to_yf_interval(self, tf: str) -> str:
         """
@@ -169,19 +361,7 @@ class MarketDataLabeler:
         Returns:
             yfinance interval (5m, 15m, 1d 등)
         """
-        mapping = {
-            "1": "1m",
-            "5": "5m",
-            "15": "15m",
-            "30": "30m",
-            "60": "1h",
-            "1H": "1h",
-            "4H": "4h",
-            "1D": "1d",
-            "1W": "1wk",
-            "1M": "1mo"
-        }
-        return mapping.get(tf, "1d")
+        return TF_INTERVALS.get(tf, "1d")
 
 
 # ─────────────── 유틸리티 함수 ───────────────
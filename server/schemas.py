@@ -3,7 +3,7 @@ VMSI-SDM Pydantic Schemas
 TradingView Webhook 데이터 검증 및 타입 정의 (v2.1 - Simplified)
 """
 
-from typing import Optional
+from typing import Any, Dict, List, Optional
 from pydantic import BaseModel, Field
 from datetime import datetime
 
@@ -40,11 +40,48 @@ class TradingViewAlert(BaseModel):
 
 class SignalResponse(BaseModel):
     """신호 저장 응답"""
-    status: str = "success"
-    signal_id: int
+    status: str = "success"  # success / queued
+    signal_id: Optional[int] = None
+    provisional_id: Optional[str] = None  # 쓰기 버퍼 대기 중인 신호의 임시 ID
     message: str = "Signal saved"
 
 
+class BatchItemResult(BaseModel):
+    """배치 알럿 개별 항목 처리 결과"""
+    index: int
+    status: str  # success / error
+    signal_id: Optional[int] = None
+    error: Optional[str] = None
+
+
+class BatchAlertResponse(BaseModel):
+    """배치 알럿 저장 응답"""
+    status: str = "success"
+    received: int
+    inserted: int
+    failed: int
+    results: List[BatchItemResult]
+
+
+class SignalGenerateRequest(BaseModel):
+    """바 데이터로 v5 신호 재생성 요청"""
+    symbol: str = Field(..., description="심볼 (SPX, AAPL 등)")
+    timeframe: str = Field("1D", description="타임프레임 (1W, 1D, 60 등)")
+    start_ts: int = Field(..., description="시작 Unix timestamp (워밍업 포함)")
+    end_ts: Optional[int] = Field(None, description="종료 Unix timestamp (기본: 현재)")
+    params: Optional[Dict[str, Any]] = Field(None, description="프리셋/Pine 입력 파라미터 (기본: v5)")
+    ingest: bool = Field(False, description="생성된 신호를 DB에 저장 + 라벨링 대기열 등록")
+
+
+class SignalGenerateResponse(BaseModel):
+    """신호 재생성 응답"""
+    status: str = "success"
+    bars: int
+    generated: int
+    inserted: int = 0
+    signals: List[Dict[str, Any]]
+
+
 class LabelResult(BaseModel):
     """레이블 결과"""
     label_id: int
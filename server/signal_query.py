@@ -0,0 +1,194 @@
+"""
+VMSI-SDM Signal Query Helpers
+/signals 키셋 페이지네이션, 컬럼 선택(fields=), ts 범위 필터, NDJSON 스트리밍
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, select
+from sqlalchemy.orm import Session
+
+from server.db import FEATURE_COLUMNS, SessionLocal, Signal
+
+
+# 응답 필드 → 컬럼 (요청한 필드만 SELECT, features/params JSON은 요청 시에만 디코딩)
+SIGNAL_FIELDS = {
+    "id": Signal.id,
+    "ts": Signal.ts,
+    "symbol": Signal.symbol,
+    "tf": Signal.tf,
+    "signal": Signal.signal,
+    "features": Signal.features_json,
+    "params": Signal.params_json,
+    "created_at": Signal.created_at,
+    **{column: getattr(Signal, column) for column in FEATURE_COLUMNS},
+    **{column: getattr(Signal, column) for column in ("bar_o", "bar_h", "bar_l", "bar_c")},
+}
+
+# fields 미지정 시 기존 /signals 응답과 같은 필드
+DEFAULT_FIELDS = ["id", "ts", "symbol", "tf", "signal", "features", "params", "created_at"]
+
+
+class InvalidQuery(ValueError):
+    """잘못된 fields / cursor (호출자는 400으로 응답)"""
+
+
+def parse_fields(fields: Optional[str]) -> List[str]:
+    """
+    fields= 파라미터 파싱
+
+    Args:
+        fields: 쉼표 구분 필드 목록 (None이면 기본 필드)
+
+    Returns:
+        필드 목록 (입력 순서, 중복 제거)
+
+    Raises:
+        InvalidQuery: 알 수 없는 필드
+    """
+    if not fields:
+        return list(DEFAULT_FIELDS)
+    names = list(dict.fromkeys(name.strip() for name in fields.split(",") if name.strip()))
+    unknown = [name for name in names if name not in SIGNAL_FIELDS]
+    if unknown:
+        raise InvalidQuery(f"Unknown fields: {', '.join(unknown)} (available: {', '.join(SIGNAL_FIELDS)})")
+    return names
+
+
+def encode_cursor(created_at: datetime, signal_id: int) -> str:
+    """마지막 행의 (created_at, id) → 불투명 커서"""
+    payload = json.dumps([created_at.isoformat(), signal_id], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    커서 → (created_at, id)
+
+    Raises:
+        InvalidQuery: 형식이 잘못된 커서
+    """
+    try:
+        payload = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, signal_id = json.loads(payload)
+        return datetime.fromisoformat(created_at), int(signal_id)
+    except (ValueError, TypeError) as e:
+        raise InvalidQuery(f"Invalid cursor: {e}")
+
+
+def signal_query(
+    fields: Sequence[str],
+    signal_type: Optional[str] = None,
+    symbol: Optional[str] = None,
+    ts_from: Optional[int] = None,
+    ts_to: Optional[int] = None,
+    cursor: Optional[str] = None
+):
+    """
+    /signals SELECT 문 (created_at, id 내림차순 키셋)
+
+    페이지 경계 계산을 위해 created_at / id는 요청 필드와 무관하게 항상 SELECT합니다.
+
+    Args:
+        fields: parse_fields() 결과
+        signal_type: BUY / SELL / WATCH_UP / WATCH_DOWN
+        symbol: 심볼
+        ts_from: 신호 ts 하한 (unix 초, 포함)
+        ts_to: 신호 ts 상한 (unix 초, 포함)
+        cursor: 이전 페이지의 next_cursor
+
+    Returns:
+        SQLAlchemy Select
+    """
+    columns = [SIGNAL_FIELDS[name].label(name) for name in fields]
+    query = select(*columns, Signal.created_at.label("_created_at"), Signal.id.label("_id"))
+
+    if signal_type:
+        query = query.where(Signal.signal == signal_type.upper())
+    if symbol:
+        query = query.where(Signal.symbol == symbol.upper())
+    if ts_from is not None:
+        query = query.where(Signal.ts_sec >= ts_from)
+    if ts_to is not None:
+        query = query.where(Signal.ts_sec <= ts_to)
+    if cursor:
+        created_at, signal_id = decode_cursor(cursor)
+        query = query.where(or_(
+            Signal.created_at < created_at,
+            and_(Signal.created_at == created_at, Signal.id < signal_id)
+        ))
+
+    return query.order_by(Signal.created_at.desc(), Signal.id.desc())
+
+
+def _serialize(row, fields: Sequence[str]) -> Dict[str, Any]:
+    """행 → 응답 dict (created_at은 ISO 문자열)"""
+    item = {}
+    for name in fields:
+        value = row._mapping[name]
+        item[name] = value.isoformat() if isinstance(value, datetime) else value
+    return item
+
+
+def fetch_signal_page(db: Session, fields: Sequence[str], limit: int, **filters) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    신호 1페이지 조회
+
+    Args:
+        db: DB 세션
+        fields: parse_fields() 결과
+        limit: 페이지 크기
+        **filters: signal_query() 필터 (signal_type, symbol, ts_from, ts_to, cursor)
+
+    Returns:
+        (행 목록, 다음 페이지 커서 또는 None)
+    """
+    rows = db.execute(signal_query(fields, **filters).limit(limit + 1)).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]._created_at, rows[-1]._id)
+    return [_serialize(row, fields) for row in rows], next_cursor
+
+
+def iter_signal_ndjson(
+    fields: Sequence[str],
+    limit: Optional[int] = None,
+    batch_size: int = 5000,
+    session_factory: Callable[[], Session] = SessionLocal,
+    **filters
+) -> Iterator[str]:
+    """
+    조건에 맞는 신호를 NDJSON 라인으로 스트리밍 (배치마다 키셋으로 이어서 조회, 메모리 일정)
+
+    응답 스트리밍 중에도 유효하도록 배치마다 전용 세션을 엽니다.
+
+    Args:
+        fields: parse_fields() 결과
+        limit: 최대 행 수 (None이면 전체)
+        batch_size: 배치당 조회 행 수
+        session_factory: 세션 생성 함수
+        **filters: signal_query() 필터
+
+    Yields:
+        JSON 한 줄 + 개행
+    """
+    remaining = limit
+    cursor = filters.pop("cursor", None)
+    while remaining is None or remaining > 0:
+        size = batch_size if remaining is None else min(batch_size, remaining)
+        db = session_factory()
+        try:
+            rows, cursor = fetch_signal_page(db, fields, size, cursor=cursor, **filters)
+        finally:
+            db.close()
+
+        if rows:
+            yield "".join(json.dumps(row, default=str) + "\n" for row in rows)
+        if remaining is not None:
+            remaining -= len(rows)
+        if cursor is None:
+            break
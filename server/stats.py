@@ -0,0 +1,236 @@
+"""
+VMSI-SDM Stats Counters
+신호/라벨/실험 건수를 stats_counters 요약 테이블에 증분 유지
+
+신호/라벨/실험을 INSERT하는 경로가 같은 트랜잭션에서 record_*()를 호출하므로
+/stats는 원본 테이블 COUNT(*) 없이 요약 행만 읽습니다.
+카운터는 (symbol, tf, signal, day) 상세 행과 day="" 전체 기간 롤업 행 두 단계로 저장합니다.
+"""
+
+from collections import Counter
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.orm import Session
+
+from server.db import Experiment, Label, Signal, StatsCounter, SessionLocal, bulk_increment_raw
+
+
+# 카운터 키 차원 (/stats?by= 허용 값)
+STATS_DIMENSIONS = ("symbol", "tf", "signal", "day")
+
+# 해당 없는 차원 / 전체 기간 롤업 값
+ALL = ""
+
+CounterKey = Tuple[str, str, str, str]
+
+
+def _day(value: Any) -> str:
+    """created_at (datetime / date / DB 날짜 문자열) → YYYY-MM-DD"""
+    if value is None:
+        value = datetime.utcnow()
+    if isinstance(value, (datetime, date)):
+        return value.strftime("%Y-%m-%d")
+    return str(value)[:10]
+
+
+def record_counts(db: Session, metric: str, counts: Mapping[CounterKey, int]) -> int:
+    """
+    카운터 증분 (상세 행 + 전체 기간 롤업 행 UPSERT, 커밋은 호출자 책임)
+
+    Args:
+        db: DB 세션 (원본 행 INSERT와 같은 트랜잭션)
+        metric: signals / labels / experiments
+        counts: {(symbol, tf, signal, day): 증분}
+
+    Returns:
+        증분 합계
+    """
+    rollup: Counter = Counter()
+    for (symbol, tf, signal, day), n in counts.items():
+        rollup[(symbol, tf, signal, day)] += n
+        rollup[(symbol, tf, signal, ALL)] += n
+    rows = [(metric, *key, n) for key, n in rollup.items() if n]
+    bulk_increment_raw(db, "stats_counters", ["metric", *STATS_DIMENSIONS], "count", rows)
+    return sum(counts.values())
+
+
+def record_signals(db: Session, rows: Iterable[Mapping[str, Any]]) -> int:
+    """
+    신호 INSERT 카운트
+
+    Args:
+        db: DB 세션
+        rows: symbol / tf / signal (/ created_at) 키를 가진 행 dict
+
+    Returns:
+        기록한 신호 수
+    """
+    counts = Counter(
+        (row["symbol"], row["tf"], row["signal"], _day(row.get("created_at"))) for row in rows
+    )
+    return record_counts(db, "signals", counts)
+
+
+def record_labels(db: Session, signals: Iterable[Tuple[str, str, str]], per_signal: int = 1,
+                  created_at: Optional[datetime] = None) -> int:
+    """
+    라벨 INSERT 카운트 (부모 신호의 symbol / tf / signal 기준)
+
+    Args:
+        db: DB 세션
+        signals: 라벨링한 신호의 (symbol, tf, signal) 목록
+        per_signal: 신호당 라벨 행 수 (forward window 수)
+        created_at: 라벨 생성 시각 (기본: 현재 UTC)
+
+    Returns:
+        기록한 라벨 수
+    """
+    day = _day(created_at)
+    counts = Counter()
+    for symbol, tf, signal in signals:
+        counts[(symbol, tf, signal, day)] += per_signal
+    return record_counts(db, "labels", counts)
+
+
+def record_experiments(db: Session, count: int = 1, created_at: Optional[datetime] = None) -> int:
+    """실험 INSERT 카운트"""
+    return record_counts(db, "experiments", {(ALL, ALL, ALL, _day(created_at)): count})
+
+
+def rebuild_stats(db: Session) -> Dict[str, int]:
+    """
+    원본 테이블 GROUP BY로 카운터 전체 재계산 (초기 시드 / 외부 직접 적재 후 보정)
+
+    Args:
+        db: DB 세션 (커밋은 호출자 책임)
+
+    Returns:
+        {metric: 전체 건수}
+    """
+    db.execute(delete(StatsCounter))
+
+    signal_day = func.date(Signal.created_at)
+    signal_rows = db.execute(
+        select(Signal.symbol, Signal.tf, Signal.signal, signal_day, func.count())
+        .group_by(Signal.symbol, Signal.tf, Signal.signal, signal_day)
+    ).all()
+    label_day = func.date(Label.created_at)
+    label_rows = db.execute(
+        select(Signal.symbol, Signal.tf, Signal.signal, label_day, func.count())
+        .join(Signal, Label.signal_id == Signal.id)
+        .group_by(Signal.symbol, Signal.tf, Signal.signal, label_day)
+    ).all()
+    experiment_day = func.date(Experiment.created_at)
+    experiment_rows = db.execute(
+        select(experiment_day, func.count()).group_by(experiment_day)
+    ).all()
+
+    totals = {}
+    for metric, rows in (
+        ("signals", signal_rows),
+        ("labels", label_rows),
+        ("experiments", [(ALL, ALL, ALL, day, n) for day, n in experiment_rows]),
+    ):
+        counts = Counter()
+        for symbol, tf, signal, day, n in rows:
+            counts[(symbol, tf, signal, _day(day))] += n
+        totals[metric] = record_counts(db, metric, counts)
+    return totals
+
+
+def seed_stats(db: Session) -> bool:
+    """
+    카운터가 비어 있고 원본 데이터가 있으면 재계산 (서버 시작 시 1회)
+
+    Returns:
+        재계산 여부
+    """
+    if db.execute(select(StatsCounter.id).limit(1)).first() is not None:
+        return False
+    if db.execute(select(Signal.id).limit(1)).first() is None and \
+            db.execute(select(Experiment.id).limit(1)).first() is None:
+        return False
+    totals = rebuild_stats(db)
+    db.commit()
+    print(f"[OK] Seeded stats counters: {totals}")
+    return True
+
+
+def read_stats(db: Session, by: Optional[str] = None) -> Dict[str, Any]:
+    """
+    요약 카운터 조회 (/stats 응답)
+
+    Args:
+        db: DB 세션
+        by: symbol / tf / signal / day 중 하나면 해당 차원별 분해 포함
+
+    Returns:
+        전체 합계 dict (by 지정 시 "by", "breakdown" 포함)
+    """
+    if by is not None and by not in STATS_DIMENSIONS:
+        raise ValueError(f"by must be one of: {', '.join(STATS_DIMENSIONS)}")
+
+    rollup = db.execute(
+        select(StatsCounter.metric, StatsCounter.signal, func.sum(StatsCounter.count))
+        .where(StatsCounter.day == ALL)
+        .group_by(StatsCounter.metric, StatsCounter.signal)
+    ).all()
+    totals: Counter = Counter()
+    by_signal: Counter = Counter()
+    for metric, signal, n in rollup:
+        totals[metric] += int(n)
+        if metric == "signals":
+            by_signal[signal] += int(n)
+
+    total_signals = totals["signals"]
+    stats: Dict[str, Any] = {
+        "total_signals": total_signals,
+        "total_labels": totals["labels"],
+        "total_experiments": totals["experiments"],
+        "buy_signals": by_signal["BUY"],
+        "sell_signals": by_signal["SELL"],
+        "watch_signals": total_signals - by_signal["BUY"] - by_signal["SELL"]
+    }
+    if by is not None:
+        stats["by"] = by
+        stats["breakdown"] = _breakdown(db, by)
+    return stats
+
+
+def _breakdown(db: Session, by: str) -> List[Dict[str, Any]]:
+    """차원별 신호/라벨 건수 (day는 상세 행, 나머지는 롤업 행 집계)"""
+    column = getattr(StatsCounter, by)
+    query = (
+        select(column, StatsCounter.metric, StatsCounter.signal, func.sum(StatsCounter.count))
+        .where(StatsCounter.metric.in_(["signals", "labels"]))
+        .group_by(column, StatsCounter.metric, StatsCounter.signal)
+        .order_by(column)
+    )
+    query = query.where(StatsCounter.day != ALL) if by == "day" else query.where(StatsCounter.day == ALL)
+
+    groups: Dict[str, Dict[str, Any]] = {}
+    for key, metric, signal, n in db.execute(query).all():
+        entry = groups.setdefault(key, {by: key, "signals": 0, "labels": 0, "buy": 0, "sell": 0, "watch": 0})
+        entry[metric] += int(n)
+        if metric == "signals":
+            bucket = signal.lower() if signal in ("BUY", "SELL") else "watch"
+            entry[bucket] += int(n)
+    return list(groups.values())
+
+
+if __name__ == "__main__":
+    import sys
+
+    # 직접 실행 시 카운터 재계산 (외부에서 signals/labels를 직접 적재한 경우)
+    if "--rebuild" in sys.argv:
+        session = SessionLocal()
+        try:
+            totals = rebuild_stats(session)
+            session.commit()
+        finally:
+            session.close()
+        print(f"[OK] Rebuilt stats counters: {totals}")
+    else:
+        print("Usage: python -m server.stats --rebuild")
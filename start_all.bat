@@ -14,7 +14,7 @@ cd /d "%~dp0"
 
 REM 1. FastAPI 서버 시작 (백그라운드)
 echo [1/3] Starting FastAPI server...
-start "FastAPI" cmd /k "uvicorn server.app:app --host 0.0.0.0 --port 8000 --reload"
+start "FastAPI" cmd /k "uvicorn server.app:app --host 0.0.0.0 --port 8000 --reload --timeout-graceful-shutdown 5"
 timeout /t 3 /nobreak > nul
 
 REM 2. ngrok 터널 시작 (백그라운드)
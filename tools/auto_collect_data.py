@@ -7,9 +7,11 @@ Features:
 - 자동 신호 생성 (v5 로직 적용)
 - FastAPI 서버로 자동 전송
 - 백테스트 데이터 생성
+- 심볼별 다운로드/지표 계산 병렬 처리 + keep-alive 세션 배치 전송
 
 Usage:
     python tools/auto_collect_data.py --symbols SPX QQQ DIA --period 2y --interval 1wk
+    python tools/auto_collect_data.py --symbols-file universe.txt --period 10y --interval 1d --workers 16
 """
 
 import sys
@@ -19,13 +21,19 @@ import yfinance as yf
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import requests
 import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk") -> pd.DataFrame:
+from server.indicators import (
+    INDICATOR_COLUMNS, bar_arrays, compute_indicators, signal_records, trend_score,
+    generate_signals as v5_generate_signals
+)
+from tools.tv_stream import SignalSender
+
+def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk", verbose: bool = True) -> pd.DataFrame:
     """
     yfinance를 사용하여 시장 데이터 다운로드
     
@@ -33,8 +41,10 @@ def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk")
         symbol: 티커 심볼 (^GSPC for SPX, ^IXIC for NASDAQ, ^DJI for Dow)
         period: 기간 (1d, 5d, 1mo, 3mo, 6mo, 1y, 2y, 5y, 10y, ytd, max)
         interval: 간격 (1m, 2m, 5m, 15m, 30m, 60m, 90m, 1h, 1d, 5d, 1wk, 1mo, 3mo)
+        verbose: 단계별 로그 출력 (병렬 수집 시 False)
     """
-    print(f"[1/5] Downloading {symbol} data (period={period}, interval={interval})...")
+    if verbose:
+        print(f"[1/5] Downloading {symbol} data (period={period}, interval={interval})...")
     
     # Map common symbols to Yahoo Finance tickers
     symbol_map = {
@@ -50,7 +60,9 @@ def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk")
     ticker = symbol_map.get(symbol, symbol)
     
     try:
-        data = yf.download(ticker, period=period, interval=interval, progress=False)
+        # yf.download는 모듈 전역 결과 딕셔너리를 공유해 병렬 수집 시 심볼 결과가 섞일 수 있음
+        # → 요청마다 독립 상태를 쓰는 Ticker.history 사용 (server/labeler.py와 동일)
+        data = yf.Ticker(ticker).history(period=period, interval=interval)
         
         if data.empty:
             raise ValueError(f"No data downloaded for {ticker}")
@@ -66,13 +78,14 @@ def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk")
         
         # Reset index to get timestamp as column
         data = data.reset_index()
-        data = data.rename(columns={'Date': 'time'})
+        data = data.rename(columns={'Date': 'time', 'Datetime': 'time'})
         
         # Convert timestamp to Unix time
-        data['time'] = data['time'].astype(int) // 10**9
+        data['time'] = data['time'].dt.as_unit('s').astype('int64')
         
-        print(f"[OK] Downloaded {len(data)} bars")
-        print(f"[INFO] Date range: {datetime.fromtimestamp(data['time'].iloc[0])} to {datetime.fromtimestamp(data['time'].iloc[-1])}")
+        if verbose:
+            print(f"[OK] Downloaded {len(data)} bars")
+            print(f"[INFO] Date range: {datetime.fromtimestamp(data['time'].iloc[0])} to {datetime.fromtimestamp(data['time'].iloc[-1])}")
         
         return data
     
@@ -80,212 +93,134 @@ def download_market_data(symbol: str, period: str = "2y", interval: str = "1wk")
         print(f"[ERROR] Failed to download {ticker}: {e}")
         return None
 
-def calculate_indicators(df: pd.DataFrame, ema1_len: int = 20, ema2_len: int = 50) -> pd.DataFrame:
-    """기술적 지표 계산"""
-    print("[2/5] Calculating indicators...")
-    
-    # EMA
-    df['ema1'] = df['close'].ewm(span=ema1_len, adjust=False).mean()
-    df['ema2'] = df['close'].ewm(span=ema2_len, adjust=False).mean()
-    
-    # RSI
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
-    # Volume multiplier
-    df['vol_avg'] = df['volume'].rolling(20).mean()
-    df['vol_mult'] = df['volume'] / df['vol_avg']
-    
-    # ATR
-    df['high_low'] = df['high'] - df['low']
-    df['high_close'] = abs(df['high'] - df['close'].shift(1))
-    df['low_close'] = abs(df['low'] - df['close'].shift(1))
-    df['true_range'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-    df['atr'] = df['true_range'].rolling(14).mean()
-    
-    # VCP
-    df['vcp_high'] = df['high'].rolling(20).max()
-    df['vcp_low'] = df['low'].rolling(20).min()
-    df['vcp_ratio'] = (df['vcp_high'] - df['vcp_low']) / df['vcp_high']
-    
-    # Trend Score (v5 weights)
-    def calc_trend_score(row):
-        if pd.isna(row['rsi']) or pd.isna(row['vol_mult']):
-            return 50
-        
-        ema_above = 1.0 if row['ema1'] > row['ema2'] else 0.0
-        rsi_norm = row['rsi'] / 100.0
-        vol_norm = min(row['vol_mult'] / 3.0, 1.0)
-        vcp_norm = 1.0 - row['vcp_ratio']
-        
-        alpha, beta, gamma, delta = 0.8, 0.35, 0.7, 0.6
-        raw = (alpha * ema_above + beta * rsi_norm + gamma * vol_norm + delta * vcp_norm) * 100.0
-        return max(0, min(100, raw))
-    
-    df['trend_score'] = df.apply(calc_trend_score, axis=1)
-    
-    print("[OK] Indicators calculated")
+# v5 조건 + EMA 필터 (yfinance 수집 규칙)
+SIGNAL_PARAMS = {
+    'trend_score_buy': 50, 'rsi_buy_th': 45, 'vol_mult_buy': 1.0,
+    'trend_score_sell': 50, 'rsi_sell_th': 55, 'vol_mult_sell': 1.0,
+    'use_ema_filter': True,
+}
+
+def calculate_indicators(df: pd.DataFrame, ema1_len: int = 20, ema2_len: int = 50, verbose: bool = True) -> pd.DataFrame:
+    """기술적 지표 계산 (server.indicators 벡터화 구현)"""
+    if verbose:
+        print("[2/5] Calculating indicators...")
+    
+    params = {**SIGNAL_PARAMS, 'ema1': ema1_len, 'ema2': ema2_len}
+    indicators = compute_indicators(df, params)
+    for column in INDICATOR_COLUMNS:
+        df[column] = indicators[column]
+    df['trend_score'] = trend_score(indicators)
+    
+    if verbose:
+        print("[OK] Indicators calculated")
     return df
 
-def generate_signals(df: pd.DataFrame, symbol: str, timeframe: str) -> list:
-    """신호 생성 (v5 Final logic)"""
-    print("[3/5] Generating signals...")
-    
-    signals = []
-    buy_count = 0
-    sell_count = 0
-    
-    for i in range(20, len(df)):  # Warmup period
-        row = df.iloc[i]
-        
-        if pd.isna(row['rsi']) or pd.isna(row['atr']):
-            continue
-        
-        # Buy Signal (v5 Final conditions)
-        buy_condition = (
-            row['ema1'] > row['ema2'] and 
-            row['rsi'] > 45 and 
-            row['vol_mult'] > 1.0 and
-            row['trend_score'] >= 50
-        )
-        
-        # Sell Signal (v5 Final conditions)
-        sell_condition = (
-            row['ema1'] < row['ema2'] and 
-            row['rsi'] < 55 and 
-            row['vol_mult'] > 1.0 and
-            row['trend_score'] <= 50
-        )
-        
-        if buy_condition:
-            buy_count += 1
-            sl_distance = row['atr'] * 1.5
-            tp_distance = row['atr'] * 2.5
-            
-            signals.append({
-                'ts_unix': int(row['time']),
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'action': 'BUY',
-                'price': float(row['close']),
-                'signal_number': buy_count,
-                'trend_score': float(row['trend_score']),
-                'prob': float(row['trend_score']) / 100.0,
-                'rsi': float(row['rsi']),
-                'vol_mult': float(row['vol_mult']),
-                'vcp_ratio': float(row['vcp_ratio']),
-                'dist_ath': 0.0,
-                'ema1': float(row['ema1']),
-                'ema2': float(row['ema2']),
-                'sl_price': float(row['close'] - sl_distance),
-                'tp_price': float(row['close'] + tp_distance),
-                'atr': float(row['atr']),
-                'bar_state': 'close',
-                'fast_mode': False,
-                'realtime_macro': False,
-                'mode': 'yfinance',
-                'version': 'vmsi_sdm_v5_yfinance'
-            })
-        
-        elif sell_condition:
-            sell_count += 1
-            sl_distance = row['atr'] * 1.5
-            tp_distance = row['atr'] * 2.5
-            
-            signals.append({
-                'ts_unix': int(row['time']),
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'action': 'SELL',
-                'price': float(row['close']),
-                'signal_number': sell_count,
-                'trend_score': float(row['trend_score']),
-                'prob': float(row['trend_score']) / 100.0,
-                'rsi': float(row['rsi']),
-                'vol_mult': float(row['vol_mult']),
-                'vcp_ratio': float(row['vcp_ratio']),
-                'dist_ath': 0.0,
-                'ema1': float(row['ema1']),
-                'ema2': float(row['ema2']),
-                'sl_price': float(row['close'] + sl_distance),
-                'tp_price': float(row['close'] - tp_distance),
-                'atr': float(row['atr']),
-                'bar_state': 'close',
-                'fast_mode': False,
-                'realtime_macro': False,
-                'mode': 'yfinance',
-                'version': 'vmsi_sdm_v5_yfinance'
-            })
-    
-    print(f"[OK] Generated {len(signals)} signals (Buy: {buy_count}, Sell: {sell_count})")
-    return signals
+def generate_signals(df: pd.DataFrame, symbol: str, timeframe: str, verbose: bool = True) -> list:
+    """신호 생성 (v5 Final logic, 조건 마스크 + 일괄 레코드 변환)"""
+    if verbose:
+        print("[3/5] Generating signals...")
+    
+    indicators = {**bar_arrays(df), **{column: df[column].to_numpy() for column in INDICATOR_COLUMNS}}
+    signals = v5_generate_signals(df, SIGNAL_PARAMS, indicators=indicators)
+    records = signal_records(signals, symbol, timeframe, mode='yfinance', version='vmsi_sdm_v5_yfinance')
+    
+    buy_count = sum(1 for record in records if record['action'] == 'BUY')
+    if verbose:
+        print(f"[OK] Generated {len(records)} signals (Buy: {buy_count}, Sell: {len(records) - buy_count})")
+    return records
+
+def collect_symbol(symbol: str, period: str, interval: str, verbose: bool = False) -> list:
+    """심볼 1개 다운로드 → 지표 계산 → 신호 생성 (워커 단위)"""
+    df = download_market_data(symbol, period, interval, verbose=verbose)
+    if df is None or df.empty:
+        return None
+    df = calculate_indicators(df, verbose=verbose)
+    return generate_signals(df, symbol, interval, verbose=verbose)
 
-def send_to_server(signals: list, server_url: str = "http://localhost:8000/alert") -> tuple:
-    """신호를 FastAPI 서버로 전송"""
+def send_to_server(signals: list, server_url: str = "http://localhost:8000/alert", batch_size: int = 500,
+                   concurrency: int = 4) -> tuple:
+    """신호를 FastAPI 서버로 전송 (keep-alive 세션, 배치 엔드포인트 우선)"""
     print(f"[4/5] Sending {len(signals)} signals to server...")
     
-    success_count = 0
-    error_count = 0
-    
-    for signal in signals:
-        try:
-            response = requests.post(server_url, json=signal, timeout=5)
-            if response.status_code == 200:
-                success_count += 1
-                if success_count % 10 == 0:
-                    print(f"  ... {success_count}/{len(signals)}")
-            else:
-                error_count += 1
-        except Exception as e:
-            error_count += 1
-            if error_count <= 3:
-                print(f"[WARN] Request failed: {e}")
-    
-    print(f"[OK] Sent: {success_count}, Errors: {error_count}")
-    return success_count, error_count
+    sender = SignalSender(server_url, batch_size=batch_size, concurrency=concurrency)
+    sender.submit(signals)
+    return sender.close()
 
 def main():
     parser = argparse.ArgumentParser(description='Auto collect market data via yfinance')
     parser.add_argument('--symbols', nargs='+', default=['SPX'], help='Symbols to collect (SPX, NASDAQ, QQQ, etc)')
+    parser.add_argument('--symbols-file', type=str, help='Text file with one symbol per line (appended to --symbols)')
     parser.add_argument('--period', type=str, default='2y', help='Period (1y, 2y, 5y, max)')
     parser.add_argument('--interval', type=str, default='1wk', help='Interval (1d, 1wk, 1mo)')
     parser.add_argument('--server', type=str, default='http://localhost:8000/alert', help='FastAPI server URL')
     parser.add_argument('--export-csv', action='store_true', help='Export to CSV instead of sending to server')
+    parser.add_argument('--workers', type=int, default=8, help='Parallel symbol downloads/indicator workers')
+    parser.add_argument('--send-concurrency', type=int, default=4, help='Concurrent HTTP requests to the server')
+    parser.add_argument('--batch-size', type=int, default=500, help='Signals per /alerts/batch request')
+    parser.add_argument('--no-batch', action='store_true', help='Send one signal per /alert request')
     
     args = parser.parse_args()
     
+    symbols = list(args.symbols)
+    if args.symbols_file:
+        with open(args.symbols_file) as f:
+            symbols.extend(line.strip() for line in f if line.strip() and not line.startswith('#'))
+    symbols = list(dict.fromkeys(symbols))
+    
     print("=" * 70)
     print("VMSI-SDM Auto Data Collection (yfinance)")
     print("=" * 70)
-    print(f"Symbols:  {', '.join(args.symbols)}")
+    print(f"Symbols:  {len(symbols)} ({', '.join(symbols[:10])}{', ...' if len(symbols) > 10 else ''})")
     print(f"Period:   {args.period}")
     print(f"Interval: {args.interval}")
+    print(f"Workers:  {args.workers}")
     print("=" * 70)
     
+    # 심볼 단위로 병렬 수집하고, 완료되는 대로 전송 큐에 넣어 수집/전송을 겹쳐 실행
+    sender = None
+    if not args.export_csv:
+        sender = SignalSender(args.server, batch_size=args.batch_size,
+                              concurrency=args.send_concurrency, use_batch=not args.no_batch)
+    
     all_signals = []
+    failed_symbols = []
+    started = time.time()
+    verbose = args.workers <= 1 or len(symbols) == 1
+    
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as executor:
+        futures = {
+            executor.submit(collect_symbol, symbol, args.period, args.interval, verbose): symbol
+            for symbol in symbols
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            symbol = futures[future]
+            try:
+                signals = future.result()
+            except Exception as e:
+                print(f"[ERROR] {symbol}: {e}")
+                signals = None
+            
+            if signals is None:
+                failed_symbols.append(symbol)
+                print(f"[ERROR] Skipping {symbol}")
+                continue
+            
+            if sender is not None:
+                sender.submit(signals)
+            else:
+                all_signals.extend(signals)
+            
+            elapsed = max(time.time() - started, 1e-9)
+            print(f"[{done}/{len(symbols)}] {symbol}: {len(signals)} signals "
+                  f"({done / elapsed:.1f} symbols/s, ETA {(len(symbols) - done) * elapsed / done:.0f}s)")
     
-    for symbol in args.symbols:
-        print(f"\n{'─' * 70}")
-        print(f"Processing: {symbol}")
-        print(f"{'─' * 70}")
-        
-        # Download data
-        df = download_market_data(symbol, args.period, args.interval)
-        if df is None or df.empty:
-            print(f"[ERROR] Skipping {symbol}")
-            continue
-        
-        # Calculate indicators
-        df = calculate_indicators(df)
-        
-        # Generate signals
-        signals = generate_signals(df, symbol, args.interval)
-        all_signals.extend(signals)
+    print(f"\n[OK] Collected {len(symbols) - len(failed_symbols)}/{len(symbols)} symbols "
+          f"in {time.time() - started:.1f}s")
+    if failed_symbols:
+        print(f"[WARN] Failed: {', '.join(failed_symbols)}")
     
     # Send to server or export CSV
+    errors = 0
     if args.export_csv:
         print(f"\n[5/5] Exporting {len(all_signals)} signals to CSV...")
         df_export = pd.DataFrame(all_signals)
@@ -294,7 +229,8 @@ def main():
         print(f"[OK] Exported to {filename}")
     else:
         print(f"\n{'=' * 70}")
-        success, errors = send_to_server(all_signals, args.server)
+        print("[4/5] Waiting for pending sends...")
+        success, errors = sender.close()
         print(f"[5/5] Complete! Success: {success}, Errors: {errors}")
         print("=" * 70)
     
@@ -302,4 +238,3 @@ def main():
 
 if __name__ == '__main__':
     sys.exit(main())
-
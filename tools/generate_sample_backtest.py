@@ -5,6 +5,7 @@ SPX 최근 3년 데이터 기반
 
 import sys
 import os
+import argparse
 from pathlib import Path
 from datetime import datetime, timedelta
 import random
@@ -165,6 +166,9 @@ def generate_realistic_signals():
                 "tp_price": round(tp_price, 2),
                 "atr": round(atr, 2),
                 "vcp_ratio": round(vcp_ratio, 4),
+                "bar_state": "close",
+                "fast_mode": False,
+                "realtime_macro": False,
                 "version": "vmsi_sdm_v4_dynamic"
             }
             
@@ -199,7 +203,22 @@ def clear_database():
         print("[INFO] No existing database found")
         return True
 
+def import_direct(signals):
+    """서버를 거치지 않고 DB에 직접 벌크 저장 (/alerts/batch와 같은 검증, 벌크 라벨링 작업 1건 등록)"""
+    from server.db import init_db
+    from server.ingest import bulk_import_alerts
+    
+    init_db()
+    result = bulk_import_alerts([signals])
+    for index, error in result['errors'][:3]:
+        print(f"[ERROR] [{index + 1}/{len(signals)}] Failed: {error}")
+    return result['inserted'], result['failed']
+
 def main():
+    parser = argparse.ArgumentParser(description='Generate realistic SPX sample signals')
+    parser.add_argument('--direct', action='store_true', help='Bulk insert into DATABASE_URL directly (server not required)')
+    args = parser.parse_args()
+    
     print("=" * 70)
     print("Realistic SPX Backtest Data Generator (3 Years)")
     print("=" * 70)
@@ -220,25 +239,29 @@ def main():
     for i, sig in enumerate(signals[:3], 1):
         print(f"  {i}. {sig['action']} @ ${sig['price']:.2f} on {datetime.fromtimestamp(sig['ts_unix']).strftime('%Y-%m-%d')}")
     
-    # 3. 전송
-    print(f"\n[3/3] Sending signals to FastAPI...")
-    print("[INFO] Please wait...")
+    # 3. 전송 (또는 DB 직접 저장)
+    if args.direct:
+        print("\n[3/3] Inserting signals into database...")
+        success_count, fail_count = import_direct(signals)
+    else:
+        print("\n[3/3] Sending signals to FastAPI...")
+        print("[INFO] Please wait...")
     
-    success_count = 0
-    fail_count = 0
+        success_count = 0
+        fail_count = 0
     
-    for i, signal in enumerate(signals, 1):
-        success, result = send_signal_to_api(signal)
+        for i, signal in enumerate(signals, 1):
+            success, result = send_signal_to_api(signal)
         
-        if success:
-            success_count += 1
-            if i % 10 == 0 or i == 1:
-                print(f"[OK] [{i}/{len(signals)}] {signal['action']} @ ${signal['price']:.2f} -> Saved")
-        else:
-            fail_count += 1
-            print(f"[ERROR] [{i}/{len(signals)}] Failed: {result}")
+            if success:
+                success_count += 1
+                if i % 10 == 0 or i == 1:
+                    print(f"[OK] [{i}/{len(signals)}] {signal['action']} @ ${signal['price']:.2f} -> Saved")
+            else:
+                fail_count += 1
+                print(f"[ERROR] [{i}/{len(signals)}] Failed: {result}")
         
-        time.sleep(0.05)
+            time.sleep(0.05)
     
     # 결과
     print()
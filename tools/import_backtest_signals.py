@@ -6,11 +6,12 @@ TradingView 백테스트 결과를 FastAPI로 전송하는 스크립트 (v4 Dyna
 2. CSV 파일 저장
 3. python import_backtest_signals.py --csv trades.csv --symbol SPX --timeframe 1D --clear
 
+서버 없이 DB에 직접 벌크 저장 (대용량 이력):
+    python tools/import_backtest_signals.py --csv trades.csv --symbol SPX --timeframe 1D --direct
+
 주의: --clear 옵션은 기존 DB를 완전히 삭제합니다!
 """
 
-import requests
-import csv
 import sys
 import argparse
 from datetime import datetime
@@ -18,80 +19,118 @@ import time
 import os
 from pathlib import Path
 
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.tv_stream import detect_layout, frame_records, import_frames, read_chunks, send_frames
+
 # FastAPI 서버 URL
 API_URL = "http://localhost:8000/alert"
 
 # DB 파일 경로
 DB_PATH = Path(__file__).parent.parent / "vmsi_sdm.db"
 
-def parse_tradingview_csv(csv_file, symbol, timeframe):
+def trades_to_alerts(chunk, symbol, timeframe):
     """
-    TradingView CSV를 파싱하여 신호 목록 생성
+    TradingView 거래 목록 청크 → 알럿 DataFrame (컬럼 단위 변환)
+    
+    날짜/가격을 파싱할 수 없는 행은 경고 후 제외합니다.
+    
+    Args:
+        chunk: tv_stream.read_chunks() 청크 (type / time / price / ts_unix [/ symbol])
+        symbol: 심볼 (CSV에 symbol 컬럼이 있으면 그 값 우선)
+        timeframe: 타임프레임
+    """
+    trade_type = chunk['type'].astype(str).str.strip() if 'type' in chunk else pd.Series('Long', index=chunk.index)
+    entry_price = pd.to_numeric(chunk['price'].str.replace(',', '', regex=False), errors='coerce')
+    
+    unparsed = chunk['ts_unix'].isna()
+    if unparsed.any():
+        print(f"Warning: Could not parse {int(unparsed.sum())} dates (e.g. '{chunk['time'][unparsed].iloc[0]}'), skipping...")
+    if entry_price.isna().any():
+        print(f"Warning: Could not parse {int(entry_price.isna().sum())} prices, skipping...")
+    
+    keep = ~unparsed & entry_price.notna()
+    price = entry_price[keep]
+    is_buy = trade_type[keep].str.contains('Long|Buy')
+    
+    # 신호 생성 (간소화된 v3 형식, 백테스트에서는 실제 지표 값 알 수 없음)
+    return pd.DataFrame({
+        "ts_unix": chunk['ts_unix'][keep].astype('int64'),
+        "symbol": chunk['symbol'][keep] if 'symbol' in chunk else symbol,
+        "timeframe": timeframe,
+        "action": is_buy.map({True: "BUY", False: "SELL"}),
+        "price": price,
+        "trend_score": 65.0,
+        "rsi": is_buy.map({True: 60.0, False: 40.0}),
+        "vol_mult": 1.5,
+        "vcp_ratio": 0.5,
+        "ema1": price * np.where(is_buy, 0.99, 1.01),
+        "ema2": price * np.where(is_buy, 0.98, 1.02),
+        "sl_price": price.where(is_buy, 0) * 0.95,
+        "tp_price": price.where(is_buy, 0) * 1.10,
+        "bar_state": "close",
+        "fast_mode": False,
+        "realtime_macro": False,
+        "version": "vmsi_sdm_v3_clean"
+    })
+
+def read_tradingview_csv(csv_file, symbol, timeframe, chunksize=100_000, tz=None):
+    """
+    TradingView 거래 목록 CSV를 스트리밍으로 읽어 알럿 DataFrame 청크 생성
+    
+    헤더 레이아웃과 날짜 형식은 처음 한 번만 감지합니다 (tools/tv_stream.py).
+    오프셋 없는 날짜는 tz 기준으로 해석합니다 (None이면 로컬 시간대).
     
     예상 CSV 형식:
     Trade #, Type, Date/Time, Entry Price, Exit Price, Profit, Duration
     1, Long, 2023-01-15 09:30, 4850.50, 4950.25, +2.05%, 3d 2h
     """
+    layout = detect_layout(csv_file)
+    if layout.kind != 'trades':
+        raise ValueError(f"Not a Strategy Tester trade list export: {layout}")
+    for chunk in read_chunks(csv_file, layout, chunksize, tz):
+        yield trades_to_alerts(chunk, symbol, timeframe)
+
+def parse_tradingview_csv(csv_file, symbol, timeframe, tz=None):
+    """TradingView CSV를 파싱하여 신호 목록 생성 (소용량용, 전체를 메모리에 적재)"""
     signals = []
-    
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        
-        for row in reader:
-            try:
-                # CSV 헤더가 다를 수 있으므로 유연하게 처리
-                trade_type = row.get('Type', row.get('Signal', 'Long')).strip()
-                entry_date = row.get('Date/Time', row.get('Entry Time', '')).strip()
-                entry_price = float(row.get('Entry Price', row.get('Price', 0)))
-                
-                # 날짜 파싱
-                try:
-                    dt = datetime.strptime(entry_date, '%Y-%m-%d %H:%M')
-                except:
-                    try:
-                        dt = datetime.strptime(entry_date, '%m/%d/%Y %H:%M')
-                    except:
-                        print(f"Warning: Could not parse date '{entry_date}', skipping...")
-                        continue
-                
-                # 신호 타입
-                action = "BUY" if "Long" in trade_type or "Buy" in trade_type else "SELL"
-                
-                # 신호 생성 (간소화된 v3 형식)
-                signal = {
-                    "ts_unix": int(dt.timestamp()),
-                    "symbol": symbol,
-                    "timeframe": timeframe,
-                    "action": action,
-                    "price": entry_price,
-                    "trend_score": 65.0,  # 백테스트에서는 실제 값 알 수 없음
-                    "rsi": 60.0 if action == "BUY" else 40.0,
-                    "vol_mult": 1.5,
-                    "ema1": entry_price * 0.99 if action == "BUY" else entry_price * 1.01,
-                    "ema2": entry_price * 0.98 if action == "BUY" else entry_price * 1.02,
-                    "sl_price": entry_price * 0.95 if action == "BUY" else 0,
-                    "tp_price": entry_price * 1.10 if action == "BUY" else 0,
-                    "version": "vmsi_sdm_v3_clean"
-                }
-                
-                signals.append(signal)
-                
-            except Exception as e:
-                print(f"Warning: Error parsing row: {e}")
-                continue
-    
+    for frame in read_tradingview_csv(csv_file, symbol, timeframe, tz=tz):
+        signals.extend(frame_records(frame))
     return signals
 
-def send_signal_to_api(signal):
-    """신호를 FastAPI로 전송"""
-    try:
-        response = requests.post(API_URL, json=signal, timeout=5)
-        if response.status_code == 200:
-            return True, response.json()
-        else:
-            return False, response.text
-    except Exception as e:
-        return False, str(e)
+def import_direct(csv_file, symbol, timeframe, chunksize=100_000, defer_indexes=True, tz=None):
+    """
+    서버를 거치지 않고 DB에 직접 벌크 저장 (/alerts/batch와 같은 검증, 벌크 라벨링 작업 1건 등록)
+    
+    Returns:
+        bulk_import_alerts() 결과
+    """
+    return import_frames(read_tradingview_csv(csv_file, symbol, timeframe, chunksize, tz), defer_indexes=defer_indexes)
+
+class StreamSummary:
+    """스트림을 그대로 통과시키며 첫 신호 미리보기와 건수/기간 집계"""
+    
+    def __init__(self, frames):
+        self.frames = frames
+        self.count = 0
+        self.first_ts = None
+        self.last_ts = None
+    
+    def __iter__(self):
+        for frame in self.frames:
+            if frame.empty:
+                continue
+            if self.count == 0:
+                print("\nFirst 3 signals:")
+                for i, sig in enumerate(frame.head(3).itertuples(), 1):
+                    print(f"  {i}. {sig.action} @ ${sig.price:.2f} on {datetime.fromtimestamp(sig.ts_unix).strftime('%Y-%m-%d')}")
+            self.count += len(frame)
+            self.first_ts = min(self.first_ts or frame['ts_unix'].min(), frame['ts_unix'].min())
+            self.last_ts = max(self.last_ts or frame['ts_unix'].max(), frame['ts_unix'].max())
+            yield frame
 
 def clear_database():
     """기존 DB 파일 삭제"""
@@ -113,6 +152,10 @@ def main():
     parser.add_argument('--symbol', required=True, help='Symbol (e.g. SPX, AAPL)')
     parser.add_argument('--timeframe', required=True, help='Timeframe (e.g. 1D, 4H, 1H)')
     parser.add_argument('--clear', action='store_true', help='⚠️  Clear existing database (DELETE ALL DATA!)')
+    parser.add_argument('--direct', action='store_true', help='Bulk insert into DATABASE_URL directly (server not required)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='CSV rows per streamed chunk (one transaction each in --direct mode)')
+    parser.add_argument('--keep-indexes', action='store_true', help='Do not drop/rebuild signal indexes during --direct import')
+    parser.add_argument('--tz', default=None, help='Timezone of dates without a UTC offset (e.g. America/New_York, UTC; default: local timezone)')
     
     args = parser.parse_args()
     
@@ -122,7 +165,9 @@ def main():
     print(f"CSV File:    {args.csv}")
     print(f"Symbol:      {args.symbol}")
     print(f"Timeframe:   {args.timeframe}")
+    print(f"Timezone:    {args.tz or 'local'}")
     print(f"Clear DB:    {'YES ⚠️  (ALL DATA WILL BE DELETED!)' if args.clear else 'NO'}")
+    print(f"Mode:        {'DIRECT (DB bulk insert)' if args.direct else 'HTTP (' + API_URL + ')'}")
     print()
     
     # 확인 프롬프트
@@ -143,48 +188,40 @@ def main():
     
     # 2. CSV 파싱
     step = 2 if args.clear else 1
+    
+    if args.direct:
+        print(f"\n[{step}/{step + 1}] Streaming CSV into database...")
+        result = import_direct(args.csv, args.symbol, args.timeframe, args.chunk_size, not args.keep_indexes, args.tz)
+        for index, error in result['errors'][:5]:
+            print(f"✗ Row {index}: {error}")
+        print(f"\n[{step + 1}/{step + 1}] Import Complete!")
+        print("=" * 70)
+        print(f"Total Rows:      {result['received']}")
+        print(f"✅ Inserted:     {result['inserted']}")
+        print(f"❌ Failed:       {result['failed']}")
+        print(f"⏱️  Elapsed:     {result['elapsed_sec']:.1f}s")
+        if result['label_job_id']:
+            print(f"🏷️  Bulk label job #{result['label_job_id']} queued (processed by the server's label workers)")
+        print("=" * 70)
+        return
+    
+    # 3. 스트리밍 파싱 + 배치 전송 (keep-alive 세션, /alerts/batch)
     total_steps = 4 if args.clear else 3
-    print(f"\n[{step}/{total_steps}] Parsing CSV...")
+    print(f"\n[{step}/{total_steps}] Streaming CSV...")
+    step += 1
+    print(f"[{step}/{total_steps}] Sending signals to FastAPI in batches...")
+    stream = StreamSummary(read_tradingview_csv(args.csv, args.symbol, args.timeframe, args.chunk_size, args.tz))
     try:
-        signals = parse_tradingview_csv(args.csv, args.symbol, args.timeframe)
-        print(f"✓ Found {len(signals)} signals")
-        
-        if len(signals) == 0:
-            print("❌ No signals found in CSV. Check your file format.")
-            return
-        
-        # 신호 미리보기
-        print("\nFirst 3 signals:")
-        for i, sig in enumerate(signals[:3], 1):
-            print(f"  {i}. {sig['action']} @ ${sig['price']:.2f} on {datetime.fromtimestamp(sig['ts_unix']).strftime('%Y-%m-%d')}")
-        
+        success_count, fail_count = send_frames(stream, API_URL)
     except Exception as e:
-        print(f"✗ Error parsing CSV: {e}")
+        print(f"✗ Error importing CSV: {e}")
         import traceback
         traceback.print_exc()
         return
     
-    # 3. 신호 전송
-    step += 1
-    print(f"\n[{step}/{total_steps}] Sending signals to FastAPI...")
-    print("⏳ This may take a few minutes for large datasets...")
-    
-    success_count = 0
-    fail_count = 0
-    
-    for i, signal in enumerate(signals, 1):
-        success, result = send_signal_to_api(signal)
-        
-        if success:
-            success_count += 1
-            if i % 10 == 0 or i == 1:  # 10개마다 출력
-                print(f"✓ [{i}/{len(signals)}] {signal['action']} @ ${signal['price']:.2f} → Saved")
-        else:
-            fail_count += 1
-            print(f"✗ [{i}/{len(signals)}] Failed: {result}")
-        
-        # API 부하 방지
-        time.sleep(0.05)
+    if stream.count == 0:
+        print("❌ No signals found in CSV. Check your file format.")
+        return
     
     # 4. 결과 요약
     step += 1
@@ -193,11 +230,11 @@ def main():
     print("=" * 70)
     print("📊 IMPORT SUMMARY")
     print("=" * 70)
-    print(f"Total Signals:   {len(signals)}")
-    print(f"✅ Success:      {success_count} ({success_count/len(signals)*100:.1f}%)")
-    print(f"❌ Failed:       {fail_count} ({fail_count/len(signals)*100:.1f}%)")
+    print(f"Total Signals:   {stream.count}")
+    print(f"✅ Success:      {success_count} ({success_count/stream.count*100:.1f}%)")
+    print(f"❌ Failed:       {fail_count} ({fail_count/stream.count*100:.1f}%)")
     print()
-    print(f"📅 Date Range:   {datetime.fromtimestamp(signals[0]['ts_unix']).strftime('%Y-%m-%d')} → {datetime.fromtimestamp(signals[-1]['ts_unix']).strftime('%Y-%m-%d')}")
+    print(f"📅 Date Range:   {datetime.fromtimestamp(stream.first_ts).strftime('%Y-%m-%d')} → {datetime.fromtimestamp(stream.last_ts).strftime('%Y-%m-%d')}")
     print(f"🔢 Symbol:       {args.symbol}")
     print(f"⏱️  Timeframe:   {args.timeframe}")
     print()
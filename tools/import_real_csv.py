@@ -4,6 +4,7 @@
 
 Usage:
     python tools/import_real_csv.py --csv "SP_SPX, 1W.csv" --symbol SPX --timeframe 1W
+    python tools/import_real_csv.py --csv "SP_SPX, 1W.csv" --symbol SPX --timeframe 1W --direct  # 서버 없이 DB 직접 저장
 """
 
 import sys
@@ -11,196 +12,113 @@ import os
 import argparse
 import pandas as pd
 from datetime import datetime
-import requests
 
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-def parse_spx_csv(csv_path: str) -> list:
+from server.indicators import compute_indicators, generate_signals, signal_records
+from tools.tv_stream import SignalSender, detect_layout, iter_symbol_bars, read_chunks
+
+# v5 조건 + EMA 필터 + RSI 밴드 (Buy 45~65, Sell 35~55)
+SIGNAL_PARAMS = {
+    'trend_score_buy': 50, 'rsi_buy_th': 45, 'rsi_buy_max': 65, 'vol_mult_buy': 1.0,
+    'trend_score_sell': 50, 'rsi_sell_th': 55, 'rsi_sell_min': 35, 'vol_mult_sell': 1.0,
+    'use_ema_filter': True,
+}
+
+def bars_to_signals(bars: pd.DataFrame, symbol: str, timeframe: str) -> list:
     """
-    SPX CSV 파일을 파싱하여 BUY/SELL 신호 생성
+    차트 바 시계열 1개 → BUY/SELL 알럿 레코드
     
     Strategy:
-    - Buy: EMA1 > EMA2 + Volume spike + Price pullback recovery
-    - Sell: EMA1 < EMA2 + Volume spike + Price breakdown
+    - Buy: EMA1 > EMA2 + Volume spike + RSI 45~65
+    - Sell: EMA1 < EMA2 + Volume spike + RSI 35~55
+    """
+    # 인디케이터 계산 (server.indicators), EMA는 차트에서 내보낸 값 우선 사용
+    indicators = compute_indicators(bars, SIGNAL_PARAMS)
+    for column in ('ema1', 'ema2'):
+        if column in bars:
+            indicators[column] = bars[column].to_numpy(dtype=float)
+    
+    signals = generate_signals(bars, SIGNAL_PARAMS, indicators=indicators)
+    return signal_records(signals, symbol, timeframe, mode='real_data', version='vmsi_sdm_v5_real')
+
+def iter_csv_signals(csv_path: str, symbol: str = 'SPX', timeframe: str = '1W', chunksize: int = 100_000, tz: str = None):
+    """
+    TradingView 차트 CSV를 스트리밍으로 읽어 심볼별 알럿 레코드 생성
+    
+    symbol 컬럼이 있는 멀티 심볼 내보내기는 심볼마다 시계열이 완성되는 즉시 신호를 만들므로
+    메모리는 가장 긴 심볼 1개 분량으로 유지됩니다.
+    
+    Args:
+        csv_path: CSV 파일 경로
+        symbol: 심볼명 (symbol 컬럼이 없을 때)
+        timeframe: 타임프레임
+        chunksize: 청크당 행 수
+        tz: 오프셋 없는 날짜의 시간대 (None이면 로컬 시간대)
+    
+    Yields:
+        (symbol, 바 수, 알럿 레코드 목록)
+    """
+    layout = detect_layout(csv_path)
+    if layout.kind != 'bars':
+        raise ValueError(f"Not a chart data export: {layout}")
+    
+    for series_symbol, bars in iter_symbol_bars(read_chunks(csv_path, layout, chunksize, tz), symbol):
+        yield series_symbol, len(bars), bars_to_signals(bars, series_symbol, timeframe)
+
+def parse_spx_csv(csv_path: str, symbol: str = 'SPX', timeframe: str = '1W') -> list:
+    """
+    TradingView CSV 파일을 파싱하여 BUY/SELL 신호 생성 (전체 신호 목록 반환)
+    
+    Args:
+        csv_path: CSV 파일 경로
+        symbol: 심볼명
+        timeframe: 타임프레임
     """
     print(f"[1/4] Reading CSV: {csv_path}")
-    df = pd.read_csv(csv_path)
-    
-    print(f"[OK] Loaded {len(df)} rows")
-    print(f"[INFO] Date range: {df['time'].iloc[0]} to {df['time'].iloc[-1]}")
-    
-    signals = []
-    
-    # Calculate indicators
-    df['ema_cross'] = (df['EMA1'] > df['EMA2']).astype(int)
-    df['ema_cross_prev'] = df['ema_cross'].shift(1)
-    df['vol_avg'] = df['Volume'].rolling(20).mean()
-    df['vol_mult'] = df['Volume'] / df['vol_avg']
-    df['price_change'] = (df['close'] - df['close'].shift(1)) / df['close'].shift(1) * 100
-    
-    # RSI calculation
-    delta = df['close'].diff()
-    gain = (delta.where(delta > 0, 0)).rolling(window=14).mean()
-    loss = (-delta.where(delta < 0, 0)).rolling(window=14).mean()
-    rs = gain / loss
-    df['rsi'] = 100 - (100 / (1 + rs))
-    
-    # ATR calculation
-    df['high_low'] = df['high'] - df['low']
-    df['high_close'] = abs(df['high'] - df['close'].shift(1))
-    df['low_close'] = abs(df['low'] - df['close'].shift(1))
-    df['true_range'] = df[['high_low', 'high_close', 'low_close']].max(axis=1)
-    df['atr'] = df['true_range'].rolling(14).mean()
-    
-    # VCP (Volatility Contraction Pattern)
-    df['vcp_high'] = df['high'].rolling(20).max()
-    df['vcp_low'] = df['low'].rolling(20).min()
-    df['vcp_ratio'] = (df['vcp_high'] - df['vcp_low']) / df['vcp_high']
-    
-    # Trend Score calculation
-    def calc_trend_score(row):
-        if pd.isna(row['rsi']) or pd.isna(row['vol_mult']):
-            return 50
-        
-        ema_above = 1.0 if row['EMA1'] > row['EMA2'] else 0.0
-        rsi_norm = row['rsi'] / 100.0
-        vol_norm = min(row['vol_mult'] / 3.0, 1.0)
-        vcp_norm = 1.0 - row['vcp_ratio']
-        
-        # Weights from v5
-        alpha, beta, gamma, delta = 0.8, 0.35, 0.7, 0.6
-        raw = (alpha * ema_above + beta * rsi_norm + gamma * vol_norm + delta * vcp_norm) * 100.0
-        return max(0, min(100, raw))
-    
-    df['trend_score'] = df.apply(calc_trend_score, axis=1)
-    
-    print("[2/4] Generating signals...")
-    
-    buy_count = 0
-    sell_count = 0
-    
-    for i in range(20, len(df)):  # Start after indicator warmup
-        row = df.iloc[i]
-        prev_row = df.iloc[i-1]
-        
-        # Skip if not enough data
-        if pd.isna(row['rsi']) or pd.isna(row['atr']):
-            continue
-        
-        # Buy Signal: EMA cross up + RSI oversold recovery + Volume
-        buy_condition = (
-            row['EMA1'] > row['EMA2'] and 
-            row['rsi'] > 45 and row['rsi'] < 65 and
-            row['vol_mult'] > 1.0 and
-            row['trend_score'] >= 50
-        )
-        
-        # Sell Signal: EMA cross down + RSI overbought + Volume
-        sell_condition = (
-            row['EMA1'] < row['EMA2'] and 
-            row['rsi'] > 35 and row['rsi'] < 55 and
-            row['vol_mult'] > 1.0 and
-            row['trend_score'] <= 50
-        )
-        
-        # Create signal
-        if buy_condition:
-            buy_count += 1
-            sl_price = row['close'] - (row['atr'] * 1.5)
-            tp_price = row['close'] + (row['atr'] * 2.5)
-            
-            signals.append({
-                'ts_unix': int(row['time']),
-                'symbol': 'SPX',
-                'timeframe': '1W',
-                'action': 'BUY',
-                'price': float(row['close']),
-                'signal_number': buy_count,
-                'trend_score': float(row['trend_score']),
-                'prob': float(row['trend_score']) / 100.0,  # Convert to 0-1 range
-                'rsi': float(row['rsi']),
-                'vol_mult': float(row['vol_mult']),
-                'vcp_ratio': float(row['vcp_ratio']),
-                'dist_ath': 0.0,  # Placeholder (not critical for v5)
-                'ema1': float(row['EMA1']),
-                'ema2': float(row['EMA2']),
-                'sl_price': float(sl_price),
-                'tp_price': float(tp_price),
-                'atr': float(row['atr']),
-                'bar_state': 'close',
-                'fast_mode': False,
-                'realtime_macro': False,
-                'mode': 'real_data',
-                'version': 'vmsi_sdm_v5_real'
-            })
-        
-        elif sell_condition:
-            sell_count += 1
-            sl_price = row['close'] + (row['atr'] * 1.5)
-            tp_price = row['close'] - (row['atr'] * 2.5)
-            
-            signals.append({
-                'ts_unix': int(row['time']),
-                'symbol': 'SPX',
-                'timeframe': '1W',
-                'action': 'SELL',
-                'price': float(row['close']),
-                'signal_number': sell_count,
-                'trend_score': float(row['trend_score']),
-                'prob': float(row['trend_score']) / 100.0,  # Convert to 0-1 range
-                'rsi': float(row['rsi']),
-                'vol_mult': float(row['vol_mult']),
-                'vcp_ratio': float(row['vcp_ratio']),
-                'dist_ath': 0.0,  # Placeholder (not critical for v5)
-                'ema1': float(row['EMA1']),
-                'ema2': float(row['EMA2']),
-                'sl_price': float(sl_price),
-                'tp_price': float(tp_price),
-                'atr': float(row['atr']),
-                'bar_state': 'close',
-                'fast_mode': False,
-                'realtime_macro': False,
-                'mode': 'real_data',
-                'version': 'vmsi_sdm_v5_real'
-            })
-    
-    print(f"[OK] Generated {len(signals)} signals (Buy: {buy_count}, Sell: {sell_count})")
-    return signals
+    records = []
+    for series_symbol, bar_count, signals in iter_csv_signals(csv_path, symbol, timeframe):
+        print(f"[OK] {series_symbol}: {bar_count} bars → {len(signals)} signals")
+        records.extend(signals)
+    
+    buy_count = sum(1 for record in records if record['action'] == 'BUY')
+    print(f"[OK] Generated {len(records)} signals (Buy: {buy_count}, Sell: {len(records) - buy_count})")
+    return records
+
+def import_direct(csv_path: str, symbol: str, timeframe: str, chunksize: int = 100_000, tz: str = None) -> tuple:
+    """서버를 거치지 않고 DB에 직접 벌크 저장 (/alerts/batch와 같은 검증, 벌크 라벨링 작업 1건 등록)"""
+    from server.db import init_db
+    from server.ingest import bulk_import_alerts
+    
+    init_db()
+    result = bulk_import_alerts(
+        signals for _, _, signals in iter_csv_signals(csv_path, symbol, timeframe, chunksize, tz)
+    )
+    for index, error in result['errors'][:3]:
+        print(f"[ERROR] Signal {index} failed: {error}")
+    if result['label_job_id']:
+        print(f"[OK] Bulk label job #{result['label_job_id']} queued")
+    return result['inserted'], result['failed']
 
-def send_to_server(signals: list, server_url: str = "http://localhost:8000/alert"):
-    """신호를 FastAPI 서버로 전송"""
-    print(f"[3/4] Sending {len(signals)} signals to server...")
-    
-    success_count = 0
-    error_count = 0
-    
-    for i, signal in enumerate(signals):
-        try:
-            response = requests.post(server_url, json=signal, timeout=5)
-            if response.status_code == 200:
-                success_count += 1
-                if success_count == 1:
-                    print(f"[OK] First signal sent successfully")
-            else:
-                error_count += 1
-                if error_count <= 3:  # Only print first 3 errors
-                    print(f"[ERROR] Signal failed: {signal['action']} @ {signal['ts_unix']}")
-                    print(f"        HTTP {response.status_code}: {response.text}")
-        except Exception as e:
-            error_count += 1
-            if error_count <= 3:
-                print(f"[ERROR] Request failed: {e}")
-    
-    print(f"[OK] Sent: {success_count}, Errors: {error_count}")
-    return success_count, error_count
+def send_to_server(csv_path: str, symbol: str, timeframe: str, server_url: str = "http://localhost:8000/alert",
+                   chunksize: int = 100_000, tz: str = None) -> tuple:
+    """심볼별 신호를 keep-alive 세션으로 /alerts/batch에 배치 전송"""
+    sender = SignalSender(server_url)
+    for series_symbol, bar_count, signals in iter_csv_signals(csv_path, symbol, timeframe, chunksize, tz):
+        print(f"[OK] {series_symbol}: {bar_count} bars → {len(signals)} signals")
+        sender.submit(signals)
+    return sender.close()
 
 def main():
     parser = argparse.ArgumentParser(description='Import real CSV data to VMSI-SDM')
     parser.add_argument('--csv', type=str, required=True, help='Path to CSV file')
-    parser.add_argument('--symbol', type=str, default='SPX', help='Symbol name')
+    parser.add_argument('--symbol', type=str, default='SPX', help='Symbol name (when the CSV has no symbol column)')
     parser.add_argument('--timeframe', type=str, default='1W', help='Timeframe (1W, 1D, etc)')
     parser.add_argument('--server', type=str, default='http://localhost:8000/alert', help='FastAPI server URL')
+    parser.add_argument('--direct', action='store_true', help='Bulk insert into DATABASE_URL directly (server not required)')
+    parser.add_argument('--chunk-size', type=int, default=100_000, help='CSV rows per streamed chunk')
+    parser.add_argument('--tz', type=str, default=None, help='Timezone of dates without a UTC offset (e.g. America/New_York, UTC; default: local timezone)')
     
     args = parser.parse_args()
     
@@ -213,18 +131,20 @@ def main():
         print(f"[ERROR] CSV file not found: {args.csv}")
         return 1
     
-    # Parse CSV
-    signals = parse_spx_csv(args.csv)
+    # Stream CSV → signals → server (or database)
+    print(f"[1/3] Streaming CSV: {args.csv}")
+    print(f"[2/3] {'Inserting into database' if args.direct else 'Sending to ' + args.server}...")
+    if args.direct:
+        success, errors = import_direct(args.csv, args.symbol, args.timeframe, args.chunk_size, args.tz)
+    else:
+        success, errors = send_to_server(args.csv, args.symbol, args.timeframe, args.server, args.chunk_size, args.tz)
     
-    if not signals:
+    if success + errors == 0:
         print("[ERROR] No signals generated")
         return 1
     
-    # Send to server
-    success, errors = send_to_server(signals, args.server)
-    
     print("=" * 60)
-    print(f"[4/4] Import complete!")
+    print(f"[3/3] Import complete!")
     print(f"      Success: {success}, Errors: {errors}")
     print("=" * 60)
     
@@ -232,4 +152,3 @@ def main():
 
 if __name__ == '__main__':
     sys.exit(main())
-
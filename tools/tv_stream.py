@@ -0,0 +1,437 @@
+"""
+TradingView CSV 스트리밍 리더 + 신호 전송 싱크
+
+- 헤더 레이아웃(거래 목록 / 차트 바 내보내기)과 날짜 형식을 한 번만 감지
+- 고정 크기 청크를 타입 지정 컬럼으로 읽고 날짜는 감지된 형식으로 벡터화 파싱
+- 청크(알럿 DataFrame)를 HTTP 배치 전송 또는 DB 직접 저장 싱크로 전달
+  → 파일 크기와 무관하게 메모리 일정 (차트 바는 심볼 1개 시계열 단위)
+
+Usage:
+    from tools.tv_stream import detect_layout, read_chunks
+    layout = detect_layout("trades.csv")
+    for chunk in read_chunks("trades.csv", layout):
+        ...
+"""
+
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+import requests
+from dateutil import tz as dateutil_tz
+from requests.adapters import HTTPAdapter
+
+
+# ─────────────── Layout Detection ───────────────
+
+# 표준 컬럼 → 후보 헤더 (앞쪽 우선)
+TRADE_HEADERS = {
+    "type": ["Type", "Signal"],
+    "time": ["Date/Time", "Entry Time", "Date and time"],
+    "price": ["Entry Price", "Price", "Price USD"],
+}
+
+BAR_HEADERS = {
+    "time": ["time", "Time", "Date", "date"],
+    "open": ["open", "Open"],
+    "high": ["high", "High"],
+    "low": ["low", "Low"],
+    "close": ["close", "Close"],
+    "volume": ["Volume", "volume"],
+    "ema1": ["EMA1"],
+    "ema2": ["EMA2"],
+}
+
+SYMBOL_HEADERS = ["symbol", "Symbol", "ticker", "Ticker"]
+
+# 문자열 날짜 후보 형식 (샘플에서 가장 많이 파싱되는 형식 선택)
+TIME_FORMATS = [
+    "%Y-%m-%d %H:%M",
+    "%Y-%m-%d %H:%M:%S",
+    "%Y-%m-%d",
+    "%m/%d/%Y %H:%M",
+    "%m/%d/%Y",
+    "%Y-%m-%dT%H:%M:%S%z",
+    "ISO8601",
+]
+
+# 날짜 문자열 끝의 UTC 오프셋 (Z, +09:00, -0500)
+UTC_OFFSET_PATTERN = r"(?:Z|[+-]\d{2}:?\d{2})$"
+
+
+class ExportLayout:
+    """감지된 CSV 레이아웃 (kind, 표준 컬럼 → 원본 헤더, 날짜 형식)"""
+
+    def __init__(self, kind: str, columns: Dict[str, str], time_format: str):
+        """
+        Args:
+            kind: trades (Strategy Tester 거래 목록) 또는 bars (차트 데이터 내보내기)
+            columns: {표준 컬럼: 원본 헤더}
+            time_format: unix / unix_ms / strftime 형식 / ISO8601
+        """
+        self.kind = kind
+        self.columns = columns
+        self.time_format = time_format
+
+    def dtypes(self) -> Dict[str, Any]:
+        """read_csv 컬럼 타입 (거래 목록 가격은 통화 표기 대비 문자열로 읽고 to_numeric 변환)"""
+        numeric = {"open", "high", "low", "close", "volume", "ema1", "ema2"}
+        return {
+            source: (np.float64 if name in numeric else str)
+            for name, source in self.columns.items()
+        }
+
+    def __repr__(self) -> str:
+        return f"ExportLayout(kind={self.kind!r}, columns={self.columns!r}, time_format={self.time_format!r})"
+
+
+def _match_headers(header: List[str], candidates: Dict[str, List[str]]) -> Dict[str, str]:
+    """후보 헤더 중 존재하는 첫 컬럼 매핑"""
+    present = set(header)
+    return {
+        name: next(source for source in sources if source in present)
+        for name, sources in candidates.items() if any(source in present for source in sources)
+    }
+
+
+def detect_time_format(values: pd.Series) -> str:
+    """
+    샘플 값으로 날짜 형식 감지
+
+    Args:
+        values: 날짜 문자열 샘플
+
+    Returns:
+        unix / unix_ms / strftime 형식 / ISO8601
+    """
+    values = values.dropna().astype(str).str.strip()
+    values = values[values != ""]
+    if values.empty:
+        return "ISO8601"
+
+    numbers = pd.to_numeric(values, errors="coerce")
+    if numbers.notna().all():
+        return "unix_ms" if numbers.abs().max() > 100_000_000_000 else "unix"
+
+    best, best_count = "ISO8601", -1
+    for fmt in TIME_FORMATS:
+        count = int(pd.to_datetime(values, format=fmt, errors="coerce", utc=True).notna().sum())
+        if count > best_count:
+            best, best_count = fmt, count
+        if count == len(values):
+            break
+    return best
+
+
+def detect_layout(path: str, sample_rows: int = 1000) -> ExportLayout:
+    """
+    헤더 + 샘플 행으로 CSV 레이아웃과 날짜 형식 감지 (파일 전체를 읽지 않음)
+
+    Args:
+        path: CSV 경로
+        sample_rows: 날짜 형식 감지용 샘플 행 수
+
+    Returns:
+        ExportLayout
+
+    Raises:
+        ValueError: 거래 목록/차트 바 어느 쪽 헤더도 아닌 경우
+    """
+    sample = pd.read_csv(path, nrows=sample_rows, dtype=str, skipinitialspace=True)
+    header = [str(column) for column in sample.columns]
+
+    bars = _match_headers(header, BAR_HEADERS)
+    trades = _match_headers(header, TRADE_HEADERS)
+    if {"time", "close"} <= bars.keys():
+        kind, columns = "bars", bars
+    elif "time" in trades and "price" in trades:
+        kind, columns = "trades", trades
+    else:
+        raise ValueError(f"Unrecognized TradingView export header: {header}")
+
+    symbol = next((source for source in SYMBOL_HEADERS if source in header), None)
+    if symbol is not None:
+        columns["symbol"] = symbol
+
+    return ExportLayout(kind, columns, detect_time_format(sample[columns["time"]]))
+
+
+# ─────────────── Chunk Reader ───────────────
+
+def _to_utc(text: pd.Series, fmt: str, zone: Any) -> pd.Series:
+    """문자열 → UTC datetime (오프셋 없는 값은 zone 기준, DST 중복/누락 시각은 NaT/앞당김)"""
+    try:
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce")
+    except ValueError:
+        # 오프셋 유무/값이 섞인 ISO8601 → 오프셋 있는 값은 그대로, 없는 값만 zone 기준으로 변환
+        parsed = pd.to_datetime(text, format=fmt, errors="coerce", utc=True)
+        naive = ~text.str.contains(UTC_OFFSET_PATTERN)
+        if naive.any():
+            parsed[naive] = _to_utc(text[naive], fmt, zone)
+        return parsed
+    if parsed.dt.tz is None:
+        parsed = parsed.dt.tz_localize(zone, ambiguous="NaT", nonexistent="shift_forward")
+    return parsed.dt.tz_convert("UTC")
+
+
+def parse_times(values: pd.Series, time_format: str, tz: Optional[str] = None) -> pd.Series:
+    """
+    날짜 컬럼 → unix 초 (파싱 실패는 NaN)
+
+    감지된 형식으로 먼저 파싱하고, 실패한 행만 나머지 후보 형식으로 다시 시도합니다.
+    오프셋 없는 날짜는 tz 기준 현지 시각으로 해석합니다 (기본: 실행 머신의 로컬 시간대,
+    기존 datetime.strptime(...).timestamp()와 동일).
+
+    Args:
+        values: 날짜 문자열 컬럼
+        time_format: detect_time_format() 결과
+        tz: 오프셋 없는 날짜의 시간대 (예: America/New_York, UTC / None이면 로컬 시간대)
+
+    Returns:
+        float64 unix 초 Series (NaN = 파싱 실패)
+    """
+    if time_format in ("unix", "unix_ms"):
+        seconds = pd.to_numeric(values, errors="coerce")
+        return seconds / 1000 if time_format == "unix_ms" else seconds.astype(np.float64)
+
+    zone = tz or dateutil_tz.tzlocal()
+    text = values.astype(str).str.strip()
+    parsed = _to_utc(text, time_format, zone)
+    for fmt in TIME_FORMATS:
+        failed = parsed.isna() & values.notna()
+        if not failed.any():
+            break
+        if fmt != time_format:
+            parsed[failed] = _to_utc(text[failed], fmt, zone)
+
+    seconds = pd.Series(np.nan, index=values.index)
+    ok = parsed.notna()
+    seconds[ok] = parsed[ok].dt.as_unit("s").astype("int64").astype(np.float64)
+    return seconds
+
+
+def read_chunks(
+    path: str,
+    layout: Optional[ExportLayout] = None,
+    chunksize: int = 100_000,
+    tz: Optional[str] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    CSV를 고정 크기 청크로 읽어 표준 컬럼 DataFrame 생성
+
+    필요한 컬럼만 타입을 지정해 읽고, 'ts_unix' 컬럼(float, NaN = 파싱 실패)을 추가합니다.
+
+    Args:
+        path: CSV 경로
+        layout: detect_layout() 결과 (None이면 감지)
+        chunksize: 청크당 행 수
+        tz: 오프셋 없는 날짜의 시간대 (parse_times 참고)
+
+    Yields:
+        표준 컬럼 이름의 청크 DataFrame
+    """
+    layout = layout or detect_layout(path)
+    rename = {source: name for name, source in layout.columns.items()}
+    reader = pd.read_csv(
+        path,
+        usecols=list(rename),
+        dtype=layout.dtypes(),
+        chunksize=chunksize,
+        skipinitialspace=True,
+    )
+    for chunk in reader:
+        chunk = chunk.rename(columns=rename)
+        chunk["ts_unix"] = parse_times(chunk["time"], layout.time_format, tz)
+        yield chunk
+
+
+def iter_symbol_bars(
+    chunks: Iterable[pd.DataFrame],
+    default_symbol: str
+) -> Iterator[Tuple[str, pd.DataFrame]]:
+    """
+    바 청크 스트림 → 심볼별 시계열 (심볼이 바뀌는 시점에 완성된 시계열 방출)
+
+    멀티 심볼 내보내기는 심볼별로 연속된 행이어야 하며, 메모리는 가장 긴 심볼 1개 분량입니다.
+
+    Args:
+        chunks: read_chunks() 결과 (kind=bars)
+        default_symbol: symbol 컬럼이 없을 때 사용할 심볼
+
+    Yields:
+        (symbol, 시간 오름차순 바 DataFrame)
+    """
+    current, parts = None, []
+    seen = set()
+
+    def flush():
+        bars = pd.concat(parts, ignore_index=True)
+        bars = bars[bars["ts_unix"].notna()].sort_values("ts_unix", kind="stable").reset_index(drop=True)
+        bars["time"] = bars["ts_unix"].astype(np.int64)
+        if current in seen:
+            print(f"⚠️  {current} rows are not contiguous; emitted as a separate series")
+        seen.add(current)
+        return current, bars.drop(columns=["ts_unix", "symbol"], errors="ignore")
+
+    for chunk in chunks:
+        if "symbol" not in chunk:
+            chunk = chunk.assign(symbol=default_symbol)
+        symbols = chunk["symbol"].to_numpy()
+        boundaries = np.flatnonzero(symbols[1:] != symbols[:-1]) + 1
+        for start, end in zip(np.r_[0, boundaries], np.r_[boundaries, len(chunk)]):
+            symbol = symbols[start]
+            if parts and symbol != current:
+                yield flush()
+                parts = []
+            current = symbol
+            parts.append(chunk.iloc[start:end])
+
+    if parts:
+        yield flush()
+
+
+# ─────────────── Sinks ───────────────
+
+def frame_records(frame: pd.DataFrame) -> List[Dict[str, Any]]:
+    """알럿 DataFrame → JSON 직렬화 가능한 dict 목록 (NaN → None)"""
+    frame = frame.astype(object)
+    return frame.where(frame.notna(), None).to_dict("records")
+
+
+def batch_url(server_url: str) -> str:
+    """단건 알럿 URL (/alert) → 배치 수신 URL (/alerts/batch)"""
+    base = server_url.rstrip("/")
+    if base.endswith("/alerts/batch"):
+        return base
+    if base.endswith("/alert"):
+        base = base[:-len("/alert")]
+    return base + "/alerts/batch"
+
+
+class SignalSender:
+    """
+    keep-alive 세션 + 동시 전송 수 제한으로 신호 전송
+
+    배치 엔드포인트(/alerts/batch)를 우선 사용하고, 서버가 지원하지 않으면(404/405)
+    같은 세션으로 /alert 단건 전송으로 전환합니다.
+    """
+
+    def __init__(self, server_url: str = "http://localhost:8000/alert", batch_size: int = 500,
+                 concurrency: int = 4, use_batch: bool = True):
+        """
+        Args:
+            server_url: 단건 알럿 URL
+            batch_size: 배치 요청당 신호 수
+            concurrency: 동시 요청 수 (커넥션 풀 크기)
+            use_batch: 배치 엔드포인트 사용 여부
+        """
+        self.server_url = server_url
+        self.batch_url = batch_url(server_url)
+        self.batch_size = batch_size
+        self.use_batch = use_batch
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=concurrency)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.executor = ThreadPoolExecutor(max_workers=concurrency)
+        self.futures = []
+        self._slots = threading.BoundedSemaphore(concurrency * 2)  # 대기 요청 상한 (메모리 일정 유지)
+
+        self._lock = threading.Lock()
+        self.success_count = 0
+        self.error_count = 0
+        self.started = time.time()
+
+    def submit(self, signals: list):
+        """신호 목록을 배치(또는 단건) 요청으로 나눠 비동기 전송 (대기 요청이 많으면 블록)"""
+        step = self.batch_size if self.use_batch else 1
+        for i in range(0, len(signals), step):
+            self._slots.acquire()
+            future = self.executor.submit(self._send, signals[i:i + step])
+            future.add_done_callback(lambda _: self._slots.release())
+            self.futures.append(future)
+        self.futures = [future for future in self.futures if not future.done()]
+
+    def _send(self, chunk: list):
+        """청크 1개 전송 (배치 미지원이면 단건 전송으로 전환)"""
+        if self.use_batch:
+            try:
+                response = self.session.post(self.batch_url, json=chunk, timeout=30)
+                if response.status_code in (404, 405):
+                    with self._lock:
+                        if self.use_batch:
+                            print(f"[WARN] Batch endpoint unavailable ({response.status_code}), falling back to {self.server_url}")
+                        self.use_batch = False
+                elif response.status_code == 200:
+                    body = response.json()
+                    self._count(body.get("inserted", 0), body.get("failed", 0))
+                    return
+                else:
+                    self._count(0, len(chunk), f"HTTP {response.status_code}: {response.text[:200]}")
+                    return
+            except Exception as e:
+                self._count(0, len(chunk), f"Request failed: {e}")
+                return
+
+        for signal in chunk:
+            try:
+                response = self.session.post(self.server_url, json=signal, timeout=5)
+                if response.status_code == 200:
+                    self._count(1, 0)
+                else:
+                    self._count(0, 1, f"HTTP {response.status_code}: {response.text[:200]}")
+            except Exception as e:
+                self._count(0, 1, f"Request failed: {e}")
+
+    def _count(self, success: int, errors: int, message: str = None):
+        """전송 결과 집계 (앞쪽 에러 3개만 출력)"""
+        with self._lock:
+            if errors and self.error_count < 3 and message:
+                print(f"[WARN] {message}")
+            self.success_count += success
+            self.error_count += errors
+
+    def close(self) -> tuple:
+        """남은 전송 대기 후 (성공, 실패) 반환"""
+        for future in self.futures:
+            future.result()
+        self.futures = []
+        self.executor.shutdown()
+        self.session.close()
+
+        elapsed = max(time.time() - self.started, 1e-9)
+        sent = self.success_count + self.error_count
+        print(f"[OK] Sent: {self.success_count}, Errors: {self.error_count} ({sent / elapsed:.0f} signals/s)")
+        return self.success_count, self.error_count
+
+
+def send_frames(frames: Iterable[pd.DataFrame], server_url: str = "http://localhost:8000/alert",
+                batch_size: int = 500, concurrency: int = 4) -> Tuple[int, int]:
+    """
+    알럿 청크 스트림을 /alerts/batch로 전송 (대기 요청 수 제한으로 메모리 일정)
+
+    Returns:
+        (성공, 실패)
+    """
+    sender = SignalSender(server_url, batch_size=batch_size, concurrency=concurrency)
+    for frame in frames:
+        sender.submit(frame_records(frame))
+    return sender.close()
+
+
+def import_frames(frames: Iterable[pd.DataFrame], defer_indexes: bool = False) -> Dict[str, Any]:
+    """
+    알럿 청크 스트림을 DB에 직접 벌크 저장 (server.ingest.bulk_import_alerts)
+
+    Returns:
+        bulk_import_alerts() 결과
+    """
+    from server.db import init_db
+    from server.ingest import bulk_import_alerts
+
+    init_db()
+    return bulk_import_alerts(frames, defer_indexes=defer_indexes)